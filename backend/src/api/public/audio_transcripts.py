@@ -13,6 +13,8 @@ from pathlib import Path
 from convex import ConvexClient
 import mimetypes
 from src.services.audio_preparation_service import audio_preparation_service
+from src.tasks.common import job_dir, remove_job_dir
+from src.tasks.transcribe import run_transcription
 
 # Load environment from backend/.env.local and .env explicitly
 try:
@@ -26,6 +28,9 @@ router = APIRouter()
 CONVEX_URL = os.getenv("NEXT_PUBLIC_CONVEX_URL", "http://127.0.0.1:3210")
 convex_client = ConvexClient(CONVEX_URL)
 MAX_FILE_SIZE = 25 * 1024 * 1024
+# Run separation/diarization/ASR on the Celery GPU workers instead of in this process
+TRANSCRIPTION_OFFLOAD = os.getenv("TRANSCRIPTION_OFFLOAD", "false").lower() == "true"
+TRANSCRIPTION_TIMEOUT = float(os.getenv("TRANSCRIPTION_TIMEOUT", "1800"))
 ALLOWED_FORMATS = {"audio/flac": ".flac", "audio/mpeg": ".mp3", "audio/mp3": ".mp3", "audio/mp4": ".mp4", "audio/x-m4a": ".m4a", "audio/ogg": ".ogg", "audio/wav": ".wav", "audio/webm": ".webm", "audio/x-wav": ".wav"}
 class JobStatusResponse(BaseModel):
     status: str; job_id: str; message: str
@@ -61,9 +66,17 @@ async def process_transcription_job(
             "identify_speakers": True, "min_speakers": 1, "max_speakers": 10,
         }
         
-        result = await audio_preparation_service.prepare_audio(
-            audio_path=file_path, provider="transcription", config=preparation_config
-        )
+        if TRANSCRIPTION_OFFLOAD:
+            result = await run_transcription(
+                file_path, job_id, timeout=TRANSCRIPTION_TIMEOUT,
+                separate=preparation_config["separate_voices"],
+                diarize=preparation_config["identify_speakers"],
+                chunk_seconds=preparation_config["max_segment_duration"],
+            )
+        else:
+            result = await audio_preparation_service.prepare_audio(
+                audio_path=file_path, provider="transcription", config=preparation_config
+            )
         
         transcript_text = result.get("transcription", "")
         
@@ -135,7 +148,10 @@ async def process_transcription_job(
         try:
             if os.path.exists(file_path): os.remove(file_path)
         except: pass
-        audio_preparation_service.cleanup()
+        if TRANSCRIPTION_OFFLOAD:
+            remove_job_dir(job_id)
+        else:
+            audio_preparation_service.cleanup()
 
 @router.post("/transcribe", response_model=JobStatusResponse, summary="Transcribe Audio File")
 async def transcribe_audio(
@@ -146,11 +162,12 @@ async def transcribe_audio(
     user_id: str = Form(...),
     # Other form fields are now handled in the background task kwargs
 ):
-    if not request.app.state.models_ready:
+    if not TRANSCRIPTION_OFFLOAD and not request.app.state.models_ready:
         raise HTTPException(status_code=503, detail="The transcription models are still loading. Please try again in a moment.")
     
     file_extension = validate_audio_file(file)
-    temp_dir = tempfile.mkdtemp()
+    # Offloaded jobs keep the upload in the work directory shared with the workers
+    temp_dir = job_dir(job_id) if TRANSCRIPTION_OFFLOAD else tempfile.mkdtemp()
     temp_file_path = os.path.join(temp_dir, f"{job_id}{file_extension}")
 
     try:
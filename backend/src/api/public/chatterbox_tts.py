@@ -12,6 +12,7 @@ import tempfile
 import os
 import logging
 
+from src.core.lazy import LazyObject
 from src.services.chatterbox_service import ChatterboxService
 
 # Configure logging
@@ -20,8 +21,8 @@ logger = logging.getLogger(__name__)
 # Create router
 router = APIRouter(prefix="/chatterbox")
 
-# Initialize service (singleton)
-chatterbox_service = ChatterboxService()
+# Initialize service (singleton) on first request; the constructor probes the GPU through torch
+chatterbox_service = LazyObject(ChatterboxService)
 
 
 @router.get("/health")
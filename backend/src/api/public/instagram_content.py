@@ -11,7 +11,6 @@ from typing import Optional, List, Dict, Any
 import asyncio
 import os
 import tempfile
-import aiofiles
 from datetime import datetime
 import uuid
 from dotenv import load_dotenv
@@ -22,6 +21,7 @@ import logging
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from src.services.instagram_service import get_instagram_service
+from src.services.media_stream import write_stream
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -228,18 +228,14 @@ async def process_media_download(job_id: str, post_ids: List[str], user_id: str,
             try:
                 logger.info(f"Downloading post {i+1}/{len(post_ids)}: {post_id}")
                 
-                # Download media bytes
-                media_bytes = await instagram_service.download_media_bytes(post_id)
-                
-                # Save to file (using .mp4 extension as default, adjust based on media type in production)
+                # Stream media straight to file (using .mp4 extension as default, adjust based on media type in production)
                 file_path = os.path.join(temp_dir, f"{post_id}.mp4")
-                async with aiofiles.open(file_path, 'wb') as f:
-                    await f.write(media_bytes)
+                file_size = await write_stream(instagram_service.stream_media(post_id), file_path)
                 
                 downloaded_files.append({
                     "postId": post_id,
                     "filePath": file_path,
-                    "fileSize": len(media_bytes)
+                    "fileSize": file_size
                 })
                 
                 # Update progress
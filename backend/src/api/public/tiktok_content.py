@@ -12,19 +12,19 @@ from typing import Optional, List, Dict, Any
 import asyncio
 import os
 import tempfile
-import aiofiles
 from datetime import datetime, timedelta
 import uuid
 from dotenv import load_dotenv
 from convex import ConvexClient
 import httpx
 import logging
-from pathlib import Path
-import time
 
 # Import our TikTok service
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from src.services.content_cache import ContentCache
+from src.services.download_scheduler import DownloadJob, get_download_scheduler
+from src.services.media_stream import AUDIO_FORMATS, prime_stream
 from src.services.tiktok_service import get_tiktok_service
 
 # Setup logger
@@ -45,6 +45,10 @@ CONVEX_URL = os.getenv("CONVEX_URL") or os.getenv("NEXT_PUBLIC_CONVEX_URL", "htt
 logger.info(f"Initializing Convex client with URL: {CONVEX_URL}")
 convex_client = ConvexClient(CONVEX_URL)
 
+# Interactive previews are scheduled ahead of bulk downloads
+PREVIEW_PRIORITY = 10
+PREVIEW_CACHE_MAX_AGE = 3600  # seconds
+
 
 class UserFetchRequest(BaseModel):
     """Request model for fetching TikTok user info."""
@@ -88,6 +92,7 @@ class VideoDownloadRequest(BaseModel):
     video_ids: List[str] = Field(..., description="List of video IDs to download")
     user_id: str = Field(..., description="User ID for rate limiting")
     username: str = Field(..., description="TikTok username for organization")
+    priority: int = Field(0, description="Download priority; higher is scheduled first")
 
     class Config:
         json_schema_extra = {
@@ -95,7 +100,8 @@ class VideoDownloadRequest(BaseModel):
                 "job_id": "job_123456",
                 "video_ids": ["7123456789012345678", "7123456789012345679"],
                 "user_id": "user123",
-                "username": "mrbeast"
+                "username": "mrbeast",
+                "priority": 0
             }
         }
 
@@ -152,6 +158,18 @@ def send_convex_webhook(job_id: str, status: str, **kwargs):
         print(f"Error sending webhook: {e}")
 
 
+def video_download_job(video_id: str, priority: int = 0, max_age: Optional[float] = None) -> DownloadJob:
+    """Scheduler job that streams a TikTok video into the shared media cache."""
+    tiktok_service = get_tiktok_service()
+    return DownloadJob(
+        key=f"tiktok:video:{video_id}",
+        open=lambda: tiktok_service.stream_video(video_id),
+        host="tiktok.com",
+        priority=priority,
+        max_age=max_age
+    )
+
+
 async def process_user_fetch(job_id: str, username: str, user_id: str):
     """Process user fetch job asynchronously."""
     print(f"[PRINT TASK] process_user_fetch STARTED - job_id: {job_id}, username: {username}")
@@ -232,12 +250,15 @@ async def process_videos_fetch(job_id: str, username: str, user_id: str, count:
         )
 
 
-async def process_video_download(job_id: str, video_ids: List[str], user_id: str, username: str):
+async def process_video_download(
+    job_id: str,
+    video_ids: List[str],
+    user_id: str,
+    username: str,
+    priority: int = 0
+):
     """Process video download job asynchronously."""
     try:
-        # Get TikTok service
-        tiktok_service = get_tiktok_service()
-        
         # Create temporary directory for downloads
         temp_dir = tempfile.mkdtemp(prefix=f"tiktok_{username}_")
         downloaded_files = []
@@ -250,36 +271,32 @@ async def process_video_download(job_id: str, video_ids: List[str], user_id: str
             totalVideos=len(video_ids)
         )
         
-        # Download each video
-        for i, video_id in enumerate(video_ids):
-            try:
-                # Download video bytes
-                video_bytes = await tiktok_service.download_video_bytes(video_id)
-                
-                # Save to file
-                file_path = os.path.join(temp_dir, f"{video_id}.mp4")
-                async with aiofiles.open(file_path, 'wb') as f:
-                    await f.write(video_bytes)
-                
-                downloaded_files.append({
-                    "videoId": video_id,
-                    "filePath": file_path,
-                    "fileSize": len(video_bytes)
-                })
-                
-                # Update progress
-                progress = int(((i + 1) / len(video_ids)) * 100)
-                send_convex_webhook(
-                    job_id,
-                    "downloading",
-                    progress=progress,
-                    totalVideos=len(video_ids),
-                    completedVideos=i + 1
-                )
-                
-            except Exception as e:
-                print(f"Error downloading video {video_id}: {e}")
+        def report_progress(result, completed, total):
+            if not result.ok:
+                print(f"Error downloading video {result.key}: {result.error}")
+            send_convex_webhook(
+                job_id,
+                "downloading",
+                progress=int((completed / total) * 100),
+                totalVideos=total,
+                completedVideos=completed
+            )
+        
+        # Download concurrently through the shared scheduler (bounded per host,
+        # retried, and served from the media cache when already downloaded)
+        jobs = [video_download_job(video_id, priority=priority) for video_id in video_ids]
+        results = await get_download_scheduler().download_many(jobs, on_progress=report_progress)
+        
+        for video_id, result in zip(video_ids, results):
+            if not result.ok:
                 # Continue with other videos
+                continue
+            file_path = ContentCache.link(result.path, os.path.join(temp_dir, f"{video_id}.mp4"))
+            downloaded_files.append({
+                "videoId": video_id,
+                "filePath": file_path,
+                "fileSize": result.size
+            })
         
         # Send success webhook
         send_convex_webhook(
@@ -417,7 +434,8 @@ async def download_videos(
         request.job_id,
         request.video_ids,
         request.user_id,
-        request.username
+        request.username,
+        request.priority
     )
     
     return JobStatusResponse(
@@ -636,64 +654,22 @@ async def stream_video(
         Video file stream with appropriate content type
     """
     try:
-        # Create cache directory if it doesn't exist
-        cache_dir = Path("/tmp/tiktok_preview_cache")
-        cache_dir.mkdir(exist_ok=True)
-        
-        # Cache file path
-        cache_path = cache_dir / f"{video_id}.mp4"
-        
-        # Check if video is already cached and not expired (1 hour cache)
-        if cache_path.exists():
-            file_size = cache_path.stat().st_size
-            file_age = time.time() - cache_path.stat().st_mtime
-            
-            # Check if file has content and is not expired
-            if file_size > 0 and file_age < 3600:  # Has content and less than 1 hour old
-                logger.info(f"Serving cached preview for video {video_id}, size: {file_size} bytes")
-                return FileResponse(
-                    path=str(cache_path),
-                    media_type="video/mp4",
-                    headers={
-                        "Accept-Ranges": "bytes",
-                        "Cache-Control": "public, max-age=3600",
-                        "Access-Control-Allow-Origin": "*",
-                    }
-                )
-            else:
-                # Remove expired or empty cache
-                cache_path.unlink()
-                if file_size == 0:
-                    logger.info(f"Removed empty cache file for video {video_id}")
-                else:
-                    logger.info(f"Removed expired cache for video {video_id}")
-        
-        # Download video preview using yt-dlp
-        logger.info(f"Downloading preview for video {video_id}")
-        
-        # Get TikTok service
-        tiktok_service = get_tiktok_service()
-        
-        # Use yt-dlp to download the video
-        video_bytes = await tiktok_service.download_video_bytes(video_id)
-        
-        # Validate video bytes
-        if not video_bytes or len(video_bytes) == 0:
-            raise Exception(f"Downloaded video is empty for {video_id}")
-        
-        # Save to cache
-        async with aiofiles.open(cache_path, 'wb') as f:
-            await f.write(video_bytes)
-        
-        # Verify the cached file
-        if not cache_path.exists() or cache_path.stat().st_size == 0:
-            raise Exception(f"Failed to cache video {video_id}")
+        # Serve from the shared media cache (1 hour), downloading ahead of
+        # queued bulk jobs on a miss
+        result = await get_download_scheduler().download(
+            video_download_job(video_id, priority=PREVIEW_PRIORITY, max_age=PREVIEW_CACHE_MAX_AGE)
+        )
+        if not result.ok:
+            raise Exception(result.error)
         
-        logger.info(f"Cached preview for video {video_id}, size: {len(video_bytes)} bytes")
+        if result.cached:
+            logger.info(f"Serving cached preview for video {video_id}, size: {result.size} bytes")
+        else:
+            logger.info(f"Cached preview for video {video_id}, size: {result.size} bytes")
         
         # Return the cached file
         return FileResponse(
-            path=str(cache_path),
+            path=result.path,
             media_type="video/mp4",
             headers={
                 "Accept-Ranges": "bytes",
@@ -933,7 +909,7 @@ async def download_video_preview(
     Download and serve a TikTok video preview.
     
     This is a fallback endpoint when proxy streaming fails due to TikTok blocking.
-    Downloads the video temporarily and serves it.
+    Streams the video through the backend chunk by chunk.
     
     **Rate Limiting**: 20 requests per hour per user
     
@@ -944,47 +920,18 @@ async def download_video_preview(
         # Get TikTok service
         tiktok_service = get_tiktok_service()
         
-        # Create temporary file for download
-        import tempfile
-        with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as tmp_file:
-            tmp_path = tmp_file.name
+        # Open the stream now so failures surface as an error response
+        logger.info(f"Streaming video {video_id} for preview")
+        video_stream = await prime_stream(tiktok_service.stream_video(video_id))
         
-        try:
-            # Download video using yt-dlp
-            logger.info(f"Downloading video {video_id} for preview")
-            video_bytes = await tiktok_service.download_video_bytes(video_id)
-            
-            if not video_bytes or len(video_bytes) == 0:
-                raise HTTPException(
-                    status_code=500,
-                    detail="Failed to download video"
-                )
-            
-            # Write to temporary file
-            async with aiofiles.open(tmp_path, 'wb') as f:
-                await f.write(video_bytes)
-            
-            # Create background task for cleanup
-            background_tasks = BackgroundTasks()
-            background_tasks.add_task(os.unlink, tmp_path)
-            
-            # Return file response
-            return FileResponse(
-                path=tmp_path,
-                media_type="video/mp4",
-                headers={
-                    "Accept-Ranges": "bytes",
-                    "Cache-Control": "public, max-age=3600",
-                    "Access-Control-Allow-Origin": "*",
-                },
-                background=background_tasks  # Delete after serving
-            )
-            
-        except Exception as e:
-            # Clean up temp file on error
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
-            raise
+        return StreamingResponse(
+            video_stream,
+            media_type="video/mp4",
+            headers={
+                "Cache-Control": "public, max-age=3600",
+                "Access-Control-Allow-Origin": "*",
+            }
+        )
             
     except HTTPException:
         raise
@@ -1005,41 +952,24 @@ async def clean_preview_cache(
     Clean up old preview cache files.
     
     This endpoint can be called periodically to remove old cached preview files
-    and free up disk space.
+    and free up disk space. Entries older than the cutoff are dropped, then any
+    stored video no remaining entry refers to is deleted. Empty files are never
+    stored, so remove_empty is accepted for compatibility only.
     
     Returns:
         Number of files cleaned
     """
     try:
-        cache_dir = Path("/tmp/tiktok_preview_cache")
-        if not cache_dir.exists():
-            return {"message": "Cache directory does not exist", "files_removed": 0}
-        
-        current_time = time.time()
-        max_age_seconds = max_age_hours * 3600
-        files_removed = 0
-        empty_files_removed = 0
-        
-        for cache_file in cache_dir.glob("*.mp4"):
-            file_size = cache_file.stat().st_size
-            file_age = current_time - cache_file.stat().st_mtime
-            
-            # Remove empty files regardless of age
-            if remove_empty and file_size == 0:
-                cache_file.unlink()
-                empty_files_removed += 1
-                logger.info(f"Removed empty cache file: {cache_file.name}")
-            # Remove old files
-            elif file_age > max_age_seconds:
-                cache_file.unlink()
-                files_removed += 1
-                logger.info(f"Removed old cache file: {cache_file.name} (age: {file_age/3600:.1f} hours)")
+        removed = get_download_scheduler().cache.prune(max_age=max_age_hours * 3600)
+        logger.info(f"Pruned media cache: {removed}")
         
         return {
             "message": f"Cleaned cache files",
-            "old_files_removed": files_removed,
-            "empty_files_removed": empty_files_removed,
-            "total_removed": files_removed + empty_files_removed
+            "old_files_removed": removed["objects_removed"],
+            "empty_files_removed": 0,
+            "total_removed": removed["objects_removed"],
+            "entries_removed": removed["refs_removed"],
+            "bytes_removed": removed["bytes_removed"]
         }
         
     except Exception as e:
@@ -1061,20 +991,12 @@ async def clear_all_cache():
         Number of files removed
     """
     try:
-        cache_dir = Path("/tmp/tiktok_preview_cache")
-        if not cache_dir.exists():
-            return {"message": "Cache directory does not exist", "files_removed": 0}
-        
-        files_removed = 0
-        
-        for cache_file in cache_dir.glob("*.mp4"):
-            cache_file.unlink()
-            files_removed += 1
-            logger.info(f"Removed cache file: {cache_file.name}")
+        removed = get_download_scheduler().cache.prune()
+        logger.info(f"Cleared media cache: {removed}")
         
         return {
             "message": "Cleared all cache files",
-            "files_removed": files_removed
+            "files_removed": removed["objects_removed"]
         }
         
     except Exception as e:
@@ -1085,6 +1007,21 @@ async def clear_all_cache():
         )
 
 
+@router.get("/downloads/stats", summary="TikTok Download Scheduler Stats")
+async def get_download_stats():
+    """
+    Report download scheduler activity and media cache usage.
+    
+    Returns:
+        Queue depth, running downloads per host, counters and cache size
+    """
+    scheduler = get_download_scheduler()
+    return {
+        "scheduler": scheduler.get_stats(),
+        "cache": scheduler.cache.get_stats()
+    }
+
+
 @router.get("/audio/{video_id}", summary="Extract Audio from TikTok Video")
 async def extract_audio(
     video_id: str,
@@ -1094,8 +1031,8 @@ async def extract_audio(
     """
     Extract and serve audio from a TikTok video.
     
-    This endpoint extracts audio from the video and returns it in the requested format.
-    If FFmpeg is not available, it returns the original video file.
+    This endpoint streams audio from the video in the requested format, transcoded
+    on the fly by FFmpeg. If FFmpeg is not available, it streams the original video.
     
     **Rate Limiting**: 30 requests per hour per user
     
@@ -1114,57 +1051,22 @@ async def extract_audio(
         # Get TikTok service
         tiktok_service = get_tiktok_service()
         
-        # Create temporary file for download
-        import tempfile
-        with tempfile.NamedTemporaryFile(suffix=f'.{format}', delete=False) as tmp_file:
-            tmp_path = tmp_file.name
+        # Stream audio straight out of ffmpeg
+        logger.info(f"Extracting audio from video {video_id} in {format} format")
+        audio_stream = await prime_stream(tiktok_service.stream_audio(video_id, format))
         
-        try:
-            # Download audio
-            logger.info(f"Extracting audio from video {video_id} in {format} format")
-            audio_bytes = await tiktok_service.download_audio_bytes(video_id, format)
-            
-            if not audio_bytes or len(audio_bytes) == 0:
-                raise HTTPException(
-                    status_code=500,
-                    detail="Failed to extract audio"
-                )
-            
-            # Write to temporary file
-            async with aiofiles.open(tmp_path, 'wb') as f:
-                await f.write(audio_bytes)
-            
-            # Determine media type
-            media_types = {
-                "mp3": "audio/mpeg",
-                "m4a": "audio/mp4",
-                "wav": "audio/wav",
-                "aac": "audio/aac",
-                "original": "video/mp4"  # Fallback to video
+        # Determine media type (original falls back to the video)
+        media_type = AUDIO_FORMATS.get(format, {}).get("media_type", "video/mp4")
+        
+        return StreamingResponse(
+            audio_stream,
+            media_type=media_type,
+            headers={
+                "Content-Disposition": f'attachment; filename="tiktok_{video_id}.{format}"',
+                "Cache-Control": "public, max-age=3600",
+                "Access-Control-Allow-Origin": "*",
             }
-            media_type = media_types.get(format, "audio/mpeg")
-            
-            # Create background task for cleanup
-            background_tasks = BackgroundTasks()
-            background_tasks.add_task(os.unlink, tmp_path)
-            
-            # Return file response
-            return FileResponse(
-                path=tmp_path,
-                media_type=media_type,
-                headers={
-                    "Content-Disposition": f'attachment; filename="tiktok_{video_id}.{format}"',
-                    "Cache-Control": "public, max-age=3600",
-                    "Access-Control-Allow-Origin": "*",
-                },
-                background=background_tasks  # Delete after serving
-            )
-            
-        except Exception as e:
-            # Clean up temp file on error
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
-            raise
+        )
             
     except HTTPException:
         raise
@@ -15,6 +15,7 @@ import base64
 import httpx
 import logging
 
+from src.core.lazy import LazyObject
 from src.services.chatterbox_service import ChatterboxService
 
 logger = logging.getLogger(__name__)
@@ -39,7 +40,8 @@ DIA_API_URL = os.getenv("DIA_API_URL", "http://localhost:8882/v1")
 ORPHEUS_API_URL = os.getenv("ORPHEUS_API_URL", "http://localhost:5005")
 SESAme_API_URL = os.getenv("SESAME_API_URL")
 
-chatterbox_service = ChatterboxService()
+# Built on first request; the constructor probes the GPU through torch
+chatterbox_service = LazyObject(ChatterboxService)
 
 
 async def _speak_chatterbox(text: str, voice_id: Optional[str], fmt: str):
@@ -11,7 +11,6 @@ from typing import Optional, List, Dict, Any
 import asyncio
 import os
 import tempfile
-import aiofiles
 from datetime import datetime
 import uuid
 from dotenv import load_dotenv
@@ -21,6 +20,7 @@ import logging
 # Import our Twitch service
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from src.services.media_stream import write_stream
 from src.services.twitch_service import get_twitch_service
 
 # Set up logging
@@ -292,22 +292,18 @@ async def process_video_download(job_id: str, video_ids: List[str], user_id: str
                 print(f"\n[Twitch] Downloading video {i+1}/{len(video_ids)}: {video_id}")
                 logger.info(f"Downloading video {i+1}/{len(video_ids)}: {video_id}")
                 
-                # Download video bytes
-                video_bytes = await twitch_service.download_video_bytes(video_id)
-                
-                # Save to file
+                # Stream the video straight to file
                 file_path = os.path.join(temp_dir, f"{video_id}.mp4")
-                async with aiofiles.open(file_path, 'wb') as f:
-                    await f.write(video_bytes)
+                file_size = await write_stream(twitch_service.stream_video(video_id), file_path)
                 
                 downloaded_files.append({
                     "videoId": video_id,
                     "filePath": file_path,
-                    "fileSize": len(video_bytes)
+                    "fileSize": file_size
                 })
                 
                 print(f"  ✓ Downloaded: {file_path}")
-                print(f"  File size: {len(video_bytes)} bytes")
+                print(f"  File size: {file_size} bytes")
                 
                 # Update progress
                 progress = int(((i + 1) / len(video_ids)) * 100)
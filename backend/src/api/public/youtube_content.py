@@ -17,9 +17,10 @@ import uuid
 import re
 from dotenv import load_dotenv
 from convex import ConvexClient
-import yt_dlp
 import json
 
+from src.services.ytdlp_pool import get_ytdlp_pool
+
 # Load environment variables
 env_path = os.path.join(os.path.dirname(__file__), "../../../../frontend/.env.local")
 load_dotenv(env_path)
@@ -162,7 +163,6 @@ def send_convex_webhook(job_id: str, status: str, **kwargs):
 async def fetch_channel_data(channel_url: str) -> Dict[str, Any]:
     """Fetch real channel data using yt-dlp."""
     import asyncio
-    import concurrent.futures
     
     print(f"[fetch_channel_data] Starting extraction for: {channel_url}")
     
@@ -200,17 +200,10 @@ async def fetch_channel_data(channel_url: str) -> Dict[str, Any]:
         
         print(f"[fetch_channel_data] Fetching from URL: {channel_videos_url}")
         
-        # Use asyncio with timeout
-        loop = asyncio.get_event_loop()
-        
-        def extract_info_sync():
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                return ydl.extract_info(channel_videos_url, download=False)
-        
-        # Run in executor with timeout
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future = loop.run_in_executor(executor, extract_info_sync)
-            info = await asyncio.wait_for(future, timeout=30.0)
+        # Extract on a pooled yt-dlp instance, with timeout
+        info = await asyncio.wait_for(
+            get_ytdlp_pool().extract_info(channel_videos_url, ydl_opts), timeout=30.0
+        )
         
         print(f"[fetch_channel_data] Extraction completed, processing data...")
         
@@ -290,7 +283,6 @@ async def fetch_channel_data(channel_url: str) -> Dict[str, Any]:
 async def fetch_channel_videos(channel_id: str, count: int = 6, sort_by: str = "newest") -> List[Dict[str, Any]]:
     """Fetch real videos from a YouTube channel using yt-dlp."""
     import asyncio
-    import concurrent.futures
     
     print(f"[fetch_channel_videos] Starting video fetch for channel: {channel_id}, count: {count}")
     
@@ -317,17 +309,10 @@ async def fetch_channel_videos(channel_id: str, count: int = 6, sort_by: str = "
     print(f"[fetch_channel_videos] Fetching from URL: {playlist_url}")
     
     try:
-        # Use asyncio with timeout
-        loop = asyncio.get_event_loop()
-        
-        def extract_info_sync():
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                return ydl.extract_info(playlist_url, download=False)
-        
-        # Run in executor with timeout
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future = loop.run_in_executor(executor, extract_info_sync)
-            playlist_info = await asyncio.wait_for(future, timeout=30.0)
+        # Extract on a pooled yt-dlp instance, with timeout
+        playlist_info = await asyncio.wait_for(
+            get_ytdlp_pool().extract_info(playlist_url, ydl_opts), timeout=30.0
+        )
         
         print(f"[fetch_channel_videos] Extraction completed, processing videos...")
         
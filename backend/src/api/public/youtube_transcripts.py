@@ -8,24 +8,25 @@ and integrates with Convex for job management and rate limiting.
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
 from pydantic import BaseModel, Field
 from youtube_transcript_api import YouTubeTranscriptApi
-import yt_dlp
 import re
 from typing import Optional, List, Dict
 import asyncio
 import os
 from dotenv import load_dotenv
-from convex import ConvexClient
 from datetime import datetime
 
+from src.services.convex_progress import get_progress_publisher
+from src.services.ytdlp_pool import get_ytdlp_pool
+
 # Load environment variables
 env_path = os.path.join(os.path.dirname(__file__), "../../../../frontend/.env.local")
 load_dotenv(env_path)
 
 router = APIRouter()
 
-# Initialize Convex client
+# Convex webhooks go out over the shared async publisher instead of a blocking client
 CONVEX_URL = os.getenv("NEXT_PUBLIC_CONVEX_URL", "http://127.0.0.1:3210")
-convex_client = ConvexClient(CONVEX_URL)
+convex_publisher = get_progress_publisher(CONVEX_URL)
 
 class TranscriptRequest(BaseModel):
     """Request model for fetching YouTube transcripts."""
@@ -95,8 +96,8 @@ def fetch_video_metadata(video_url: str) -> Optional[VideoMetadata]:
     }
     
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(video_url, download=False)
+        info = get_ytdlp_pool().extract_info_sync(video_url, ydl_opts)
+        if info:
             
             # Extract metadata
             metadata = VideoMetadata(
@@ -113,11 +114,11 @@ def fetch_video_metadata(video_url: str) -> Optional[VideoMetadata]:
         print(f"Error fetching video metadata: {e}")
         return None
 
-def send_convex_webhook(job_id: str, status: str, **kwargs):
+async def send_convex_webhook(job_id: str, status: str, **kwargs):
     """Send webhook to Convex to update job status"""
     try:
         # Call the Convex mutation
-        convex_client.mutation("mutations/youtubeTranscripts:transcriptWebhook", {
+        await convex_publisher.send("mutations/youtubeTranscripts:transcriptWebhook", {
             "jobId": job_id,
             "status": status,
             **kwargs
@@ -131,7 +132,7 @@ async def process_transcript_job(job_id: str, youtube_url: str, user_id: str):
         # Extract video ID
         video_id = extract_video_id(youtube_url)
         if not video_id:
-            send_convex_webhook(
+            await send_convex_webhook(
                 job_id, 
                 "failed", 
                 error="Invalid YouTube URL"
@@ -177,11 +178,11 @@ async def process_transcript_job(job_id: str, youtube_url: str, user_id: str):
             })
         
         # Send webhook using dictionary unpacking
-        convex_client.mutation("mutations/youtubeTranscripts:transcriptWebhook", webhook_data)
+        await convex_publisher.send("mutations/youtubeTranscripts:transcriptWebhook", webhook_data)
         
     except Exception as e:
         # Send failure webhook
-        send_convex_webhook(
+        await send_convex_webhook(
             job_id,
             "failed",
             error=str(e)
@@ -7,7 +7,7 @@ Provides REST API for telephony operations and serves BXML for call control.
 import os
 import sys
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from pathlib import Path
 
 # Add project root to path
@@ -39,6 +39,7 @@ app = FastAPI(title="Diala Telephony API", version="1.0.0")
 class StartCallRequest(BaseModel):
     user_id: str = Field(..., description="User ID")
     phone_number: str = Field(..., description="Phone number to call")
+    latency_budget_s: Optional[float] = Field(None, gt=0, description="Per-call transcript latency budget in seconds")
 
 class EndCallRequest(BaseModel):
     call_id: str = Field(..., description="Call identifier")
@@ -77,7 +78,8 @@ async def start_call(request: StartCallRequest):
         result = await telephony_service.start_call(
             request.user_id,
             request.phone_number,
-            "outbound"
+            "outbound",
+            latency_budget_s=request.latency_budget_s
         )
         return {"success": True, "data": result}
     except Exception as e:
@@ -102,6 +104,11 @@ async def get_status(call_id: str):
         raise HTTPException(status_code=404, detail=result["error"])
     return {"success": True, "data": result}
 
+@app.get("/api/telephony/inference/stats")
+async def get_inference_stats():
+    """Queue depth and latency metrics of the shared ASR/speaker-ID scheduler"""
+    return {"success": True, "data": telephony_service.get_inference_stats()}
+
 # WebSocket endpoint is now managed by gstreamer_service
 @app.websocket("/ws/{call_id}")
 async def websocket_endpoint(websocket: WebSocket, call_id: str):
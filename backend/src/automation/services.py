@@ -4,9 +4,11 @@ Core workflow execution services.
 
 import asyncio
 import json
+import os
 import uuid
+from collections import deque
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Type
+from typing import Any, Dict, List, Optional, Tuple, Type
 from abc import ABC, abstractmethod
 import httpx
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -15,6 +17,9 @@ from sqlalchemy import select
 from .models import Workflow, WorkflowExecution, ExecutionStatus
 from ..core.logging import logger
 
+# Nodes of one workflow execution allowed to run at the same time
+DEFAULT_MAX_CONCURRENT_NODES = int(os.environ.get("AUTOMATION_MAX_CONCURRENT_NODES", "8"))
+
 
 class BaseNode(ABC):
     """Base class for all workflow nodes."""
@@ -263,11 +268,22 @@ NodeRegistry.register("dialaMakeCall", DialaMakeCallNode)
 
 
 class WorkflowExecutor:
-    """Executes workflows."""
+    """
+    Executes workflows.
+
+    Nodes run as a DAG: every node whose parents have all finished is started
+    right away, so independent branches run concurrently (up to
+    ``max_concurrency`` nodes at once) and a fan-in node runs once, after all
+    of its parents. Start nodes receive the trigger data; a node with one
+    parent receives that parent's output, and a node with several receives a
+    dict of parent id -> output. Every node also finds its parents' outputs
+    under ``context["inputs"]``.
+    """
     
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, max_concurrency: Optional[int] = None):
         self.db = db
         self.execution_data: Dict[str, Any] = {}
+        self.max_concurrency = max_concurrency or DEFAULT_MAX_CONCURRENT_NODES
         
     async def execute_workflow(self, workflow_id: str, trigger_data: Optional[Dict[str, Any]] = None) -> WorkflowExecution:
         """Execute a workflow."""
@@ -309,61 +325,108 @@ class WorkflowExecutor:
         return execution
     
     async def _execute_nodes(self, workflow: Workflow, trigger_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute workflow nodes in order."""
-        nodes = workflow.nodes or []
-        connections = workflow.connections or {}
-        execution_data = {}
+        """Execute workflow nodes as a DAG, running ready nodes concurrently."""
+        node_index, parents, children = self._build_graph(workflow.nodes or [], workflow.connections or {})
+        waiting = {node_id: len(parent_ids) for node_id, parent_ids in parents.items()}
+        settings = getattr(workflow, "settings", None) or {}
+        semaphore = asyncio.Semaphore(settings.get("maxConcurrency") or self.max_concurrency)
+        execution_data: Dict[str, Any] = {}
         
-        # Find start nodes (triggers or nodes without inputs)
-        start_nodes = self._find_start_nodes(nodes, connections)
+        async def run_node(node_instance: BaseNode, input_data: Any, inputs: Dict[str, Any]) -> Any:
+            async with semaphore:
+                return await node_instance.execute(input_data, {"workflow": workflow, "inputs": inputs})
         
-        # Execute nodes using BFS
-        queue = [(node, trigger_data) for node in start_nodes]
-        executed = set()
+        def release(node_id: str):
+            # Fan-out targets become ready together; fan-in targets wait for every parent
+            for child_id in children[node_id]:
+                waiting[child_id] -= 1
+                if waiting[child_id] == 0:
+                    ready.append(child_id)
         
-        while queue:
-            node, input_data = queue.pop(0)
-            node_id = node["id"]
-            
-            if node_id in executed:
-                continue
-                
-            # Create and execute node
-            node_instance = NodeRegistry.create_node(
-                node["type"],
-                node_id,
-                node.get("parameters", {}),
-                node.get("credentials"),
-            )
+        # Start nodes are those not targeted by any connection
+        ready = deque(node_id for node_id, count in waiting.items() if count == 0)
+        running: Dict[asyncio.Task, str] = {}
+        
+        while ready or running:
+            while ready:
+                node_id = ready.popleft()
+                node = node_index[node_id]
+                inputs = {p: execution_data[p] for p in parents[node_id] if p in execution_data}
+                node_instance = NodeRegistry.create_node(
+                    node["type"],
+                    node_id,
+                    node.get("parameters", {}),
+                    node.get("credentials"),
+                )
+                # Nodes of unknown type, and nodes none of whose parents ran,
+                # are skipped along with anything that only they lead to
+                if node_instance is None or (parents[node_id] and not inputs):
+                    if node_instance is None:
+                        logger.warning(f"Skipping node {node_id}: unknown node type {node['type']}")
+                    release(node_id)
+                    continue
+                if not parents[node_id]:
+                    input_data = trigger_data
+                elif len(inputs) == 1:
+                    input_data = next(iter(inputs.values()))
+                else:
+                    input_data = inputs
+                running[asyncio.ensure_future(run_node(node_instance, input_data, inputs))] = node_id
+            if not running:
+                break
             
-            if node_instance:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                node_id = running.pop(task)
                 try:
-                    output_data = await node_instance.execute(input_data, {"workflow": workflow})
-                    execution_data[node_id] = output_data
-                    executed.add(node_id)
-                    
-                    # Queue connected nodes
-                    if node_id in connections:
-                        for connection in connections[node_id].get("main", [[]]):
-                            for target in connection:
-                                target_node = next((n for n in nodes if n["id"] == target["node"]), None)
-                                if target_node:
-                                    queue.append((target_node, output_data))
-                                    
+                    output_data = task.result()
                 except Exception as e:
                     logger.error(f"Node {node_id} execution error: {str(e)}")
+                    for other in running:
+                        other.cancel()
+                    await asyncio.gather(*running, return_exceptions=True)
                     raise
+                execution_data[node_id] = output_data
+                release(node_id)
         
         return execution_data
     
-    def _find_start_nodes(self, nodes: List[Dict], connections: Dict) -> List[Dict]:
-        """Find nodes that should execute first."""
-        # Find all nodes that are targets of connections
-        target_nodes = set()
-        for source_connections in connections.values():
+    def _build_graph(self, nodes: List[Dict], connections: Dict) -> Tuple[Dict[str, Dict], Dict[str, List[str]], Dict[str, List[str]]]:
+        """
+        Index nodes by id and resolve connections into parent/child lists.
+        
+        Connections from or to unknown node ids are ignored.
+        
+        Raises:
+            ValueError: If the connections contain a cycle
+        """
+        node_index = {node["id"]: node for node in nodes}
+        parents: Dict[str, List[str]] = {node_id: [] for node_id in node_index}
+        children: Dict[str, List[str]] = {node_id: [] for node_id in node_index}
+        
+        for source_id, source_connections in connections.items():
+            if source_id not in node_index:
+                continue
             for output_connections in source_connections.get("main", [[]]):
                 for connection in output_connections:
-                    target_nodes.add(connection["node"])
+                    target_id = connection["node"]
+                    if target_id in node_index and target_id not in children[source_id]:
+                        children[source_id].append(target_id)
+                        parents[target_id].append(source_id)
         
-        # Start nodes are those not targeted by any connection
-        return [node for node in nodes if node["id"] not in target_nodes]
\ No newline at end of file
+        # Kahn's algorithm: anything never released sits on a cycle
+        waiting = {node_id: len(parent_ids) for node_id, parent_ids in parents.items()}
+        frontier = [node_id for node_id, count in waiting.items() if count == 0]
+        visited = 0
+        while frontier:
+            node_id = frontier.pop()
+            visited += 1
+            for child_id in children[node_id]:
+                waiting[child_id] -= 1
+                if waiting[child_id] == 0:
+                    frontier.append(child_id)
+        if visited < len(node_index):
+            cyclic = sorted(node_id for node_id, count in waiting.items() if count > 0)
+            raise ValueError(f"Workflow connections contain a cycle through nodes: {', '.join(cyclic)}")
+        
+        return node_index, parents, children
@@ -1,16 +1,48 @@
+"""
+Celery Application
+
+Multi-second inference runs on Celery workers, not in the API process.
+Tasks are routed by name to two queues:
+
+- ``gpu``: model inference (Demucs, diarization, ASR, speaker embeddings),
+  consumed by ``workers/worker_gpu.py``, a single process that keeps the
+  models loaded between tasks
+- ``default``: light CPU work (splitting audio, merging results),
+  consumed by ``workers/worker_default.py``
+
+Set CELERY_TASK_ALWAYS_EAGER=true to run tasks inline (tests, local dev).
+"""
+
+import os
+
 from celery import Celery
+from kombu import Queue
+
+BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
+RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/1")
+
+DEFAULT_QUEUE = "default"
+GPU_QUEUE = "gpu"
+
+# Tasks that load models; everything else runs on the default queue
+GPU_TASKS = (
+    "voice.separate_vocals",
+    "voice.diarize",
+    "voice.speaker_embeddings",
+    "transcribe.transcribe_chunk",
+)
 
 celery_app = Celery(
     "diala",
-    broker="redis://localhost:6379/0",
-    backend="redis://localhost:6379/1",
+    broker=BROKER_URL,
+    backend=RESULT_BACKEND,
     include=[
-        "tasks.agent",
-        "tasks.hunter",
-        "tasks.rag",
-        "tasks.swarm",
-        "tasks.transcribe",
-        "tasks.voice",
+        "src.tasks.agent",
+        "src.tasks.hunter",
+        "src.tasks.rag",
+        "src.tasks.swarm",
+        "src.tasks.transcribe",
+        "src.tasks.voice",
     ],
 )
 
@@ -19,4 +51,12 @@ celery_app.conf.update(
     task_reject_on_worker_lost=True,
     worker_prefetch_multiplier=1,
     result_expires=86400,
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    task_default_queue=DEFAULT_QUEUE,
+    task_queues=(Queue(DEFAULT_QUEUE), Queue(GPU_QUEUE)),
+    task_routes={name: {"queue": GPU_QUEUE} for name in GPU_TASKS},
+    task_always_eager=os.getenv("CELERY_TASK_ALWAYS_EAGER", "false").lower() == "true",
+    task_eager_propagates=True,
 )
@@ -0,0 +1,122 @@
+"""
+Deferred Imports
+
+Heavy ML libraries (torch, transformers, pyannote, speechbrain, ...) take
+seconds to import and pull gigabytes into every process that touches them.
+Service modules bind them through these proxies instead, so importing a
+router or service stays cheap and the library (or service) is only loaded
+on first real use:
+
+    torch = lazy_import("torch")                      # imported on first attribute access
+    separation = LazyObject(AudioSeparationService)   # constructed on first attribute access
+
+Availability checks use ``is_available``, which locates a package without
+importing it.
+"""
+
+import importlib
+import importlib.util
+import sys
+import threading
+import types
+from typing import Any, Callable, Iterable, List
+
+# Libraries that must not be imported just by importing the API
+HEAVY_MODULES = (
+    "torch", "torchaudio", "transformers", "pyannote.audio", "speechbrain",
+    "funasr", "chatterbox", "sklearn", "pandas", "librosa", "demucs",
+)
+
+
+class LazyModule(types.ModuleType):
+    """Module stand-in that imports the real module on first attribute access"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__.get("_lazy_module")
+        if module is None:
+            with self._lazy_lock:
+                module = self.__dict__.get("_lazy_module")
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._load(), name)
+
+    def __dir__(self) -> List[str]:
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if "_lazy_module" in self.__dict__ else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Return ``name`` if already imported, else a proxy that imports it on first use"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
+
+
+class LazyObject:
+    """
+    Proxy that builds its target with ``factory()`` on first attribute access
+
+    Used for module-level service singletons whose constructors load models
+    or touch heavy libraries. Construction is thread-safe and happens once.
+    """
+
+    __slots__ = ("_factory", "_target", "_lock")
+
+    def __init__(self, factory: Callable[[], Any]):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_target", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _resolve(self) -> Any:
+        target = object.__getattribute__(self, "_target")
+        if target is None:
+            with object.__getattribute__(self, "_lock"):
+                target = object.__getattribute__(self, "_target")
+                if target is None:
+                    target = object.__getattribute__(self, "_factory")()
+                    object.__setattr__(self, "_target", target)
+        return target
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._resolve(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._resolve(), name, value)
+
+    def __repr__(self) -> str:
+        target = object.__getattribute__(self, "_target")
+        return f"<lazy {target!r}>" if target is not None else "<lazy object (not built)>"
+
+
+def is_resolved(proxy: Any) -> bool:
+    """Whether a LazyObject has built its target (True for plain objects)"""
+    if isinstance(proxy, LazyObject):
+        return object.__getattribute__(proxy, "_target") is not None
+    return True
+
+
+def is_available(name: str) -> bool:
+    """Whether ``name`` can be imported, without importing it"""
+    if name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def loaded_heavy_modules(names: Iterable[str] = HEAVY_MODULES) -> List[str]:
+    """Heavy libraries currently imported in this process"""
+    return [name for name in names if name in sys.modules]
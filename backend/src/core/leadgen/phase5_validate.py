@@ -7,8 +7,11 @@ to identify companies that meet the specified requirements.
 
 import os
 import json
+import hashlib
 import logging
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Dict, Any, Optional
 from dotenv import load_dotenv
@@ -35,7 +38,9 @@ logger = logging.getLogger(__name__)
 # Constants
 COMBINED_DATA_FILE = "data/combined_data.json"
 VALIDATED_DATA_FILE = "data/validated_data.json"
+VALIDATION_CACHE_FILE = "data/validation_cache.jsonl"
 DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
+MAX_VALIDATION_WORKERS = int(os.getenv("PHASE5_MAX_WORKERS", "16"))
 
 
 def load_combined_data():
@@ -104,24 +109,123 @@ def extract_text_content(website: Dict[str, Any]) -> str:
     return text_content.strip()
 
 
-def validate_website_entry(website: Dict[str, Any], validation_criteria: Dict[str, Any]) -> tuple:
+def criteria_fingerprint(validation_criteria: Dict[str, Any]) -> str:
+    """
+    Hash validation criteria so verdicts can be reused across runs.
+    
+    Args:
+        validation_criteria (dict): User-defined validation criteria
+        
+    Returns:
+        str: Stable hex digest of the criteria
+    """
+    canonical = json.dumps(validation_criteria, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def validation_cache_key(url: str, text_content: str, criteria_hash: str) -> str:
+    """
+    Build the cache key for a website verdict.
+    
+    Args:
+        url (str): The website URL
+        text_content (str): Extracted website text
+        criteria_hash (str): Output of criteria_fingerprint
+        
+    Returns:
+        str: Hex digest identifying this (content, criteria) pair
+    """
+    digest = hashlib.sha256()
+    for part in (url, text_content, criteria_hash):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ValidationCache:
+    """
+    Append-only JSONL store of validation verdicts.
+    
+    Each verdict is written as soon as it is produced, so an interrupted run
+    resumes by skipping every website whose content and criteria are unchanged.
+    """
+    
+    def __init__(self, path: str = VALIDATION_CACHE_FILE):
+        self.path = path
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._load()
+    
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        complete = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # A run killed mid-write leaves a partial last line
+                    break
+                complete += len(line)
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._entries[entry["key"]] = entry
+        if complete < os.path.getsize(self.path):
+            # Drop the fragment so the next verdict starts on a fresh line
+            with open(self.path, 'r+b') as f:
+                f.truncate(complete)
+        logger.info(f"Loaded {len(self._entries)} cached verdicts from {self.path}")
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._entries.get(key)
+    
+    def put(self, key: str, url: str, is_valid: bool, validation_results: Dict[str, Any]):
+        entry = {
+            "key": key,
+            "url": url,
+            "is_valid": is_valid,
+            "validation_results": validation_results,
+        }
+        line = json.dumps(entry, default=str)
+        with self._lock:
+            self._entries[key] = entry
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a') as f:
+                f.write(line + "\n")
+                f.flush()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def validate_website_entry(
+    website: Dict[str, Any],
+    validation_criteria: Dict[str, Any],
+    llm_client: Optional[Any] = None,
+    text_content: Optional[str] = None
+) -> tuple:
     """
     Validate a website against user-defined criteria.
     
     Args:
         website (dict): The website data
         validation_criteria (dict): User-defined validation criteria
+        llm_client (optional): Client with a DeepSeekAIClient-compatible
+                               validate_content method. Defaults to DeepSeek
+                               when DEEPSEEK_API_KEY is set.
+        text_content (str, optional): Pre-extracted text content
         
     Returns:
         tuple: (is_valid, validation_results)
     """
     url = website.get("url", "")
-    
-    # Log validation criteria for debugging
-    logger.info(f"Validating {url} with criteria: {json.dumps(validation_criteria, indent=2)}")
+    logger.debug(f"Validating {url}")
     
     # Extract text content
-    text_content = extract_text_content(website)
+    if text_content is None:
+        text_content = extract_text_content(website)
     
     # Perform generic validation
     is_valid = validate_website(text_content, url, validation_criteria)
@@ -137,11 +241,12 @@ def validate_website_entry(website: Dict[str, Any], validation_criteria: Dict[st
         "criteria_used": validation_criteria
     }
     
+    if llm_client is None and DEEPSEEK_API_KEY:
+        llm_client = DeepSeekAIClient()
+    
     # AI validation if available and custom rules are present
-    if DEEPSEEK_API_KEY and validation_criteria.get('customValidationRules'):
+    if llm_client is not None and validation_criteria.get('customValidationRules'):
         try:
-            deepseek_client = DeepSeekAIClient()
-            
             # Create a custom prompt based on validation criteria
             custom_prompt = f"""
             Check if this website meets the following criteria:
@@ -150,9 +255,10 @@ def validate_website_entry(website: Dict[str, Any], validation_criteria: Dict[st
             - Custom Rules: {validation_criteria.get('customValidationRules', '')}
             
             Analyze the content and determine if it meets these requirements.
+            Respond with JSON: {{"is_valid": true/false, "evidence": "brief explanation", "confidence": 0.0-1.0}}.
             """
             
-            ai_validation = deepseek_client.validate_content(text_content, validation_type="custom", custom_prompt=custom_prompt)
+            ai_validation = llm_client.validate_content(text_content, validation_type="custom", custom_prompt=custom_prompt)
             if ai_validation:
                 validation_results["ai_validation"] = {
                     "is_valid": ai_validation.get("is_valid", False),
@@ -195,13 +301,25 @@ def save_validated_data(validated_data):
         return False
 
 
-def run(validation_criteria: Optional[Dict[str, Any]] = None):
+def run(
+    validation_criteria: Optional[Dict[str, Any]] = None,
+    max_workers: Optional[int] = None,
+    llm_client: Optional[Any] = None,
+    cache_file: Optional[str] = VALIDATION_CACHE_FILE
+):
     """
     Run phase 5: Validate website data using user-defined criteria.
     
+    Websites are validated concurrently on a bounded thread pool. Verdicts are
+    cached by a hash of the website content and the criteria and persisted as
+    they complete, so re-runs and interrupted runs only pay for new work.
+    
     Args:
         validation_criteria (dict): User-defined validation criteria from frontend.
                                    REQUIRED - this phase only supports generic validation.
+        max_workers (int, optional): Concurrent validations (default PHASE5_MAX_WORKERS)
+        llm_client (optional): Override for the LLM validation client
+        cache_file (str, optional): Verdict cache path, or None to disable caching
     
     Returns:
         dict: The validated data
@@ -223,35 +341,73 @@ def run(validation_criteria: Optional[Dict[str, Any]] = None):
         logger.warning("No websites found in combined data")
         return {"websites": []}
     
-    # Validate each website
-    validated_websites = []
-    valid_count = 0
+    if llm_client is None and DEEPSEEK_API_KEY:
+        # One client shared by all workers
+        llm_client = DeepSeekAIClient()
+    
+    cache = ValidationCache(cache_file) if cache_file else None
+    criteria_hash = criteria_fingerprint(validation_criteria)
     
+    # Resolve cache hits up front; only misses go to the worker pool
+    pending = []
+    cached_count = 0
     for i, website in enumerate(websites):
-        url = website.get("url", "")
-        logger.info(f"Validating website {i+1}/{len(websites)}: {url}")
-        
-        try:
-            # Perform validation with user criteria
-            is_valid, validation_results = validate_website_entry(website, validation_criteria)
-            
-            # Add validation results to website data
-            website["is_valid"] = is_valid
-            website["validation_results"] = validation_results
-            
-            if is_valid:
-                valid_count += 1
-                logger.info(f"✓ Valid: {url} (score: {validation_results.get('validation_score', 0):.2f})")
-            else:
-                logger.info(f"✗ Invalid: {url} (failed checks: {[k for k, v in validation_results.get('validation_checks', {}).items() if not v]})")
-            
-            validated_websites.append(website)
+        text_content = extract_text_content(website)
+        key = validation_cache_key(website.get("url", ""), text_content, criteria_hash)
+        entry = cache.get(key) if cache is not None else None
+        if entry:
+            website["is_valid"] = entry["is_valid"]
+            website["validation_results"] = entry["validation_results"]
+            cached_count += 1
+        else:
+            pending.append((i, website, text_content, key))
+    
+    if cached_count:
+        logger.info(f"Reusing {cached_count} cached verdicts, validating {len(pending)} websites")
+    
+    def validate(website: Dict[str, Any], text_content: str, key: str) -> tuple:
+        is_valid, validation_results = validate_website_entry(
+            website, validation_criteria, llm_client=llm_client, text_content=text_content
+        )
+        # A verdict missing its AI check (LLM error, 429, empty reply) is not
+        # cached, so the next run retries the AI validation for that site
+        ai_required = bool(validation_criteria.get('customValidationRules'))
+        if cache is not None and (not ai_required or "ai_validation" in validation_results):
+            cache.put(key, website.get("url", ""), is_valid, validation_results)
+        return is_valid, validation_results
+    
+    workers = max(1, max_workers or MAX_VALIDATION_WORKERS)
+    completed = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="phase5") as executor:
+        futures = {
+            executor.submit(validate, website, text_content, key): website
+            for _, website, text_content, key in pending
+        }
+        for future in as_completed(futures):
+            website = futures[future]
+            url = website.get("url", "")
+            completed += 1
             
-        except Exception as e:
-            logger.error(f"Error validating {url}: {e}")
-            website["is_valid"] = False
-            website["validation_results"] = {"error": str(e)}
-            validated_websites.append(website)
+            try:
+                is_valid, validation_results = future.result()
+                
+                # Add validation results to website data
+                website["is_valid"] = is_valid
+                website["validation_results"] = validation_results
+                
+                if is_valid:
+                    logger.info(f"✓ Valid ({completed}/{len(pending)}): {url} (score: {validation_results.get('validation_score', 0):.2f})")
+                else:
+                    logger.info(f"✗ Invalid ({completed}/{len(pending)}): {url} (failed checks: {[k for k, v in validation_results.get('validation_checks', {}).items() if not v]})")
+                
+            except Exception as e:
+                logger.error(f"Error validating {url}: {e}")
+                website["is_valid"] = False
+                website["validation_results"] = {"error": str(e)}
+    
+    # Websites keep their original order
+    validated_websites = websites
+    valid_count = sum(1 for website in websites if website.get("is_valid"))
     
     # Create validated data structure
     validated_data = {
@@ -265,7 +421,7 @@ def run(validation_criteria: Optional[Dict[str, Any]] = None):
     # Save validated data
     save_validated_data(validated_data)
     
-    logger.info(f"Phase 5 completed. Validated {len(websites)} websites, {valid_count} are valid using user-defined criteria.")
+    logger.info(f"Phase 5 completed. Validated {len(websites)} websites ({cached_count} from cache), {valid_count} are valid using user-defined criteria.")
     
     return validated_data
 
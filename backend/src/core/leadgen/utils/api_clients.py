@@ -326,14 +326,16 @@ class DeepSeekAIClient:
         if not self.api_key:
             logger.warning("No DeepSeek AI API key provided")
     
-    def validate_content(self, text_content, validation_type="all"):
+    def validate_content(self, text_content, validation_type="all", custom_prompt=None):
         """
         Analyze and validate text content using DeepSeek AI.
         
         Args:
             text_content (str): The text content to analyze
             validation_type (str): The type of validation to perform
-                Options: "fca", "broker", "iar", "all", "partner", "partner_validation"
+                Options: "fca", "broker", "iar", "all", "partner", "partner_validation", "custom"
+            custom_prompt (str, optional): Prompt used instead of the built-in ones;
+                the website content is appended after it
                 
         Returns:
             dict: The validation results or None if validation failed
@@ -387,7 +389,10 @@ Website content:
 """
         }
         
-        prompt = prompts.get(validation_type, prompts["all"]) + text_content
+        if custom_prompt:
+            prompt = custom_prompt.strip() + "\n\nWebsite content:\n" + text_content
+        else:
+            prompt = prompts.get(validation_type, prompts["all"]) + text_content
         
         data = {
             "model": "deepseek-chat",
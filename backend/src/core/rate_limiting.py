@@ -1,12 +1,19 @@
 """
 Rate Limiting Module
 
-This module provides rate limiting functionality for API endpoints
-using Redis for distributed rate limiting.
+This module provides rate limiting functionality for API endpoints.
+Limits are enforced with GCRA, which keeps a single timestamp per key:
+InMemoryRateLimiter serves one process, and RedisRateLimiter
+(RATE_LIMIT_BACKEND=redis) shares limits across processes through one
+atomic Lua script.
 """
 
 import logging
+import math
+import os
+import threading
 import time
+from dataclasses import dataclass
 from typing import Dict, Optional
 from datetime import datetime, timedelta
 import json
@@ -22,50 +29,194 @@ class RateLimitException(Exception):
         self.retry_after = retry_after
         super().__init__(self.message)
 
+@dataclass
+class RateLimitResult:
+    """Outcome of a rate limit check."""
+    allowed: bool
+    remaining: int
+    retry_after: float  # seconds until the request would be allowed (0 if allowed)
+    reset_after: float  # seconds until the key is back to its full limit
+
+
+def gcra_update(tat, now, emission_interval, window, cost=1):
+    """
+    One GCRA (generic cell rate algorithm) step.
+
+    GCRA keeps a single "theoretical arrival time" (TAT) per key instead of a
+    log of timestamps. Each request pushes the TAT forward by one emission
+    interval (window / limit); a request is rejected if that would put the
+    TAT more than one window ahead of now. This allows bursts of up to
+    ``limit`` requests and then one request per emission interval.
+
+    Both limiters call it with integer microseconds; the Redis Lua script
+    below is a line-for-line port.
+
+    Args:
+        tat: Stored TAT for the key, or None if the key is absent or expired
+        now: Current time
+        emission_interval: window / limit
+        window: Rate limit window
+        cost: Requests consumed; 0 only inspects the key
+
+    Returns:
+        Tuple of (allowed, new_tat, remaining, retry_after, reset_after)
+    """
+    tat = now if tat is None or tat < now else tat
+    new_tat = tat + emission_interval * cost
+    allow_at = new_tat - window
+    if now < allow_at:
+        remaining = math.floor((window - (tat - now)) / emission_interval)
+        return False, tat, max(0, remaining), allow_at - now, tat - now
+    remaining = math.floor((window - (new_tat - now)) / emission_interval)
+    return True, new_tat, max(0, remaining), 0, new_tat - now
+
+
 class InMemoryRateLimiter:
-    """In-memory rate limiter for development/testing."""
+    """
+    In-process GCRA rate limiter.
+
+    Stores one integer (the TAT in microseconds, the same arithmetic as the
+    Redis script) per active key, so checks cost the same however busy a
+    key is. Keys whose TAT has passed carry no state and are evicted lazily
+    by a sweep that runs at most once per ``sweep_interval`` seconds.
+    Thread-safe.
+    """
     
-    def __init__(self):
-        self.requests: Dict[str, list] = {}
+    def __init__(self, sweep_interval: float = 60.0, clock=time.monotonic):
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+        self._tats: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = clock()
+    
+    def acquire(self, key: str, limit: int, window_seconds: float, cost: int = 1) -> RateLimitResult:
+        """Consume ``cost`` requests from ``key`` if the limit allows it."""
+        if limit <= 0:
+            return RateLimitResult(False, 0, float(window_seconds), 0.0)
+        window_us = int(window_seconds * 1_000_000)
+        with self._lock:
+            now = self.clock()
+            allowed, tat, remaining, retry_after, reset_after = gcra_update(
+                self._tats.get(key), round(now * 1_000_000), max(1, window_us // limit), window_us, cost
+            )
+            if allowed and cost:
+                self._tats[key] = tat
+            if now - self._last_sweep >= self.sweep_interval:
+                self._sweep(now)
+            return RateLimitResult(allowed, remaining, retry_after / 1e6, reset_after / 1e6)
+    
+    def peek(self, key: str, limit: int, window_seconds: float) -> RateLimitResult:
+        """Report the state of ``key`` without consuming anything."""
+        return self.acquire(key, limit, window_seconds, cost=0)
     
     def check_rate_limit(self, key: str, limit: int, window_seconds: int) -> bool:
         """Check if request is within rate limit."""
-        now = time.time()
-        
-        # Clean old requests
-        if key in self.requests:
-            self.requests[key] = [
-                req_time for req_time in self.requests[key] 
-                if now - req_time < window_seconds
-            ]
-        else:
-            self.requests[key] = []
-        
-        # Check if within limit
-        if len(self.requests[key]) >= limit:
-            return False
-        
-        # Add current request
-        self.requests[key].append(now)
-        return True
+        return self.acquire(key, limit, window_seconds).allowed
     
     def get_remaining_requests(self, key: str, limit: int, window_seconds: int) -> int:
         """Get remaining requests in current window."""
-        now = time.time()
-        
-        if key not in self.requests:
-            return limit
-        
-        # Clean old requests
-        self.requests[key] = [
-            req_time for req_time in self.requests[key] 
-            if now - req_time < window_seconds
-        ]
-        
-        return max(0, limit - len(self.requests[key]))
+        return self.peek(key, limit, window_seconds).remaining
+    
+    def _sweep(self, now: float):
+        # Caller holds the lock
+        now_us = round(now * 1_000_000)
+        expired = [key for key, tat in self._tats.items() if tat <= now_us]
+        for key in expired:
+            del self._tats[key]
+        self._last_sweep = now
+        if expired:
+            logger.debug(f"Evicted {len(expired)} idle rate limit keys")
+    
+    def __len__(self) -> int:
+        return len(self._tats)
+
+
+# KEYS[1] = rate key
+# ARGV = emission interval (us), window (us), cost
+# Returns {allowed, remaining, retry_after (us), reset_after (us)}
+GCRA_LUA = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000000 + tonumber(now_parts[2])
+local emission_interval = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+
+local stored = redis.call('GET', KEYS[1])
+local tat = now
+if stored then
+    tat = math.max(tonumber(stored), now)
+end
+
+local new_tat = tat + emission_interval * cost
+local allow_at = new_tat - window
+if now < allow_at then
+    local remaining = math.max(0, math.floor((window - (tat - now)) / emission_interval))
+    return {0, remaining, allow_at - now, tat - now}
+end
+
+if cost > 0 then
+    redis.call('SET', KEYS[1], string.format('%d', new_tat), 'PX', math.ceil((new_tat - now) / 1000))
+end
+local remaining = math.max(0, math.floor((window - (new_tat - now)) / emission_interval))
+return {1, remaining, 0, new_tat - now}
+"""
+
+
+class RedisRateLimiter:
+    """
+    Distributed GCRA rate limiter backed by Redis.
+
+    Each check is one round trip running ``GCRA_LUA`` atomically on the
+    server, using the Redis clock. A key holds a single integer TAT and
+    expires by itself once the key is back to its full limit.
+    """
+    
+    def __init__(self, client, prefix: str = ""):
+        """
+        Args:
+            client: redis-py client (or anything with a compatible ``register_script``)
+            prefix: Prepended to every key
+        """
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(GCRA_LUA)
+    
+    def acquire(self, key: str, limit: int, window_seconds: float, cost: int = 1) -> RateLimitResult:
+        """Consume ``cost`` requests from ``key`` if the limit allows it."""
+        if limit <= 0:
+            return RateLimitResult(False, 0, float(window_seconds), 0.0)
+        window_us = int(window_seconds * 1_000_000)
+        allowed, remaining, retry_after, reset_after = self._script(
+            keys=[self.prefix + key], args=[max(1, window_us // limit), window_us, cost]
+        )
+        return RateLimitResult(bool(int(allowed)), int(remaining), int(retry_after) / 1e6, int(reset_after) / 1e6)
+    
+    def peek(self, key: str, limit: int, window_seconds: float) -> RateLimitResult:
+        """Report the state of ``key`` without consuming anything."""
+        return self.acquire(key, limit, window_seconds, cost=0)
+    
+    def check_rate_limit(self, key: str, limit: int, window_seconds: int) -> bool:
+        """Check if request is within rate limit."""
+        return self.acquire(key, limit, window_seconds).allowed
+    
+    def get_remaining_requests(self, key: str, limit: int, window_seconds: int) -> int:
+        """Get remaining requests in current window."""
+        return self.peek(key, limit, window_seconds).remaining
+
+
+def _create_rate_limiter():
+    """Redis limiter when RATE_LIMIT_BACKEND=redis, otherwise in-memory."""
+    if os.getenv("RATE_LIMIT_BACKEND", "memory").lower() == "redis":
+        try:
+            import redis
+            client = redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379"))
+            return RedisRateLimiter(client)
+        except Exception as e:
+            logger.error(f"Redis rate limiter unavailable, falling back to in-memory: {e}")
+    return InMemoryRateLimiter()
 
 # Global rate limiter instance
-_rate_limiter = InMemoryRateLimiter()
+_rate_limiter = _create_rate_limiter()
 
 def get_rate_limiter():
     """Get the global rate limiter instance."""
@@ -98,9 +249,9 @@ async def check_rate_limit(
         limiter = get_rate_limiter()
         
         # Check rate limit
-        if not limiter.check_rate_limit(rate_key, limit, window_seconds):
-            remaining = limiter.get_remaining_requests(rate_key, limit, window_seconds)
-            retry_after = window_seconds
+        result = limiter.acquire(rate_key, limit, window_seconds)
+        if not result.allowed:
+            retry_after = max(1, math.ceil(result.retry_after))
             
             logger.warning(f"Rate limit exceeded for {user_id}:{action}. Limit: {limit}, Window: {window_hours}h")
             
@@ -109,8 +260,7 @@ async def check_rate_limit(
                 retry_after=retry_after
             )
         
-        remaining = limiter.get_remaining_requests(rate_key, limit, window_seconds)
-        logger.debug(f"Rate limit check passed for {user_id}:{action}. Remaining: {remaining}")
+        logger.debug(f"Rate limit check passed for {user_id}:{action}. Remaining: {result.remaining}")
         
     except RateLimitException:
         raise
@@ -137,13 +287,13 @@ def get_rate_limit_info(user_id: str, action: str, limit: int, window_hours: int
         window_seconds = window_hours * 3600
         
         limiter = get_rate_limiter()
-        remaining = limiter.get_remaining_requests(rate_key, limit, window_seconds)
+        state = limiter.peek(rate_key, limit, window_seconds)
         
         return {
             "limit": limit,
-            "remaining": remaining,
+            "remaining": state.remaining,
             "window_hours": window_hours,
-            "reset_time": datetime.now() + timedelta(hours=window_hours)
+            "reset_time": datetime.now() + timedelta(seconds=state.reset_after)
         }
         
     except Exception as e:
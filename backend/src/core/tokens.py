@@ -0,0 +1,52 @@
+"""
+Token Encoders
+
+Process-wide tiktoken encoders shared by the RAG pipeline and the embedding
+batch packer. tiktoken downloads its BPE files on first use; when that fails
+(offline hosts, blocked egress) a character-length estimate stands in so token
+budgets keep working, only less tightly.
+"""
+
+import logging
+from functools import lru_cache
+from typing import List, Sequence
+
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+# Average characters per cl100k token for English prose
+CHARS_PER_TOKEN = 4
+
+
+class CharEstimateEncoder:
+    """
+    Tokenizer stand-in that treats every ``CHARS_PER_TOKEN`` characters as a token
+
+    Implements the subset of the tiktoken ``Encoding`` API used here; "tokens"
+    are the text pieces themselves, so ``decode`` of any slice is exact.
+    """
+
+    name = "char-estimate"
+
+    def encode(self, text: str, **kwargs) -> List[str]:
+        return [text[i:i + CHARS_PER_TOKEN] for i in range(0, len(text), CHARS_PER_TOKEN)]
+
+    def encode_ordinary(self, text: str) -> List[str]:
+        return self.encode(text)
+
+    def encode_ordinary_batch(self, texts: Sequence[str], **kwargs) -> List[List[str]]:
+        return [self.encode(text) for text in texts]
+
+    def decode(self, tokens: Sequence[str]) -> str:
+        return "".join(tokens)
+
+
+@lru_cache(maxsize=None)
+def get_token_encoder(encoding_name: str = "cl100k_base"):
+    """Load a tiktoken encoder once per process, or the character estimate if it cannot load."""
+    try:
+        return tiktoken.get_encoding(encoding_name)
+    except Exception as e:
+        logger.warning(f"Could not load tiktoken encoding {encoding_name} ({e}); estimating tokens from length")
+        return CharEstimateEncoder()
@@ -4,6 +4,7 @@ Main FastAPI application for Diala Backend
 """
 
 import logging
+import os
 import sys
 import asyncio
 from fastapi import FastAPI, Request
@@ -42,7 +43,10 @@ for logger_name in (
 # logging.getLogger("httpx").setLevel(logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Import service instances for pre-loading
+# Import service instances for pre-loading. ML libraries behind them are
+# imported lazily, so this (and importing the routers) stays fast.
+from .core.lazy import loaded_heavy_modules
+from .services.convex_progress import close_progress_publishers
 from .services.realtime_analysis_service import get_realtime_analysis_service
 from .services.audio_separation_service import audio_separation_service
 
@@ -85,6 +89,10 @@ app.add_middleware(
 # --- MODEL LOADING STATE ---
 app.state.models_ready = False
 
+# Workers that only serve non-ML routes can skip loading models at startup;
+# models are then loaded on the first request that needs them.
+PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "true").lower() == "true"
+
 async def load_models_background():
     """The actual model loading logic, to be run in the background."""
     logger.info("Background model loading initiated...")
@@ -116,8 +124,17 @@ async def startup_event():
     On startup, create a background task to load the models.
     """
     logger.info("Diala Backend API starting up...")
-    asyncio.create_task(load_models_background())
-    logger.info("Server is running. Model loading continues in the background.")
+    if PRELOAD_MODELS:
+        asyncio.create_task(load_models_background())
+        logger.info("Server is running. Model loading continues in the background.")
+    else:
+        logger.info("Server is running. PRELOAD_MODELS is off; models load on first use.")
+    # Save hunter leads left in write-ahead logs by searches that crashed
+    try:
+        from .services.hunter_pipeline import replay_pending_saves
+        asyncio.create_task(replay_pending_saves())
+    except Exception as e:
+        logger.error(f"Failed to schedule hunter lead replay: {e}")
     # Log TTS providers health on startup
     try:
         from .api.public.tts import check_tts_providers_and_log
@@ -125,6 +142,11 @@ async def startup_event():
     except Exception as e:
         logger.error(f"Failed to schedule TTS health check: {e}")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Send progress updates still waiting to be coalesced before exiting."""
+    await close_progress_publishers()
+
 # Include routers
 app.include_router(audio_transcripts.router, prefix="/api/public/audio", tags=["Audio"])
 app.include_router(youtube_transcripts.router, prefix="/api/public/youtube", tags=["YouTube"])
@@ -152,7 +174,8 @@ async def health_check(request: Request):
         "status": "healthy",
         "service": "diala-backend",
         "version": "1.0.0",
-        "models_ready": request.app.state.models_ready
+        "models_ready": request.app.state.models_ready,
+        "loaded_ml_modules": loaded_heavy_modules(),
     }
 
 @app.get("/", tags=["System"])
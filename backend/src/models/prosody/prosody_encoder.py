@@ -1,11 +1,14 @@
 # File: src/models/prosody/prosody_encoder.py (Definitive Version)
 
+import os
 import numpy as np
 import librosa
 import torch
 import logging
 from typing import Optional, List, Dict, Any
 
+from .pitch import PITCH_METHODS, batch_pitch_statistics
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -16,8 +19,19 @@ except ImportError:
 
 
 class ProsodyEncoder:
-    def __init__(self, use_pretrained=True, device="cpu"):
+    def __init__(self, use_pretrained=True, device="cpu", pitch_method=None, pitch_workers=None):
+        """
+        pitch_method: "pyin" (librosa, default) or "yin" (vectorized, much
+            faster); defaults to the PROSODY_PITCH_METHOD env var.
+        pitch_workers: processes used for pyin in extract_features_batch;
+            defaults to PROSODY_PITCH_WORKERS, else one per CPU.
+        """
         self.device = device
+        self.pitch_method = pitch_method or os.getenv("PROSODY_PITCH_METHOD", "pyin")
+        if self.pitch_method not in PITCH_METHODS:
+            raise ValueError(f"Unknown pitch method {self.pitch_method!r}; expected one of {PITCH_METHODS}")
+        workers = pitch_workers or os.getenv("PROSODY_PITCH_WORKERS")
+        self.pitch_workers = int(workers) if workers else None
         self.use_pretrained = use_pretrained and (WavLMModel is not None)
         if self.use_pretrained:
             logger.info(f"Loading WavLMModel to {device} for prosody encoding...")
@@ -52,10 +66,14 @@ class ProsodyEncoder:
                 f"ProsodyEncoder expects 16000 Hz, got {sample_rate} Hz."
             )
 
-        # 1. Low-level features (fast, always available)
+        # 1. Low-level features (always available). Pitch for the whole batch
+        #    is either one vectorized YIN pass or pyin across a process pool.
+        pitch_stats = batch_pitch_statistics(
+            audio_chunks, sample_rate, method=self.pitch_method, workers=self.pitch_workers
+        )
         low_level = [
-            self._get_low_level_features(chunk, sample_rate)
-            for chunk in audio_chunks
+            self._get_low_level_features(chunk, sample_rate, pitch)
+            for chunk, pitch in zip(audio_chunks, pitch_stats)
         ]
 
         # 2. WavLM embeddings (optional, GPU-safe)
@@ -92,27 +110,17 @@ class ProsodyEncoder:
     # Internal helpers
     # ------------------------------------------------------------------
     def _get_low_level_features(
-        self, y: np.ndarray, sr: int
+        self, y: np.ndarray, sr: int, pitch: Optional[Dict[str, float]] = None
     ) -> Dict[str, float]:
         """
         Compute pitch, energy, voiced ratio, etc. for a single waveform.
+        `pitch` takes precomputed pitch statistics (from a batch pass).
         """
         duration_sec = len(y) / sr
 
         # Pitch
-        f0, voiced_flags, _ = librosa.pyin(
-            y,
-            fmin=librosa.note_to_hz("C2"),
-            fmax=librosa.note_to_hz("C7"),
-            frame_length=1024,
-        )
-        f0_values = f0[~np.isnan(f0)]
-        if len(f0_values) > 0:
-            avg_pitch = float(np.nanmean(f0_values))
-            pitch_std = float(np.nanstd(f0_values))
-            voiced_ratio = float(np.sum(voiced_flags) / len(voiced_flags))
-        else:
-            avg_pitch = pitch_std = voiced_ratio = 0.0
+        if pitch is None:
+            pitch = batch_pitch_statistics([y], sr, method=self.pitch_method, workers=1)[0]
 
         # Energy
         hop_length = 512
@@ -124,11 +132,11 @@ class ProsodyEncoder:
 
         return {
             "duration_sec": duration_sec,
-            "avg_pitch": avg_pitch,
-            "pitch_std": pitch_std,
+            "avg_pitch": pitch["avg_pitch"],
+            "pitch_std": pitch["pitch_std"],
             "avg_energy": float(np.mean(energy_frames)),
             "energy_std": float(np.std(energy_frames)),
-            "voiced_ratio": voiced_ratio,
+            "voiced_ratio": pitch["voiced_ratio"],
         }
 
     def get_features_from_waveform(
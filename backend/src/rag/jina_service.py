@@ -10,6 +10,8 @@ import numpy as np
 from datetime import datetime
 import logging
 
+from ..services.embedding_dispatcher import RateLimitError, parse_retry_after
+
 logger = logging.getLogger(__name__)
 
 class JinaService:
@@ -78,6 +80,11 @@ class JinaService:
                     json=payload,
                     headers=headers
                 )
+                if response.status_code == 429:
+                    raise RateLimitError(
+                        f"Jina rate limit exceeded: {response.text}",
+                        retry_after=parse_retry_after(response.headers.get("Retry-After"))
+                    )
                 response.raise_for_status()
                 
                 result = response.json()
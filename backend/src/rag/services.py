@@ -11,16 +11,16 @@ from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import numpy as np
 from urllib.parse import urlparse, parse_qs
-import tiktoken
 import openai
 from bs4 import BeautifulSoup
 import PyPDF2
 import docx
 import csv
 import io
+import uuid
 
 from sqlalchemy.orm import Session
-from sqlalchemy import update
+from sqlalchemy import update, insert
 
 from .models import (
     RAGWorkflow, RAGSource, RAGChunk, RAGEmbedding, RAGProcessingStep, 
@@ -28,8 +28,14 @@ from .models import (
     VectorStore, EmbeddingModel
 )
 from ..core.logging import logger
+from ..core.tokens import get_token_encoder
 from .external_search_service import ExternalSearchService
 from .jina_service import JinaService
+from ..services.embedding_dispatcher import RateLimitError, get_embedding_dispatcher, iter_windowed
+
+
+# Rows per INSERT statement when persisting chunks and embeddings
+BULK_INSERT_BATCH_SIZE = 1000
 
 
 class RAGProcessingService:
@@ -41,7 +47,7 @@ class RAGProcessingService:
         self.embedding_cache = {}
         self.external_search_service = ExternalSearchService()
         self.jina_service = JinaService()
-        self.tokenizer = tiktoken.get_encoding("cl100k_base")
+        self.tokenizer = get_token_encoder()
         
     async def start_workflow(self, workflow_id: str) -> RAGWorkflow:
         """Start processing a RAG workflow."""
@@ -428,32 +434,39 @@ class RAGProcessingService:
             overlap = workflow.parameters.get("overlap", 50)
             
             total_chunks = 0
+            pending_rows: List[Dict[str, Any]] = []
             for source in sources:
                 content = source.metadata.get("raw_content", "")
                 chunks = self._create_chunks(content, chunk_size, overlap)
+                token_counts = self._count_tokens_batch(chunks)
+                source_title = source.metadata.get("title", "")
                 
-                for idx, chunk_text in enumerate(chunks):
-                    chunk = RAGChunk(
-                        source_id=source.id,
-                        chunk_index=idx,
-                        content=chunk_text,
-                        metadata={
-                            "source_title": source.metadata.get("title", ""),
+                for idx, (chunk_text, token_count) in enumerate(zip(chunks, token_counts)):
+                    pending_rows.append({
+                        "id": uuid.uuid4(),
+                        "source_id": source.id,
+                        "chunk_index": idx,
+                        "content": chunk_text,
+                        "metadata": {
+                            "source_title": source_title,
                             "chunk_size": chunk_size,
                             "overlap": overlap,
                         },
-                        token_count=self._count_tokens(chunk_text)
-                    )
-                    self.db.add(chunk)
-                    total_chunks += 1
+                        "token_count": token_count,
+                    })
+                    if len(pending_rows) >= BULK_INSERT_BATCH_SIZE:
+                        self._bulk_insert(RAGChunk, pending_rows)
+                        pending_rows = []
+                total_chunks += len(chunks)
                     
                 # Update source stats
                 source.stats = {
                     **source.stats,
                     "chunks": len(chunks),
-                    "total_tokens": sum(self._count_tokens(c) for c in chunks),
+                    "total_tokens": sum(token_counts),
                 }
                 
+            self._bulk_insert(RAGChunk, pending_rows)
             self.db.commit()
             
             # Update workflow stats
@@ -494,12 +507,26 @@ class RAGProcessingService:
     def _count_tokens(self, text: str) -> int:
         """Count tokens in text using tiktoken."""
         try:
-            encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
-            return len(encoding.encode(text))
+            return len(get_token_encoder().encode(text))
         except Exception:
             # Fallback to word count estimation
             return len(text.split())
             
+    def _count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """Count tokens for many texts with a single encoder call."""
+        if not texts:
+            return []
+        try:
+            return [len(tokens) for tokens in get_token_encoder().encode_ordinary_batch(texts)]
+        except Exception:
+            return [self._count_tokens(text) for text in texts]
+            
+    def _bulk_insert(self, model, rows: List[Dict[str, Any]]):
+        """Write rows for a model with Core INSERTs in fixed-size batches."""
+        table = model.__table__
+        for i in range(0, len(rows), BULK_INSERT_BATCH_SIZE):
+            self.db.execute(insert(table), rows[i:i + BULK_INSERT_BATCH_SIZE])
+            
     async def _process_embedding(self, workflow_id: str):
         """Generate embeddings for all chunks."""
         step = self._create_processing_step(workflow_id, "embedding")
@@ -508,38 +535,49 @@ class RAGProcessingService:
             workflow = self.db.query(RAGWorkflow).filter_by(id=workflow_id).first()
             embedding_model = workflow.parameters.get("embeddingModel", EmbeddingModel.ADA_002)
             
-            # Get all chunks
-            chunks = self.db.query(RAGChunk).join(RAGSource).filter(
+            # Get all chunks (plain rows; the ORM identity map is not needed here)
+            chunks = self.db.query(
+                RAGChunk.id, RAGChunk.chunk_index, RAGChunk.source_id, RAGChunk.content
+            ).join(RAGSource).filter(
                 RAGSource.workflow_id == workflow_id
             ).all()
             
             total_chunks = len(chunks)
             embeddings_created = 0
             
-            # Process in batches
+            # Process in batches, several in flight at once; rows are written
+            # as each batch completes. Provider calls take a slot in their own
+            # dispatcher inside _generate_embeddings, so this window only
+            # bounds pending batches and follows the preferred provider's limit
             batch_size = 100
-            for i in range(0, total_chunks, batch_size):
-                batch = chunks[i:i + batch_size]
-                batch_texts = [chunk.content for chunk in batch]
-                
-                # Generate embeddings
-                embeddings = await self._generate_embeddings(batch_texts, embedding_model)
+            batches = [chunks[i:i + batch_size] for i in range(0, total_chunks, batch_size)]
+            provider = "jina" if embedding_model.startswith("jina-") else "openai"
+            controller = get_embedding_dispatcher(provider).controller
+            
+            async def embed_batch(batch) -> List[List[float]]:
+                return await self._generate_embeddings([chunk.content for chunk in batch], embedding_model)
+            
+            async for index, embeddings in iter_windowed(batches, embed_batch, controller.max_limit, controller):
+                batch = batches[index]
                 
                 # Store embeddings
-                for chunk, embedding in zip(batch, embeddings):
-                    embedding_record = RAGEmbedding(
-                        workflow_id=workflow_id,
-                        chunk_id=chunk.id,
-                        vector=self._serialize_vector(embedding),
-                        vector_dimension=len(embedding),
-                        embedding_model=embedding_model,
-                        metadata={
+                rows = [
+                    {
+                        "id": uuid.uuid4(),
+                        "workflow_id": workflow_id,
+                        "chunk_id": chunk.id,
+                        "vector": self._serialize_vector(embedding),
+                        "vector_dimension": len(embedding),
+                        "embedding_model": embedding_model,
+                        "metadata": {
                             "chunk_index": chunk.chunk_index,
                             "source_id": str(chunk.source_id),
-                        }
-                    )
-                    self.db.add(embedding_record)
-                    embeddings_created += 1
+                        },
+                    }
+                    for chunk, embedding in zip(batch, embeddings)
+                ]
+                self._bulk_insert(RAGEmbedding, rows)
+                embeddings_created += len(rows)
                     
                 self.db.commit()
                 
@@ -564,15 +602,18 @@ class RAGProcessingService:
         """Generate embeddings using Jina AI or OpenAI as fallback."""
         # Check if model is a Jina model
         if model.startswith("jina-"):
-            try:
-                # Use Jina AI for embeddings
-                embeddings = await self.jina_service.generate_embeddings(
-                    texts=texts,
+            async def embed_with_jina(batch: List[str]) -> List[List[float]]:
+                return await self.jina_service.generate_embeddings(
+                    texts=batch,
                     model=model,
                     dimensions=1024,
                     normalize=True,
                     batch_size=32
                 )
+            
+            try:
+                # Use Jina AI for embeddings; only this call holds a Jina slot
+                embeddings = await get_embedding_dispatcher("jina").submit(texts, embed_with_jina)
                 
                 # Calculate and log cost
                 total_tokens = sum(len(self.tokenizer.encode(text)) for text in texts)
@@ -581,16 +622,20 @@ class RAGProcessingService:
                 
                 return embeddings
                 
+            except RateLimitError:
+                # Still rate limited after the dispatcher's backoff; do not
+                # spill the whole workload onto OpenAI
+                raise
             except Exception as e:
                 logger.error(f"Error generating embeddings with Jina: {e}")
                 logger.info("Falling back to OpenAI embeddings")
                 model = "text-embedding-ada-002"  # Fallback model
         
         # Use OpenAI for embeddings (fallback or if not Jina model)
-        response = await self.openai_client.embeddings.create(
-            input=texts,
-            model=model
-        )
+        async def embed_with_openai(batch: List[str]):
+            return await self.openai_client.embeddings.create(input=batch, model=model)
+        
+        response = await get_embedding_dispatcher("openai").submit(texts, embed_with_openai)
         
         embeddings = [item.embedding for item in response.data]
         
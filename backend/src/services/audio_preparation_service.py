@@ -13,13 +13,14 @@ import tempfile
 import asyncio
 import subprocess
 import uuid
+import wave
 from typing import Dict, Any, Optional, List, Tuple
 from pathlib import Path
-import soundfile as sf
 import numpy as np
 from src.services.audio_separation_service import audio_separation_service
 from src.services.realtime_analysis_service import get_realtime_analysis_service
 from src.services.comprehensive_audio_service import comprehensive_audio_service
+from src.services.audio_stream_decoder import aload_pcm16, transcode_to_wav
 
 logger = logging.getLogger(__name__)
 
@@ -136,8 +137,9 @@ class AudioPreparationService:
             # Get realtime analysis service
             realtime_service = await get_realtime_analysis_service()
             
-            # Load and process audio directly
-            audio_data, sample_rate = sf.read(audio_path, dtype='int16')
+            # Decode frame by frame to the 16kHz int16 PCM the ASR expects
+            sample_rate = 16000
+            audio_data = await aload_pcm16(audio_path, sample_rate)
             audio_bytes = audio_data.tobytes()
             
             # Process with realtime analysis service
@@ -194,8 +196,7 @@ class AudioPreparationService:
             # Ensure correct format for Chatterbox (24kHz, mono)
             final_path = await self._ensure_audio_format(
                 result["prepared_audio_path"],
-                sample_rate=24000,
-                channels=1
+                sample_rate=24000
             )
             result["prepared_audio_path"] = final_path
             
@@ -275,18 +276,12 @@ class AudioPreparationService:
                 audio_path = cleaned_path
                 result["metadata"]["silence_removed"] = True
             
-            # Ensure proper format for ASR (16kHz is optimal)
-            formatted_path = await self._ensure_audio_format(
-                audio_path,
-                sample_rate=16000,  # Whisper prefers 16kHz for stable results
-                channels=1
-            )
-            
-            # Use the proven comprehensive audio processing approach
+            # No intermediate 16kHz WAV: the comprehensive service streams the
+            # decode and resamples to 16kHz (what Whisper prefers) in-process
             logger.info("Using comprehensive audio processing service (based on working stream_simulation.py)")
             
             comprehensive_result = await comprehensive_audio_service.process_audio_comprehensive(
-                audio_path=formatted_path,
+                audio_path=audio_path,
                 separate_speakers=config.get("identify_speakers", True),
                 use_pyannote=True,  # Use pyannote diarization
                 max_seconds=None
@@ -296,9 +291,9 @@ class AudioPreparationService:
                 logger.error(f"Comprehensive processing failed: {comprehensive_result['error']}")
                 # Fallback to basic realtime service
                 realtime_service = await get_realtime_analysis_service()
-                audio_data, sample_rate = sf.read(formatted_path, dtype='int16')
-                audio_bytes = audio_data.tobytes()
-                analysis_result = await realtime_service.process_sentiment_chunk(audio_bytes)
+                audio_data = await aload_pcm16(audio_path, 16000)
+                audio_duration = len(audio_data) / 16000
+                analysis_result = await realtime_service.process_sentiment_chunk(audio_data.tobytes())
                 
                 transcription_result = {
                     "transcript": analysis_result.get("text", "").strip(),
@@ -307,6 +302,7 @@ class AudioPreparationService:
                     "tokens": analysis_result.get("tokens", [])
                 }
             else:
+                audio_duration = comprehensive_result.get("total_duration", 0)
                 # Use comprehensive results and format for Convex schema
                 segments = comprehensive_result.get("segments", [])
                 
@@ -347,7 +343,6 @@ class AudioPreparationService:
                     sentences = [s.strip() for s in transcript_text.split('.') if s.strip()]
                     segments = []
                     current_time = 0.0
-                    audio_duration = len(audio_data) / sample_rate if len(audio_data) > 0 else 0
                     
                     for i, sentence in enumerate(sentences):
                         if sentence:
@@ -376,10 +371,6 @@ class AudioPreparationService:
                     # Group segments by speaker
                     result["segments_by_speaker"] = self._group_segments_by_speaker(segments)
             
-            # Clean up temporary formatted file if different from input
-            if formatted_path != audio_path and os.path.exists(formatted_path):
-                os.unlink(formatted_path)
-            
             result["prepared_audio_path"] = audio_path
 
             # Extra logging summary
@@ -579,54 +570,32 @@ class AudioPreparationService:
     async def _ensure_audio_format(
         self,
         audio_path: str,
-        sample_rate: int = 24000,
-        channels: int = 1,
-        format: str = "wav"
+        sample_rate: int = 24000
     ) -> str:
         """
-        Ensure audio is in the correct format
+        Ensure audio is a mono 16-bit WAV at the target sample rate
         
         Args:
             audio_path: Input audio path
             sample_rate: Target sample rate
-            channels: Number of channels (1=mono, 2=stereo)
-            format: Output format
             
         Returns:
             Path to formatted audio
         """
         try:
-            # Check current format
-            info = sf.info(audio_path)
-            
             # If already correct format, return as-is
-            if (info.samplerate == sample_rate and 
-                info.channels == channels and 
-                audio_path.endswith(f".{format}")):
-                return audio_path
-            
-            # Convert to target format
-            output_path = os.path.join(self.temp_dir, f"formatted_{uuid.uuid4().hex}.{format}")
-            
-            cmd = [
-                "ffmpeg", "-loglevel", "error", "-y",
-                "-i", audio_path,
-                "-ar", str(sample_rate),
-                "-ac", str(channels),
-                output_path
-            ]
-            
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            _, stderr = await process.communicate()
-            
-            if process.returncode != 0:
-                logger.error(f"Error converting audio format: {stderr.decode()}")
-                return audio_path
+            if audio_path.endswith(".wav"):
+                try:
+                    with wave.open(audio_path, "rb") as wav:
+                        if (wav.getframerate(), wav.getnchannels(), wav.getsampwidth()) == (sample_rate, 1, 2):
+                            return audio_path
+                except (wave.Error, EOFError):
+                    pass
+            
+            # Convert with the streaming decoder: decoded, resampled and
+            # written block by block on a worker thread
+            output_path = os.path.join(self.temp_dir, f"formatted_{uuid.uuid4().hex}.wav")
+            await asyncio.to_thread(transcode_to_wav, audio_path, output_path, sample_rate)
             
             return output_path
             
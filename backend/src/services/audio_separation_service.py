@@ -11,14 +11,20 @@ import os
 import logging
 import tempfile
 import asyncio
-import subprocess
+import threading
 from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 import uuid
 import json
-import torch
-import torchaudio
-from pyannote.audio import Pipeline
+
+from src.core.lazy import LazyObject, lazy_import
+
+torch = lazy_import("torch")
+torchaudio = lazy_import("torchaudio")
+pyannote_audio = lazy_import("pyannote.audio")
+demucs_apply = lazy_import("demucs.apply")
+demucs_audio = lazy_import("demucs.audio")
+demucs_pretrained = lazy_import("demucs.pretrained")
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +34,8 @@ class AudioSeparationService:
     
     def __init__(self):
         """Initialize the audio separation service"""
-        self.demucs_model = None
+        self.demucs_models: Dict[str, Any] = {}
+        self._demucs_lock = threading.Lock()
         self.diarization_pipeline = None
         self.temp_dir = tempfile.mkdtemp(prefix="audio_sep_")
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
@@ -51,12 +58,44 @@ class AudioSeparationService:
         """Loads the pyannote pipeline if not already loaded."""
         if self.diarization_pipeline is None:
             logger.info("Loading pyannote speaker diarization pipeline...")
-            self.diarization_pipeline = Pipeline.from_pretrained(
+            self.diarization_pipeline = pyannote_audio.Pipeline.from_pretrained(
                 "pyannote/speaker-diarization-3.1",
                 use_auth_token=self.hf_token
             ).to(torch.device(self.device))
             logger.info("Diarization pipeline loaded.")
 
+    def load_demucs_model(self, model_name: str = "htdemucs"):
+        """Load a Demucs model once and keep it on the device for later calls"""
+        with self._demucs_lock:
+            model = self.demucs_models.get(model_name)
+            if model is None:
+                logger.info(f"Loading Demucs model {model_name}...")
+                model = demucs_pretrained.get_model(model_name)
+                model.to(self.device).eval()
+                self.demucs_models[model_name] = model
+                logger.info("Demucs model loaded.")
+            return model
+
+    def _separate_vocals(self, audio_path: str, output_dir: str, model_name: str) -> str:
+        """Run the kept Demucs model on one file and write the vocal stem (blocking)"""
+        model = self.load_demucs_model(model_name)
+        wav = demucs_audio.AudioFile(audio_path).read(
+            streams=0, samplerate=model.samplerate, channels=model.audio_channels
+        )
+        # Same normalization as the demucs CLI
+        ref = wav.mean(0)
+        wav = (wav - ref.mean()) / ref.std()
+        with torch.no_grad():
+            sources = demucs_apply.apply_model(model, wav[None], device=self.device, split=True, overlap=0.25)[0]
+        vocals = sources[model.sources.index("vocals")] * ref.std() + ref.mean()
+
+        # Same layout as the CLI: <output_dir>/<model>/<track>/vocals.wav
+        track_dir = os.path.join(output_dir, model_name, Path(audio_path).stem)
+        os.makedirs(track_dir, exist_ok=True)
+        vocals_path = os.path.join(track_dir, "vocals.wav")
+        demucs_audio.save_audio(vocals.cpu(), vocals_path, samplerate=model.samplerate)
+        return vocals_path
+
     async def extract_vocals(
         self,
         audio_path: str,
@@ -79,44 +118,8 @@ class AudioSeparationService:
             output_dir = os.path.join(self.temp_dir, f"separated_{uuid.uuid4().hex}")
             os.makedirs(output_dir, exist_ok=True)
             
-            cmd = [
-                "python", "-m", "demucs",
-                "--two-stems=vocals",
-                "-n", model_name,
-                "-o", output_dir,
-                "--device", self.device,
-                audio_path
-            ]
-            
-            if audio_path.lower().endswith('.mp3'):
-                cmd.extend(["--mp3", "--mp3-bitrate", "320"])
-            
-            logger.info(f"Running Demucs: {' '.join(cmd)}")
-            
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode != 0:
-                error_msg = stderr.decode() if stderr else "Unknown error"
-                logger.error(f"Demucs failed: {error_msg}")
-                raise RuntimeError(f"Demucs separation failed: {error_msg}")
-            
-            vocals_path = None
-            for root, _, files in os.walk(output_dir):
-                for file in files:
-                    if file.startswith("vocals"):
-                        vocals_path = os.path.join(root, file)
-                        break
-                if vocals_path:
-                    break
-            
-            if not vocals_path or not os.path.exists(vocals_path):
-                raise FileNotFoundError(f"Vocals file not found in {output_dir}")
+            # The model stays loaded between calls; inference runs off the event loop
+            vocals_path = await asyncio.to_thread(self._separate_vocals, audio_path, output_dir, model_name)
             
             logger.info(f"Successfully extracted vocals: {vocals_path}")
             return vocals_path
@@ -127,7 +130,7 @@ class AudioSeparationService:
 
     async def diarize_from_waveform(
         self,
-        waveform: torch.Tensor,
+        waveform: "torch.Tensor",
         sample_rate: int,
         min_speakers: int = 1,
         max_speakers: int = 10,
@@ -291,5 +294,5 @@ class AudioSeparationService:
         """Cleanup on deletion"""
         self.cleanup()
 
-# Global instance
-audio_separation_service = AudioSeparationService()
+# Global instance, constructed on first use so importing this module stays cheap
+audio_separation_service = LazyObject(AudioSeparationService)
@@ -0,0 +1,436 @@
+"""
+Streaming Audio Decoder
+
+Shared decode layer that turns an audio or video file into a stream of
+fixed-size mono float32 PCM frames at a target sample rate, without loading
+the whole file or writing intermediate WAVs.
+
+Backends, in order of preference:
+
+- soundfile: reads blocks in-process and resamples them with a streaming
+  polyphase filter (``PolyphaseResampler``)
+- ffmpeg: a single long-lived decode pipe per file that emits f32le at the
+  target rate on stdout
+- wave (stdlib): 8/16/24/32-bit PCM WAV, resampled like soundfile
+
+Peak memory per stream is bounded by the frame size plus the filter history.
+``aiter_audio_frames`` decodes on a worker thread into a bounded queue so
+decoding overlaps with VAD / ASR / embedding work on the consumer side.
+"""
+
+import asyncio
+import logging
+import shutil
+import subprocess
+import threading
+import wave
+from math import gcd
+from pathlib import Path
+from typing import AsyncIterator, Iterator, Optional, Tuple, Union
+
+import numpy as np
+from scipy.signal import firwin
+
+logger = logging.getLogger(__name__)
+
+try:
+    import soundfile as sf
+    SOUNDFILE_AVAILABLE = True
+except ImportError:
+    sf = None
+    SOUNDFILE_AVAILABLE = False
+
+DEFAULT_SAMPLE_RATE = 16000
+DEFAULT_FRAME_SIZE = 16000
+_READ_BLOCK = 65536
+_OUTPUTS_PER_PASS = 8192
+
+
+class AudioDecodeError(Exception):
+    """Raised when no backend can decode an audio file"""
+
+
+class PolyphaseResampler:
+    """
+    Streaming rational resampler
+
+    Produces the same samples as ``scipy.signal.resample_poly(x, up, down)``
+    on the concatenated input (Kaiser-windowed FIR, zero padding at the
+    edges), but accepts the input in arbitrary chunks and only keeps the
+    filter history between calls.
+    """
+
+    def __init__(self, orig_sr: int, target_sr: int, window=("kaiser", 5.0)):
+        """
+        Args:
+            orig_sr: Input sample rate
+            target_sr: Output sample rate
+            window: FIR window passed to scipy.signal.firwin
+        """
+        divisor = gcd(int(orig_sr), int(target_sr))
+        self.up = int(target_sr) // divisor
+        self.down = int(orig_sr) // divisor
+        self.passthrough = self.up == self.down
+        self._received = 0
+        self._next_out = 0
+        if self.passthrough:
+            return
+
+        max_rate = max(self.up, self.down)
+        self._half_len = 10 * max_rate
+        h = firwin(2 * self._half_len + 1, 1.0 / max_rate, window=window) * self.up
+        self._taps = -(-len(h) // self.up)
+        padded = np.zeros(self._taps * self.up)
+        padded[:len(h)] = h
+        # bank[phase, t] = h[phase + t * up]
+        self._bank = padded.reshape(self._taps, self.up).T.astype(np.float32)
+        # Leading zeros stand in for samples before the start of the signal
+        self._buffer = np.zeros(self._taps, dtype=np.float32)
+        self._buffer_start = -self._taps
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Feed input samples and return every output sample that is now final"""
+        samples = np.asarray(samples, dtype=np.float32)
+        if self.passthrough:
+            return samples
+        self._buffer = np.concatenate((self._buffer, samples))
+        self._received += len(samples)
+        # Output m needs inputs up to (m * down + half_len) // up
+        ready = (self._received * self.up - 1 - self._half_len) // self.down + 1
+        return self._emit(max(self._next_out, ready))
+
+    def flush(self) -> np.ndarray:
+        """Return the remaining output, treating samples after the end as zero"""
+        if self.passthrough:
+            return np.zeros(0, dtype=np.float32)
+        total = -(-self._received * self.up // self.down)
+        self._buffer = np.concatenate((self._buffer, np.zeros(self._taps + 1, dtype=np.float32)))
+        return self._emit(total)
+
+    def _emit(self, stop: int) -> np.ndarray:
+        outputs = []
+        offsets = np.arange(self._taps)
+        for start in range(self._next_out, stop, _OUTPUTS_PER_PASS):
+            m = np.arange(start, min(stop, start + _OUTPUTS_PER_PASS))
+            u = m * self.down + self._half_len
+            centre = u // self.up
+            window = self._buffer[(centre - self._buffer_start)[:, None] - offsets[None, :]]
+            outputs.append(np.einsum("nt,nt->n", window, self._bank[u % self.up]))
+        self._next_out = max(self._next_out, stop)
+
+        # Drop history the next output no longer needs
+        next_centre = (self._next_out * self.down + self._half_len) // self.up
+        keep_from = next_centre - (self._taps - 1) - self._buffer_start
+        if keep_from > 0:
+            self._buffer = self._buffer[keep_from:]
+            self._buffer_start += keep_from
+        return np.concatenate(outputs).astype(np.float32) if outputs else np.zeros(0, dtype=np.float32)
+
+
+def _frames_from_wave(path: str) -> Tuple[int, Iterator[np.ndarray]]:
+    wav = wave.open(path, "rb")
+    channels = wav.getnchannels()
+    width = wav.getsampwidth()
+    if width not in (1, 2, 3, 4):
+        wav.close()
+        raise AudioDecodeError(f"Unsupported WAV sample width: {width}")
+
+    def blocks() -> Iterator[np.ndarray]:
+        try:
+            for raw in iter(lambda: wav.readframes(_READ_BLOCK), b""):
+                if width == 1:
+                    pcm = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+                elif width == 2:
+                    pcm = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+                elif width == 3:
+                    packed = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+                    ints = (packed[:, 0].astype(np.int32) | (packed[:, 1].astype(np.int32) << 8)
+                            | (packed[:, 2].astype(np.int32) << 16))
+                    pcm = (np.where(ints & 0x800000, ints - (1 << 24), ints)).astype(np.float32) / 8388608.0
+                else:
+                    pcm = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+                yield pcm.reshape(-1, channels).mean(axis=1)
+        finally:
+            wav.close()
+
+    return wav.getframerate(), blocks()
+
+
+def _frames_from_soundfile(path: str) -> Tuple[int, Iterator[np.ndarray]]:
+    handle = sf.SoundFile(path)
+
+    def blocks() -> Iterator[np.ndarray]:
+        try:
+            for block in handle.blocks(blocksize=_READ_BLOCK, dtype="float32", always_2d=True):
+                yield block.mean(axis=1)
+        finally:
+            handle.close()
+
+    return handle.samplerate, blocks()
+
+
+def _frames_from_ffmpeg(path: str, sample_rate: int) -> Iterator[np.ndarray]:
+    process = subprocess.Popen(
+        ["ffmpeg", "-v", "error", "-i", path, "-vn", "-ac", "1", "-ar", str(sample_rate), "-f", "f32le", "-"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+    # Drain stderr on the side so a chatty decoder can never block the pipe
+    errors = []
+    drain = threading.Thread(target=lambda: errors.append(process.stderr.read()), daemon=True)
+    drain.start()
+    try:
+        remainder = b""
+        for raw in iter(lambda: process.stdout.read(_READ_BLOCK * 4), b""):
+            raw = remainder + raw
+            usable = len(raw) - len(raw) % 4
+            remainder = raw[usable:]
+            if usable:
+                yield np.frombuffer(raw[:usable], dtype="<f4")
+        process.wait()
+        drain.join()
+        if process.returncode != 0:
+            message = errors[0].decode(errors="ignore").strip() if errors and errors[0] else ""
+            raise AudioDecodeError(f"ffmpeg failed to decode {path}: {message}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+
+class AudioStream:
+    """
+    Iterator of fixed-size mono float32 frames decoded from a file
+
+    Every frame has ``frame_size`` samples except possibly the last one.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        sample_rate: int = DEFAULT_SAMPLE_RATE,
+        frame_size: int = DEFAULT_FRAME_SIZE,
+        max_seconds: Optional[float] = None,
+        backend: Optional[str] = None
+    ):
+        """
+        Args:
+            path: Audio or video file
+            sample_rate: Output sample rate
+            frame_size: Samples per yielded frame
+            max_seconds: Stop decoding after this much output audio
+            backend: Force "soundfile", "ffmpeg" or "wave" instead of auto-detecting
+        """
+        self.path = str(path)
+        self.sample_rate = sample_rate
+        self.frame_size = max(1, int(frame_size))
+        self.max_samples = int(max_seconds * sample_rate) if max_seconds and max_seconds > 0 else None
+        self.samples_emitted = 0
+        self.backend, self.source_sample_rate, blocks = self._open(backend)
+        self._frames = self._reframe(blocks)
+
+    def _open(self, backend: Optional[str]) -> Tuple[str, int, Iterator[np.ndarray]]:
+        errors = []
+        for name in ([backend] if backend else ["soundfile", "ffmpeg", "wave"]):
+            try:
+                if name == "soundfile" and SOUNDFILE_AVAILABLE:
+                    rate, blocks = _frames_from_soundfile(self.path)
+                    return name, rate, self._resampled(blocks, rate)
+                if name == "ffmpeg" and shutil.which("ffmpeg"):
+                    return name, self.sample_rate, _frames_from_ffmpeg(self.path, self.sample_rate)
+                if name == "wave":
+                    rate, blocks = _frames_from_wave(self.path)
+                    return name, rate, self._resampled(blocks, rate)
+            except AudioDecodeError:
+                raise
+            except Exception as e:
+                errors.append(f"{name}: {e}")
+        raise AudioDecodeError(f"Could not decode {self.path} ({'; '.join(errors) or 'no backend available'})")
+
+    def _resampled(self, blocks: Iterator[np.ndarray], rate: int) -> Iterator[np.ndarray]:
+        resampler = PolyphaseResampler(rate, self.sample_rate)
+        for block in blocks:
+            out = resampler.process(block)
+            if len(out):
+                yield out
+        tail = resampler.flush()
+        if len(tail):
+            yield tail
+
+    def _reframe(self, blocks: Iterator[np.ndarray]) -> Iterator[np.ndarray]:
+        pending = np.zeros(0, dtype=np.float32)
+        try:
+            for block in blocks:
+                if self.max_samples is not None:
+                    block = block[:self.max_samples - self.samples_emitted - len(pending)]
+                pending = np.concatenate((pending, block)) if len(pending) else block
+                while len(pending) >= self.frame_size:
+                    frame, pending = pending[:self.frame_size], pending[self.frame_size:]
+                    self.samples_emitted += len(frame)
+                    yield frame
+                if self.max_samples is not None and self.samples_emitted + len(pending) >= self.max_samples:
+                    break
+            if len(pending):
+                self.samples_emitted += len(pending)
+                yield pending
+        finally:
+            # Closes the file handle / ffmpeg pipe even if the consumer stops early
+            close = getattr(blocks, "close", None)
+            if close:
+                close()
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        return self._frames
+
+    def __next__(self) -> np.ndarray:
+        return next(self._frames)
+
+    def close(self):
+        self._frames.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def open_audio_stream(
+    path: Union[str, Path],
+    sample_rate: int = DEFAULT_SAMPLE_RATE,
+    frame_size: int = DEFAULT_FRAME_SIZE,
+    max_seconds: Optional[float] = None
+) -> AudioStream:
+    """Open a file as a stream of fixed-size mono float32 frames"""
+    return AudioStream(path, sample_rate=sample_rate, frame_size=frame_size, max_seconds=max_seconds)
+
+
+def load_audio(
+    path: Union[str, Path],
+    sample_rate: int = DEFAULT_SAMPLE_RATE,
+    max_seconds: Optional[float] = None
+) -> np.ndarray:
+    """
+    Decode a whole file (or its first ``max_seconds``) to mono float32
+
+    Drop-in replacement for ``librosa.load(path, sr=sample_rate, mono=True)[0]``
+    that decodes and resamples block by block.
+    """
+    with open_audio_stream(path, sample_rate, _READ_BLOCK, max_seconds) as stream:
+        frames = list(stream)
+    return np.concatenate(frames) if frames else np.zeros(0, dtype=np.float32)
+
+
+def float_to_int16(audio: np.ndarray) -> np.ndarray:
+    """Convert [-1, 1] float audio to int16 PCM"""
+    return (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+
+
+def transcode_to_wav(
+    path: Union[str, Path],
+    output_path: Union[str, Path],
+    sample_rate: int = DEFAULT_SAMPLE_RATE
+) -> int:
+    """
+    Write a file out as mono 16-bit PCM WAV at ``sample_rate``, frame by frame
+
+    Returns:
+        Number of samples written
+    """
+    with open_audio_stream(path, sample_rate, _READ_BLOCK) as stream, wave.open(str(output_path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        for frame in stream:
+            wav.writeframes(float_to_int16(frame).astype("<i2").tobytes())
+        return stream.samples_emitted
+
+
+async def aiter_audio_frames(
+    path: Union[str, Path],
+    sample_rate: int = DEFAULT_SAMPLE_RATE,
+    frame_size: int = DEFAULT_FRAME_SIZE,
+    max_seconds: Optional[float] = None,
+    prefetch: int = 4
+) -> AsyncIterator[np.ndarray]:
+    """
+    Decode on a worker thread and yield frames to an async consumer
+
+    At most ``prefetch`` frames are buffered, so a slow consumer applies
+    backpressure to the decoder instead of letting it run ahead.
+
+    Args:
+        path: Audio or video file
+        sample_rate: Output sample rate
+        frame_size: Samples per frame
+        max_seconds: Stop after this much audio
+        prefetch: Frames decoded ahead of the consumer
+
+    Yields:
+        Mono float32 frames
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, prefetch))
+    stop = threading.Event()
+    done = object()
+
+    def put(item) -> bool:
+        future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+        while not stop.is_set():
+            try:
+                future.result(timeout=0.1)
+                return True
+            except TimeoutError:
+                continue
+        future.cancel()
+        return False
+
+    def produce():
+        try:
+            with open_audio_stream(path, sample_rate, frame_size, max_seconds) as stream:
+                for frame in stream:
+                    if not put(frame):
+                        return
+        except Exception as e:
+            put(e)
+            return
+        put(done)
+
+    producer = loop.run_in_executor(None, produce)
+    try:
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        await producer
+
+
+async def aload_pcm16(
+    path: Union[str, Path],
+    sample_rate: int = DEFAULT_SAMPLE_RATE,
+    max_seconds: Optional[float] = None
+) -> np.ndarray:
+    """
+    Decode a file to int16 PCM, converting each frame as it arrives
+
+    For consumers that need the whole signal at once (an ASR request,
+    diarization): only the int16 buffer grows, never a float32 copy of the
+    file, and decoding runs on a worker thread.
+
+    Args:
+        path: Audio or video file
+        sample_rate: Output sample rate
+        max_seconds: Stop after this much audio
+
+    Returns:
+        Mono int16 samples
+    """
+    pcm = bytearray()
+    async for frame in aiter_audio_frames(path, sample_rate, _READ_BLOCK, max_seconds):
+        pcm += float_to_int16(frame).tobytes()
+    return np.frombuffer(pcm, dtype=np.int16)
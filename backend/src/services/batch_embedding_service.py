@@ -20,6 +20,8 @@ from .jina.embeddings_service import JinaEmbeddingsService
 from .jina.config import JinaConfig
 from .gemini.embeddings_service import GeminiEmbeddingsService
 from .gemini.config import GeminiConfig
+from .embedding_batch_packer import EmbeddingBatchPacker, OverflowPolicy, PackedBatch, PROVIDER_LIMITS
+from .embedding_dispatcher import get_embedding_dispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -41,11 +43,9 @@ class BatchConfig:
     provider: EmbeddingProvider
     batch_size: int = 50
     max_concurrent_batches: int = 3
-    rate_limit_delay: float = 1.0
-    retry_attempts: int = 3
-    retry_delay: float = 2.0
     memory_limit_mb: int = 1024
     enable_progress_tracking: bool = True
+    overflow_policy: OverflowPolicy = OverflowPolicy.TRUNCATE
 
 @dataclass
 class BatchResult:
@@ -94,12 +94,6 @@ class BatchEmbeddingService:
         self.jina_service = JinaEmbeddingsService(jina_config) if jina_config or self._has_jina_config() else None
         self.gemini_service = GeminiEmbeddingsService(gemini_config) if gemini_config or self._has_gemini_config() else None
         
-        # Rate limiting state
-        self._rate_limits = {
-            EmbeddingProvider.JINA: {"last_request": 0, "request_count": 0},
-            EmbeddingProvider.GEMINI: {"last_request": 0, "request_count": 0}
-        }
-        
         # Progress tracking
         self._progress_callbacks = []
         
@@ -157,45 +151,24 @@ class BatchEmbeddingService:
         logger.info(f"Starting Jina batch processing for {len(texts)} texts")
         
         try:
-            # Optimize batch size based on content
-            optimized_batch_size = self.optimize_batch_size(texts, config.batch_size, EmbeddingProvider.JINA)
+            # Pack texts into requests that fill the provider's token and item limits
+            batches = self.create_packer(EmbeddingProvider.JINA, config).pack(texts)
             
-            # Process in batches with rate limiting
-            all_embeddings = []
-            processed_count = 0
-            errors = []
+            # Process batches concurrently; the shared dispatcher adapts the
+            # number of HTTP requests in flight to rate limits. Batches are
+            # already packed, so each goes out as exactly one request
+            dispatcher = get_embedding_dispatcher("jina")
             
-            for i in range(0, len(texts), optimized_batch_size):
-                batch = texts[i:i + optimized_batch_size]
-                
-                # Handle rate limiting
-                await self.handle_rate_limits(EmbeddingProvider.JINA, config.rate_limit_delay)
-                
-                try:
-                    # Process batch with retry logic
-                    batch_embeddings = await self._process_batch_with_retry(
-                        self.jina_service.embed_documents,
-                        batch,
-                        config.retry_attempts,
-                        config.retry_delay
-                    )
-                    
-                    all_embeddings.extend(batch_embeddings)
-                    processed_count += len(batch)
-                    
-                    # Update progress
-                    if config.enable_progress_tracking:
-                        self._notify_progress(processed_count, len(texts), "jina")
-                    
-                    logger.debug(f"Processed Jina batch {i//optimized_batch_size + 1}, total: {processed_count}/{len(texts)}")
-                    
-                except Exception as e:
-                    error_msg = f"Batch {i//optimized_batch_size + 1} failed: {str(e)}"
-                    errors.append(error_msg)
-                    logger.error(error_msg)
-                    
-                    # Add empty embeddings for failed batch
-                    all_embeddings.extend([[]] * len(batch))
+            async def embed_packed(batch_texts: List[str]) -> List[List[float]]:
+                return await dispatcher.submit(batch_texts, self.jina_service.embed_packed)
+            
+            all_embeddings, processed_count, errors = await self._run_batches(
+                texts,
+                batches,
+                embed_packed,
+                config,
+                "jina"
+            )
             
             processing_time = time.time() - start_time
             
@@ -208,7 +181,7 @@ class BatchEmbeddingService:
                 metadata={
                     "provider": "jina",
                     "model": "jina-embeddings-v4",
-                    "batch_size": optimized_batch_size,
+                    "requests": len(batches),
                     "dimensions": 1024
                 },
                 processing_time=processing_time,
@@ -259,75 +232,28 @@ class BatchEmbeddingService:
         logger.info(f"Starting Gemini batch processing for {len(texts)} texts")
         
         try:
-            # Optimize batch size based on content and rate limits
-            optimized_batch_size = self.optimize_batch_size(texts, config.batch_size, EmbeddingProvider.GEMINI)
+            # Pack texts into requests that fill the provider's token and item limits
+            batches = self.create_packer(EmbeddingProvider.GEMINI, config).pack(texts)
             
-            # Process in batches with rate limiting
-            all_embeddings = []
-            processed_count = 0
-            errors = []
+            if task_type == "RETRIEVAL_QUERY":
+                embed_func = lambda x: self.gemini_service.embed_queries(x, output_dimensionality)
+            elif task_type == "CLASSIFICATION":
+                embed_func = lambda x: self.gemini_service.embed_for_classification(x, output_dimensionality)
+            elif task_type == "CLUSTERING":
+                embed_func = lambda x: self.gemini_service.embed_for_clustering(x, output_dimensionality)
+            else:
+                # Default to document embedding
+                embed_func = lambda x: self.gemini_service.embed_documents(x, output_dimensionality)
             
-            for i in range(0, len(texts), optimized_batch_size):
-                batch = texts[i:i + optimized_batch_size]
-                
-                # Handle rate limiting (Gemini has stricter limits)
-                await self.handle_rate_limits(EmbeddingProvider.GEMINI, config.rate_limit_delay)
-                
-                try:
-                    # Process batch with retry logic
-                    if task_type == "RETRIEVAL_DOCUMENT":
-                        batch_embeddings = await self._process_batch_with_retry(
-                            lambda x: self.gemini_service.embed_documents(x, output_dimensionality),
-                            batch,
-                            config.retry_attempts,
-                            config.retry_delay
-                        )
-                    elif task_type == "RETRIEVAL_QUERY":
-                        batch_embeddings = await self._process_batch_with_retry(
-                            lambda x: self.gemini_service.embed_queries(x, output_dimensionality),
-                            batch,
-                            config.retry_attempts,
-                            config.retry_delay
-                        )
-                    elif task_type == "CLASSIFICATION":
-                        batch_embeddings = await self._process_batch_with_retry(
-                            lambda x: self.gemini_service.embed_for_classification(x, output_dimensionality),
-                            batch,
-                            config.retry_attempts,
-                            config.retry_delay
-                        )
-                    elif task_type == "CLUSTERING":
-                        batch_embeddings = await self._process_batch_with_retry(
-                            lambda x: self.gemini_service.embed_for_clustering(x, output_dimensionality),
-                            batch,
-                            config.retry_attempts,
-                            config.retry_delay
-                        )
-                    else:
-                        # Default to document embedding
-                        batch_embeddings = await self._process_batch_with_retry(
-                            lambda x: self.gemini_service.embed_documents(x, output_dimensionality),
-                            batch,
-                            config.retry_attempts,
-                            config.retry_delay
-                        )
-                    
-                    all_embeddings.extend(batch_embeddings)
-                    processed_count += len(batch)
-                    
-                    # Update progress
-                    if config.enable_progress_tracking:
-                        self._notify_progress(processed_count, len(texts), "gemini")
-                    
-                    logger.debug(f"Processed Gemini batch {i//optimized_batch_size + 1}, total: {processed_count}/{len(texts)}")
-                    
-                except Exception as e:
-                    error_msg = f"Batch {i//optimized_batch_size + 1} failed: {str(e)}"
-                    errors.append(error_msg)
-                    logger.error(error_msg)
-                    
-                    # Add empty embeddings for failed batch
-                    all_embeddings.extend([[]] * len(batch))
+            # Process batches concurrently; the client's shared dispatcher
+            # adapts the number of HTTP requests in flight to rate limits
+            all_embeddings, processed_count, errors = await self._run_batches(
+                texts,
+                batches,
+                embed_func,
+                config,
+                "gemini"
+            )
             
             processing_time = time.time() - start_time
             
@@ -340,7 +266,7 @@ class BatchEmbeddingService:
                 metadata={
                     "provider": "gemini",
                     "model": "gemini-embedding-exp-03-07",
-                    "batch_size": optimized_batch_size,
+                    "requests": len(batches),
                     "task_type": task_type,
                     "dimensions": output_dimensionality or 3072
                 },
@@ -364,112 +290,79 @@ class BatchEmbeddingService:
                 errors=[str(e)]
             )
     
-    async def _process_batch_with_retry(
+    async def _run_batches(
         self,
+        texts: List[str],
+        batches: List[PackedBatch],
         process_func,
-        batch: List[str],
-        max_retries: int,
-        retry_delay: float
-    ) -> List[List[float]]:
+        config: BatchConfig,
+        provider_name: str
+    ) -> Tuple[List[List[float]], int, List[str]]:
         """
-        Process a batch with retry logic
+        Embed packed batches concurrently, preserving input order
         
         Args:
-            process_func: Function to process the batch
-            batch: Batch of texts
-            max_retries: Maximum retry attempts
-            retry_delay: Delay between retries
+            texts: Original list of texts
+            batches: Packed request batches covering ``texts``
+            process_func: Function to process a batch
+            config: Batch processing configuration
+            provider_name: Provider label for progress callbacks
             
         Returns:
-            List of embeddings
+            Tuple of (embeddings in input order, processed count, error messages)
         """
-        for attempt in range(max_retries + 1):
-            try:
-                return await process_func(batch)
-            except Exception as e:
-                if attempt == max_retries:
-                    raise e
-                
-                logger.warning(f"Batch processing attempt {attempt + 1} failed: {e}, retrying in {retry_delay}s")
-                await asyncio.sleep(retry_delay * (attempt + 1))  # Exponential backoff
+        results: List[Optional[List[List[float]]]] = [None] * len(batches)
+        errors = []
+        processed_count = 0
+        semaphore = asyncio.Semaphore(max(1, config.max_concurrent_batches))
+        
+        async def run(index: int, batch: PackedBatch):
+            nonlocal processed_count
+            async with semaphore:
+                try:
+                    # Retries and rate-limit backoff happen in the provider's dispatcher
+                    results[index] = await process_func(batch.texts)
+                except Exception as e:
+                    error_msg = f"Batch {index + 1} failed: {str(e)}"
+                    errors.append(error_msg)
+                    logger.error(error_msg)
+                    return
+            
+            processed_count += len({item.index for item in batch.items})
+            if config.enable_progress_tracking:
+                self._notify_progress(min(processed_count, len(texts)), len(texts), provider_name)
+            logger.debug(f"Processed {provider_name} batch {index + 1}/{len(batches)} ({batch.total_tokens} tokens)")
         
-        return []
+        await asyncio.gather(*(run(i, batch) for i, batch in enumerate(batches)))
+        
+        # Failed batches come back as empty embeddings
+        all_embeddings = EmbeddingBatchPacker.unpack(batches, results, len(texts))
+        processed_count = sum(1 for embedding in all_embeddings if embedding)
+        
+        return all_embeddings, processed_count, errors
     
-    def optimize_batch_size(
+    def create_packer(
         self,
-        texts: List[str],
-        base_batch_size: int,
-        provider: EmbeddingProvider
-    ) -> int:
+        provider: EmbeddingProvider,
+        config: Optional[BatchConfig] = None
+    ) -> EmbeddingBatchPacker:
         """
-        Optimize batch size based on content characteristics and provider limits
+        Create a token-budget packer for a provider
         
         Args:
-            texts: List of texts to analyze
-            base_batch_size: Base batch size
             provider: Embedding provider
+            config: Batch configuration; ``batch_size`` caps items per request
             
         Returns:
-            Optimized batch size
-        """
-        if not texts:
-            return base_batch_size
-        
-        # Calculate average text length
-        avg_length = sum(len(text) for text in texts) / len(texts)
-        
-        # Provider-specific optimizations
-        if provider == EmbeddingProvider.JINA:
-            # Jina has 8K token limit, batch size based on text length
-            if avg_length > 2000:
-                return min(base_batch_size // 2, 25)  # Reduce for long texts
-            elif avg_length < 500:
-                return min(base_batch_size * 2, 200)  # Increase for short texts
-            else:
-                return base_batch_size
-                
-        elif provider == EmbeddingProvider.GEMINI:
-            # Gemini has stricter rate limits but 8K context
-            if avg_length > 2000:
-                return min(base_batch_size // 3, 20)  # More conservative for long texts
-            elif avg_length < 500:
-                return min(base_batch_size, 50)  # Conservative increase
-            else:
-                return min(base_batch_size, 30)  # Default conservative
-        
-        return base_batch_size
-    
-    async def handle_rate_limits(self, provider: EmbeddingProvider, delay: float):
+            EmbeddingBatchPacker using the provider's request limits
         """
-        Handle rate limiting for embedding providers
-        
-        Args:
-            provider: Embedding provider
-            delay: Base delay between requests
-        """
-        current_time = time.time()
-        rate_info = self._rate_limits[provider]
-        
-        # Calculate required delay based on rate limits
-        if provider == EmbeddingProvider.JINA:
-            # Jina: 600 requests/minute for free tier
-            min_interval = 60.0 / 600  # ~0.1 seconds between requests
-        elif provider == EmbeddingProvider.GEMINI:
-            # Gemini: 100 requests/minute for experimental
-            min_interval = 60.0 / 100  # 0.6 seconds between requests
-        else:
-            min_interval = delay
-        
-        # Ensure minimum interval
-        time_since_last = current_time - rate_info["last_request"]
-        if time_since_last < min_interval:
-            sleep_time = min_interval - time_since_last
-            logger.debug(f"Rate limiting {provider.value}: sleeping {sleep_time:.2f}s")
-            await asyncio.sleep(sleep_time)
-        
-        # Update rate limiting state
-        rate_info["last_request"] = time.time()
-        rate_info["request_count"] += 1
+        config = config or BatchConfig(provider=provider)
+        limits = PROVIDER_LIMITS[provider.value]
+        return EmbeddingBatchPacker.for_provider(
+            provider.value,
+            overflow_policy=config.overflow_policy,
+            max_items_per_request=min(config.batch_size, limits.max_items_per_request)
+        )
     
     async def process_mixed_batch(
         self,
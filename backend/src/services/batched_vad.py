@@ -0,0 +1,520 @@
+"""
+Batched Voice Activity Detection
+
+Streaming VAD engine that evaluates one frame from every active stream
+(telephony call, file being decoded, ...) in a single batched model call,
+keeping each stream's recurrent state and audio context between calls, and
+turns the per-frame speech probabilities into speech start/end events with
+hysteresis.
+
+- ``SileroOnnxVAD`` runs the Silero VAD v5 ONNX export with an explicit
+  ``(2, batch, 128)`` state, so many streams share one inference.
+- ``EnergyVAD`` is a vectorized, dependency-free fallback based on frame
+  energy above a per-stream adaptive noise floor.
+
+Frame sizes come from the model: Silero needs 512-sample (32 ms) windows at
+16 kHz and 256 at 8 kHz; the energy model defaults to 30 ms.
+"""
+
+import logging
+import os
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    import onnxruntime
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+
+class VADEventType(Enum):
+    """Kinds of events emitted by the VAD engine"""
+    SPEECH_START = "speech_start"
+    SPEECH_END = "speech_end"
+
+
+@dataclass
+class VADEvent:
+    """
+    A speech boundary on one stream
+
+    ``audio`` is set on SPEECH_END events and holds the voiced segment
+    (including padding) as float32 samples at the engine's sample rate.
+    """
+    stream_id: str
+    type: VADEventType
+    time: float
+    start_time: Optional[float] = None
+    audio: Optional[np.ndarray] = None
+
+    @property
+    def duration(self) -> float:
+        return self.time - self.start_time if self.start_time is not None else 0.0
+
+
+class EnergyVAD:
+    """
+    Vectorized energy-based speech detector
+
+    The speech probability is a logistic function of how far a frame's level
+    (dBFS) sits above the stream's noise floor. The floor follows quiet frames
+    quickly and loud frames slowly, and is the per-stream state.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: float = 30.0,
+        margin_db: float = 12.0,
+        slope_db: float = 2.0,
+        floor_db: float = -60.0,
+        rise_rate: float = 0.002,
+        fall_rate: float = 0.2
+    ):
+        self.sample_rate = sample_rate
+        self.frame_size = int(sample_rate * frame_ms / 1000)
+        self.context_size = 0
+        self.state_shape: Tuple[int, ...] = (1,)
+        self.margin_db = margin_db
+        self.slope_db = slope_db
+        self.floor_db = floor_db
+        self.rise_rate = rise_rate
+        self.fall_rate = fall_rate
+
+    def initial_state(self) -> np.ndarray:
+        return np.full(self.state_shape, self.floor_db, dtype=np.float32)
+
+    def __call__(self, frames: np.ndarray, states: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Args:
+            frames: (batch, context_size + frame_size) float32 samples
+            states: (batch, *state_shape) noise floors in dBFS
+
+        Returns:
+            (speech probabilities of shape (batch,), new states)
+        """
+        energy = np.mean(np.square(frames, dtype=np.float64), axis=1)
+        level = 10.0 * np.log10(energy + 1e-10)
+        floor = states[:, 0].astype(np.float64)
+
+        probs = 1.0 / (1.0 + np.exp(-(level - floor - self.margin_db) / self.slope_db))
+        rate = np.where(level < floor, self.fall_rate, self.rise_rate)
+        new_floor = np.maximum(floor + rate * (level - floor), self.floor_db)
+        return probs.astype(np.float32), new_floor.astype(np.float32)[:, None]
+
+
+class SileroOnnxVAD:
+    """
+    Silero VAD v5 (ONNX) evaluated over a batch of streams
+
+    The ONNX graph takes ``input`` (batch, context + window), ``state``
+    (2, batch, 128) and ``sr``; state is kept batch-first here so the engine
+    can gather and scatter it per stream.
+    """
+
+    def __init__(self, model_path: Optional[Union[str, Path]] = None, sample_rate: int = 16000):
+        if not ONNXRUNTIME_AVAILABLE:
+            raise RuntimeError("onnxruntime is required for SileroOnnxVAD")
+        if sample_rate not in (8000, 16000):
+            raise ValueError("Silero VAD supports 8000 or 16000 Hz")
+
+        model_path = model_path or os.getenv("SILERO_VAD_ONNX_PATH") or _packaged_silero_model()
+        if not model_path:
+            raise RuntimeError("Silero VAD ONNX model not found; set SILERO_VAD_ONNX_PATH")
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = 1
+        options.inter_op_num_threads = 1
+        self.session = onnxruntime.InferenceSession(
+            str(model_path), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.sample_rate = sample_rate
+        self.frame_size = 512 if sample_rate == 16000 else 256
+        self.context_size = 64 if sample_rate == 16000 else 32
+        self.state_shape: Tuple[int, ...] = (2, 128)
+        self._sr = np.array(sample_rate, dtype=np.int64)
+
+    def initial_state(self) -> np.ndarray:
+        return np.zeros(self.state_shape, dtype=np.float32)
+
+    def __call__(self, frames: np.ndarray, states: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Args:
+            frames: (batch, context_size + frame_size) float32 samples
+            states: (batch, 2, 128) recurrent state
+
+        Returns:
+            (speech probabilities of shape (batch,), new states)
+        """
+        output, state = self.session.run(
+            None,
+            {
+                "input": frames.astype(np.float32, copy=False),
+                "state": np.ascontiguousarray(states.transpose(1, 0, 2)),
+                "sr": self._sr,
+            },
+        )
+        return output.reshape(-1), state.transpose(1, 0, 2)
+
+
+def _packaged_silero_model() -> Optional[str]:
+    """ONNX model shipped with the silero-vad pip package, if installed"""
+    try:
+        import silero_vad
+    except ImportError:
+        return None
+    candidate = Path(silero_vad.__file__).parent / "data" / "silero_vad.onnx"
+    return str(candidate) if candidate.exists() else None
+
+
+def create_vad_model(sample_rate: int = 16000) -> Any:
+    """Silero ONNX model when available, otherwise the energy model"""
+    try:
+        return SileroOnnxVAD(sample_rate=sample_rate)
+    except Exception as e:
+        logger.warning(f"Silero ONNX VAD unavailable ({e}); using energy VAD")
+        return EnergyVAD(sample_rate=sample_rate)
+
+
+@dataclass
+class _StreamState:
+    """Per-stream buffers, model state and hysteresis state"""
+    model_state: np.ndarray
+    context: np.ndarray
+    pending: List[np.ndarray] = field(default_factory=list)
+    pending_samples: int = 0
+    frame_index: int = 0
+    history: Deque[np.ndarray] = field(default_factory=deque)
+    triggered: bool = False
+    speech_run: int = 0
+    speech_start: int = 0
+    silence_start: Optional[int] = None
+    segment: List[np.ndarray] = field(default_factory=list)
+    segment_start: int = 0
+    closing: bool = False
+    events: List[VADEvent] = field(default_factory=list)
+
+
+class BatchedVADEngine:
+    """
+    Shared VAD over many concurrent streams
+
+    Feed audio with ``push``; each ``step`` takes the next frame from every
+    stream that has one buffered and evaluates them in one model call.
+    Events are returned from ``step``/``drain`` and, with ``queue_events``,
+    also queued per stream for ``pop_events``.
+
+    Hysteresis follows Silero's ``get_speech_timestamps``: speech starts after
+    ``min_speech_ms`` of frames at or above ``threshold`` and ends once the
+    probability has stayed below ``neg_threshold`` for ``min_silence_ms``.
+    """
+
+    def __init__(
+        self,
+        model: Any = None,
+        sample_rate: int = 16000,
+        threshold: float = 0.5,
+        neg_threshold: Optional[float] = None,
+        min_speech_ms: float = 250.0,
+        min_silence_ms: float = 300.0,
+        speech_pad_ms: float = 60.0,
+        max_speech_s: float = 30.0,
+        keep_audio: bool = True,
+        queue_events: bool = False
+    ):
+        """
+        Args:
+            model: Batched VAD model; defaults to create_vad_model(sample_rate)
+            sample_rate: Sample rate of the audio pushed into the engine
+            threshold: Probability at which speech begins
+            neg_threshold: Probability below which silence is counted
+                (default threshold - 0.15)
+            min_speech_ms: Speech needed before a SPEECH_START
+            min_silence_ms: Silence needed before a SPEECH_END
+            speech_pad_ms: Audio kept before and after each segment
+            max_speech_s: Segments longer than this are split
+            keep_audio: Attach segment audio to SPEECH_END events
+            queue_events: Also queue events per stream for pop_events, so
+                each consumer can collect its own stream's events
+        """
+        self.model = model if model is not None else create_vad_model(sample_rate)
+        if getattr(self.model, "sample_rate", sample_rate) != sample_rate:
+            raise ValueError("VAD model sample rate does not match engine sample rate")
+
+        self.sample_rate = sample_rate
+        self.frame_size = self.model.frame_size
+        self.threshold = threshold
+        self.neg_threshold = neg_threshold if neg_threshold is not None else max(threshold - 0.15, 0.01)
+        frame_ms = 1000.0 * self.frame_size / sample_rate
+        self.min_speech_frames = max(1, int(round(min_speech_ms / frame_ms)))
+        self.min_silence_frames = max(1, int(round(min_silence_ms / frame_ms)))
+        self.pad_frames = int(round(speech_pad_ms / frame_ms))
+        self.max_speech_frames = max(self.min_speech_frames, int(max_speech_s * 1000 / frame_ms))
+        self.keep_audio = keep_audio
+        self.queue_events = queue_events
+
+        self.streams: Dict[str, _StreamState] = {}
+        self.model_calls = 0
+        self.frames_evaluated = 0
+
+    # --- Stream management ---
+
+    def add_stream(self, stream_id: str) -> None:
+        if stream_id in self.streams:
+            raise ValueError(f"VAD stream {stream_id} already exists")
+        self.streams[stream_id] = _StreamState(
+            model_state=self.model.initial_state(),
+            context=np.zeros(self.model.context_size, dtype=np.float32),
+            history=deque(maxlen=self.pad_frames + self.min_speech_frames),
+        )
+
+    def remove_stream(self, stream_id: str) -> None:
+        """Drop a stream immediately, discarding buffered audio and events"""
+        self.streams.pop(stream_id, None)
+
+    def end_stream(self, stream_id: str) -> None:
+        """
+        Mark a stream as finished; the next steps flush its remaining audio
+        (zero-padded to a frame), close any open segment and remove it
+        """
+        self.streams[stream_id].closing = True
+
+    def push(self, stream_id: str, samples: np.ndarray) -> None:
+        """
+        Buffer audio for a stream (created on first push)
+
+        Args:
+            stream_id: Stream identifier
+            samples: Mono samples; int16 is scaled to [-1, 1]
+        """
+        if stream_id not in self.streams:
+            self.add_stream(stream_id)
+        samples = np.asarray(samples)
+        if samples.dtype == np.int16:
+            samples = samples.astype(np.float32) / 32768.0
+        elif samples.dtype != np.float32:
+            samples = samples.astype(np.float32)
+        if len(samples):
+            stream = self.streams[stream_id]
+            stream.pending.append(samples.reshape(-1))
+            stream.pending_samples += len(samples)
+
+    def pop_events(self, stream_id: str) -> List[VADEvent]:
+        """Events produced for a stream since the last call"""
+        stream = self.streams.get(stream_id)
+        if stream is None:
+            return []
+        events, stream.events = stream.events, []
+        return events
+
+    def is_speaking(self, stream_id: str) -> bool:
+        stream = self.streams.get(stream_id)
+        return bool(stream and stream.triggered)
+
+    # --- Evaluation ---
+
+    def _ready(self, stream: _StreamState) -> bool:
+        return stream.pending_samples >= self.frame_size or (stream.closing and stream.pending_samples > 0)
+
+    def _take_frame(self, stream: _StreamState) -> np.ndarray:
+        """Remove the next frame from a stream's buffer, zero-padding the last one"""
+        buffered = np.concatenate(stream.pending) if len(stream.pending) > 1 else stream.pending[0]
+        frame = buffered[:self.frame_size]
+        rest = buffered[self.frame_size:]
+        stream.pending = [rest] if len(rest) else []
+        stream.pending_samples = len(rest)
+        if len(frame) < self.frame_size:
+            frame = np.pad(frame, (0, self.frame_size - len(frame)))
+        return frame
+
+    def step(self) -> List[VADEvent]:
+        """
+        Evaluate one frame for every stream that has one buffered
+
+        Returns:
+            Events emitted during this step, across all streams
+        """
+        ready = [(stream_id, stream) for stream_id, stream in self.streams.items() if self._ready(stream)]
+        events: List[VADEvent] = []
+
+        if ready:
+            context_size = self.model.context_size
+            batch = np.empty((len(ready), context_size + self.frame_size), dtype=np.float32)
+            states = np.stack([stream.model_state for _, stream in ready])
+            frames = []
+            for row, (_, stream) in enumerate(ready):
+                frame = self._take_frame(stream)
+                batch[row, :context_size] = stream.context
+                batch[row, context_size:] = frame
+                frames.append(frame)
+
+            probs, new_states = self.model(batch, states)
+            self.model_calls += 1
+            self.frames_evaluated += len(ready)
+
+            for row, (stream_id, stream) in enumerate(ready):
+                stream.model_state = new_states[row]
+                if context_size:
+                    stream.context = batch[row, -context_size:].copy()
+                events.extend(self._advance(stream_id, stream, frames[row], float(probs[row])))
+
+        for stream_id in [sid for sid, s in self.streams.items() if s.closing and s.pending_samples == 0]:
+            events.extend(self._close(stream_id, self.streams.pop(stream_id)))
+        return events
+
+    def drain(self) -> List[VADEvent]:
+        """Step until no stream has a full frame (or closing tail) buffered"""
+        events: List[VADEvent] = []
+        while any(self._ready(stream) or stream.closing for stream in self.streams.values()):
+            events.extend(self.step())
+        return events
+
+    # --- Hysteresis ---
+
+    def _time(self, frame_index: int) -> float:
+        return frame_index * self.frame_size / self.sample_rate
+
+    def _emit(self, stream_id: str, stream: _StreamState, event: VADEvent) -> VADEvent:
+        if self.queue_events:
+            stream.events.append(event)
+        return event
+
+    def _start(self, stream_id: str, stream: _StreamState, first_speech: int) -> VADEvent:
+        stream.triggered = True
+        stream.silence_start = None
+        stream.segment_start = max(0, first_speech - self.pad_frames)
+        stream.segment = list(stream.history)[-(stream.frame_index + 1 - stream.segment_start):] if self.keep_audio else []
+        return self._emit(stream_id, stream, VADEvent(
+            stream_id=stream_id,
+            type=VADEventType.SPEECH_START,
+            time=self._time(stream.segment_start),
+        ))
+
+    def _end(self, stream_id: str, stream: _StreamState, end_frame: int) -> VADEvent:
+        """Close the open segment at end_frame (exclusive)"""
+        end_frame = min(end_frame, stream.frame_index + 1)
+        audio = None
+        if self.keep_audio:
+            frames = stream.segment[:end_frame - stream.segment_start]
+            audio = np.concatenate(frames) if frames else np.zeros(0, dtype=np.float32)
+        stream.triggered = False
+        stream.silence_start = None
+        stream.speech_run = 0
+        stream.segment = []
+        return self._emit(stream_id, stream, VADEvent(
+            stream_id=stream_id,
+            type=VADEventType.SPEECH_END,
+            time=self._time(end_frame),
+            start_time=self._time(stream.segment_start),
+            audio=audio,
+        ))
+
+    def _advance(self, stream_id: str, stream: _StreamState, frame: np.ndarray, prob: float) -> List[VADEvent]:
+        """Update one stream's hysteresis state with its newest frame"""
+        events = []
+        index = stream.frame_index
+        if self.keep_audio:
+            stream.history.append(frame)
+            if stream.triggered:
+                stream.segment.append(frame)
+
+        if not stream.triggered:
+            if prob >= self.threshold:
+                if stream.speech_run == 0:
+                    stream.speech_start = index
+                stream.speech_run += 1
+                if stream.speech_run >= self.min_speech_frames:
+                    events.append(self._start(stream_id, stream, stream.speech_start))
+            else:
+                stream.speech_run = 0
+        else:
+            if prob >= self.threshold:
+                stream.silence_start = None
+            elif prob < self.neg_threshold and stream.silence_start is None:
+                stream.silence_start = index
+
+            if stream.silence_start is not None and index + 1 - stream.silence_start >= self.min_silence_frames:
+                events.append(self._end(stream_id, stream, stream.silence_start + self.pad_frames))
+            elif index + 1 - stream.segment_start >= self.max_speech_frames:
+                # Split overly long speech so downstream ASR gets bounded segments
+                events.append(self._end(stream_id, stream, index + 1))
+                stream.triggered = True
+                stream.segment_start = index + 1
+                events.append(self._emit(stream_id, stream, VADEvent(
+                    stream_id=stream_id, type=VADEventType.SPEECH_START, time=self._time(index + 1)
+                )))
+
+        stream.frame_index += 1
+        return events
+
+    def _close(self, stream_id: str, stream: _StreamState) -> List[VADEvent]:
+        if not stream.triggered:
+            return []
+        end_frame = stream.silence_start + self.pad_frames if stream.silence_start is not None else stream.frame_index
+        return [self._end(stream_id, stream, end_frame)]
+
+
+def detect_speech_segments(
+    sources: Iterable[Union[str, Path]],
+    engine: Optional[BatchedVADEngine] = None,
+    frames_per_push: int = 16,
+    max_seconds: Optional[float] = None
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Run VAD over many audio files in lockstep, one batched call per frame
+
+    Files are decoded incrementally with the streaming decoder, so memory
+    stays bounded by ``frames_per_push`` frames per file.
+
+    Args:
+        sources: Audio file paths
+        engine: Engine to use (default: a new one at 16 kHz)
+        frames_per_push: VAD frames decoded per file between evaluations
+        max_seconds: Only analyze the first ``max_seconds`` of each file
+
+    Returns:
+        Mapping of path to speech segments (``audio`` int16, ``start_time``,
+        ``end_time``), matching get_vad_segments' output
+    """
+    from src.services.audio_stream_decoder import float_to_int16, open_audio_stream
+
+    engine = engine or BatchedVADEngine()
+    streams = {}
+    for source in sources:
+        stream_id = str(source)
+        streams[stream_id] = iter(open_audio_stream(
+            source, sample_rate=engine.sample_rate, frame_size=engine.frame_size * frames_per_push,
+            max_seconds=max_seconds
+        ))
+        engine.add_stream(stream_id)
+
+    segments: Dict[str, List[Dict[str, Any]]] = {stream_id: [] for stream_id in streams}
+
+    def collect(events: List[VADEvent]) -> None:
+        for event in events:
+            if event.type is VADEventType.SPEECH_END:
+                segments[event.stream_id].append({
+                    "audio": float_to_int16(event.audio) if event.audio is not None else None,
+                    "start_time": event.start_time,
+                    "end_time": event.time,
+                })
+
+    while streams:
+        for stream_id in list(streams):
+            block = next(streams[stream_id], None)
+            if block is None:
+                del streams[stream_id]
+                engine.end_stream(stream_id)
+            else:
+                engine.push(stream_id, block)
+        collect(engine.drain())
+
+    return segments
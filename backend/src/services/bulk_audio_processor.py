@@ -18,10 +18,15 @@ from pathlib import Path
 from datetime import datetime
 import concurrent.futures
 from dataclasses import dataclass, asdict
-import pandas as pd
 
+from src.core.lazy import lazy_import
 from src.services.audio_preparation_service import audio_preparation_service
 from src.services.audio_separation_service import audio_separation_service
+from src.services.content_fingerprint_index import (
+    TRANSCRIPT, artifact_variant, get_content_index, pcm_fingerprint
+)
+
+pd = lazy_import("pandas")
 
 logger = logging.getLogger(__name__)
 
@@ -68,6 +73,9 @@ class BatchProcessingConfig:
     max_workers: int = 4
     timeout_per_file: int = 300  # 5 minutes per file
     
+    # Reuse transcripts of audio already processed in earlier batches
+    use_content_index: bool = True
+    
     # Export options
     export_formats: List[str] = None
     export_directory: Optional[str] = None
@@ -85,10 +93,12 @@ class BulkAudioProcessor:
         self.temp_dir = tempfile.mkdtemp(prefix="bulk_audio_")
         self.results: List[AudioProcessingResult] = []
         self.current_batch_id = None
+        self.content_index = get_content_index()
         self.processing_stats = {
             "total_files": 0,
             "processed_files": 0,
             "failed_files": 0,
+            "cached_files": 0,
             "total_duration": 0.0,
             "processing_time": 0.0,
             "start_time": None,
@@ -121,6 +131,7 @@ class BulkAudioProcessor:
             "total_files": len(audio_files),
             "processed_files": 0,
             "failed_files": 0,
+            "cached_files": 0,
             "total_duration": 0.0,
             "processing_time": 0.0,
             "start_time": datetime.now(),
@@ -167,6 +178,8 @@ class BulkAudioProcessor:
                     if result.success:
                         self.processing_stats["processed_files"] += 1
                         self.processing_stats["total_duration"] += result.duration
+                        if result.metadata.get("content_index_hit"):
+                            self.processing_stats["cached_files"] += 1
                     else:
                         self.processing_stats["failed_files"] += 1
             
@@ -311,10 +324,10 @@ class BulkAudioProcessor:
                         }
                     }
                     
-                    result = await audio_preparation_service.prepare_audio(
-                        audio_path=file_path,
-                        provider="transcription",
-                        config=preparation_config
+                    result = await self._prepare_audio_with_index(
+                        file_path,
+                        preparation_config,
+                        config.use_content_index
                     )
                     
                     processing_time = (datetime.now() - start_time).total_seconds()
@@ -414,6 +427,57 @@ class BulkAudioProcessor:
         
         return export_paths
     
+    async def _prepare_audio_with_index(
+        self,
+        file_path: str,
+        preparation_config: Dict[str, Any],
+        use_index: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Prepare and transcribe audio, consulting the content fingerprint index
+        
+        Files are keyed by a hash of their decoded PCM, so the same audio in a
+        different file or container is only transcribed once per set of
+        preparation settings.
+        
+        Args:
+            file_path: Audio file path
+            preparation_config: Settings passed to the audio preparation service
+            use_index: Look up and store transcripts in the content index
+            
+        Returns:
+            Preparation result; cached results carry ``content_index_hit`` in metadata
+        """
+        if not use_index:
+            return await audio_preparation_service.prepare_audio(
+                audio_path=file_path,
+                provider="transcription",
+                config=preparation_config
+            )
+        
+        fingerprint = await asyncio.to_thread(pcm_fingerprint, file_path)
+        variant = artifact_variant(**preparation_config)
+        cached = self.content_index.get(fingerprint, TRANSCRIPT, variant)
+        if cached:
+            logger.info(f"Reusing transcript for {file_path} from the content index")
+            cached["metadata"] = {**(cached.get("metadata") or {}), "content_index_hit": True}
+            return cached
+        
+        result = await audio_preparation_service.prepare_audio(
+            audio_path=file_path,
+            provider="transcription",
+            config=preparation_config
+        )
+        if result.get("transcription"):
+            # Generated files live in temp directories, so only the transcript is kept
+            self.content_index.put(fingerprint, TRANSCRIPT, {
+                "transcription": result.get("transcription", ""),
+                "segments": result.get("segments", []),
+                "diarization": result.get("diarization", {}),
+                "metadata": result.get("metadata", {})
+            }, variant)
+        return result
+    
     async def _process_single_audio_file(
         self,
         file_path: str,
@@ -445,11 +509,11 @@ class BulkAudioProcessor:
                 }
             }
             
-            # Process audio
-            result = await audio_preparation_service.prepare_audio(
-                audio_path=file_path,
-                provider="transcription",
-                config=preparation_config
+            # Process audio, or reuse the transcript of identical audio
+            result = await self._prepare_audio_with_index(
+                file_path,
+                preparation_config,
+                config.use_content_index
             )
             
             processing_time = (datetime.now() - start_time).total_seconds()
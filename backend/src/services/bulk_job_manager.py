@@ -18,11 +18,11 @@ from pathlib import Path
 from enum import Enum
 from dataclasses import dataclass, asdict
 from convex import ConvexClient
-import json
-import zipfile
-import csv
 import time
 
+from .convex_progress import MISSING_FUNCTION, ConvexError, get_progress_publisher
+from .export_writers import export_json_document, export_records, export_zip, is_record_stream
+
 logger = logging.getLogger(__name__)
 
 
@@ -37,6 +37,10 @@ class BulkJobStatus(Enum):
     CANCELLED = "cancelled"
 
 
+# Statuses that end a job; these always reach Convex immediately
+TERMINAL_STATUSES = (BulkJobStatus.COMPLETED, BulkJobStatus.FAILED, BulkJobStatus.CANCELLED)
+
+
 class BulkJobStage(Enum):
     """Bulk job processing stages"""
     INITIALIZATION = "initialization"
@@ -70,7 +74,7 @@ class BulkJobStageInfo:
 class BulkJobExportInfo:
     """Information about job export"""
     export_id: str
-    format: str  # zip, csv, json
+    format: str  # zip, csv, json, jsonl
     file_path: Optional[str] = None
     file_size: Optional[int] = None
     download_url: Optional[str] = None
@@ -94,6 +98,8 @@ class BulkJobManager:
         """Initialize bulk job manager"""
         self.convex_url = os.getenv("CONVEX_URL") or os.getenv("NEXT_PUBLIC_CONVEX_URL", "http://127.0.0.1:3210")
         self.convex_client = ConvexClient(self.convex_url)
+        # Progress and status updates go out through one coalescing async publisher
+        self.progress_publisher = get_progress_publisher(self.convex_url)
         self.environment = os.getenv("ENVIRONMENT", "development")
         
         # Export configuration
@@ -270,6 +276,11 @@ class BulkJobManager:
                 if remaining_updates:
                     mutation_data["updates"] = remaining_updates
             
+            if status not in TERMINAL_STATUSES:
+                # Progress ticks: only the latest status per interval reaches Convex
+                await self._send_webhook("bulkJobs:updateStatus", mutation_data, coalesce=True)
+                return
+
             result = await self._send_webhook("bulkJobs:updateStatus", mutation_data)
             
             if result is not None:
@@ -319,7 +330,7 @@ class BulkJobManager:
             if metadata:
                 stage_update["metadata"] = metadata
             
-            await self._send_webhook("bulkJobs:updateStageProgress", stage_update)
+            await self._send_webhook("bulkJobs:updateStageProgress", stage_update, coalesce=True)
             
             logger.debug(f"Updated stage {stage.value} progress for job {job_id}: {progress:.2%}")
             
@@ -465,8 +476,9 @@ class BulkJobManager:
         
         Args:
             job_id: Job ID
-            export_format: Export format (zip, csv, json)
-            data: Data to export
+            export_format: Export format (zip, csv, json, jsonl)
+            data: Data to export; lists, generators and async iterators of
+                  records are streamed to disk
             filename_prefix: Prefix for the export filename
             expires_in_hours: Custom expiration time
             
@@ -487,6 +499,8 @@ class BulkJobManager:
             # Generate export file based on format
             if export_format == "json":
                 await self._create_json_export(export_path, data)
+            elif export_format == "jsonl":
+                await self._create_jsonl_export(export_path, data)
             elif export_format == "csv":
                 await self._create_csv_export(export_path, data)
             elif export_format == "zip":
@@ -772,46 +786,51 @@ class BulkJobManager:
     
     async def _create_json_export(self, export_path: Path, data: Any):
         """Create JSON export file"""
-        with open(export_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        if is_record_stream(data):
+            await export_records(export_path, data, "json")
+        else:
+            await export_json_document(export_path, data)
+    
+    async def _create_jsonl_export(self, export_path: Path, data: Any):
+        """Create JSONL export file"""
+        if not is_record_stream(data):
+            raise ValueError("JSONL export requires a list or stream of records")
+        
+        await export_records(export_path, data, "jsonl")
     
     async def _create_csv_export(self, export_path: Path, data: Any):
         """Create CSV export file"""
-        if not isinstance(data, list) or not data:
+        if not is_record_stream(data) or (isinstance(data, list) and not data):
             raise ValueError("CSV export requires list of dictionaries")
         
-        with open(export_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=data[0].keys())
-            writer.writeheader()
-            writer.writerows(data)
+        await export_records(export_path, data, "csv")
     
     async def _create_zip_export(self, export_path: Path, data: Any):
         """Create ZIP export file"""
-        with zipfile.ZipFile(export_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-            if isinstance(data, dict):
-                for filename, content in data.items():
-                    if isinstance(content, (str, bytes)):
-                        zf.writestr(filename, content)
-                    else:
-                        zf.writestr(filename, json.dumps(content, indent=2))
-            else:
-                zf.writestr("data.json", json.dumps(data, indent=2))
+        if isinstance(data, dict):
+            await export_zip(export_path, data)
+        else:
+            await export_zip(export_path, {"data.json": data})
     
-    async def _send_webhook(self, function_name: str, data: Dict[str, Any]):
-        """Send webhook to Convex with fallback handling (supports both actions and mutations)"""
+    async def _send_webhook(self, function_name: str, data: Dict[str, Any], coalesce: bool = False):
+        """
+        Send webhook to Convex with fallback handling (supports both actions and mutations)
+
+        With ``coalesce`` the update is queued on the progress publisher and
+        merged with other updates for the same job and stage; otherwise it is
+        sent immediately, after any queued updates for the job.
+        """
+        # Use actions for complex operations that involve external APIs or long processing
+        kind = "action" if function_name in ["bulkJobs:create", "bulkJobs:updateStatus"] else "mutation"
+        if coalesce:
+            self.progress_publisher.publish(function_name, data, kind=kind)
+            return None
         try:
-            # Use actions for complex operations that involve external APIs or long processing
-            if function_name in ["bulkJobs:create", "bulkJobs:updateStatus"]:
-                result = self.convex_client.action(function_name, data)
-                logger.info(f"Convex action {function_name} completed successfully: {result}")
-                return result
-            else:
-                # Use mutations for simple database operations
-                result = self.convex_client.mutation(function_name, data)
-                logger.info(f"Convex mutation {function_name} completed successfully: {result}")
-                return result
-        except Exception as e:
-            if "Could not find public function" in str(e):
+            result = await self.progress_publisher.send(function_name, data, kind=kind)
+            logger.info(f"Convex {kind} {function_name} completed successfully: {result}")
+            return result
+        except ConvexError as e:
+            if MISSING_FUNCTION in str(e):
                 logger.warning(f"Convex function {function_name} not found. Continuing without Convex integration.")
                 # Don't raise error for missing functions - continue without Convex
                 return None
@@ -902,15 +921,21 @@ class BulkJobManager:
             else:
                 # Convert stage string to enum value for consistency  
                 stage_enum = BulkJobStage(stage) if stage in [s.value for s in BulkJobStage] else BulkJobStage.CONTENT_PROCESSING
-                asyncio.run(self.update_job_status(
-                    job_id=job_id,
-                    status=BulkJobStatus.PROCESSING,
-                    updates={
-                        "progress_percentage": progress,
-                        "currentStage": stage_enum.value,  # Convert enum to string
-                        "metadata": self._filter_metadata_for_schema(metadata)
-                    }
-                ))
+
+                async def update_and_flush():
+                    await self.update_job_status(
+                        job_id=job_id,
+                        status=BulkJobStatus.PROCESSING,
+                        updates={
+                            "progress_percentage": progress,
+                            "currentStage": stage_enum.value,  # Convert enum to string
+                            "metadata": self._filter_metadata_for_schema(metadata)
+                        }
+                    )
+                    # This loop's client and flusher die with it: send and close before returning
+                    await self.progress_publisher.close()
+
+                asyncio.run(update_and_flush())
         except Exception as e:
             logger.error(f"Error updating job progress for {job_id}: {e}")
     
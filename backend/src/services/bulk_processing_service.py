@@ -15,7 +15,7 @@ import asyncio
 import tempfile
 import uuid
 import threading
-from typing import Dict, Any, List, Optional, Union, Tuple
+from typing import Dict, Any, Iterator, List, Optional, Union, Tuple
 from datetime import datetime
 from pathlib import Path
 from dataclasses import dataclass, asdict
@@ -24,6 +24,13 @@ import aiofiles
 
 from src.services.tiktok_service import get_tiktok_service
 from src.services.audio_preparation_service import audio_preparation_service
+from src.services.bulk_result_store import BulkResultStore, get_result_store
+from src.services.export_writers import export_json_document, export_records
+from src.services.media_stream import write_stream
+from src.services.content_fingerprint_index import (
+    EMBEDDING, TRANSCRIPT, artifact_variant, content_source_key,
+    get_content_index, pcm_fingerprint, text_fingerprint
+)
 from src.services.gemini.embeddings_service import GeminiEmbeddingsService
 from src.services.jina.embeddings_service import JinaEmbeddingsService
 from src.services.gemini.config import GeminiConfig
@@ -35,6 +42,12 @@ from src.services.vector_db_connectors import (
 
 logger = logging.getLogger(__name__)
 
+# Columns of the flattened CSV export
+CSV_EXPORT_HEADERS = (
+    "item_id", "content_type", "status", "transcription", "language", "audio_duration",
+    "processing_time", "error_message", "segments_count", "embeddings_count", "vocals_extracted",
+)
+
 
 class ProcessingStatus(Enum):
     """Processing status enumeration"""
@@ -104,6 +117,9 @@ class ProcessingConfig:
     retry_attempts: int = 3
     timeout_seconds: int = 300
     
+    # Reuse transcripts and embeddings of content seen in earlier jobs
+    enable_content_dedup: bool = True
+    
     def __post_init__(self):
         if self.export_formats is None:
             self.export_formats = ["json", "csv", "jsonl"]
@@ -157,6 +173,22 @@ class ProcessingResult:
             self.chunks = []
 
 
+def serialize_processing_result(result: ProcessingResult) -> Dict[str, Any]:
+    """Convert a ProcessingResult to a JSON-ready dict with enum values as strings"""
+    result_dict = asdict(result)
+    result_dict["content_type"] = result.content_type.value if isinstance(result.content_type, Enum) else str(result.content_type)
+    result_dict["status"] = result.status.value if isinstance(result.status, Enum) else str(result.status)
+    return result_dict
+
+
+def deserialize_processing_result(data: Dict[str, Any]) -> ProcessingResult:
+    """Rebuild a ProcessingResult from serialize_processing_result output"""
+    fields = dict(data)
+    fields["content_type"] = ContentType(fields["content_type"])
+    fields["status"] = ProcessingStatus(fields["status"])
+    return ProcessingResult(**fields)
+
+
 @dataclass
 class BulkProcessingState:
     """State management for bulk processing operations"""
@@ -165,16 +197,20 @@ class BulkProcessingState:
     status: ProcessingStatus
     config: ProcessingConfig
     
+    # Job the results are persisted under (defaults to the session ID)
+    job_id: Optional[str] = None
+    
     # Progress tracking
     total_items: int = 0
     completed_items: int = 0
     failed_items: int = 0
+    skipped_items: int = 0
     
-    # Results storage
-    results: List[ProcessingResult] = None
+    # Per-item results are persisted to the result store as they finish
+    store: Optional[BulkResultStore] = None
+    summary: Optional[Dict[str, Any]] = None
     
     # Real-time progress tracking (thread-safe)
-    _processing_results: List[ProcessingResult] = None
     _embeddings_count: int = 0
     _lock: threading.Lock = None
     
@@ -186,27 +222,68 @@ class BulkProcessingState:
     errors: List[Dict[str, Any]] = None
     
     def __post_init__(self):
-        if self.results is None:
-            self.results = []
+        if self.job_id is None:
+            self.job_id = self.session_id
+        if self.store is None:
+            self.store = get_result_store()
         if self.errors is None:
             self.errors = []
-        if self._processing_results is None:
-            self._processing_results = []
         if self._lock is None:
             self._lock = threading.Lock()
     
-    def add_completed_item(self, result: ProcessingResult):
-        """Thread-safe method to add a completed processing result"""
+    def _persist_result(self, result: ProcessingResult) -> int:
+        """Write a result to the store and return its embedding count"""
+        embeddings_count = 0
+        # Count embeddings if they exist - embeddings is List[List[float]]
+        if hasattr(result, 'embeddings') and result.embeddings:
+            # Each item in embeddings list is a vector (List[float])
+            embeddings_count = len(result.embeddings) if isinstance(result.embeddings, list) else 1
+        self.store.put(
+            self.job_id,
+            result.item_id,
+            result.status.value,
+            serialize_processing_result(result),
+            embeddings_count
+        )
+        return embeddings_count
+    
+    async def add_completed_item(self, result: ProcessingResult):
+        """Persist a finished processing result in a worker thread and count it"""
+        embeddings_count = await asyncio.to_thread(self._persist_result, result)
         with self._lock:
-            self._processing_results.append(result)
             self.completed_items += 1
-            # Count embeddings if they exist - embeddings is List[List[float]]
-            if hasattr(result, 'embeddings') and result.embeddings:
-                if isinstance(result.embeddings, list):
-                    # Each item in embeddings list is a vector (List[float])
-                    self._embeddings_count += len(result.embeddings)
-                else:
-                    self._embeddings_count += 1
+            self._embeddings_count += embeddings_count
+    
+    async def add_failed_item(self, result: ProcessingResult):
+        """Persist a failed processing result in a worker thread and count it"""
+        await asyncio.to_thread(self._persist_result, result)
+        with self._lock:
+            self.failed_items += 1
+    
+    def resume_from_store(self) -> set:
+        """
+        Load progress for items this job already finished.
+        
+        Returns:
+            IDs of completed items that should be skipped
+        """
+        completed_ids = self.store.completed_item_ids(self.job_id)
+        if completed_ids:
+            stats = self.store.stats(self.job_id)
+            with self._lock:
+                self.skipped_items = len(completed_ids)
+                self.completed_items += len(completed_ids)
+                self._embeddings_count += stats["embeddings_count"]
+        return completed_ids
+    
+    def iter_results(self) -> Iterator["ProcessingResult"]:
+        """Stream this job's persisted results from the store"""
+        for payload in self.store.iter_results(self.job_id):
+            yield deserialize_processing_result(payload)
+    
+    def iter_serialized_results(self) -> Iterator[Dict[str, Any]]:
+        """Stream this job's persisted results as JSON-ready dicts"""
+        return self.store.iter_results(self.job_id)
     
     def get_real_time_stats(self) -> Dict[str, int]:
         """Get real-time statistics in a thread-safe way"""
@@ -253,6 +330,7 @@ class BulkProcessingService:
         # Initialize service clients
         self.tiktok_service = get_tiktok_service()
         self.audio_service = audio_preparation_service
+        self.content_index = get_content_index()
         
         # Initialize embedding services
         self.gemini_service = None
@@ -394,19 +472,24 @@ class BulkProcessingService:
             )
             
             # Start processing session
-            session_id = await self.process_bulk_content_legacy(selected_content, processing_config, progress_callback)
+            session_id = await self.process_bulk_content_legacy(
+                selected_content, processing_config, progress_callback, job_id=job_id
+            )
             
             # Wait for completion and return results
             state = self.active_sessions.get(session_id)
             if state:
-                # Return formatted results
+                # Return the job summary; results stay in the result store and
+                # are streamed from there by export_data
                 return {
                     "session_id": session_id,
+                    "job_id": state.job_id,
                     "status": state.status.value,
                     "total_items": state.total_items,
                     "completed_items": state.completed_items,
                     "failed_items": state.failed_items,
-                    "results": [self._serialize_processing_result(result) for result in state.results if isinstance(result, ProcessingResult)] if state.results else [],
+                    "skipped_items": state.skipped_items,
+                    "results_count": state.completed_items + state.failed_items,
                     "processing_time": state.processing_time,
                     "progress": state.progress_percentage
                 }
@@ -431,7 +514,8 @@ class BulkProcessingService:
         self,
         content_source: Union[str, List[str]], 
         config: ProcessingConfig,
-        progress_callback: Optional[callable] = None
+        progress_callback: Optional[callable] = None,
+        job_id: Optional[str] = None
     ) -> str:
         """
         Legacy processing method (renamed from original process_bulk_content).
@@ -440,6 +524,8 @@ class BulkProcessingService:
             content_source: Username, URL, or list of content identifiers
             config: Processing configuration
             progress_callback: Optional callback for progress updates
+            job_id: Job to persist results under; re-running a job ID skips
+                items that already completed
             
         Returns:
             Session ID for tracking progress
@@ -449,6 +535,7 @@ class BulkProcessingService:
             session_id=session_id,
             status=ProcessingStatus.INITIALIZING,
             config=config,
+            job_id=job_id,
             start_time=datetime.now()
         )
         
@@ -519,6 +606,12 @@ class BulkProcessingService:
         """
         state = self.active_sessions[session_id]
         
+        # Skip items a previous run of this job already completed
+        completed_ids = state.resume_from_store()
+        if completed_ids:
+            logger.info(f"Resuming job {state.job_id}: skipping {len(completed_ids)} completed items")
+            content_items = [item for item in content_items if str(item["id"]) not in completed_ids]
+        
         # Create semaphore for concurrency control
         semaphore = asyncio.Semaphore(state.config.max_concurrent_items)
         
@@ -529,7 +622,7 @@ class BulkProcessingService:
                     
                     # Add completed item to real-time tracking
                     if result and not isinstance(result, Exception):
-                        state.add_completed_item(result)
+                        await state.add_completed_item(result)
                     else:
                         # Handle failed item
                         with state._lock:
@@ -569,20 +662,13 @@ class BulkProcessingService:
         
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
-        # Process results - note: completed_items and failed_items are already tracked in real-time
+        # Results are already persisted and counted in real-time; only record errors here
         for result in results:
             if isinstance(result, Exception):
                 state.errors.append({
                     "error": str(result),
                     "timestamp": datetime.now().isoformat()
                 })
-            else:
-                state.results.append(result)
-        
-        # Copy real-time results to final results for consistency
-        with state._lock:
-            # Ensure final state matches real-time tracking
-            state.results.extend([r for r in state._processing_results if r not in state.results])
     
     async def _ingest_content(
         self,
@@ -715,13 +801,19 @@ class BulkProcessingService:
         
         async def process_single_item(item: Dict[str, Any]) -> ProcessingResult:
             async with semaphore:
-                return await self._process_single_content_item(session_id, item)
+                result = await self._process_single_content_item(session_id, item)
+                # Persist as soon as the item finishes
+                if result.status == ProcessingStatus.COMPLETED:
+                    await state.add_completed_item(result)
+                else:
+                    await state.add_failed_item(result)
+                return result
         
         # Process items concurrently
         tasks = [process_single_item(item) for item in content_items]
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
-        # Update state with results
+        # Record items that raised before producing a result
         for result in results:
             if isinstance(result, Exception):
                 logger.error(f"Processing error: {result}")
@@ -731,12 +823,6 @@ class BulkProcessingService:
                     "timestamp": datetime.now().isoformat(),
                     "stage": "item_processing"
                 })
-            else:
-                state.results.append(result)
-                if result.status == ProcessingStatus.COMPLETED:
-                    state.completed_items += 1
-                else:
-                    state.failed_items += 1
     
     async def _process_single_content_item(
         self,
@@ -765,28 +851,49 @@ class BulkProcessingService:
         
         start_time = datetime.now()
         
+        # Remote content is aliased to its audio fingerprint so repeats skip the download
+        source_key = None
+        if item.get("type") != "audio_file":
+            source_key = content_source_key(config.content_type.value, str(item["id"]))
+        
         try:
-            # Step 1: Audio extraction/preparation
-            if config.enable_audio_processing:
-                await self._update_status(session_id, ProcessingStatus.PROCESSING_AUDIO)
-                audio_result = await self._process_audio(item, config)
-                
-                result.audio_path = audio_result.get("audio_path")
-                result.audio_duration = audio_result.get("duration")
-                result.audio_format = audio_result.get("format")
-                result.vocals_extracted = audio_result.get("vocals_extracted", False)
+            cached_transcript = None
+            if config.enable_content_dedup and config.enable_transcription and source_key:
+                fingerprint = self.content_index.resolve_source(source_key)
+                if fingerprint:
+                    cached_transcript = self.content_index.get(
+                        fingerprint, TRANSCRIPT, self._transcription_variant(config)
+                    )
             
-            # Step 2: Transcription
-            if config.enable_transcription and result.audio_path:
-                await self._update_status(session_id, ProcessingStatus.TRANSCRIBING)
-                transcription_result = await self._process_transcription(
-                    result.audio_path, 
-                    config
-                )
+            if cached_transcript:
+                logger.info(f"Reusing transcript of item {item['id']} from the content index")
+                result.audio_duration = item.get("metadata", {}).get("duration", 0)
+                result.transcription = cached_transcript.get("transcription")
+                result.segments = cached_transcript.get("segments", [])
+                result.language = cached_transcript.get("language")
+            else:
+                # Step 1: Audio extraction/preparation
+                if config.enable_audio_processing:
+                    await self._update_status(session_id, ProcessingStatus.PROCESSING_AUDIO)
+                    audio_result = await self._process_audio(item, config)
+                    
+                    result.audio_path = audio_result.get("audio_path")
+                    result.audio_duration = audio_result.get("duration")
+                    result.audio_format = audio_result.get("format")
+                    result.vocals_extracted = audio_result.get("vocals_extracted", False)
                 
-                result.transcription = transcription_result.get("transcription")
-                result.segments = transcription_result.get("segments", [])
-                result.language = transcription_result.get("language")
+                # Step 2: Transcription
+                if config.enable_transcription and result.audio_path:
+                    await self._update_status(session_id, ProcessingStatus.TRANSCRIBING)
+                    transcription_result = await self._process_transcription(
+                        result.audio_path, 
+                        config,
+                        source_key=source_key
+                    )
+                    
+                    result.transcription = transcription_result.get("transcription")
+                    result.segments = transcription_result.get("segments", [])
+                    result.language = transcription_result.get("language")
             
             # Step 3: Embedding generation
             if config.enable_embedding and result.transcription:
@@ -837,17 +944,13 @@ class BulkProcessingService:
             Audio processing results
         """
         if item["type"] == "tiktok_video":
-            # Download TikTok video audio
+            # Stream TikTok video audio straight to a temporary file
             video_id = item["id"]
-            audio_bytes = await self.tiktok_service.download_audio_bytes(
-                video_id, 
-                format=config.audio_format
-            )
-            
-            # Save to temporary file
             audio_path = os.path.join(self.temp_dir, f"{video_id}.{config.audio_format}")
-            async with aiofiles.open(audio_path, 'wb') as f:
-                await f.write(audio_bytes)
+            await write_stream(
+                self.tiktok_service.stream_audio(video_id, format=config.audio_format),
+                audio_path
+            )
             
             return {
                 "audio_path": audio_path,
@@ -868,21 +971,61 @@ class BulkProcessingService:
         else:
             raise ValueError(f"Unsupported item type for audio processing: {item['type']}")
     
+    def _transcription_variant(self, config: ProcessingConfig) -> str:
+        """Settings that shape a transcript, hashed for the content index"""
+        return artifact_variant(
+            whisper_model=config.whisper_model,
+            segment_audio=config.segment_audio,
+            max_segment_duration=config.max_segment_duration,
+            clean_silence=config.clean_silence,
+            separate_voices=config.separate_voices
+        )
+    
+    def _embedding_variant(self, config: ProcessingConfig) -> str:
+        """Settings that shape chunks and embeddings, hashed for the content index"""
+        return artifact_variant(
+            provider=config.embedding_provider,
+            task_type=config.embedding_task_type,
+            chunk_size=config.chunk_size,
+            chunk_overlap=config.chunk_overlap,
+            jina_v4_task=config.jina_v4_task,
+            jina_v4_dimensions=config.jina_v4_dimensions,
+            jina_v4_late_chunking=config.jina_v4_late_chunking,
+            jina_v4_multi_vector=config.jina_v4_multi_vector,
+            jina_v4_optimize_for_rag=config.jina_v4_optimize_for_rag
+        )
+    
     async def _process_transcription(
         self,
         audio_path: str,
-        config: ProcessingConfig
+        config: ProcessingConfig,
+        source_key: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Process transcription for audio content.
         
+        Audio whose decoded PCM was already transcribed with the same
+        settings is served from the content index.
+        
         Args:
             audio_path: Path to audio file
             config: Processing configuration
+            source_key: Source alias to link to the audio fingerprint
             
         Returns:
             Transcription results
         """
+        fingerprint = None
+        variant = self._transcription_variant(config)
+        if config.enable_content_dedup:
+            fingerprint = await asyncio.to_thread(pcm_fingerprint, audio_path)
+            if source_key:
+                self.content_index.link_source(source_key, fingerprint)
+            cached = self.content_index.get(fingerprint, TRANSCRIPT, variant)
+            if cached:
+                logger.info(f"Reusing transcript for {audio_path} from the content index")
+                return {**cached, "prepared_audio_path": None}
+        
         prep_config = {
             "use_whisper": True,
             "segment_audio": config.segment_audio,
@@ -901,12 +1044,15 @@ class BulkProcessingService:
             config=prep_config
         )
         
-        return {
+        transcript = {
             "transcription": result.get("transcription"),
             "segments": result.get("segments", []),
-            "language": result.get("metadata", {}).get("language"),
-            "prepared_audio_path": result.get("prepared_audio_path")
+            "language": result.get("metadata", {}).get("language")
         }
+        if fingerprint and transcript["transcription"]:
+            self.content_index.put(fingerprint, TRANSCRIPT, transcript, variant)
+        
+        return {**transcript, "prepared_audio_path": result.get("prepared_audio_path")}
     
     async def _process_embeddings(
         self,
@@ -916,6 +1062,9 @@ class BulkProcessingService:
         """
         Process embedding generation for text content using optimized V4 transcript processing.
         
+        Text whose normalized form was already embedded with the same settings
+        is served from the content index.
+        
         Args:
             text: Text content to embed (transcript)
             config: Processing configuration
@@ -923,6 +1072,27 @@ class BulkProcessingService:
         Returns:
             Embedding results with V4 optimizations
         """
+        if not config.enable_content_dedup:
+            return await self._compute_embeddings(text, config)
+        
+        fingerprint = text_fingerprint(text)
+        variant = self._embedding_variant(config)
+        cached = self.content_index.get(fingerprint, EMBEDDING, variant)
+        if cached:
+            logger.info("Reusing chunks and embeddings from the content index")
+            return cached
+        
+        embedding_result = await self._compute_embeddings(text, config)
+        if embedding_result.get("embeddings"):
+            self.content_index.put(fingerprint, EMBEDDING, embedding_result, variant)
+        return embedding_result
+    
+    async def _compute_embeddings(
+        self,
+        text: str,
+        config: ProcessingConfig
+    ) -> Dict[str, Any]:
+        """Generate chunks and embeddings for text without consulting the content index"""
         embedding_service = self._get_embedding_service(config.embedding_provider)
         
         # Use V4 transcript-optimized embedding for JINA (supports both "jina" and "jina-v4")
@@ -984,23 +1154,37 @@ class BulkProcessingService:
         """
         state = self.active_sessions[session_id]
         
-        # Generate summary statistics
-        successful_results = [r for r in state.results if r.status == ProcessingStatus.COMPLETED]
+        # Generate summary statistics in one pass over the stored results
+        successful_items = 0
+        total_processing_time = 0.0
+        total_transcription_length = 0
+        total_embeddings = 0
+        languages = set()
+        for result in state.store.iter_results(state.job_id, status=ProcessingStatus.COMPLETED.value):
+            successful_items += 1
+            total_processing_time += result.get("processing_time") or 0.0
+            total_transcription_length += len(result.get("transcription") or "")
+            total_embeddings += len(result.get("embeddings") or [])
+            if result.get("language"):
+                languages.add(result["language"])
         
         summary = {
             "session_id": session_id,
+            "job_id": state.job_id,
             "total_items": state.total_items,
-            "successful_items": len(successful_results),
+            "successful_items": successful_items,
             "failed_items": state.failed_items,
+            "skipped_items": state.skipped_items,
             "processing_time": state.processing_time,
-            "average_processing_time": sum(r.processing_time for r in successful_results) / len(successful_results) if successful_results else 0,
-            "total_transcription_length": sum(len(r.transcription or "") for r in successful_results),
-            "total_embeddings": sum(len(r.embeddings) for r in successful_results),
-            "languages_detected": list(set(r.language for r in successful_results if r.language))
+            "average_processing_time": total_processing_time / successful_items if successful_items else 0,
+            "total_transcription_length": total_transcription_length,
+            "total_embeddings": total_embeddings,
+            "languages_detected": list(languages)
         }
         
-        # Store summary in state
-        state.results.append(summary)
+        # Store summary alongside the item results
+        state.summary = summary
+        state.store.put_summary(state.job_id, summary)
         
         logger.info(f"Processing summary: {summary}")
     
@@ -1017,7 +1201,8 @@ class BulkProcessingService:
             export_format: Export format (json, csv, jsonl)
             
         Returns:
-            Export data structure
+            Export data structure; result records are lazy iterators over
+            the result store, to be written with ``export_writers``
         """
         if session_id not in self.active_sessions:
             raise ValueError(f"Session {session_id} not found")
@@ -1045,48 +1230,41 @@ class BulkProcessingService:
                 "processing_time": state.processing_time,
                 "progress": state.progress_percentage
             },
-            "results": [asdict(result) for result in state.results if isinstance(result, ProcessingResult)],
+            "results": state.iter_serialized_results(),
             "errors": state.errors,
-            "summary": state.results[-1] if state.results and isinstance(state.results[-1], dict) else {}
+            "summary": state.summary or state.store.get_summary(state.job_id) or {}
         }
     
     async def _prepare_csv_export(self, state: BulkProcessingState) -> Dict[str, Any]:
         """Prepare CSV export format"""
-        # Flatten results for CSV
-        csv_rows = []
-        for result in state.results:
-            if isinstance(result, ProcessingResult):
-                row = {
-                    "item_id": result.item_id,
-                    "content_type": result.content_type.value,
-                    "status": result.status.value,
-                    "transcription": result.transcription,
-                    "language": result.language,
-                    "audio_duration": result.audio_duration,
-                    "processing_time": result.processing_time,
-                    "error_message": result.error_message,
-                    "segments_count": len(result.segments),
-                    "embeddings_count": len(result.embeddings),
-                    "vocals_extracted": result.vocals_extracted
-                }
-                csv_rows.append(row)
-        
         return {
             "format": "csv",
-            "headers": list(csv_rows[0].keys()) if csv_rows else [],
-            "rows": csv_rows
+            "headers": list(CSV_EXPORT_HEADERS),
+            "rows": self._iter_csv_rows(state)
         }
     
+    def _iter_csv_rows(self, state: BulkProcessingState) -> Iterator[Dict[str, Any]]:
+        """Flatten stored results into CSV rows one at a time"""
+        for result in state.iter_results():
+            yield {
+                "item_id": result.item_id,
+                "content_type": result.content_type.value,
+                "status": result.status.value,
+                "transcription": result.transcription,
+                "language": result.language,
+                "audio_duration": result.audio_duration,
+                "processing_time": result.processing_time,
+                "error_message": result.error_message,
+                "segments_count": len(result.segments),
+                "embeddings_count": len(result.embeddings),
+                "vocals_extracted": result.vocals_extracted
+            }
+    
     async def _prepare_jsonl_export(self, state: BulkProcessingState) -> Dict[str, Any]:
         """Prepare JSONL export format"""
-        jsonl_lines = []
-        for result in state.results:
-            if isinstance(result, ProcessingResult):
-                jsonl_lines.append(asdict(result))
-        
         return {
             "format": "jsonl",
-            "lines": jsonl_lines
+            "lines": state.iter_serialized_results()
         }
     
     def validate_processing_config(self, config: ProcessingConfig) -> Dict[str, Any]:
@@ -1202,13 +1380,14 @@ class BulkProcessingService:
                 state = self.active_sessions[session_id]
                 
                 # Clean up result files
-                for result in state.results:
-                    if isinstance(result, ProcessingResult) and result.audio_path:
-                        if os.path.exists(result.audio_path):
-                            os.unlink(result.audio_path)
-                            logger.debug(f"Cleaned up audio file: {result.audio_path}")
+                for result in state.iter_serialized_results():
+                    audio_path = result.get("audio_path")
+                    if audio_path and os.path.exists(audio_path):
+                        os.unlink(audio_path)
+                        logger.debug(f"Cleaned up audio file: {audio_path}")
                 
-                # Remove session
+                # Remove session and its persisted results
+                state.store.delete_job(state.job_id)
                 del self.active_sessions[session_id]
                 logger.info(f"Cleaned up session: {session_id}")
             
@@ -1275,24 +1454,18 @@ class BulkProcessingService:
             export_dir.mkdir(exist_ok=True)
             
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            records = self._iter_job_results(job_result)
             
             if format == "json":
                 export_path = export_dir / f"{export_id}_{timestamp}.json"
-                async with aiofiles.open(export_path, 'w') as f:
-                    await f.write(json.dumps(job_result, indent=2))
+                await export_json_document(export_path, {**job_result, "results": records})
                     
             elif format == "csv":
                 export_path = export_dir / f"{export_id}_{timestamp}.csv"
                 
-                # Convert results to CSV format
-                if "results" in job_result and job_result["results"]:
-                    import csv
-                    async with aiofiles.open(export_path, 'w', newline='') as f:
-                        writer = csv.DictWriter(f, fieldnames=job_result["results"][0].keys())
-                        await f.write(','.join(writer.fieldnames) + '\n')
-                        for result in job_result["results"]:
-                            await f.write(','.join(str(result.get(field, '')) for field in writer.fieldnames) + '\n')
-                else:
+                # Columns come from the first result; rows are streamed from the store
+                written = await export_records(export_path, records, "csv")
+                if not written:
                     # Empty results
                     async with aiofiles.open(export_path, 'w') as f:
                         await f.write("No results to export\n")
@@ -1301,12 +1474,13 @@ class BulkProcessingService:
                 export_path = export_dir / f"{export_id}_{timestamp}.parquet"
                 
                 # For now, save as JSON (could implement proper Parquet later)
-                async with aiofiles.open(export_path, 'w') as f:
-                    await f.write(json.dumps(job_result, indent=2))
+                await export_json_document(export_path, {**job_result, "results": records})
                     
             elif format == "vector":
                 # Vector database export with import scripts and configurations
-                return await self._export_vector_database_format(job_result, export_id, vector_db_type, export_dir, timestamp)
+                return await self._export_vector_database_format(
+                    {**job_result, "results": records}, export_id, vector_db_type, export_dir, timestamp
+                )
                     
             else:
                 raise ValueError(f"Unsupported export format: {format}")
@@ -1317,6 +1491,14 @@ class BulkProcessingService:
         except Exception as e:
             logger.error(f"Error exporting data: {e}")
             raise
+    
+    def _iter_job_results(self, job_result: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Results carried by the job result, or else streamed from the result store"""
+        if job_result.get("results") is not None:
+            return iter(job_result["results"])
+        if job_result.get("job_id"):
+            return get_result_store().iter_results(job_result["job_id"])
+        return iter(())
 
     async def _export_vector_database_format(
         self,
@@ -1332,7 +1514,7 @@ class BulkProcessingService:
             # Convert job results to VectorRecord format
             vector_records = []
             
-            if "results" in job_result and job_result["results"]:
+            if job_result.get("results") is not None:
                 for i, result in enumerate(job_result["results"]):
                     if "embeddings" in result and result["embeddings"]:
                         # Handle both single embeddings and list of embeddings
@@ -1461,22 +1643,7 @@ class BulkProcessingService:
         Returns:
             Dictionary with enum values converted to strings
         """
-        # Convert to dict first
-        result_dict = asdict(result)
-        
-        # Convert enums to strings
-        if 'content_type' in result_dict and hasattr(result_dict['content_type'], 'value'):
-            result_dict['content_type'] = result_dict['content_type'].value
-        elif 'content_type' in result_dict:
-            # Handle case where it's already a string or other serializable type
-            result_dict['content_type'] = str(result_dict['content_type'])
-            
-        if 'status' in result_dict and hasattr(result_dict['status'], 'value'):
-            result_dict['status'] = result_dict['status'].value
-        elif 'status' in result_dict:
-            result_dict['status'] = str(result_dict['status'])
-        
-        return result_dict
+        return serialize_processing_result(result)
     
     def __del__(self):
         """Cleanup on deletion"""
@@ -0,0 +1,180 @@
+"""
+Bulk Result Store
+
+Persists per-item bulk processing results to a local SQLite database as each
+item finishes, keyed by ``(job_id, item_id)``. An index on ``(job_id, status)``
+serves as the completed-set index, so a restarted job can skip items that
+already finished, and exports can stream results back in pages instead of
+holding the whole job in memory.
+"""
+
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Set, Union
+
+from .sqlite_store import SQLiteStore, shared_store
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESULT_STORE_PATH = "data/bulk_results.db"
+COMPLETED_STATUS = "completed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    job_id TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    embeddings_count INTEGER NOT NULL DEFAULT 0,
+    payload TEXT NOT NULL,
+    completed_at REAL NOT NULL,
+    PRIMARY KEY (job_id, item_id)
+);
+CREATE INDEX IF NOT EXISTS idx_results_job_status ON results (job_id, status);
+CREATE TABLE IF NOT EXISTS job_summaries (
+    job_id TEXT PRIMARY KEY,
+    summary TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class BulkResultStore(SQLiteStore):
+    """
+    SQLite-backed store for bulk processing item results
+
+    Each ``put`` is its own transaction, so a crash loses at most the item
+    that was being written.
+    """
+
+    SCHEMA = _SCHEMA
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_RESULT_STORE_PATH):
+        """
+        Args:
+            path: Database file path, or ":memory:"
+        """
+        super().__init__(path)
+        logger.info(f"Bulk result store opened at {self.path}")
+
+    def put(
+        self,
+        job_id: str,
+        item_id: str,
+        status: str,
+        payload: Dict[str, Any],
+        embeddings_count: int = 0
+    ) -> None:
+        """
+        Insert or replace the result for one item
+
+        Args:
+            job_id: Job the item belongs to
+            item_id: Item identifier, unique within the job
+            status: Item status value (e.g. "completed", "failed")
+            payload: JSON-serializable result
+            embeddings_count: Number of embedding vectors in the result
+        """
+        encoded = json.dumps(payload, default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (job_id, item_id, status, embeddings_count, payload, completed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, str(item_id), status, int(embeddings_count), encoded, time.time()),
+            )
+
+    def get(self, job_id: str, item_id: str) -> Optional[Dict[str, Any]]:
+        """Stored payload for one item, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM results WHERE job_id = ? AND item_id = ?", (job_id, str(item_id))
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def completed_item_ids(self, job_id: str) -> Set[str]:
+        """Ids of items in a job that finished successfully"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT item_id FROM results WHERE job_id = ? AND status = ?", (job_id, COMPLETED_STATUS)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def iter_results(
+        self,
+        job_id: str,
+        status: Optional[str] = None,
+        batch_size: int = 500
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream stored payloads for a job in insertion order
+
+        Pages are fetched by rowid so the lock is only held per page and
+        concurrent writers are not blocked for the length of an export.
+
+        Args:
+            job_id: Job to read
+            status: Only return items with this status
+            batch_size: Rows fetched per page
+
+        Yields:
+            Result payload dicts
+        """
+        last_rowid = 0
+        query = "SELECT rowid, payload FROM results WHERE job_id = ? AND rowid > ?"
+        if status is not None:
+            query += " AND status = ?"
+        query += " ORDER BY rowid LIMIT ?"
+        while True:
+            params = (job_id, last_rowid) + ((status,) if status is not None else ()) + (batch_size,)
+            with self._lock:
+                rows = self._conn.execute(query, params).fetchall()
+            if not rows:
+                return
+            for rowid, payload in rows:
+                yield json.loads(payload)
+            last_rowid = rows[-1][0]
+
+    def stats(self, job_id: str) -> Dict[str, int]:
+        """Item and embedding counts for a job, per status"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*), COALESCE(SUM(embeddings_count), 0) FROM results "
+                "WHERE job_id = ? GROUP BY status",
+                (job_id,),
+            ).fetchall()
+        stats = {"total_items": 0, "embeddings_count": 0}
+        for status, count, embeddings in rows:
+            stats[f"{status}_items"] = count
+            stats["total_items"] += count
+            stats["embeddings_count"] += embeddings
+        return stats
+
+    def put_summary(self, job_id: str, summary: Dict[str, Any]) -> None:
+        """Store the finalization summary for a job"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO job_summaries (job_id, summary, updated_at) VALUES (?, ?, ?)",
+                (job_id, json.dumps(summary, default=str), time.time()),
+            )
+
+    def get_summary(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Finalization summary for a job, or None"""
+        with self._lock:
+            row = self._conn.execute("SELECT summary FROM job_summaries WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete_job(self, job_id: str) -> int:
+        """
+        Remove all stored results for a job
+
+        Returns:
+            Number of item results deleted
+        """
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM results WHERE job_id = ?", (job_id,))
+            self._conn.execute("DELETE FROM job_summaries WHERE job_id = ?", (job_id,))
+        return cursor.rowcount
+
+
+get_result_store = shared_store(BulkResultStore, "BULK_RESULT_STORE_PATH", DEFAULT_RESULT_STORE_PATH)
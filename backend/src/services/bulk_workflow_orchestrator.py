@@ -21,11 +21,15 @@ from dataclasses import dataclass, asdict
 from enum import Enum
 import traceback
 
+import numpy as np
+
 # Import existing services
 from .tiktok_service import TikTokService, get_tiktok_service
+from .media_stream import write_stream
 from .audio_preparation_service import AudioPreparationService, audio_preparation_service
 from .jina.embeddings_service import JinaEmbeddingsService
 from .gemini.embeddings_service import GeminiEmbeddingsService
+from .embedding_dispatcher import get_embedding_dispatcher, iter_windowed
 
 logger = logging.getLogger(__name__)
 
@@ -77,7 +81,7 @@ class ContentItem:
     audio_path: Optional[str] = None
     cleaned_audio_path: Optional[str] = None
     transcription: Optional[str] = None
-    embeddings: Optional[List[float]] = None
+    embeddings: Optional[Union[List[float], np.ndarray]] = None
     metadata: Optional[Dict[str, Any]] = None
     error_message: Optional[str] = None
     processing_time: float = 0.0
@@ -85,6 +89,8 @@ class ContentItem:
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
         data = asdict(self)
+        if isinstance(self.embeddings, np.ndarray):
+            data['embeddings'] = self.embeddings.tolist()
         # Convert enums to strings
         data['status'] = self.status.value
         data['stage'] = self.stage.value
@@ -141,6 +147,7 @@ class WorkflowConfig:
     # Performance settings
     max_concurrent_items: int = 5
     batch_size: int = 10
+    max_embedding_requests_in_flight: int = 8
     timeout_per_item: int = 300  # 5 minutes
     
     def __post_init__(self):
@@ -187,15 +194,20 @@ class BulkWorkflowOrchestrator:
         if self.config.embedding_provider == "gemini":
             try:
                 self.embedding_service = GeminiEmbeddingsService()
+                self.embedding_provider = "gemini"
                 logger.info("Initialized Gemini embeddings service")
             except Exception as e:
                 logger.warning(f"Failed to initialize Gemini service: {e}, falling back to Jina")
                 self.embedding_service = JinaEmbeddingsService()
+                self.embedding_provider = "jina"
         else:
             self.embedding_service = JinaEmbeddingsService()
+            self.embedding_provider = "jina"
             
         # Workflow state
         self.items: List[ContentItem] = []
+        # (items, dimensions) float32 matrix; item.embeddings are row views into it
+        self.embedding_matrix: Optional[np.ndarray] = None
         self.progress: Optional[WorkflowProgress] = None
         self.is_running = False
         self.should_stop = False
@@ -359,24 +371,21 @@ class BulkWorkflowOrchestrator:
                     # Download audio from TikTok
                     logger.info(f"Extracting audio for video {item.video_id}")
                     
-                    audio_bytes = await self.tiktok_service.download_audio_bytes(
-                        item.video_id,
-                        format=self.config.audio_format
-                    )
-                    
-                    # Save audio to temporary file
+                    # Stream audio to a temporary file
                     audio_filename = f"{item.id}_audio.{self.config.audio_format}"
                     audio_path = os.path.join(self.temp_dir, audio_filename)
                     
-                    with open(audio_path, 'wb') as f:
-                        f.write(audio_bytes)
+                    audio_size = await write_stream(
+                        self.tiktok_service.stream_audio(item.video_id, format=self.config.audio_format),
+                        audio_path
+                    )
                     
                     item.audio_path = audio_path
                     item.stage = WorkflowStage.AUDIO_EXTRACTION
                     item.status = ProcessingStatus.COMPLETED
                     item.processing_time += time.time() - start_time
                     
-                    logger.info(f"Audio extracted for {item.video_id}: {len(audio_bytes)} bytes")
+                    logger.info(f"Audio extracted for {item.video_id}: {audio_size} bytes")
                     
                 except Exception as e:
                     logger.error(f"Audio extraction failed for {item.video_id}: {str(e)}")
@@ -616,32 +625,52 @@ class BulkWorkflowOrchestrator:
                 progress_callback(self.progress)
             return
         
+        batch_size = self.config.batch_size
+        batches = [
+            (start, [item.transcription for item in items_with_transcriptions[start:start + batch_size]])
+            for start in range(0, len(items_with_transcriptions), batch_size)
+        ]
+        # The provider dispatcher's AIMD window shrinks on 429s and grows on
+        # success; following it keeps this stage at the provider's headroom
+        controller = get_embedding_dispatcher(self.embedding_provider).controller
+        model_name = getattr(self.embedding_service, 'model_name', 'unknown')
+        self.embedding_matrix = None
+        
+        async def embed_batch(batch) -> List[List[float]]:
+            if self.should_stop:
+                return []
+            _, texts = batch
+            if self.embedding_provider == "gemini":
+                return await self.embedding_service.embed_documents(
+                    texts,
+                    output_dimensionality=self.config.embedding_dimensions
+                )
+            return await self.embedding_service.embed_documents(texts)
+        
         try:
-            # Process in batches
-            batch_size = self.config.batch_size
-            total_batches = (len(items_with_transcriptions) + batch_size - 1) // batch_size
-            
-            for batch_idx in range(0, len(items_with_transcriptions), batch_size):
+            completed_batches = 0
+            async for batch_index, embeddings in iter_windowed(
+                batches,
+                embed_batch,
+                self.config.max_embedding_requests_in_flight,
+                controller
+            ):
                 if self.should_stop:
                     break
+                start = batches[batch_index][0]
+                if len(embeddings):
+                    vectors = np.asarray(embeddings, dtype=np.float32)
+                    if self.embedding_matrix is None:
+                        # Dimensions are known once the first response arrives
+                        self.embedding_matrix = np.zeros(
+                            (len(items_with_transcriptions), vectors.shape[1]), dtype=np.float32
+                        )
+                    self.embedding_matrix[start:start + len(vectors)] = vectors
                 
-                batch_items = items_with_transcriptions[batch_idx:batch_idx + batch_size]
-                texts = [item.transcription for item in batch_items]
-                
-                logger.info(f"Generating embeddings for batch {batch_idx // batch_size + 1}/{total_batches}")
-                
-                # Generate embeddings based on provider
-                if self.config.embedding_provider == "gemini":
-                    embeddings = await self.embedding_service.embed_documents(
-                        texts,
-                        output_dimensionality=self.config.embedding_dimensions
-                    )
-                else:  # Jina
-                    embeddings = await self.embedding_service.embed_documents(texts)
-                
-                # Assign embeddings to items
-                for item, embedding in zip(batch_items, embeddings):
-                    item.embeddings = embedding
+                # Assign embeddings to items as views into the shared buffer
+                for row in range(start, start + len(embeddings)):
+                    item = items_with_transcriptions[row]
+                    item.embeddings = self.embedding_matrix[row]
                     item.stage = WorkflowStage.EMBEDDING_GENERATION
                     item.status = ProcessingStatus.COMPLETED
                     
@@ -649,31 +678,30 @@ class BulkWorkflowOrchestrator:
                     if not item.metadata:
                         item.metadata = {}
                     item.metadata.update({
-                        "embedding_provider": self.config.embedding_provider,
-                        "embedding_dimensions": len(embedding),
-                        "embedding_model": getattr(self.embedding_service, 'model_name', 'unknown')
+                        "embedding_provider": self.embedding_provider,
+                        "embedding_dimensions": self.embedding_matrix.shape[1],
+                        "embedding_model": model_name
                     })
                 
                 # Update progress
-                completed_batches = (batch_idx // batch_size) + 1
-                self.progress.stage_progress = (completed_batches / total_batches) * 100
+                completed_batches += 1
+                self.progress.stage_progress = (completed_batches / len(batches)) * 100
                 self.progress.overall_progress = (5 * 100 + self.progress.stage_progress) / 7
                 
                 if progress_callback:
                     progress_callback(self.progress)
-                
-                # Small delay between batches to avoid rate limiting
-                if batch_idx + batch_size < len(items_with_transcriptions):
-                    await asyncio.sleep(0.5)
             
-            successful_embeddings = sum(1 for item in items_with_transcriptions if item.embeddings)
-            logger.info(f"Embedding generation completed: {successful_embeddings}/{len(items_with_transcriptions)} successful")
+            successful_embeddings = sum(1 for item in items_with_transcriptions if item.embeddings is not None)
+            logger.info(
+                f"Embedding generation completed: {successful_embeddings}/{len(items_with_transcriptions)} successful "
+                f"({len(batches)} batches, window {controller.limit})"
+            )
             
         except Exception as e:
             logger.error(f"Embedding generation failed: {str(e)}")
             # Mark all remaining items as failed
             for item in items_with_transcriptions:
-                if not item.embeddings:
+                if item.embeddings is None:
                     item.status = ProcessingStatus.FAILED
                     item.error_message = f"Embedding generation failed: {str(e)}"
             raise
@@ -688,7 +716,7 @@ class BulkWorkflowOrchestrator:
         # Filter successfully processed items
         successful_items = [
             item for item in self.items 
-            if item.embeddings and item.transcription and item.status == ProcessingStatus.COMPLETED
+            if item.embeddings is not None and item.transcription and item.status == ProcessingStatus.COMPLETED
         ]
         
         if not successful_items:
@@ -742,6 +770,13 @@ class BulkWorkflowOrchestrator:
             logger.error(f"Export preparation failed: {str(e)}")
             raise
     
+    @staticmethod
+    def _embedding_values(item: ContentItem) -> List[float]:
+        """JSON-serializable embedding for an item"""
+        if isinstance(item.embeddings, np.ndarray):
+            return item.embeddings.tolist()
+        return item.embeddings
+    
     def _prepare_pinecone_format(self, items: List[ContentItem]) -> Dict[str, Any]:
         """Prepare data in Pinecone format"""
         vectors = []
@@ -749,7 +784,7 @@ class BulkWorkflowOrchestrator:
         for item in items:
             vector_data = {
                 "id": f"{item.username}_{item.video_id}",
-                "values": item.embeddings,
+                "values": self._embedding_values(item),
                 "metadata": {
                     "username": item.username,
                     "video_id": item.video_id,
@@ -808,7 +843,7 @@ class BulkWorkflowOrchestrator:
                     "createdTime": item.created_time,
                     "thumbnailUrl": item.thumbnail_url
                 },
-                "vector": item.embeddings
+                "vector": self._embedding_values(item)
             }
             
             # Add metadata
@@ -841,7 +876,7 @@ class BulkWorkflowOrchestrator:
         
         for item in items:
             ids.append(f"{item.username}_{item.video_id}")
-            embeddings.append(item.embeddings)
+            embeddings.append(self._embedding_values(item))
             documents.append(item.transcription)
             
             metadata = {
@@ -889,7 +924,7 @@ class BulkWorkflowOrchestrator:
                 "duration": item.duration,
                 "created_time": item.created_time,
                 "thumbnail_url": item.thumbnail_url,
-                "embeddings": item.embeddings
+                "embeddings": self._embedding_values(item)
             }
             
             # Add metadata
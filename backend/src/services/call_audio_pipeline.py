@@ -0,0 +1,262 @@
+"""
+Per-Call Streaming Audio Pipeline
+
+Turns the stream of small telephony media packets for one call into
+utterances, so ASR and speaker identification run once per utterance
+instead of once per packet.
+
+- ``PCMRingBuffer`` is a preallocated int16 ring addressed by absolute
+  sample index. Packets are decoded with ``np.frombuffer`` (no copy),
+  written once into the ring, and utterances are read back as views, or
+  converted to normalized float32 straight into a reusable scratch buffer.
+- Speech boundaries come from the shared ``BatchedVADEngine``, which only
+  tracks timing here (``keep_audio=False``); utterance audio is sliced from
+  the ring.
+- ``TranscriptHistory`` keeps the most recent utterance records and
+  compacts older ones into a running transcript, so a long call holds a
+  bounded number of records.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+from scipy.signal import resample_poly
+
+from src.services.audio_stream_decoder import float_to_int16
+from src.services.batched_vad import BatchedVADEngine, VADEvent, VADEventType
+
+logger = logging.getLogger(__name__)
+
+ASR_SAMPLE_RATE = 16000
+DEFAULT_MAX_SEGMENTS = 50
+
+_INT16_SCALE = np.float32(1.0 / 32768.0)
+
+
+class PCMRingBuffer:
+    """
+    Fixed-capacity int16 ring buffer addressed by absolute sample index
+
+    Sample ``i`` of the stream lives at ``i % capacity`` until it is
+    overwritten ``capacity`` samples later.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("Ring buffer capacity must be positive")
+        self.capacity = capacity
+        self._buffer = np.zeros(capacity, dtype=np.int16)
+        self._scratch = np.empty(0, dtype=np.float32)
+        self.written = 0
+
+    @property
+    def oldest(self) -> int:
+        """Absolute index of the oldest sample still held"""
+        return max(0, self.written - self.capacity)
+
+    def write(self, samples: np.ndarray) -> None:
+        """Append int16 samples, overwriting the oldest once full"""
+        samples = np.asarray(samples, dtype=np.int16).reshape(-1)
+        if len(samples) > self.capacity:
+            self.written += len(samples) - self.capacity
+            samples = samples[-self.capacity:]
+        position = self.written % self.capacity
+        first = min(len(samples), self.capacity - position)
+        self._buffer[position:position + first] = samples[:first]
+        self._buffer[:len(samples) - first] = samples[first:]
+        self.written += len(samples)
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        """
+        Samples [start, end) as int16
+
+        Returns a view into the ring when the range does not wrap, so the
+        result is only valid until the ring is written again.
+        """
+        start, end = self._clamp(start, end)
+        position = start % self.capacity
+        if position + (end - start) <= self.capacity:
+            return self._buffer[position:position + (end - start)]
+        return np.concatenate([self._buffer[position:], self._buffer[:end % self.capacity]])
+
+    def read_float(self, start: int, end: int) -> np.ndarray:
+        """
+        Samples [start, end) as float32 in [-1, 1]
+
+        Converted directly into a scratch buffer that grows as needed and
+        is reused across calls; the result is valid until the next call.
+        """
+        start, end = self._clamp(start, end)
+        count = end - start
+        if len(self._scratch) < count:
+            self._scratch = np.empty(max(count, 2 * len(self._scratch)), dtype=np.float32)
+        out = self._scratch[:count]
+        position = start % self.capacity
+        first = min(count, self.capacity - position)
+        np.multiply(self._buffer[position:position + first], _INT16_SCALE, out=out[:first], dtype=np.float32)
+        np.multiply(self._buffer[:count - first], _INT16_SCALE, out=out[first:], dtype=np.float32)
+        return out
+
+    def _clamp(self, start: int, end: int):
+        if start < self.oldest:
+            logger.warning(f"Ring buffer overrun: samples {start}-{self.oldest} already overwritten")
+        start = max(start, self.oldest)
+        end = max(start, min(end, self.written))
+        return start, end
+
+
+@dataclass
+class Utterance:
+    """A voiced segment ready for ASR, as PCM16 at the ASR sample rate"""
+    call_id: str
+    index: int
+    start_time: float
+    end_time: float
+    audio: np.ndarray
+
+    @property
+    def duration(self) -> float:
+        return self.end_time - self.start_time
+
+
+@dataclass
+class TranscriptHistory:
+    """
+    Bounded per-call transcript
+
+    The newest ``max_segments`` utterance records are kept in full; older
+    ones are folded into ``compacted_text`` and per-speaker totals.
+    """
+    max_segments: int = DEFAULT_MAX_SEGMENTS
+    segments: List[Dict[str, Any]] = field(default_factory=list)
+    compacted_text: str = ""
+    compacted_segments: int = 0
+    speaker_seconds: Dict[str, float] = field(default_factory=dict)
+
+    def append(self, segment: Dict[str, Any]) -> None:
+        self.segments.append(segment)
+        speaker = segment.get("speaker", "unknown")
+        duration = segment.get("end_time", 0.0) - segment.get("start_time", 0.0)
+        self.speaker_seconds[speaker] = self.speaker_seconds.get(speaker, 0.0) + duration
+        if len(self.segments) > self.max_segments:
+            self.compact(len(self.segments) - self.max_segments // 2)
+
+    def compact(self, count: int) -> None:
+        """Fold the oldest ``count`` records into the compacted transcript"""
+        old, self.segments = self.segments[:count], self.segments[count:]
+        texts = [s.get("transcript", "") for s in old if s.get("transcript")]
+        self.compacted_text = " ".join(t for t in [self.compacted_text] + texts if t)
+        self.compacted_segments += len(old)
+
+    @property
+    def total_segments(self) -> int:
+        return self.compacted_segments + len(self.segments)
+
+    def full_transcript(self) -> str:
+        texts = [self.compacted_text] + [s.get("transcript", "") for s in self.segments]
+        return " ".join(t for t in texts if t)
+
+
+class CallAudioPipeline:
+    """
+    Streaming audio front end for one call
+
+    ``ingest`` buffers a packet and feeds the shared VAD; after the VAD has
+    been stepped, ``collect`` returns the utterances that have ended.
+    """
+
+    def __init__(
+        self,
+        call_id: str,
+        vad: BatchedVADEngine,
+        sample_rate: int,
+        target_rate: int = ASR_SAMPLE_RATE,
+        buffer_seconds: Optional[float] = None
+    ):
+        """
+        Args:
+            call_id: Call identifier, also used as the VAD stream id
+            vad: Shared VAD engine; must be created with queue_events=True
+            sample_rate: Sample rate of the incoming PCM16 packets
+            target_rate: Sample rate of emitted utterances
+            buffer_seconds: Ring capacity; defaults to the VAD's maximum
+                utterance length plus headroom for padding and detection lag
+        """
+        if not vad.queue_events:
+            raise ValueError("CallAudioPipeline needs a VAD engine created with queue_events=True")
+        if vad.sample_rate != sample_rate:
+            raise ValueError("VAD sample rate does not match call sample rate")
+
+        self.call_id = call_id
+        self.vad = vad
+        self.sample_rate = sample_rate
+        self.target_rate = target_rate
+        frame_seconds = vad.frame_size / sample_rate
+        if buffer_seconds is None:
+            lag_frames = vad.max_speech_frames + vad.min_silence_frames + 2 * vad.pad_frames + vad.min_speech_frames
+            buffer_seconds = lag_frames * frame_seconds + 2.0
+        self.ring = PCMRingBuffer(int(buffer_seconds * sample_rate))
+        self.utterance_count = 0
+        self.packets = 0
+        vad.add_stream(call_id)
+
+    def ingest(self, pcm: Union[bytes, np.ndarray]) -> int:
+        """
+        Buffer one packet of PCM16 audio
+
+        Returns:
+            Number of samples ingested
+        """
+        samples = np.frombuffer(pcm, dtype=np.int16) if isinstance(pcm, (bytes, bytearray, memoryview)) else pcm
+        if len(samples) == 0:
+            return 0
+        self.ring.write(samples)
+        self.vad.push(self.call_id, samples)
+        self.packets += 1
+        return len(samples)
+
+    def collect(self) -> List[Utterance]:
+        """Utterances completed since the last call"""
+        return self.utterances_from(self.vad.pop_events(self.call_id))
+
+    def finish(self) -> List[Utterance]:
+        """Flush the VAD for this call and return any final utterances"""
+        if self.call_id not in self.vad.streams:
+            return []
+        pending = self.vad.pop_events(self.call_id)
+        self.vad.end_stream(self.call_id)
+        events = pending + [e for e in self.vad.drain() if e.stream_id == self.call_id]
+        return self.utterances_from(events)
+
+    def utterances_from(self, events: List[VADEvent]) -> List[Utterance]:
+        utterances = []
+        for event in events:
+            if event.type is not VADEventType.SPEECH_END or event.start_time is None:
+                continue
+            start = int(round(event.start_time * self.sample_rate))
+            end = int(round(event.time * self.sample_rate))
+            if end <= start:
+                continue
+            utterances.append(Utterance(
+                call_id=self.call_id,
+                index=self.utterance_count,
+                start_time=event.start_time,
+                end_time=event.time,
+                audio=self._to_target_pcm(start, end),
+            ))
+            self.utterance_count += 1
+        return utterances
+
+    def _to_target_pcm(self, start: int, end: int) -> np.ndarray:
+        """Slice [start, end) from the ring as PCM16 at the target rate"""
+        if self.sample_rate == self.target_rate:
+            return self.ring.read(start, end).copy()
+        audio = self.ring.read_float(start, end)
+        divisor = np.gcd(self.sample_rate, self.target_rate)
+        return float_to_int16(resample_poly(audio, self.target_rate // divisor, self.sample_rate // divisor))
+
+    def close(self) -> None:
+        """Drop the call's VAD state without flushing"""
+        self.vad.remove_stream(self.call_id)
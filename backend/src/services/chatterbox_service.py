@@ -6,7 +6,6 @@ TTS operations within the main application process.
 """
 
 import os
-import torch
 import tempfile
 import subprocess
 import asyncio
@@ -16,6 +15,10 @@ import threading
 import time
 from pathlib import Path
 
+from src.core.lazy import lazy_import
+
+torch = lazy_import("torch")
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -4,13 +4,11 @@ Based on the proven logic from tests/stream_simulation.py that actually works
 """
 
 import os
-import sys
 import logging
 import json
 import numpy as np
 import asyncio
 import tempfile
-import soundfile as sf
 import textwrap
 from pathlib import Path
 from scipy.spatial.distance import cosine
@@ -20,6 +18,13 @@ from datetime import datetime
 # Import our working services
 from src.services.realtime_analysis_service import get_realtime_analysis_service
 from src.services.audio_separation_service import audio_separation_service
+from src.services.audio_stream_decoder import aload_pcm16
+from src.services.batched_vad import BatchedVADEngine, VADEventType, create_vad_model, detect_speech_segments
+from src.core.lazy import is_available, lazy_import
+
+sf = lazy_import("soundfile")
+
+logger = logging.getLogger(__name__)
 
 # Import LangExtract for advanced analysis
 try:
@@ -29,8 +34,6 @@ except ImportError:
     logger.warning("LangExtract not available. Advanced sentiment analysis will be disabled.")
     LANGEXTRACT_AVAILABLE = False
 
-logger = logging.getLogger(__name__)
-
 # --- START: LangExtract Integration (copied from stream_simulation.py) ---
 class LangExtractStreamAnalyzer:
     """
@@ -51,43 +54,46 @@ class LangExtractStreamAnalyzer:
             Provide exact text extractions with contextual attributes.
         """)
         
-        self.examples = [
-            lx.data.ExampleData(
-                text="I'm really disappointed with this service, it's been terrible.",
-                extractions=[
-                    lx.data.Extraction(
-                        extraction_class="emotion",
-                        extraction_text="disappointed",
-                        attributes={"type": "negative", "intensity": "high", "context": "service quality"}
-                    ),
-                    lx.data.Extraction(
-                        extraction_class="sentiment",
-                        extraction_text="negative",
-                        attributes={"confidence": "high", "trigger": "terrible service"}
-                    ),
-                    lx.data.Extraction(
-                        extraction_class="topic",
-                        extraction_text="service quality",
-                        attributes={"category": "customer_service", "sentiment": "negative"}
-                    )
-                ]
-            ),
-            lx.data.ExampleData(
-                text="That's wonderful news! I'm so happy to hear about your promotion.",
-                extractions=[
-                    lx.data.Extraction(
-                        extraction_class="emotion",
-                        extraction_text="happy",
-                        attributes={"type": "positive", "intensity": "high", "context": "promotion news"}
-                    ),
-                    lx.data.Extraction(
-                        extraction_class="engagement",
-                        extraction_text="high",
-                        attributes={"type": "enthusiastic", "response": "excitement"}
-                    )
-                ]
-            )
-        ]
+        # Few-shot examples need the library; without it analysis uses the offline fallback
+        self.examples = []
+        if LANGEXTRACT_AVAILABLE:
+            self.examples = [
+                lx.data.ExampleData(
+                    text="I'm really disappointed with this service, it's been terrible.",
+                    extractions=[
+                        lx.data.Extraction(
+                            extraction_class="emotion",
+                            extraction_text="disappointed",
+                            attributes={"type": "negative", "intensity": "high", "context": "service quality"}
+                        ),
+                        lx.data.Extraction(
+                            extraction_class="sentiment",
+                            extraction_text="negative",
+                            attributes={"confidence": "high", "trigger": "terrible service"}
+                        ),
+                        lx.data.Extraction(
+                            extraction_class="topic",
+                            extraction_text="service quality",
+                            attributes={"category": "customer_service", "sentiment": "negative"}
+                        )
+                    ]
+                ),
+                lx.data.ExampleData(
+                    text="That's wonderful news! I'm so happy to hear about your promotion.",
+                    extractions=[
+                        lx.data.Extraction(
+                            extraction_class="emotion",
+                            extraction_text="happy",
+                            attributes={"type": "positive", "intensity": "high", "context": "promotion news"}
+                        ),
+                        lx.data.Extraction(
+                            extraction_class="engagement",
+                            extraction_text="high",
+                            attributes={"type": "enthusiastic", "response": "excitement"}
+                        )
+                    ]
+                )
+            ]
     
     def analyze_transcription(self, text: str) -> dict:
         """Analyze transcribed text using LangExtract; falls back to local heuristics if no API key."""
@@ -307,34 +313,36 @@ def _compute_emotion2vec_head_tokens(int16_audio: np.ndarray, head: int = 8) ->
         return {"tokens": [], "label": None, "scores": None}
 # --- END: Emotion2Vec Integration ---
 
-# Import dependencies with fallbacks
-try:
-    import torch
-    import torchaudio
-    # Enable better CUDA memory management
-    if torch.cuda.is_available():
-        torch.cuda.empty_cache()
-    from speechbrain.pretrained import SepformerSeparation as separator_model
-    from speechbrain.pretrained import EncoderClassifier as speaker_id_model
-    SPEECHBRAIN_AVAILABLE = True
-except ImportError:
-    logger.warning("Could not import SpeechBrain. Speaker separation/ID will be unavailable.")
-    SPEECHBRAIN_AVAILABLE = False
-    
-try:
-    if 'torch' not in sys.modules:
-        import torch
-    torch.set_num_threads(1)
-    vad_model, utils = torch.hub.load(repo_or_dir='snakers4/silero-vad', model='silero_vad', force_reload=False, trust_repo=True)
-    (get_speech_timestamps, _, read_audio, _, _) = utils
-    SILERO_AVAILABLE = True
-    logger.info("Silero VAD loaded successfully")
-except Exception as e:
-    logger.warning(f"Could not load Silero VAD: {e}. VAD segmentation will be unavailable.")
-    SILERO_AVAILABLE = False
+# Check for the ML libraries without importing them; torch and speechbrain
+# are imported when a speaker identifier is first built
+torch = lazy_import("torch")
+SPEECHBRAIN_AVAILABLE = is_available("torch") and is_available("speechbrain")
+if not SPEECHBRAIN_AVAILABLE:
+    logger.warning("SpeechBrain is not installed. Speaker ID will be unavailable.")
 
 SAMPLE_RATE = 16000
 
+# Shared by every VAD engine built here; the models keep no per-stream state
+_vad_model = None
+
+
+def _get_vad_model():
+    """Silero ONNX VAD (or the energy fallback), loaded on first use"""
+    global _vad_model
+    if _vad_model is None:
+        _vad_model = create_vad_model(SAMPLE_RATE)
+    return _vad_model
+
+
+def _vad_engine(min_speech_duration=0.5, min_silence_duration=0.25, keep_audio=True) -> BatchedVADEngine:
+    return BatchedVADEngine(
+        model=_get_vad_model(),
+        sample_rate=SAMPLE_RATE,
+        min_speech_ms=min_speech_duration * 1000,
+        min_silence_ms=min_silence_duration * 1000,
+        keep_audio=keep_audio
+    )
+
 class StatefulSpeakerIdentifier:
     """
     Stateful speaker identification that maintains speaker profiles across audio processing.
@@ -343,11 +351,12 @@ class StatefulSpeakerIdentifier:
     def __init__(self, cache_dir="speaker_id_cache", similarity_threshold=0.60):
         if not SPEECHBRAIN_AVAILABLE:
             raise ImportError("SpeechBrain is not installed.")
+        from speechbrain.pretrained import EncoderClassifier
         
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         logger.info(f"SpeakerIdentifier using device: {self.device}")
         
-        self.embedding_model = speaker_id_model.from_hparams(
+        self.embedding_model = EncoderClassifier.from_hparams(
             source="speechbrain/spkrec-ecapa-voxceleb",
             savedir=Path(cache_dir) / "spkrec-ecapa-voxceleb",
             run_opts={"device": self.device}
@@ -423,20 +432,22 @@ class StatefulSpeakerIdentifier:
 
 
 def get_vad_segments(audio_data, min_speech_duration=0.5, min_silence_duration=0.25):
-    """Extract speech segments using Silero VAD"""
-    if not SILERO_AVAILABLE:
-        # Fallback: treat entire audio as one segment
-        return [{'audio': audio_data, 'start_time': 0, 'end_time': len(audio_data) / SAMPLE_RATE}]
-    
-    audio_float = audio_data.astype(np.float32) / 32768.0
-    speech_timestamps = get_speech_timestamps(
-        torch.from_numpy(audio_float), 
-        vad_model, 
-        sampling_rate=SAMPLE_RATE,
-        min_speech_duration_ms=int(min_speech_duration*1000),
-        min_silence_duration_ms=int(min_silence_duration*1000)
-    )
-    return [{'audio': audio_data[s['start']:s['end']], 'start_time': s['start']/SAMPLE_RATE, 'end_time': s['end']/SAMPLE_RATE} for s in speech_timestamps]
+    """Extract speech segments from in-memory int16 audio with the batched VAD engine"""
+    engine = _vad_engine(min_speech_duration, min_silence_duration, keep_audio=False)
+    engine.push("audio", audio_data)
+    engine.end_stream("audio")
+    segments = []
+    for event in engine.drain():
+        if event.type is VADEventType.SPEECH_END:
+            start, end = int(event.start_time * SAMPLE_RATE), int(event.time * SAMPLE_RATE)
+            segments.append({'audio': audio_data[start:end], 'start_time': event.start_time, 'end_time': event.time})
+    return segments
+
+
+def get_vad_segments_from_file(audio_path, max_seconds=None, min_speech_duration=0.5, min_silence_duration=0.25):
+    """Extract speech segments while streaming the decode; only the speech audio is kept"""
+    engine = _vad_engine(min_speech_duration, min_silence_duration)
+    return detect_speech_segments([audio_path], engine=engine, max_seconds=max_seconds)[str(audio_path)]
 
 
 async def _segments_from_pyannote_diarization(int16_audio: np.ndarray) -> list[dict]:
@@ -492,26 +503,26 @@ class ComprehensiveAudioService:
         # Get realtime analysis service
         service = await get_realtime_analysis_service()
         
-        # Load audio
-        try:
-            import librosa
-            audio, _ = librosa.load(audio_path, sr=SAMPLE_RATE, mono=True)
-            if max_seconds is not None and max_seconds > 0:
-                max_samples = int(max_seconds * SAMPLE_RATE)
-                audio = audio[:max_samples]
-            test_audio = (audio * 32767).astype(np.int16)
-        except Exception as e:
-            logger.error(f"Failed to load audio: {e}")
-            return {"error": f"Failed to load audio: {e}"}
-        
-        if test_audio is None or len(test_audio) == 0:
-            return {"error": "No audio data"}
-        
-        # Get segments using the proven approach
         if use_pyannote:
+            # Diarization needs the whole signal: decoded, resampled and
+            # converted to int16 frame by frame on a worker thread
+            try:
+                test_audio = await aload_pcm16(audio_path, SAMPLE_RATE, max_seconds)
+            except Exception as e:
+                logger.error(f"Failed to load audio: {e}")
+                return {"error": f"Failed to load audio: {e}"}
+            
+            if test_audio is None or len(test_audio) == 0:
+                return {"error": "No audio data"}
+            
             segments = await _segments_from_pyannote_diarization(test_audio)
         else:
-            segments = get_vad_segments(test_audio)
+            # VAD runs on the frames as they are decoded, so only speech is kept
+            try:
+                segments = await asyncio.to_thread(get_vad_segments_from_file, audio_path, max_seconds)
+            except Exception as e:
+                logger.error(f"Failed to load audio: {e}")
+                return {"error": f"Failed to load audio: {e}"}
         
         if not segments:
             logger.warning("No speech segments detected.")
@@ -0,0 +1,202 @@
+"""
+Content-Addressed Media Cache
+
+On-disk store for downloaded media, shared by preview streaming and bulk
+download jobs so the same video is fetched and stored once:
+
+- ``objects/<sha256[:2]>/<sha256>`` holds each distinct payload once,
+  named by the hash of its bytes.
+- ``refs/<sha256(key)>.json`` maps a logical key (``tiktok:video:<id>``)
+  to an object, with its size and when it was stored.
+
+Objects are written through a temp file and renamed into place, so
+readers never see a partial download. Consumers that need their own path
+(e.g. a job's temp directory) get a hard link rather than a copy.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator, Callable, Dict, Optional
+
+import aiofiles
+
+from src.services.media_stream import MediaStreamError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.getenv("MEDIA_CACHE_DIR", "/tmp/media_cache")
+
+
+@dataclass
+class CacheEntry:
+    """A logical key resolved to a stored object"""
+    key: str
+    digest: str
+    size: int
+    created_at: float
+    path: str
+
+
+class ContentCache:
+    """
+    Content-addressed file store with key references
+    """
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            root: Cache directory (created on demand)
+            clock: Wall-clock time source for entry ages
+        """
+        self.root = root
+        self.clock = clock
+        self.objects_dir = os.path.join(root, "objects")
+        self.refs_dir = os.path.join(root, "refs")
+        self.tmp_dir = os.path.join(root, "tmp")
+
+    def _ref_path(self, key: str) -> str:
+        return os.path.join(self.refs_dir, hashlib.sha256(key.encode()).hexdigest() + ".json")
+
+    def object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def lookup(self, key: str, max_age: Optional[float] = None) -> Optional[CacheEntry]:
+        """
+        Resolve a key to its stored object
+
+        Args:
+            key: Logical key
+            max_age: Treat entries older than this many seconds as missing
+
+        Returns:
+            The entry, or None if the key is unknown, stale or its object is gone
+        """
+        try:
+            with open(self._ref_path(key)) as f:
+                ref = json.load(f)
+        except (OSError, ValueError):
+            return None
+        path = self.object_path(ref["digest"])
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return None
+        if max_age is not None and self.clock() - ref["created_at"] > max_age:
+            return None
+        return CacheEntry(key=key, digest=ref["digest"], size=ref["size"], created_at=ref["created_at"], path=path)
+
+    async def store(self, key: str, chunks: AsyncIterator[bytes]) -> CacheEntry:
+        """
+        Stream a payload into the cache under ``key``
+
+        Identical payloads stored under different keys share one object.
+
+        Raises:
+            MediaStreamError: If the stream is empty
+        """
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        tmp_path = os.path.join(self.tmp_dir, uuid.uuid4().hex)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            async with aiofiles.open(tmp_path, "wb") as f:
+                async for chunk in chunks:
+                    digest.update(chunk)
+                    await f.write(chunk)
+                    size += len(chunk)
+            if size == 0:
+                raise MediaStreamError(f"Empty payload for {key}")
+
+            hexdigest = digest.hexdigest()
+            path = self.object_path(hexdigest)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if os.path.exists(path):
+                logger.debug(f"Cache object {hexdigest[:12]} already stored, deduplicated {key}")
+            else:
+                os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+        entry = CacheEntry(key=key, digest=hexdigest, size=size, created_at=self.clock(), path=path)
+        self._write_ref(entry)
+        return entry
+
+    def _write_ref(self, entry: CacheEntry) -> None:
+        os.makedirs(self.refs_dir, exist_ok=True)
+        ref_path = self._ref_path(entry.key)
+        tmp_path = f"{ref_path}.{uuid.uuid4().hex}.tmp"
+        ref = {k: v for k, v in asdict(entry).items() if k != "path"}
+        with open(tmp_path, "w") as f:
+            json.dump(ref, f)
+        os.replace(tmp_path, ref_path)
+
+    @staticmethod
+    def link(path: str, destination: str) -> str:
+        """Expose a cached object at ``destination`` (hard link, copy across filesystems)"""
+        if os.path.exists(destination):
+            os.unlink(destination)
+        try:
+            os.link(path, destination)
+        except OSError:
+            shutil.copyfile(path, destination)
+        return destination
+
+    def _iter_refs(self):
+        if not os.path.isdir(self.refs_dir):
+            return
+        for name in os.listdir(self.refs_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.refs_dir, name)
+            try:
+                with open(path) as f:
+                    yield path, json.load(f)
+            except (OSError, ValueError):
+                yield path, None
+
+    def prune(self, max_age: Optional[float] = None) -> Dict[str, int]:
+        """
+        Drop references older than ``max_age`` (all if None), then delete
+        objects no reference points to
+
+        Returns:
+            Counts of removed references, objects and bytes
+        """
+        now = self.clock()
+        removed_refs = 0
+        live = set()
+        for path, ref in self._iter_refs():
+            if ref is None or max_age is None or now - ref["created_at"] > max_age:
+                os.unlink(path)
+                removed_refs += 1
+            else:
+                live.add(ref["digest"])
+
+        removed_objects = removed_bytes = 0
+        if os.path.isdir(self.objects_dir):
+            for shard in os.listdir(self.objects_dir):
+                shard_dir = os.path.join(self.objects_dir, shard)
+                for digest in os.listdir(shard_dir):
+                    if digest in live:
+                        continue
+                    path = os.path.join(shard_dir, digest)
+                    removed_bytes += os.path.getsize(path)
+                    os.unlink(path)
+                    removed_objects += 1
+        return {"refs_removed": removed_refs, "objects_removed": removed_objects, "bytes_removed": removed_bytes}
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return reference and object counts and stored bytes"""
+        refs = sum(1 for _ in self._iter_refs())
+        objects = size = 0
+        if os.path.isdir(self.objects_dir):
+            for shard in os.listdir(self.objects_dir):
+                for digest in os.listdir(os.path.join(self.objects_dir, shard)):
+                    objects += 1
+                    size += os.path.getsize(os.path.join(self.objects_dir, shard, digest))
+        return {"refs": refs, "objects": objects, "bytes": size}
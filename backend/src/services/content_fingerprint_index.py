@@ -0,0 +1,210 @@
+"""
+Content Fingerprint Index
+
+Persistent, cross-job index from content fingerprints to processing artifacts
+(transcripts, chunks, embeddings), so bulk jobs only pay for content they have
+not seen before.
+
+- Audio is keyed by a hash of its decoded PCM (mono, 16 kHz, s16le via ffmpeg),
+  so a reposted video re-encoded into a different container still matches.
+- Text is keyed by a hash of its normalized form (NFKC, case-folded,
+  whitespace collapsed).
+- Source identifiers (platform + video id) are aliased to the audio
+  fingerprint, letting a repeat item skip the download entirely.
+
+Artifacts are stored per ``(fingerprint, kind, variant)``; the variant is a
+hash of the settings that shape the artifact (Whisper model, embedding
+provider and dimensions, ...), so changing settings never returns stale output.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+import unicodedata
+import wave
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from .sqlite_store import SQLiteStore, shared_store
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = "data/content_index.db"
+FINGERPRINT_SAMPLE_RATE = 16000
+_READ_CHUNK = 1 << 20
+
+# Artifact kinds
+TRANSCRIPT = "transcript"
+EMBEDDING = "embedding"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    fingerprint TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (fingerprint, kind, variant)
+);
+CREATE TABLE IF NOT EXISTS sources (
+    source_key TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for fingerprinting: NFKC, case-folded, single spaces"""
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def text_fingerprint(text: str) -> str:
+    """Fingerprint of a text's normalized form"""
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"text:{digest}"
+
+
+def artifact_variant(**settings: Any) -> str:
+    """Short stable hash of the settings that shape an artifact"""
+    encoded = json.dumps(settings, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+def content_source_key(platform: str, source_id: str) -> str:
+    """Alias key for content identified by its origin (e.g. a TikTok video id)"""
+    return f"{platform}:{source_id}"
+
+
+def pcm_fingerprint(audio_path: Union[str, Path]) -> str:
+    """
+    Fingerprint audio by its decoded samples rather than its file bytes
+
+    Decodes with ffmpeg to mono 16 kHz s16le and hashes the stream in chunks,
+    so container, codec metadata and tags do not affect the result. Without
+    ffmpeg, WAV files are hashed by their frames and other files by their
+    bytes; the prefix records which method was used.
+
+    Args:
+        audio_path: Audio or video file
+
+    Returns:
+        Fingerprint string such as ``pcm16k:<sha256>``
+    """
+    audio_path = str(audio_path)
+    hasher = hashlib.sha256()
+
+    if shutil.which("ffmpeg"):
+        # stderr goes to a file: an unread pipe would block ffmpeg once it filled up
+        with tempfile.TemporaryFile() as stderr:
+            process = subprocess.Popen(
+                [
+                    "ffmpeg", "-v", "error", "-i", audio_path,
+                    "-vn", "-ac", "1", "-ar", str(FINGERPRINT_SAMPLE_RATE), "-f", "s16le", "-"
+                ],
+                stdout=subprocess.PIPE,
+                stderr=stderr
+            )
+            with process.stdout:
+                for chunk in iter(lambda: process.stdout.read(_READ_CHUNK), b""):
+                    hasher.update(chunk)
+            process.wait()
+            if process.returncode == 0:
+                return f"pcm16k:{hasher.hexdigest()}"
+            stderr.seek(0)
+            message = stderr.read().decode(errors="ignore").strip()
+        logger.warning(f"ffmpeg could not decode {audio_path} for fingerprinting: {message}")
+        hasher = hashlib.sha256()
+
+    try:
+        with wave.open(audio_path, "rb") as wav:
+            hasher.update(f"{wav.getnchannels()}:{wav.getsampwidth()}:{wav.getframerate()}".encode())
+            frames_per_read = max(1, _READ_CHUNK // max(1, wav.getnchannels() * wav.getsampwidth()))
+            for frames in iter(lambda: wav.readframes(frames_per_read), b""):
+                hasher.update(frames)
+        return f"wav:{hasher.hexdigest()}"
+    except (wave.Error, EOFError):
+        pass
+
+    with open(audio_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_READ_CHUNK), b""):
+            hasher.update(chunk)
+    return f"bytes:{hasher.hexdigest()}"
+
+
+class ContentFingerprintIndex(SQLiteStore):
+    """
+    SQLite-backed map from content fingerprints to stored artifacts
+    """
+
+    SCHEMA = _SCHEMA
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_INDEX_PATH):
+        """
+        Args:
+            path: Database file path, or ":memory:"
+        """
+        super().__init__(path)
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+
+    def get(self, fingerprint: str, kind: str, variant: str = "") -> Optional[Dict[str, Any]]:
+        """
+        Look up an artifact
+
+        Args:
+            fingerprint: Content fingerprint
+            kind: Artifact kind (TRANSCRIPT, EMBEDDING, ...)
+            variant: Settings hash from artifact_variant
+
+        Returns:
+            Stored payload, or None on a miss
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM artifacts WHERE fingerprint = ? AND kind = ? AND variant = ?",
+                (fingerprint, kind, variant),
+            ).fetchone()
+            counter = self.hits if row else self.misses
+            counter[kind] = counter.get(kind, 0) + 1
+        return json.loads(row[0]) if row else None
+
+    def put(self, fingerprint: str, kind: str, payload: Dict[str, Any], variant: str = "") -> None:
+        """Store or replace an artifact"""
+        encoded = json.dumps(payload, default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO artifacts (fingerprint, kind, variant, payload, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (fingerprint, kind, variant, encoded, time.time()),
+            )
+
+    def link_source(self, source_key: str, fingerprint: str) -> None:
+        """Record which content fingerprint a source identifier resolved to"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sources (source_key, fingerprint, created_at) VALUES (?, ?, ?)",
+                (source_key, fingerprint, time.time()),
+            )
+
+    def resolve_source(self, source_key: str) -> Optional[str]:
+        """Fingerprint previously linked to a source identifier, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint FROM sources WHERE source_key = ?", (source_key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit and miss counts per artifact kind since this index was opened"""
+        with self._lock:
+            return {"hits": dict(self.hits), "misses": dict(self.misses)}
+
+
+get_content_index = shared_store(ContentFingerprintIndex, "CONTENT_INDEX_PATH", DEFAULT_INDEX_PATH)
@@ -0,0 +1,281 @@
+"""
+Coalesced Convex Progress Publisher
+
+Job progress used to be pushed to Convex with a synchronous client call on
+every tick, blocking the event loop and sending one mutation per item of a
+bulk job. This publisher talks to the Convex HTTP API
+(``POST /api/mutation`` / ``/api/action``) over one shared async client:
+
+- ``publish`` records an update and returns at once. Updates with the same
+  key (function + job + stage) are merged, later fields winning, and a
+  single background task sends what is pending at most once per
+  ``interval``.
+- ``send`` is for state changes that must not wait (created, completed,
+  failed, ...): it first sends the job's pending updates, in order, then
+  the call itself, and returns its result.
+
+One publisher serves a whole process, but each event loop that uses it gets
+its own HTTP client, pending updates and flusher, so a worker thread running
+its own loop never touches another loop's state.
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = float(os.getenv("CONVEX_PROGRESS_INTERVAL", "1.0"))
+DEFAULT_TIMEOUT = float(os.getenv("CONVEX_HTTP_TIMEOUT", "10"))
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("CONVEX_MAX_CONCURRENCY", "8"))
+
+MISSING_FUNCTION = "Could not find public function"
+
+
+class ConvexError(Exception):
+    """A Convex function call failed"""
+
+
+@dataclass
+class _Pending:
+    kind: str
+    path: str
+    args: Dict[str, Any]
+    job_id: Optional[str]
+
+
+@dataclass
+class _LoopState:
+    """Client, queued updates and flusher owned by one event loop"""
+    client: httpx.AsyncClient
+    pending: "OrderedDict[Tuple, _Pending]" = field(default_factory=OrderedDict)
+    job_locks: Dict[Optional[str], list] = field(default_factory=dict)  # job -> [lock, holders + waiters]
+    wakeup: asyncio.Event = field(default_factory=asyncio.Event)
+    flusher: Optional[asyncio.Task] = None
+
+
+@dataclass
+class PublisherStats:
+    """Counters exposed by a ConvexProgressPublisher"""
+    published: int = 0
+    coalesced: int = 0
+    immediate: int = 0
+    sent: int = 0
+    failed: int = 0
+    flushes: int = 0
+
+
+class ConvexProgressPublisher:
+    """
+    Per-deployment publisher that coalesces progress updates
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        interval: float = DEFAULT_INTERVAL,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+    ):
+        """
+        Args:
+            base_url: Convex deployment URL
+            interval: Minimum seconds between two flushes of pending updates
+            timeout: HTTP timeout per call
+            max_concurrency: Calls in flight at once during a flush
+        """
+        self.base_url = base_url.rstrip("/")
+        self.interval = interval
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.stats = PublisherStats()
+
+        self._states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+        self._states_lock = threading.Lock()
+
+    # --- HTTP ----------------------------------------------------------------
+
+    def _state(self) -> _LoopState:
+        """State of the running loop, created on its first use"""
+        loop = asyncio.get_running_loop()
+        with self._states_lock:
+            state = self._states.get(loop)
+            if state is None:
+                client = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout)
+                state = self._states[loop] = _LoopState(client)
+        return state
+
+    async def call(self, path: str, args: Dict[str, Any], kind: str = "mutation") -> Any:
+        """
+        Run a Convex function now
+
+        Args:
+            path: Function path, e.g. ``bulkJobs:updateStatus``
+            args: Function arguments
+            kind: "mutation", "action" or "query"
+
+        Returns:
+            The function's return value
+
+        Raises:
+            ConvexError: If the request fails or the function throws
+        """
+        try:
+            response = await self._state().client.post(f"/api/{kind}", json={"path": path, "args": args, "format": "json"})
+        except httpx.HTTPError as e:
+            raise ConvexError(f"{path}: {e}") from e
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        if response.status_code != 200 or body.get("status") != "success":
+            message = body.get("errorMessage") or body.get("message") or response.text
+            raise ConvexError(f"{path}: {message}")
+        return body.get("value")
+
+    # --- Coalesced updates ---------------------------------------------------
+
+    def publish(self, path: str, args: Dict[str, Any], kind: str = "mutation", key: Optional[Tuple] = None) -> None:
+        """
+        Queue an update to be sent with the next flush
+
+        Args:
+            path: Function path
+            args: Function arguments; merged into a pending update with the same key
+            kind: "mutation" or "action"
+            key: Coalescing key (default: path, ``jobId`` and ``stage`` arguments)
+        """
+        state = self._state()
+        key = key or (kind, path, args.get("jobId"), args.get("stage"))
+        self.stats.published += 1
+        pending = state.pending.get(key)
+        if pending is not None:
+            pending.args.update(args)
+            self.stats.coalesced += 1
+        else:
+            state.pending[key] = _Pending(kind, path, dict(args), args.get("jobId"))
+        if state.flusher is None or state.flusher.done():
+            state.flusher = asyncio.get_running_loop().create_task(self._run(state))
+        state.wakeup.set()
+
+    async def send(self, path: str, args: Dict[str, Any], kind: str = "mutation") -> Any:
+        """
+        Send an update immediately, after the job's pending updates
+
+        Raises:
+            ConvexError: If the call fails
+        """
+        state = self._state()
+        job_id = args.get("jobId")
+        self.stats.immediate += 1
+        async with self._job_lock(state, job_id):
+            await self._send_pending(self._take(state, job_id))
+            try:
+                result = await self.call(path, args, kind)
+            except ConvexError:
+                self.stats.failed += 1
+                raise
+            self.stats.sent += 1
+            return result
+
+    async def flush(self, job_id: Optional[str] = None) -> None:
+        """Send the running loop's pending updates now (all jobs, or only ``job_id``)"""
+        await self._flush(self._state(), job_id)
+
+    async def _flush(self, state: _LoopState, job_id: Optional[str] = None) -> None:
+        self.stats.flushes += 1
+        jobs = [job_id] if job_id is not None else list(dict.fromkeys(p.job_id for p in state.pending.values()))
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def send_job(job: Optional[str]):
+            # Take the updates under the job's lock so a concurrent send() cannot overtake them
+            async with semaphore, self._job_lock(state, job):
+                await self._send_pending(self._take(state, job))
+
+        await asyncio.gather(*(send_job(job) for job in jobs))
+
+    def _take(self, state: _LoopState, job_id: Optional[str]) -> List[_Pending]:
+        keys = [key for key, pending in state.pending.items() if pending.job_id == job_id]
+        return [state.pending.pop(key) for key in keys]
+
+    @contextlib.asynccontextmanager
+    async def _job_lock(self, state: _LoopState, job_id: Optional[str]):
+        """Serialize sends for one job; the lock is dropped once nobody holds or awaits it"""
+        entry = state.job_locks.setdefault(job_id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del state.job_locks[job_id]
+
+    async def _send_pending(self, updates: List[_Pending]) -> None:
+        """Send one job's updates in order; failures are logged, later updates supersede them"""
+        for pending in updates:
+            try:
+                await self.call(pending.path, pending.args, pending.kind)
+                self.stats.sent += 1
+            except ConvexError as e:
+                self.stats.failed += 1
+                if MISSING_FUNCTION in str(e):
+                    logger.warning(f"Convex function {pending.path} not found, dropping update")
+                else:
+                    logger.error(f"Error sending progress update {pending.path} for job {pending.job_id}: {e}")
+
+    async def _run(self, state: _LoopState) -> None:
+        """Flush whenever updates are pending, at most once per interval"""
+        while True:
+            await state.wakeup.wait()
+            state.wakeup.clear()
+            await self._flush(state)
+            await asyncio.sleep(self.interval)
+
+    # --- Introspection and shutdown -----------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return counters plus the number of pending updates across loops"""
+        with self._states_lock:
+            states = list(self._states.values())
+        return {"pending": sum(len(state.pending) for state in states), "loops": len(states), **self.stats.__dict__}
+
+    async def close(self) -> None:
+        """Flush the running loop's pending updates, stop its flusher and close its client"""
+        loop = asyncio.get_running_loop()
+        with self._states_lock:
+            state = self._states.get(loop)
+        if state is None:
+            return
+        await self._flush(state)
+        if state.flusher is not None:
+            state.flusher.cancel()
+            await asyncio.gather(state.flusher, return_exceptions=True)
+        with self._states_lock:
+            self._states.pop(loop, None)
+        await state.client.aclose()
+
+
+_publishers: Dict[str, ConvexProgressPublisher] = {}
+
+
+def get_progress_publisher(base_url: str) -> ConvexProgressPublisher:
+    """Process-wide publisher for a Convex deployment"""
+    publisher = _publishers.get(base_url)
+    if publisher is None:
+        publisher = _publishers[base_url] = ConvexProgressPublisher(base_url)
+    return publisher
+
+
+async def close_progress_publishers() -> None:
+    """Flush and close every publisher (application shutdown)"""
+    for publisher in list(_publishers.values()):
+        await publisher.close()
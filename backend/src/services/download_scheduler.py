@@ -0,0 +1,317 @@
+"""
+Bounded Concurrent Download Scheduler
+
+Runs media downloads concurrently with limits that hold across every
+caller in the process (bulk jobs, preview streaming):
+
+- at most ``max_concurrency`` downloads at once, and at most
+  ``per_host_limit`` against any one host;
+- queued downloads start in priority order (higher first, then FIFO),
+  skipping over ones whose host is saturated;
+- failures are retried with full-jitter exponential backoff, except for
+  errors that look permanent (private, removed, ...);
+- results land in a ContentCache, so a key that is already cached is
+  served without downloading and concurrent requests for the same key
+  share one download.
+
+``download_many`` reports progress as each download finishes, in
+completion order, and returns results in input order.
+"""
+
+import asyncio
+import heapq
+import inspect
+import itertools
+import logging
+import os
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from src.services.content_cache import ContentCache
+from src.services.ytdlp_pool import PERMANENT_ERROR_TERMS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("DOWNLOAD_MAX_CONCURRENCY", "16"))
+DEFAULT_PER_HOST_LIMIT = int(os.getenv("DOWNLOAD_PER_HOST_LIMIT", "8"))
+DEFAULT_RETRIES = int(os.getenv("DOWNLOAD_RETRIES", "2"))
+
+
+@dataclass
+class DownloadJob:
+    """One payload to fetch into the cache"""
+    key: str
+    open: Callable[[], AsyncIterator[bytes]]
+    host: str = "default"
+    priority: int = 0
+    max_age: Optional[float] = None  # reuse cached entries younger than this (None: any age)
+
+
+@dataclass
+class DownloadResult:
+    """Outcome of a DownloadJob"""
+    key: str
+    ok: bool
+    path: Optional[str] = None
+    digest: Optional[str] = None
+    size: int = 0
+    cached: bool = False
+    attempts: int = 0
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+
+@dataclass
+class DownloadStats:
+    """Counters exposed by a DownloadScheduler"""
+    submitted: int = 0
+    cache_hits: int = 0
+    shared_inflight: int = 0
+    completed: int = 0
+    failed: int = 0
+    retries: int = 0
+    bytes_downloaded: int = 0
+
+
+@dataclass(order=True)
+class _Queued:
+    sort_key: tuple
+    job: DownloadJob = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    attempt: int = field(default=0, compare=False)
+    enqueued_at: float = field(default=0.0, compare=False)
+
+
+class DownloadScheduler:
+    """
+    Priority download queue with global and per-host concurrency limits
+    """
+
+    def __init__(
+        self,
+        cache: Optional[ContentCache] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+        retries: int = DEFAULT_RETRIES,
+        retry_base_delay: float = 0.5,
+        retry_max_delay: float = 8.0,
+        rng: Optional[random.Random] = None
+    ):
+        """
+        Args:
+            cache: Where downloads are stored (default location if None)
+            max_concurrency: Downloads running at once across all hosts
+            per_host_limit: Downloads running at once against one host
+            retries: Extra attempts after a transient failure
+            retry_base_delay: Backoff cap before the first retry; doubles per attempt
+            retry_max_delay: Upper bound on the backoff cap
+            rng: Source of retry jitter
+        """
+        self.cache = cache or ContentCache()
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.retries = retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.rng = rng or random.Random()
+        self.stats = DownloadStats()
+
+        self._queue: List[_Queued] = []
+        self._seq = itertools.count()
+        self._running: Dict[asyncio.Task, _Queued] = {}
+        self._host_active: Counter = Counter()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._delayed: Dict[int, asyncio.TimerHandle] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    # --- Submission ----------------------------------------------------------
+
+    async def download(self, job: DownloadJob) -> DownloadResult:
+        """
+        Fetch one job into the cache (or find it there)
+
+        Returns:
+            The result; failures are reported in it rather than raised
+        """
+        self.stats.submitted += 1
+        entry = self.cache.lookup(job.key, max_age=job.max_age)
+        if entry is not None:
+            self.stats.cache_hits += 1
+            return DownloadResult(key=job.key, ok=True, path=entry.path, digest=entry.digest,
+                                  size=entry.size, cached=True)
+
+        inflight = self._inflight.get(job.key)
+        if inflight is not None:
+            self.stats.shared_inflight += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[job.key] = future
+        future.add_done_callback(lambda _, key=job.key: self._inflight.pop(key, None))
+        self._enqueue(_Queued((-job.priority, next(self._seq)), job, future, enqueued_at=time.perf_counter()))
+        return await asyncio.shield(future)
+
+    async def download_many(
+        self,
+        jobs: List[DownloadJob],
+        on_progress: Optional[Callable[[DownloadResult, int, int], Any]] = None
+    ) -> List[DownloadResult]:
+        """
+        Fetch several jobs concurrently
+
+        Args:
+            jobs: Jobs to fetch
+            on_progress: Called (sync or async) with each result and the
+                number finished so far out of the total, as they finish
+
+        Returns:
+            Results in the order of ``jobs``
+        """
+        results: List[Optional[DownloadResult]] = [None] * len(jobs)
+
+        async def run(index: int, job: DownloadJob):
+            return index, await self.download(job)
+
+        # Create the tasks in order so equal-priority jobs queue in input order
+        tasks = [asyncio.ensure_future(run(i, job)) for i, job in enumerate(jobs)]
+        finished = 0
+        for next_done in asyncio.as_completed(tasks):
+            index, result = await next_done
+            results[index] = result
+            finished += 1
+            if on_progress is not None:
+                outcome = on_progress(result, finished, len(jobs))
+                if inspect.isawaitable(outcome):
+                    await outcome
+        return results
+
+    # --- Dispatch ------------------------------------------------------------
+
+    def _enqueue(self, queued: _Queued) -> None:
+        heapq.heappush(self._queue, queued)
+        self._ensure_dispatcher()
+        self._wakeup.set()
+
+    def _ensure_dispatcher(self) -> None:
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch())
+
+    async def _dispatch(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            self._launch_ready()
+
+    def _launch_ready(self) -> None:
+        """Start the highest-priority queued jobs whose host has a free slot"""
+        saturated = []
+        while self._queue and len(self._running) < self.max_concurrency:
+            queued = heapq.heappop(self._queue)
+            if queued.future.done():
+                continue
+            if self._host_active[queued.job.host] >= self.per_host_limit:
+                saturated.append(queued)
+                continue
+            self._host_active[queued.job.host] += 1
+            task = asyncio.get_running_loop().create_task(self._attempt(queued))
+            self._running[task] = queued
+            task.add_done_callback(self._on_attempt_done)
+        for queued in saturated:
+            heapq.heappush(self._queue, queued)
+
+    def _on_attempt_done(self, task: asyncio.Task) -> None:
+        queued = self._running.pop(task)
+        self._host_active[queued.job.host] -= 1
+        if not self._host_active[queued.job.host]:
+            del self._host_active[queued.job.host]
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _backoff(self, attempt: int) -> float:
+        cap = min(self.retry_max_delay, self.retry_base_delay * (2 ** attempt))
+        return self.rng.uniform(0, cap)
+
+    async def _attempt(self, queued: _Queued) -> None:
+        job = queued.job
+        queued.attempt += 1
+        try:
+            entry = await self.cache.store(job.key, job.open())
+        except asyncio.CancelledError:
+            if not queued.future.done():
+                queued.future.cancel()
+            raise
+        except Exception as e:
+            message = str(e)
+            permanent = any(term in message.lower() for term in PERMANENT_ERROR_TERMS)
+            if permanent or queued.attempt > self.retries:
+                self.stats.failed += 1
+                logger.error(f"Download of {job.key} failed after {queued.attempt} attempt(s): {message}")
+                self._resolve(queued, DownloadResult(key=job.key, ok=False, attempts=queued.attempt, error=message))
+                return
+            self.stats.retries += 1
+            delay = self._backoff(queued.attempt - 1)
+            logger.warning(f"Download of {job.key} failed (attempt {queued.attempt}), retrying in {delay:.2f}s: {message}")
+            # Wait outside the concurrency slot, then queue again at the same priority
+            self._delayed[id(queued)] = asyncio.get_running_loop().call_later(delay, self._requeue, queued)
+            return
+
+        self.stats.completed += 1
+        self.stats.bytes_downloaded += entry.size
+        self._resolve(queued, DownloadResult(
+            key=job.key, ok=True, path=entry.path, digest=entry.digest, size=entry.size,
+            attempts=queued.attempt
+        ))
+
+    def _requeue(self, queued: _Queued) -> None:
+        self._delayed.pop(id(queued), None)
+        if not queued.future.done():
+            self._enqueue(queued)
+
+    def _resolve(self, queued: _Queued, result: DownloadResult) -> None:
+        result.elapsed = time.perf_counter() - queued.enqueued_at
+        if not queued.future.done():
+            queued.future.set_result(result)
+
+    # --- Introspection and shutdown -----------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return counters plus current queue and per-host activity"""
+        return {
+            "queued": len(self._queue),
+            "running": len(self._running),
+            "running_by_host": dict(self._host_active),
+            **self.stats.__dict__,
+        }
+
+    async def close(self) -> None:
+        """Cancel queued, delayed and running downloads"""
+        for handle in self._delayed.values():
+            handle.cancel()
+        self._delayed.clear()
+        for queued in self._queue:
+            queued.future.cancel()
+        self._queue.clear()
+        tasks = list(self._running)
+        for task in tasks:
+            task.cancel()
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            tasks.append(self._dispatcher)
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._dispatcher = None
+
+
+_scheduler: Optional[DownloadScheduler] = None
+
+
+def get_download_scheduler() -> DownloadScheduler:
+    """Process-wide scheduler shared by preview streaming and bulk downloads"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = DownloadScheduler()
+    return _scheduler
@@ -0,0 +1,267 @@
+"""
+Token-Budget Batch Packing for Embedding Requests
+
+Measures every text once with a cached tokenizer and bin-packs texts into
+requests that fill a provider's per-request token and item limits, instead of
+slicing fixed counts. Texts longer than the per-item limit are truncated or
+split according to an overflow policy; split parts are merged back into one
+vector per input text when results are unpacked.
+
+Token counts use the cl100k tokenizer, which is close to but not identical
+with the providers' own tokenizers, so limits carry a small safety margin.
+Without the tokenizer files, counts fall back to a character-length estimate.
+"""
+
+import bisect
+import logging
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.core.tokens import get_token_encoder
+
+logger = logging.getLogger(__name__)
+
+
+class OverflowPolicy(Enum):
+    """What to do with a text longer than the per-item token limit"""
+    TRUNCATE = "truncate"
+    SPLIT = "split"
+    ERROR = "error"
+
+
+@dataclass
+class PackingLimits:
+    """Per-request limits for an embedding provider"""
+    max_items_per_request: int
+    max_tokens_per_item: int
+    max_tokens_per_request: Optional[int] = None
+    safety_margin: float = 0.95
+
+    @property
+    def item_budget(self) -> int:
+        return max(1, int(self.max_tokens_per_item * self.safety_margin))
+
+    @property
+    def request_budget(self) -> Optional[int]:
+        if self.max_tokens_per_request is None:
+            return None
+        return max(self.item_budget, int(self.max_tokens_per_request * self.safety_margin))
+
+
+# Defaults mirror JinaConfig / GeminiConfig: item counts match the client
+# batch sizes so a packed batch is sent as exactly one HTTP request
+PROVIDER_LIMITS: Dict[str, PackingLimits] = {
+    "jina": PackingLimits(max_items_per_request=50, max_tokens_per_item=32768, max_tokens_per_request=131072),
+    "gemini": PackingLimits(max_items_per_request=100, max_tokens_per_item=8192, max_tokens_per_request=None),
+}
+
+
+@dataclass
+class PackedItem:
+    """A text (or one part of a split text) placed in a request"""
+    index: int
+    text: str
+    token_count: int
+    part: int = 0
+
+
+@dataclass
+class PackedBatch:
+    """Texts that go out together in one embedding request"""
+    items: List[PackedItem] = field(default_factory=list)
+    total_tokens: int = 0
+
+    @property
+    def texts(self) -> List[str]:
+        return [item.text for item in self.items]
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+class EmbeddingBatchPacker:
+    """
+    Packs texts into token-budgeted embedding requests
+    """
+
+    def __init__(
+        self,
+        limits: PackingLimits,
+        overflow_policy: OverflowPolicy = OverflowPolicy.TRUNCATE,
+        encoding_name: str = "cl100k_base",
+        split_overlap: int = 0
+    ):
+        """
+        Args:
+            limits: Provider per-request limits
+            overflow_policy: Handling for texts over the per-item limit
+            encoding_name: tiktoken encoding used for counting
+            split_overlap: Tokens shared between consecutive parts of a split text
+        """
+        self.limits = limits
+        self.overflow_policy = overflow_policy
+        self.encoding_name = encoding_name
+        self.split_overlap = max(0, min(split_overlap, limits.item_budget // 2))
+
+    @classmethod
+    def for_provider(
+        cls,
+        provider: str,
+        overflow_policy: OverflowPolicy = OverflowPolicy.TRUNCATE,
+        **limit_overrides
+    ) -> "EmbeddingBatchPacker":
+        """
+        Create a packer with a provider's default limits
+
+        Args:
+            provider: Provider key ("jina" or "gemini"; "jina-v4" maps to "jina")
+            overflow_policy: Handling for texts over the per-item limit
+            **limit_overrides: PackingLimits fields to override
+
+        Returns:
+            Configured EmbeddingBatchPacker
+        """
+        key = "jina" if provider == "jina-v4" else provider
+        if key not in PROVIDER_LIMITS:
+            raise ValueError(f"Unsupported embedding provider: {provider}")
+        base = PROVIDER_LIMITS[key]
+        limits = PackingLimits(**{**base.__dict__, **{k: v for k, v in limit_overrides.items() if v is not None}})
+        return cls(limits, overflow_policy=overflow_policy)
+
+    def count_tokens(self, texts: Sequence[str]) -> List[int]:
+        """Count tokens for many texts with a single encoder call"""
+        if not texts:
+            return []
+        return [len(tokens) for tokens in get_token_encoder(self.encoding_name).encode_ordinary_batch(list(texts))]
+
+    def prepare(self, texts: Sequence[str]) -> List[PackedItem]:
+        """
+        Measure texts once and apply the overflow policy
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            Items that each fit within the per-item budget
+        """
+        encoder = get_token_encoder(self.encoding_name)
+        budget = self.limits.item_budget
+        token_lists = encoder.encode_ordinary_batch(list(texts)) if texts else []
+        items: List[PackedItem] = []
+
+        for index, (text, tokens) in enumerate(zip(texts, token_lists)):
+            if len(tokens) <= budget:
+                items.append(PackedItem(index=index, text=text, token_count=len(tokens)))
+                continue
+
+            if self.overflow_policy == OverflowPolicy.ERROR:
+                raise ValueError(
+                    f"Text {index} has {len(tokens)} tokens, over the per-item limit of {budget}"
+                )
+            if self.overflow_policy == OverflowPolicy.TRUNCATE:
+                items.append(PackedItem(index=index, text=encoder.decode(tokens[:budget]), token_count=budget))
+                continue
+
+            stride = budget - self.split_overlap
+            for part, start in enumerate(range(0, len(tokens), stride)):
+                piece = tokens[start:start + budget]
+                items.append(PackedItem(index=index, text=encoder.decode(piece), token_count=len(piece), part=part))
+                if start + budget >= len(tokens):
+                    break
+
+        return items
+
+    def pack(self, texts: Sequence[str]) -> List[PackedBatch]:
+        """
+        Bin-pack texts into requests (best-fit decreasing)
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            Batches that respect the item and token limits
+        """
+        items = self.prepare(texts)
+        max_items = self.limits.max_items_per_request
+        request_budget = self.limits.request_budget
+
+        if request_budget is None:
+            # Only the item count binds: contiguous slices are already optimal
+            return [
+                PackedBatch(items=items[i:i + max_items], total_tokens=sum(it.token_count for it in items[i:i + max_items]))
+                for i in range(0, len(items), max_items)
+            ]
+
+        batches: List[PackedBatch] = []
+        # Open batches sorted by remaining token capacity
+        open_remaining: List[int] = []
+        open_batches: List[PackedBatch] = []
+
+        for item in sorted(items, key=lambda it: it.token_count, reverse=True):
+            pos = bisect.bisect_left(open_remaining, item.token_count)
+            if pos < len(open_remaining):
+                batch = open_batches.pop(pos)
+                remaining = open_remaining.pop(pos)
+            else:
+                batch = PackedBatch()
+                batches.append(batch)
+                remaining = request_budget
+
+            batch.items.append(item)
+            batch.total_tokens += item.token_count
+            remaining -= item.token_count
+
+            if len(batch.items) < max_items and remaining > 0:
+                pos = bisect.bisect_left(open_remaining, remaining)
+                open_remaining.insert(pos, remaining)
+                open_batches.insert(pos, batch)
+
+        return batches
+
+    @staticmethod
+    def unpack(
+        batches: Sequence[PackedBatch],
+        results: Sequence[Optional[Sequence[Sequence[float]]]],
+        total_texts: int
+    ) -> List[List[float]]:
+        """
+        Map per-batch results back to one embedding per input text
+
+        Parts of a split text are merged with a token-weighted mean and
+        re-normalized. Texts whose batch failed (``None`` result) get an
+        empty list.
+
+        Args:
+            batches: Batches returned by ``pack``
+            results: One list of embeddings per batch, or None on failure
+            total_texts: Number of original input texts
+
+        Returns:
+            Embeddings in input order
+        """
+        parts: Dict[int, List[Any]] = {}
+        for batch, batch_result in zip(batches, results):
+            if batch_result is None:
+                continue
+            for item, embedding in zip(batch.items, batch_result):
+                parts.setdefault(item.index, []).append((item.token_count, embedding))
+
+        embeddings: List[List[float]] = []
+        for index in range(total_texts):
+            pieces = parts.get(index)
+            if not pieces:
+                embeddings.append([])
+            elif len(pieces) == 1:
+                embeddings.append(list(pieces[0][1]))
+            else:
+                weights = np.array([count for count, _ in pieces], dtype=np.float32)
+                vectors = np.array([vector for _, vector in pieces], dtype=np.float32)
+                merged = (vectors * weights[:, None]).sum(axis=0) / weights.sum()
+                norm = np.linalg.norm(merged)
+                if norm > 0:
+                    merged = merged / norm
+                embeddings.append(merged.tolist())
+        return embeddings
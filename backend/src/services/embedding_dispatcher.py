@@ -0,0 +1,432 @@
+"""
+Shared Embedding Dispatcher
+
+Keeps several embedding batches in flight against a provider and tunes the
+number of outstanding requests with AIMD (additive increase, multiplicative
+decrease): every successful response grows the window by roughly one request
+per round-trip, while a 429 or a response slower than the latency target
+shrinks it. ``Retry-After`` is honored by pausing new requests until the
+provider says it is ready again. Results are always returned in batch order.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+EmbedFunc = Callable[[Any], Awaitable[Any]]
+
+
+class RateLimitError(Exception):
+    """Raised by embedding clients when the provider rejects a request with 429"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None, status: int = 429):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.status = status
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a ``Retry-After`` header value into seconds
+
+    Args:
+        value: Header value, either delta-seconds or an HTTP date
+
+    Returns:
+        Seconds to wait, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class AIMDController:
+    """Additive-increase / multiplicative-decrease concurrency window"""
+
+    def __init__(
+        self,
+        initial: int = 2,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        latency_target: Optional[float] = None
+    ):
+        """
+        Args:
+            initial: Starting number of requests in flight
+            min_limit: Lower bound for the window
+            max_limit: Upper bound for the window
+            increase: Requests added to the window per full window of successes
+            decrease_factor: Multiplier applied to the window on congestion
+            latency_target: Responses slower than this (seconds) count as congestion
+        """
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_target = latency_target
+        self._window = float(min(max(initial, self.min_limit), self.max_limit))
+        self._last_decrease = 0.0
+        self._latency_ewma: Optional[float] = None
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight"""
+        return int(self._window)
+
+    @property
+    def latency(self) -> Optional[float]:
+        """Smoothed response latency in seconds"""
+        return self._latency_ewma
+
+    def on_success(self, latency: float):
+        """Record a successful response and grow or shrink the window"""
+        if self._latency_ewma is None:
+            self._latency_ewma = latency
+        else:
+            self._latency_ewma = 0.8 * self._latency_ewma + 0.2 * latency
+
+        if self.latency_target is not None and latency > self.latency_target:
+            self.on_congestion()
+            return
+
+        self._window = min(float(self.max_limit), self._window + self.increase / max(1.0, self._window))
+
+    def on_congestion(self):
+        """Shrink the window, at most once per observed round-trip"""
+        now = time.monotonic()
+        # Responses already in flight when congestion started report it too;
+        # collapse them into a single decrease
+        if now - self._last_decrease < (self._latency_ewma or 0.0):
+            return
+        self._last_decrease = now
+        self._window = max(float(self.min_limit), self._window * self.decrease_factor)
+
+
+@dataclass
+class DispatcherStats:
+    """Counters exposed by an EmbeddingDispatcher"""
+    requests: int = 0
+    succeeded: int = 0
+    rate_limited: int = 0
+    retries: int = 0
+    failed: int = 0
+    max_in_flight: int = 0
+
+
+class EmbeddingDispatcher:
+    """
+    Runs embedding batches concurrently under an adaptive in-flight limit
+    """
+
+    def __init__(
+        self,
+        name: str = "embeddings",
+        initial_concurrency: int = 2,
+        max_concurrency: int = 16,
+        min_interval: float = 0.0,
+        max_retries: int = 5,
+        base_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        latency_target: Optional[float] = None
+    ):
+        """
+        Args:
+            name: Label used in logs
+            initial_concurrency: Batches in flight before any feedback arrives
+            max_concurrency: Hard cap on batches in flight
+            min_interval: Minimum spacing between request starts (seconds)
+            max_retries: Retries per batch before the error is raised
+            base_backoff: Backoff for failures without a Retry-After hint
+            max_backoff: Upper bound for any single wait
+            latency_target: Optional latency above which the window shrinks
+        """
+        self.name = name
+        self.min_interval = min_interval
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.controller = AIMDController(
+            initial=initial_concurrency,
+            max_limit=max_concurrency,
+            latency_target=latency_target
+        )
+        self.stats = DispatcherStats()
+
+        self._in_flight = 0
+        self._blocked_until = 0.0
+        self._next_start = 0.0
+        self._cond: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently outstanding"""
+        return self._in_flight
+
+    def _condition(self) -> asyncio.Condition:
+        # Shared dispatchers outlive individual event loops (tests, workers
+        # calling asyncio.run repeatedly), so bind the condition lazily
+        loop = asyncio.get_running_loop()
+        if self._cond is None or self._loop is not loop:
+            self._cond = asyncio.Condition()
+            self._loop = loop
+            self._in_flight = 0
+        return self._cond
+
+    async def _acquire(self):
+        cond = self._condition()
+        async with cond:
+            while True:
+                now = time.monotonic()
+                wait = self._blocked_until - now
+                if wait <= 0 and self._in_flight < self.controller.limit:
+                    wait = self._next_start - now
+                    if wait <= 0:
+                        self._in_flight += 1
+                        self._next_start = now + self.min_interval
+                        self.stats.max_in_flight = max(self.stats.max_in_flight, self._in_flight)
+                        return
+                if wait > 0:
+                    try:
+                        await asyncio.wait_for(cond.wait(), timeout=wait)
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    await cond.wait()
+
+    async def _release(self):
+        cond = self._condition()
+        async with cond:
+            self._in_flight -= 1
+            cond.notify_all()
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.max_backoff, self.base_backoff * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _run_batch(self, batch: Any, embed_func: EmbedFunc) -> Any:
+        attempt = 0
+        while True:
+            await self._acquire()
+            started = time.monotonic()
+            self.stats.requests += 1
+            try:
+                result = await embed_func(batch)
+            except RateLimitError as e:
+                self.stats.rate_limited += 1
+                self.controller.on_congestion()
+                wait = e.retry_after if e.retry_after is not None else self._backoff(attempt)
+                wait = min(wait, self.max_backoff)
+                # Pause every new request, not just this one: the provider
+                # limit is shared by the whole window
+                self._blocked_until = max(self._blocked_until, time.monotonic() + wait)
+                logger.warning(
+                    f"{self.name}: rate limited, pausing {wait:.2f}s "
+                    f"(window now {self.controller.limit})"
+                )
+                error: Exception = e
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error = e
+                wait = self._backoff(attempt)
+            else:
+                self.controller.on_success(time.monotonic() - started)
+                self.stats.succeeded += 1
+                return result
+            finally:
+                await self._release()
+
+            if attempt >= self.max_retries:
+                self.stats.failed += 1
+                raise error
+            attempt += 1
+            self.stats.retries += 1
+            if not isinstance(error, RateLimitError):
+                logger.warning(f"{self.name}: batch failed ({error}), retry {attempt} in {wait:.2f}s")
+                await asyncio.sleep(wait)
+
+    async def submit(self, batch: Any, embed_func: EmbedFunc) -> Any:
+        """
+        Embed a single batch under the window, with the dispatcher's retries
+
+        Args:
+            batch: Batch payload passed to ``embed_func``
+            embed_func: Coroutine function that embeds the batch
+
+        Returns:
+            The batch's result
+        """
+        return await self._run_batch(batch, embed_func)
+
+    async def iter_completed(
+        self,
+        batches: Sequence[Any],
+        embed_func: EmbedFunc
+    ) -> AsyncIterator[Tuple[int, Any]]:
+        """
+        Dispatch batches and yield ``(index, result)`` pairs as they finish
+
+        Args:
+            batches: Batch payloads passed to ``embed_func`` one at a time
+            embed_func: Coroutine function that embeds a single batch
+
+        Yields:
+            Batch index and its result, in completion order
+        """
+        async def run(index: int, batch: Any) -> Tuple[int, Any]:
+            return index, await self._run_batch(batch, embed_func)
+
+        tasks = [asyncio.ensure_future(run(i, batch)) for i, batch in enumerate(batches)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def dispatch(
+        self,
+        batches: Sequence[Any],
+        embed_func: EmbedFunc,
+        return_exceptions: bool = False
+    ) -> List[Any]:
+        """
+        Dispatch batches concurrently and return their results in order
+
+        Args:
+            batches: Batch payloads passed to ``embed_func`` one at a time
+            embed_func: Coroutine function that embeds a single batch
+            return_exceptions: Place a batch's final exception in its slot
+                instead of raising it
+
+        Returns:
+            One result per batch, in the same order as ``batches``
+        """
+        async def run(batch: Any) -> Any:
+            try:
+                return await self._run_batch(batch, embed_func)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if return_exceptions:
+                    return e
+                raise
+
+        return list(await asyncio.gather(*(run(batch) for batch in batches)))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return counters plus the current window and latency"""
+        return {
+            "name": self.name,
+            "concurrency_limit": self.controller.limit,
+            "in_flight": self._in_flight,
+            "latency_seconds": self.controller.latency,
+            **self.stats.__dict__,
+        }
+
+
+async def iter_windowed(
+    batches: Iterable[Any],
+    embed_func: EmbedFunc,
+    max_in_flight: int,
+    controller: Optional[AIMDController] = None
+) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Keep a bounded number of batches outstanding and yield results as they finish
+
+    Unlike ``EmbeddingDispatcher.iter_completed`` this takes no dispatcher
+    slots itself, so it suits callers whose ``embed_func`` already goes through
+    a dispatcher; it only bounds how many calls are pending at once. With a
+    controller the window also tracks its current limit, so 429s observed by
+    the provider dispatcher shrink it and successful responses grow it again.
+
+    Args:
+        batches: Batch payloads, consumed lazily
+        embed_func: Coroutine function that embeds a single batch
+        max_in_flight: Upper bound on outstanding calls
+        controller: Optional AIMD controller whose limit caps the window
+
+    Yields:
+        Batch index and its result, in completion order
+    """
+    async def run(index: int, batch: Any) -> Tuple[int, Any]:
+        return index, await embed_func(batch)
+
+    source = enumerate(batches)
+    exhausted = False
+    pending: Set[asyncio.Future] = set()
+    try:
+        while True:
+            window = max(1, min(max_in_flight, controller.limit if controller else max_in_flight))
+            while not exhausted and len(pending) < window:
+                try:
+                    index, batch = next(source)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending.add(asyncio.ensure_future(run(index, batch)))
+            if not pending:
+                return
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+# Per-provider defaults derived from the published request-per-minute limits
+PROVIDER_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "jina": {"initial_concurrency": 4, "max_concurrency": 16, "min_interval": 60.0 / 600},
+    "gemini": {"initial_concurrency": 2, "max_concurrency": 8, "min_interval": 60.0 / 100},
+    "openai": {"initial_concurrency": 4, "max_concurrency": 16, "min_interval": 0.0},
+}
+
+_dispatchers: Dict[str, EmbeddingDispatcher] = {}
+
+
+def get_embedding_dispatcher(provider: str, **overrides) -> EmbeddingDispatcher:
+    """
+    Get the process-wide dispatcher for a provider
+
+    All callers embedding against the same provider share one window, so a
+    429 seen by one job slows down every job using that API key.
+
+    Args:
+        provider: Provider key (jina, gemini, openai, ...)
+        **overrides: Constructor arguments used when the dispatcher is first created
+
+    Returns:
+        Shared EmbeddingDispatcher instance
+    """
+    dispatcher = _dispatchers.get(provider)
+    if dispatcher is None:
+        options = {**PROVIDER_DEFAULTS.get(provider, {}), **overrides}
+        dispatcher = EmbeddingDispatcher(name=provider, **options)
+        _dispatchers[provider] = dispatcher
+    return dispatcher
@@ -11,10 +11,13 @@ diarization, ensuring robust centroid updates in streaming scenarios.
 """
 
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, List, Sequence
 import scipy.signal
 import scipy.fft
 
+# Welch windows are scored in blocks of this many rows to bound peak memory
+_WELCH_BLOCK_ROWS = 4096
+
 
 class EmbeddingQualityAssessor:
     """
@@ -27,6 +30,9 @@ class EmbeddingQualityAssessor:
     
     The composite quality score is used to make informed decisions about
     whether to update speaker centroids in streaming scenarios.
+    
+    Segments can be scored one at a time (assess_quality) or many at once
+    (assess_quality_batch); both share the same vectorized implementation.
     """
     
     def __init__(self, 
@@ -34,7 +40,8 @@ class EmbeddingQualityAssessor:
                  snr_weight: float = 0.5,
                  duration_weight: float = 0.3,
                  spectral_weight: float = 0.2,
-                 min_quality_threshold: float = 0.3):
+                 min_quality_threshold: float = 0.3,
+                 spectral_window: int = 512):
         """
         Initialize the quality assessor.
         
@@ -44,6 +51,7 @@ class EmbeddingQualityAssessor:
             duration_weight: Weight for duration quality (0-1)
             spectral_weight: Weight for spectral quality (0-1)
             min_quality_threshold: Minimum quality threshold for centroid updates
+            spectral_window: Welch window length (samples) for spectral quality
         """
         self.sample_rate = sample_rate
         self.snr_weight = snr_weight
@@ -55,6 +63,17 @@ class EmbeddingQualityAssessor:
         total_weight = snr_weight + duration_weight + spectral_weight
         if abs(total_weight - 1.0) > 0.001:
             raise ValueError(f"Weights must sum to 1.0, got {total_weight}")
+        
+        # Welch analysis: Hann windows with 50% overlap, each zero-padded to a
+        # fast real-FFT length; only the 80-4000 Hz speech band is kept
+        self.spectral_window = spectral_window
+        self.spectral_hop = spectral_window // 2
+        self.spectral_n_fft = scipy.fft.next_fast_len(spectral_window, real=True)
+        self._welch_window = scipy.signal.get_window('hann', spectral_window).astype(np.float32)
+        freqs = scipy.fft.rfftfreq(self.spectral_n_fft, 1 / sample_rate)
+        band = np.flatnonzero((freqs >= 80) & (freqs <= 4000))
+        self._speech_band = slice(band[0], band[-1] + 1)
+        self._speech_freqs = freqs[self._speech_band]
     
     def assess_quality(self, audio: np.ndarray) -> float:
         """
@@ -66,10 +85,45 @@ class EmbeddingQualityAssessor:
         Returns:
             Composite quality score between 0.0 and 1.0
         """
-        if len(audio) == 0:
-            return 0.0
+        return self.assess_quality_batch([audio])[0]
+    
+    def assess_quality_batch(self, segments: Sequence[np.ndarray]) -> List[float]:
+        """
+        Assess the quality of many audio segments in one vectorized pass.
+        
+        Scores match assess_quality for each segment; frames and Welch
+        windows from all segments are stacked so every metric is computed
+        with a handful of array operations regardless of segment count.
+        
+        Args:
+            segments: Raw audio segments (any lengths, int16/int32/float)
             
-        # Ensure float32 format
+        Returns:
+            Composite quality score between 0.0 and 1.0 per segment
+        """
+        segments = [self._to_float32(audio) for audio in segments]
+        if not segments:
+            return []
+        
+        snr_quality = self._snr_quality_batch(segments)
+        duration_quality = self._duration_quality_batch(segments)
+        spectral_quality = self._spectral_quality_batch(segments)
+        
+        # Weighted aggregation
+        composite_quality = np.clip(
+            self.snr_weight * snr_quality +
+            self.duration_weight * duration_quality +
+            self.spectral_weight * spectral_quality,
+            0.0, 1.0
+        )
+        lengths = np.array([len(audio) for audio in segments])
+        composite_quality[lengths == 0] = 0.0
+        return [float(q) for q in composite_quality]
+    
+    @staticmethod
+    def _to_float32(audio: np.ndarray) -> np.ndarray:
+        """Convert audio to float32, scaling integer PCM to [-1, 1]."""
+        audio = np.asarray(audio)
         if audio.dtype != np.float32:
             if audio.dtype == np.int16:
                 audio = audio.astype(np.float32) / 32768.0
@@ -77,20 +131,7 @@ class EmbeddingQualityAssessor:
                 audio = audio.astype(np.float32) / 2147483648.0
             else:
                 audio = audio.astype(np.float32)
-        
-        # Calculate individual quality metrics
-        snr_quality = self._calculate_snr_quality(audio)
-        duration_quality = self._calculate_duration_quality(audio)
-        spectral_quality = self._calculate_spectral_quality(audio)
-        
-        # Weighted aggregation
-        composite_quality = (
-            self.snr_weight * snr_quality +
-            self.duration_weight * duration_quality +
-            self.spectral_weight * spectral_quality
-        )
-        
-        return float(np.clip(composite_quality, 0.0, 1.0))
+        return audio.reshape(-1)
     
     def _calculate_snr_quality(self, audio: np.ndarray) -> float:
         """
@@ -98,52 +139,74 @@ class EmbeddingQualityAssessor:
         This method is robust against absolute volume changes and identifies noise
         based on the energy difference between quiet and loud segments.
         """
+        return float(self._snr_quality_batch([self._to_float32(audio)])[0])
+    
+    def _snr_quality_batch(self, segments: List[np.ndarray]) -> np.ndarray:
+        """SNR quality for many segments; frame energies are computed in one pass."""
+        frame_length = 512
+        hop_length = 256
+        quality = np.full(len(segments), 0.1)
+        
         try:
-            # Require at least 100ms of audio for a meaningful estimation
-            if len(audio) < self.sample_rate * 0.1:
-                return 0.1
-
-            frame_length = 512
-            hop_length = 256
+            # Require at least 100ms of audio (and 5 frames) for a meaningful estimation
+            eligible = [
+                i for i, audio in enumerate(segments)
+                if len(audio) >= self.sample_rate * 0.1 and 1 + (len(audio) - frame_length) // hop_length >= 5
+            ]
+            if not eligible:
+                return quality
             
-            frames = self._frame_audio(audio, frame_length, hop_length)
+            # Frames overlap by exactly one hop, so each frame's energy is the sum
+            # of two adjacent hop-sized blocks; no frame copies are materialized
+            framed_energies = []
+            for i in eligible:
+                audio = segments[i]
+                n_frames = 1 + (len(audio) - frame_length) // hop_length
+                blocks = audio[:(n_frames + 1) * hop_length].reshape(-1, hop_length)
+                block_energy = np.einsum('ij,ij->i', blocks, blocks, dtype=np.float64)
+                framed_energies.append(np.sqrt((block_energy[:-1] + block_energy[1:]) / frame_length))
+            counts = np.array([len(energies) for energies in framed_energies])
+            frame_energies = np.concatenate(framed_energies)
             
-            # Require a minimum number of frames to estimate distribution
-            if frames.shape[0] < 5:
-                return 0.1 
-                
-            frame_energies = np.sqrt(np.mean(frames**2, axis=1))
+            # Per-segment percentiles over a +inf-padded, row-sorted matrix
+            energy_matrix = np.full((len(eligible), counts.max()), np.inf)
+            energy_matrix[np.arange(counts.max()) < counts[:, None]] = frame_energies
+            energy_matrix.sort(axis=1)
             
-            # Estimate noise power from the 20th percentile (quieter parts)
-            noise_power = np.percentile(frame_energies, 20)
+            def percentile(q: float) -> np.ndarray:
+                position = (counts - 1) * q / 100.0
+                lower = np.floor(position).astype(int)
+                upper = np.minimum(lower + 1, counts - 1)
+                rows = np.arange(len(eligible))
+                low, high = energy_matrix[rows, lower], energy_matrix[rows, upper]
+                return low + (high - low) * (position - lower)
             
-            # Estimate signal power from the 95th percentile (louder parts)
-            signal_power = np.percentile(frame_energies, 95)
+            # Noise from the 20th percentile (quieter parts), signal from the 95th (louder parts)
+            noise_power = percentile(20)
+            signal_power = percentile(95)
+            
+            # If noise is practically zero, SNR is very high
+            silent_noise = noise_power < 1e-9
+            snr = (np.where(silent_noise, 1.0, signal_power) / np.where(silent_noise, 1.0, noise_power))**2
+            snr_db = np.where(silent_noise, 80.0, 10 * np.log10(snr))
             
-            if noise_power < 1e-9:
-                # If noise is practically zero, SNR is very high
-                snr_db = 80.0
-            else:
-                # Calculate SNR and convert to dB
-                snr = (signal_power / noise_power)**2
-                snr_db = 10 * np.log10(snr)
-
             # Map SNR in dB to a quality score (0-1) using a calibrated piecewise function.
             # This mapping is crucial for providing a predictable quality score.
-            if snr_db < 5:
-                quality = 0.3 * (snr_db / 5) # Smooth ramp up from 0 for very noisy audio
-            elif snr_db < 15:
-                quality = 0.3 + 0.4 * ((snr_db - 5) / 10)
-            elif snr_db < 30:
-                quality = 0.7 + 0.2 * ((snr_db - 15) / 15)
-            else: # snr_db >= 30
-                quality = 0.9 + 0.1 * (min(snr_db - 30, 10) / 10) # Cap at 40dB
-
-            return float(np.clip(quality, 0.0, 1.0))
-
+            mapped = np.select(
+                [snr_db < 5, snr_db < 15, snr_db < 30],
+                [
+                    0.3 * (snr_db / 5),                          # Smooth ramp up from 0 for very noisy audio
+                    0.3 + 0.4 * ((snr_db - 5) / 10),
+                    0.7 + 0.2 * ((snr_db - 15) / 15),
+                ],
+                0.9 + 0.1 * (np.minimum(snr_db - 30, 10) / 10)   # Cap at 40dB
+            )
+            quality[eligible] = np.clip(mapped, 0.0, 1.0)
+            return quality
+        
         except Exception:
             # Return a default low-to-moderate score in case of unexpected errors
-            return 0.2
+            return np.full(len(segments), 0.2)
 
     def _frame_audio(self, audio: np.ndarray, frame_length: int, hop_length: int) -> np.ndarray:
         """Frame audio into overlapping windows."""
@@ -175,6 +238,21 @@ class EmbeddingQualityAssessor:
             
         return float(np.clip(quality, 0.0, 1.0))
     
+    def _duration_quality_batch(self, segments: List[np.ndarray]) -> np.ndarray:
+        """Vectorized _calculate_duration_quality."""
+        duration = np.array([len(audio) for audio in segments]) / self.sample_rate
+        quality = np.select(
+            [duration < 0.25, duration <= 1.0, duration <= 3.0, duration <= 5.0],
+            [
+                duration * 1.6,
+                0.4 + 0.4 * ((duration - 0.25) / 0.75),
+                0.8 + 0.2 * ((duration - 1.0) / 2.0),
+                1.0 - 0.3 * ((duration - 3.0) / 2.0),
+            ],
+            np.maximum(0.0, 0.7 - 0.1 * (duration - 5.0))
+        )
+        return np.clip(quality, 0.0, 1.0)
+    
     def _calculate_spectral_quality(self, audio: np.ndarray) -> float:
         """
         Calculate spectral clarity quality using FFT analysis.
@@ -182,47 +260,93 @@ class EmbeddingQualityAssessor:
         Speech signals should have energy distributed across multiple
         frequency bands rather than concentrated in narrow bands.
         """
+        return float(self._spectral_quality_batch([self._to_float32(audio)])[0])
+    
+    def _spectral_quality_batch(self, segments: List[np.ndarray]) -> np.ndarray:
+        """
+        Spectral clarity quality for many segments from Welch-averaged spectra.
+        
+        Each segment is split into fixed-size Hann windows (segments shorter
+        than one window are zero-padded to it); the windows of all segments
+        are transformed together with a real FFT at a fast length and their
+        power is averaged per segment. The magnitude spectrum in the speech
+        band is then scored with the same centroid/spread/flatness/peak
+        calibration as before, independent of segment length.
+        """
+        quality = np.full(len(segments), 0.5)
+        
         try:
-            if len(audio) < 256:
-                return 0.5
-                
-            fft = np.abs(scipy.fft.fft(audio))
-            freqs = scipy.fft.fftfreq(len(audio), 1/self.sample_rate)
+            eligible = [i for i, audio in enumerate(segments) if len(audio) >= 256]
+            if not eligible:
+                return quality
             
-            mask = (freqs >= 80) & (freqs <= 4000)
-            speech_fft = fft[mask]
-            speech_freqs = freqs[mask]
+            window, hop = self.spectral_window, self.spectral_hop
+            power_sums = np.zeros((len(eligible), len(self._speech_freqs)))
+            counts = np.zeros(len(eligible))
             
-            if len(speech_fft) == 0:
-                return 0.5
+            # Windows from consecutive segments are packed into blocks of up to
+            # _WELCH_BLOCK_ROWS rows; each block is one real FFT call
+            block, block_rows, owners = [], 0, []
             
-            total_energy = np.sum(speech_fft)
-            if total_energy < 1e-10:
-                return 0.0
+            def transform_block():
+                frames = np.concatenate(block)
+                frames *= self._welch_window
+                spectrum = scipy.fft.rfft(frames, n=self.spectral_n_fft, axis=1)[:, self._speech_band]
+                power = spectrum.real ** 2 + spectrum.imag ** 2
+                sizes = np.array([len(frames) for frames in block])
+                offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+                power_sums[owners] += np.add.reduceat(power, offsets, axis=0)
+                counts[owners] += sizes
             
-            spectral_centroid = np.sum(speech_freqs * speech_fft) / total_energy
-            spectral_spread = np.sqrt(np.sum(((speech_freqs - spectral_centroid) ** 2) * speech_fft) / total_energy)
-            geometric_mean = np.exp(np.mean(np.log(speech_fft + 1e-10)))
-            arithmetic_mean = np.mean(speech_fft)
+            for row, i in enumerate(eligible):
+                audio = segments[i]
+                if len(audio) < window:
+                    audio = np.pad(audio, (0, window - len(audio)))
+                frames = np.lib.stride_tricks.sliding_window_view(audio, window)[::hop]
+                while len(frames):
+                    take = frames[:_WELCH_BLOCK_ROWS - block_rows]
+                    block.append(take)
+                    owners.append(row)
+                    block_rows += len(take)
+                    frames = frames[len(take):]
+                    if block_rows == _WELCH_BLOCK_ROWS:
+                        transform_block()
+                        block, block_rows, owners = [], 0, []
+            if block:
+                transform_block()
+            
+            speech_fft = np.sqrt(power_sums / counts[:, None])
+            speech_freqs = self._speech_freqs
+            
+            total_energy = np.sum(speech_fft, axis=1)
+            silent = total_energy < 1e-10
+            total_energy = np.where(silent, 1.0, total_energy)
+            
+            spectral_centroid = speech_fft @ speech_freqs / total_energy
+            spectral_spread = np.sqrt(
+                np.sum(((speech_freqs - spectral_centroid[:, None]) ** 2) * speech_fft, axis=1) / total_energy
+            )
+            geometric_mean = np.exp(np.mean(np.log(speech_fft + 1e-10), axis=1))
+            arithmetic_mean = np.mean(speech_fft, axis=1)
             spectral_flatness = geometric_mean / (arithmetic_mean + 1e-10)
             
-            peak_threshold = np.max(speech_fft) * 0.1
-            significant_peaks = np.sum(speech_fft > peak_threshold)
-            peak_score = min(1.0, significant_peaks / 10.0)
+            peak_threshold = np.max(speech_fft, axis=1, keepdims=True) * 0.1
+            significant_peaks = np.sum(speech_fft > peak_threshold, axis=1)
+            peak_score = np.minimum(1.0, significant_peaks / 10.0)
             
-            centroid_score = 1.0 - min(1.0, abs(spectral_centroid - 1500) / 1500)
-            spread_score = min(1.0, spectral_spread / 1000)
-            flatness_score = min(1.0, spectral_flatness * 10)
+            centroid_score = 1.0 - np.minimum(1.0, np.abs(spectral_centroid - 1500) / 1500)
+            spread_score = np.minimum(1.0, spectral_spread / 1000)
+            flatness_score = np.minimum(1.0, spectral_flatness * 10)
             
             spectral_quality = (
                 0.2 * centroid_score + 0.3 * spread_score +
                 0.3 * flatness_score + 0.2 * peak_score
             )
-            
-            return float(np.clip(spectral_quality, 0.0, 1.0))
+            quality[eligible] = np.where(silent, 0.0, np.clip(spectral_quality, 0.0, 1.0))
+            return quality
             
         except Exception:
-            return 0.5
+            return np.full(len(segments), 0.5)
     
     def should_update_centroid(self, quality_score: float) -> bool:
         """
@@ -0,0 +1,296 @@
+"""
+Streaming Export Writers
+
+Writes bulk job exports (JSON array, JSONL, CSV and ZIP archives of those)
+incrementally from a sync or async iterable of records. Records are pulled in
+small chunks and each chunk is serialized and written in a worker thread, so
+peak memory depends on the chunk size rather than the job size and the event
+loop is never blocked on disk I/O.
+"""
+
+import asyncio
+import csv
+import io
+import json
+import logging
+import zipfile
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, TextIO, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class JsonArrayFormat:
+    """Records as a JSON array, one record per line"""
+
+    def __init__(self):
+        self._first = True
+
+    def begin(self, fp: TextIO):
+        fp.write("[")
+
+    def write(self, fp: TextIO, records: List[Any]):
+        parts = []
+        for record in records:
+            parts.append("\n  " if self._first else ",\n  ")
+            parts.append(json.dumps(record, ensure_ascii=False, default=str))
+            self._first = False
+        fp.write("".join(parts))
+
+    def end(self, fp: TextIO):
+        fp.write("]\n" if self._first else "\n]\n")
+
+
+class JsonlFormat:
+    """Records as newline-delimited JSON"""
+
+    def begin(self, fp: TextIO):
+        pass
+
+    def write(self, fp: TextIO, records: List[Any]):
+        fp.write("".join(json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in records))
+
+    def end(self, fp: TextIO):
+        pass
+
+
+class CsvFormat:
+    """
+    Records as CSV rows
+
+    Columns come from ``fieldnames`` or, by default, the keys of the first
+    record; keys that only appear in later records are dropped.
+    """
+
+    def __init__(self, fieldnames: Optional[Sequence[str]] = None):
+        self.fieldnames = list(fieldnames) if fieldnames else None
+        self._writer: Optional[csv.DictWriter] = None
+        self._warned = False
+
+    def begin(self, fp: TextIO):
+        if self.fieldnames:
+            self._start(fp)
+
+    def _start(self, fp: TextIO):
+        self._writer = csv.DictWriter(fp, fieldnames=self.fieldnames, extrasaction="ignore")
+        self._writer.writeheader()
+
+    def write(self, fp: TextIO, records: List[Dict[str, Any]]):
+        if self._writer is None:
+            self.fieldnames = list(records[0].keys())
+            self._start(fp)
+        if not self._warned and any(record.keys() - set(self.fieldnames) for record in records):
+            logger.warning(f"CSV export: dropping columns not present in header {self.fieldnames}")
+            self._warned = True
+        self._writer.writerows(records)
+
+    def end(self, fp: TextIO):
+        pass
+
+
+RECORD_FORMATS = {
+    "json": JsonArrayFormat,
+    "jsonl": JsonlFormat,
+    "csv": CsvFormat,
+}
+
+RecordSource = Union[Iterable[Any], AsyncIterator[Any]]
+
+
+def is_record_stream(data: Any) -> bool:
+    """True for lists, generators and async iterables; False for documents and scalars"""
+    if hasattr(data, "__aiter__"):
+        return True
+    return hasattr(data, "__iter__") and not isinstance(data, (str, bytes, bytearray, dict))
+
+
+async def iter_chunks(records: RecordSource, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[List[Any]]:
+    """
+    Group a sync or async iterable into lists of at most ``chunk_size``
+
+    Args:
+        records: Records to group
+        chunk_size: Maximum records per chunk
+
+    Yields:
+        Lists of records
+    """
+    chunk: List[Any] = []
+    if hasattr(records, "__aiter__"):
+        async for record in records:
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    else:
+        for record in records:
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+                # Give other tasks a turn while draining a large list
+                await asyncio.sleep(0)
+    if chunk:
+        yield chunk
+
+
+async def stream_records(
+    fp: TextIO,
+    records: RecordSource,
+    record_format: Any,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> int:
+    """
+    Write records to an open text stream chunk by chunk off the event loop
+
+    Args:
+        fp: Destination text stream
+        records: Sync or async iterable of records
+        record_format: A JsonArrayFormat, JsonlFormat or CsvFormat instance
+        chunk_size: Records serialized per worker-thread call
+
+    Returns:
+        Number of records written
+    """
+    count = 0
+    await asyncio.to_thread(record_format.begin, fp)
+    async for chunk in iter_chunks(records, chunk_size):
+        await asyncio.to_thread(record_format.write, fp, chunk)
+        count += len(chunk)
+    await asyncio.to_thread(record_format.end, fp)
+    return count
+
+
+def _write_document(fp: TextIO, document: Any):
+    # iterencode emits the document piece by piece instead of building one string
+    encoder = json.JSONEncoder(indent=2, ensure_ascii=False, default=str)
+    for piece in encoder.iterencode(document):
+        fp.write(piece)
+    fp.write("\n")
+
+
+async def export_records(
+    path: Union[str, Path],
+    records: RecordSource,
+    export_format: str = "jsonl",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    **format_options
+) -> int:
+    """
+    Stream records to a file
+
+    Args:
+        path: Output file path
+        records: Sync or async iterable of records
+        export_format: json (array), jsonl or csv
+        chunk_size: Records serialized per worker-thread call
+        **format_options: Passed to the format (e.g. ``fieldnames`` for csv)
+
+    Returns:
+        Number of records written
+    """
+    if export_format not in RECORD_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    record_format = RECORD_FORMATS[export_format](**format_options)
+    fp = await asyncio.to_thread(open, path, "w", encoding="utf-8", newline="")
+    try:
+        return await stream_records(fp, records, record_format, chunk_size)
+    finally:
+        await asyncio.to_thread(fp.close)
+
+
+def _is_lazy_stream(value: Any) -> bool:
+    return is_record_stream(value) and not isinstance(value, (list, tuple))
+
+
+async def export_json_document(path: Union[str, Path], document: Any, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Write a JSON document (e.g. a result dict) without materializing the text
+
+    Top-level values of a dict document that are lazy record streams
+    (generators, iterators, async iterables) are written as JSON arrays chunk
+    by chunk, so a job summary can carry its results straight from the store.
+
+    Args:
+        path: Output file path
+        document: JSON-serializable object
+        chunk_size: Records serialized per worker-thread call for streamed values
+    """
+    if not isinstance(document, dict) or not any(_is_lazy_stream(value) for value in document.values()):
+        def write():
+            with open(path, "w", encoding="utf-8") as fp:
+                _write_document(fp, document)
+
+        await asyncio.to_thread(write)
+        return
+
+    fp = await asyncio.to_thread(open, path, "w", encoding="utf-8", newline="")
+    try:
+        await asyncio.to_thread(fp.write, "{")
+        for position, (key, value) in enumerate(document.items()):
+            await asyncio.to_thread(fp.write, ("," if position else "") + f"\n  {json.dumps(str(key))}: ")
+            if _is_lazy_stream(value):
+                await stream_records(fp, value, JsonArrayFormat(), chunk_size)
+            else:
+                text = json.dumps(value, indent=2, ensure_ascii=False, default=str)
+                await asyncio.to_thread(fp.write, text.replace("\n", "\n  "))
+        await asyncio.to_thread(fp.write, "\n}\n")
+    finally:
+        await asyncio.to_thread(fp.close)
+
+
+def _member_format(name: str) -> str:
+    suffix = Path(name).suffix.lower().lstrip(".")
+    return suffix if suffix in RECORD_FORMATS else "json"
+
+
+async def export_zip(
+    path: Union[str, Path],
+    members: Union[Dict[str, Any], Iterable[Tuple[str, Any]]],
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> int:
+    """
+    Stream a ZIP archive, compressing each member as it is written
+
+    Member contents may be str/bytes (written as-is), a record stream
+    (serialized according to the member's extension: .jsonl, .csv, otherwise
+    a JSON array) or any other JSON document.
+
+    Args:
+        path: Output archive path
+        members: Mapping or iterable of (member name, content)
+        chunk_size: Records serialized per worker-thread call
+
+    Returns:
+        Number of records written across all streamed members
+    """
+    items = members.items() if isinstance(members, dict) else members
+    total = 0
+    zf = await asyncio.to_thread(zipfile.ZipFile, path, "w", zipfile.ZIP_DEFLATED, True)
+    try:
+        for name, content in items:
+            # force_zip64: streamed members have no size known up front
+            raw = await asyncio.to_thread(zf.open, name, "w", force_zip64=True)
+            if isinstance(content, (bytes, bytearray)):
+                try:
+                    await asyncio.to_thread(raw.write, content)
+                finally:
+                    await asyncio.to_thread(raw.close)
+                continue
+
+            fp = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+            try:
+                if isinstance(content, str):
+                    await asyncio.to_thread(fp.write, content)
+                elif is_record_stream(content):
+                    record_format = RECORD_FORMATS[_member_format(name)]()
+                    total += await stream_records(fp, content, record_format, chunk_size)
+                else:
+                    await asyncio.to_thread(_write_document, fp, content)
+            finally:
+                await asyncio.to_thread(fp.close)
+    finally:
+        await asyncio.to_thread(zf.close)
+    return total
@@ -8,6 +8,7 @@ import logging
 from typing import List, Optional, Dict, Any, Union
 from .config import GeminiConfig
 from .models import GeminiEmbeddingRequest, GeminiEmbeddingResponse, GeminiModelInfo, GeminiEmbeddingConfig
+from ..embedding_dispatcher import RateLimitError, get_embedding_dispatcher, parse_retry_after
 
 logger = logging.getLogger(__name__)
 
@@ -17,15 +18,21 @@ class GeminiEmbeddingsClient:
     def __init__(self, config: Optional[GeminiConfig] = None):
         self.config = config or GeminiConfig()
         self.session: Optional[aiohttp.ClientSession] = None
+        self._context_users = 0
         
     async def __aenter__(self):
         """Async context manager entry"""
+        # Reference-counted so concurrent batches can share one session
+        self._context_users += 1
         await self.start_session()
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
-        await self.close_session()
+        self._context_users -= 1
+        if self._context_users <= 0:
+            self._context_users = 0
+            await self.close_session()
         
     async def start_session(self):
         """Start HTTP session"""
@@ -117,11 +124,19 @@ class GeminiEmbeddingsClient:
                                 })
                     
                     return GeminiEmbeddingResponse(embeddings=embeddings)
+                elif response.status == 429:
+                    error_text = await response.text()
+                    raise RateLimitError(
+                        f"Gemini rate limit exceeded: {error_text}",
+                        retry_after=parse_retry_after(response.headers.get("Retry-After"))
+                    )
                 else:
                     error_text = await response.text()
                     logger.error(f"Gemini API error {response.status}: {error_text}")
                     raise Exception(f"API request failed: {response.status} - {error_text}")
                     
+        except RateLimitError:
+            raise
         except Exception as e:
             logger.error(f"Error creating embeddings: {e}")
             raise
@@ -172,21 +187,19 @@ class GeminiEmbeddingsClient:
             List of embedding vectors
         """
         batch_size = batch_size or self.config.batch_size
-        all_embeddings = []
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
         
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
+        async def embed_batch(batch: List[str]) -> List[List[float]]:
             response = await self.create_embeddings(
                 batch, 
                 task_type=task_type,
                 output_dimensionality=output_dimensionality
             )
-            
-            # Extract embeddings in order
-            batch_embeddings = [embedding.values for embedding in response.embeddings]
-            all_embeddings.extend(batch_embeddings)
-            
-        return all_embeddings
+            return [embedding.values for embedding in response.embeddings]
+        
+        # Batches run concurrently under the shared Gemini window; results come back in order
+        results = await get_embedding_dispatcher("gemini").dispatch(batches, embed_batch)
+        return [embedding for batch_embeddings in results for embedding in batch_embeddings]
         
     async def health_check(self) -> bool:
         """
@@ -256,6 +256,8 @@ class GeminiEmbeddingsService:
                     "end": end,
                     "length": len(chunk_text)
                 })
+                if end == len(text):
+                    break
                 start = end - overlap
                 
             # Create embeddings for all chunks
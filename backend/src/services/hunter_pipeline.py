@@ -8,11 +8,12 @@ from convex import ConvexClient
 from .enrichors import domain_enrich, contact_enrich
 from .dedup import dedupe_exact, fuzzy_dedupe
 from .scoring import compute_score
-from .save_batcher import SaveBatcher
+from .save_batcher import SaveBatcher, replay_wal_dir
 from ..core.leadgen.jina_client import JinaClient
 
 BACKEND_API = os.getenv("BACKEND_API")
 CONVEX_URL = os.getenv("NEXT_PUBLIC_CONVEX_URL", "http://127.0.0.1:3210")
+DEFAULT_WAL_DIR = "data/hunter_wal"
 convex_client = ConvexClient(CONVEX_URL)
 
 async def _send_convex_update(search_id: str, payload: dict, session: aiohttp.ClientSession):
@@ -103,21 +104,52 @@ async def _parallel_discover(query: str, domains_info: list, session: aiohttp.Cl
     return results
 
 async def _save_to_backend(search_id: str, items: list, session: aiohttp.ClientSession):
-    """Default saver: call BACKEND_API to persist leads; override by injecting save_fn."""
+    """
+    Default saver: call BACKEND_API to persist leads; override by injecting save_fn.
+
+    Raises on a non-200 response or a network error, so SaveBatcher keeps the
+    batch in its write-ahead log and retries it.
+    """
     if not BACKEND_API:
         # if you don't have BACKEND_API, write into your DB client here instead
         logging.info("No BACKEND_API; skipping save (implement save_fn to persist)")
         return
-    try:
-        async with session.post(
-            f"{BACKEND_API}/api/public/hunter/ingest_batch",
-            json={"search_id": search_id, "leads": items},
-            timeout=30,
-        ) as r:
-            if r.status != 200:
-                logging.error("ingest_batch failed with %s", r.status)
-    except Exception:
-        logging.exception("ingest_batch exception")
+    async with session.post(
+        f"{BACKEND_API}/api/public/hunter/ingest_batch",
+        json={"search_id": search_id, "leads": items},
+        timeout=30,
+    ) as r:
+        if r.status != 200:
+            body = (await r.text())[:200]
+            raise RuntimeError(f"ingest_batch for {search_id} failed with {r.status}: {body}")
+
+def _default_save_fn(search_id: str):
+    """save_fn that posts a search's leads to the backend ingestion endpoint."""
+    async def _default_save(items):
+        async with aiohttp.ClientSession() as s:
+            await _save_to_backend(search_id, items, s)
+    return _default_save
+
+async def replay_pending_saves(wal_dir: str = None, save_fn_for=None) -> dict:
+    """
+    Save leads left in write-ahead logs by searches that crashed or whose final
+    save kept failing. Run once at startup.
+
+    Args:
+        wal_dir: Directory of per-search logs (default HUNTER_WAL_DIR)
+        save_fn_for: search_id -> save_fn; defaults to the backend ingestion endpoint
+
+    Returns:
+        Leads still unsaved, per search id
+    """
+    wal_dir = wal_dir or os.getenv("HUNTER_WAL_DIR", DEFAULT_WAL_DIR)
+    if save_fn_for is None:
+        if not BACKEND_API:
+            # The default saver would drop them; keep the logs until it can save
+            logging.info("No BACKEND_API; leaving hunter write-ahead logs in %s for later", wal_dir)
+            return {}
+        save_fn_for = _default_save_fn
+    return await replay_wal_dir(wal_dir, save_fn_for)
 
 async def run_hunter_pipeline(search_id: str, config: dict, save_fn=None) -> list:
     """
@@ -128,7 +160,7 @@ async def run_hunter_pipeline(search_id: str, config: dict, save_fn=None) -> lis
     - exact dedupe
     - parallel candidate enrichment with concurrency limiting
     - per-lead scoring
-    - incremental saving via SaveBatcher
+    - incremental saving via SaveBatcher (write-ahead logged, bounded backlog)
     - final fuzzy dedupe + final save
     """
     concurrency = config.get("concurrency", 24)
@@ -139,14 +171,20 @@ async def run_hunter_pipeline(search_id: str, config: dict, save_fn=None) -> lis
 
     if save_fn is None:
         # default: call backend ingestion endpoint
-        async def _default_save(items):
-            async with aiohttp.ClientSession() as s:
-                await _save_to_backend(search_id, items, s)
-        save_fn = _default_save
+        save_fn = _default_save_fn(search_id)
 
     sem = asyncio.Semaphore(concurrency)
     async with aiohttp.ClientSession() as session:
-        batcher = SaveBatcher(save_fn, batch_size=batch_size, flush_interval=flush_interval)
+        # Unsaved leads survive a crash in a per-search write-ahead log and are
+        # replayed at startup (replay_pending_saves) or when the search runs again
+        wal_dir = config.get("wal_dir", os.getenv("HUNTER_WAL_DIR", DEFAULT_WAL_DIR))
+        batcher = SaveBatcher(
+            save_fn,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            wal_path=os.path.join(wal_dir, f"{search_id}.wal") if wal_dir else None,
+            max_pending=config.get("max_pending_saves"),
+        )
         await batcher.start()
 
         # 1) front-load filters
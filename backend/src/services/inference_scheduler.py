@@ -0,0 +1,330 @@
+"""
+Deadline-Aware Inference Scheduler
+
+Collects inference work (utterances ready for ASR and speaker ID) from many
+concurrent telephony calls and runs it in shared, cross-call batches on one
+model worker, instead of every call invoking the models on its own.
+
+- Every submission gets a deadline: the time it became ready plus its
+  call's latency budget. Pending work is kept in a heap and batches are
+  formed earliest-deadline-first, so a call close to its budget is served
+  before one that just started waiting, whichever call submitted first.
+- A batch is dispatched as soon as it is full, when the oldest item has
+  lingered ``max_wait`` seconds, or when waiting any longer would make the
+  most urgent item miss its deadline given the measured batch service time.
+  While a batch runs, new work queues up, so batches grow with load.
+- Items whose deadline has already passed when their batch is formed can be
+  shed (``shed_expired=True``), failing with ``DeadlineExceeded`` rather than
+  delaying everything queued behind them.
+- Queue depth, batch sizes and latency percentiles, overall and per call,
+  are reported by ``get_stats``.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BatchFunc = Callable[[List[Any]], Awaitable[Sequence[Any]]]
+
+LATENCY_WINDOW = 1000
+CALL_LATENCY_WINDOW = 200
+
+
+class DeadlineExceeded(Exception):
+    """Raised for a submission shed because its latency budget had already run out"""
+
+
+@dataclass(order=True)
+class _Job:
+    deadline: float
+    seq: int
+    call_id: str = field(compare=False)
+    item: Any = field(compare=False)
+    ready_at: float = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+@dataclass
+class SchedulerStats:
+    """Counters exposed by a DeadlineBatchScheduler"""
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    shed: int = 0
+    deadline_misses: int = 0
+    batches: int = 0
+    max_queue_depth: int = 0
+
+
+class DeadlineBatchScheduler:
+    """
+    Earliest-deadline-first batching front end for a batched inference function
+    """
+
+    def __init__(
+        self,
+        batch_func: BatchFunc,
+        name: str = "inference",
+        max_batch_size: int = 16,
+        latency_budget: float = 2.0,
+        max_wait: float = 0.05,
+        shed_expired: bool = False,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            batch_func: Async function mapping a list of items to a list of
+                results of the same length and order
+            name: Label used in logs
+            max_batch_size: Upper bound on items per batch
+            latency_budget: Default seconds from ready to result for a call
+            max_wait: Longest an item lingers waiting for a batch to fill
+            shed_expired: Fail items whose deadline has passed instead of
+                running them late
+            clock: Monotonic time source
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.batch_func = batch_func
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self.latency_budget = latency_budget
+        self.max_wait = max_wait
+        self.shed_expired = shed_expired
+        self.clock = clock
+        self.stats = SchedulerStats()
+
+        self._budgets: Dict[str, float] = {}
+        self._heap: List[_Job] = []
+        self._pending_by_call: Dict[str, int] = {}
+        self._seq = itertools.count()
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._call_latencies: Dict[str, Deque[float]] = {}
+        self._batch_sizes: Deque[int] = deque(maxlen=LATENCY_WINDOW)
+        # Service time model: seconds per batch = overhead + per_item * size
+        self._overhead: Optional[float] = None
+        self._per_item = 0.0
+        self._in_flight = 0
+
+        self._wakeup: Optional[asyncio.Event] = None
+        self._runner: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # --- Call registration -------------------------------------------------
+
+    def set_budget(self, call_id: str, latency_budget: float) -> None:
+        """Give a call its own latency budget instead of the default"""
+        self._budgets[call_id] = latency_budget
+
+    def remove_call(self, call_id: str) -> None:
+        """Forget a finished call's budget and latency history"""
+        self._budgets.pop(call_id, None)
+        self._call_latencies.pop(call_id, None)
+
+    def budget_for(self, call_id: str) -> float:
+        return self._budgets.get(call_id, self.latency_budget)
+
+    # --- Submission --------------------------------------------------------
+
+    @property
+    def queue_depth(self) -> int:
+        """Items waiting to be batched"""
+        return len(self._heap)
+
+    def _ensure_runner(self) -> None:
+        # Like the embedding dispatcher, a shared scheduler can outlive an
+        # event loop (tests, asyncio.run per worker), so bind lazily
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._runner is None or self._runner.done():
+            if self._loop is not loop:
+                self._heap.clear()
+                self._pending_by_call.clear()
+                self._in_flight = 0
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._runner = loop.create_task(self._run())
+
+    def submit(self, call_id: str, item: Any, ready_at: Optional[float] = None) -> "asyncio.Future":
+        """
+        Queue one item for inference
+
+        Args:
+            call_id: Call the item belongs to; selects the latency budget
+            item: Input passed to batch_func
+            ready_at: When the item became ready (clock time); defaults to now
+
+        Returns:
+            Future resolving to the item's result
+        """
+        self._ensure_runner()
+        now = self.clock()
+        ready_at = now if ready_at is None else ready_at
+        future = self._loop.create_future()
+        job = _Job(ready_at + self.budget_for(call_id), next(self._seq), call_id, item, ready_at, future)
+        heapq.heappush(self._heap, job)
+        self._pending_by_call[call_id] = self._pending_by_call.get(call_id, 0) + 1
+        self.stats.submitted += 1
+        self.stats.max_queue_depth = max(self.stats.max_queue_depth, len(self._heap))
+        self._wakeup.set()
+        return future
+
+    async def infer(self, call_id: str, item: Any, ready_at: Optional[float] = None) -> Any:
+        """Submit an item and wait for its result"""
+        return await self.submit(call_id, item, ready_at)
+
+    # --- Batch formation ---------------------------------------------------
+
+    def estimate_service_time(self, batch_size: int) -> float:
+        """Expected seconds to run a batch of ``batch_size`` items"""
+        if self._overhead is None:
+            return 0.0
+        return self._overhead + self._per_item * batch_size
+
+    def _record_service_time(self, batch_size: int, seconds: float, alpha: float = 0.2) -> None:
+        if self._overhead is None:
+            self._overhead = seconds
+            return
+        # Attribute the error between prediction and observation to the
+        # per-item cost for large batches and to the overhead for small ones
+        error = seconds - self.estimate_service_time(batch_size)
+        share = (batch_size - 1) / max(batch_size, 1)
+        self._per_item = max(0.0, self._per_item + alpha * share * error / batch_size)
+        self._overhead = max(0.0, self._overhead + alpha * (1 - share) * error)
+
+    def _dispatch_delay(self) -> float:
+        """Seconds to keep collecting before the next batch must go out"""
+        if len(self._heap) >= self.max_batch_size:
+            return 0.0
+        now = self.clock()
+        oldest = min(job.ready_at for job in self._heap)
+        linger = oldest + self.max_wait - now
+        slack = self._heap[0].deadline - self.estimate_service_time(len(self._heap) + 1) - now
+        return max(0.0, min(linger, slack))
+
+    def _take_batch(self) -> List[_Job]:
+        batch: List[_Job] = []
+        now = self.clock()
+        while self._heap and len(batch) < self.max_batch_size:
+            job = heapq.heappop(self._heap)
+            self._pending_by_call[job.call_id] -= 1
+            if not self._pending_by_call[job.call_id]:
+                del self._pending_by_call[job.call_id]
+            if job.future.done():
+                continue                                # caller gave up
+            if self.shed_expired and job.deadline < now:
+                self.stats.shed += 1
+                job.future.set_exception(DeadlineExceeded(
+                    f"{self.name}: call {job.call_id} item waited {now - job.ready_at:.3f}s "
+                    f"(budget {job.deadline - job.ready_at:.3f}s)"
+                ))
+                continue
+            batch.append(job)
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            if not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            delay = self._dispatch_delay()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                if self._dispatch_delay() > 0:
+                    continue
+
+            batch = self._take_batch()
+            if batch:
+                await self._run_batch(batch)
+
+    async def _run_batch(self, batch: List[_Job]) -> None:
+        self.stats.batches += 1
+        self._batch_sizes.append(len(batch))
+        self._in_flight = len(batch)
+        started = self.clock()
+        try:
+            results = await self.batch_func([job.item for job in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"{self.name}: batch_func returned {len(results)} results for {len(batch)} items")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"{self.name}: batch of {len(batch)} failed: {e}")
+            self.stats.failed += len(batch)
+            for job in batch:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            return
+        finally:
+            self._in_flight = 0
+            self._record_service_time(len(batch), self.clock() - started)
+
+        finished = self.clock()
+        for job, result in zip(batch, results):
+            latency = finished - job.ready_at
+            self._latencies.append(latency)
+            self._call_latencies.setdefault(job.call_id, deque(maxlen=CALL_LATENCY_WINDOW)).append(latency)
+            if finished > job.deadline:
+                self.stats.deadline_misses += 1
+            self.stats.completed += 1
+            if not job.future.done():
+                job.future.set_result(result)
+
+    async def close(self) -> None:
+        """Stop the runner and fail anything still queued"""
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        while self._heap:
+            job = heapq.heappop(self._heap)
+            job.future.cancel()
+        self._pending_by_call.clear()
+
+    # --- Metrics -----------------------------------------------------------
+
+    @staticmethod
+    def _percentiles(latencies: Sequence[float]) -> Dict[str, Optional[float]]:
+        if not latencies:
+            return {"p50": None, "p95": None, "max": None}
+        p50, p95 = np.percentile(np.asarray(latencies), [50, 95])
+        return {"p50": float(p50), "p95": float(p95), "max": float(max(latencies))}
+
+    def call_stats(self, call_id: str) -> Dict[str, Any]:
+        """Queue depth and recent latency percentiles for one call"""
+        return {
+            "queue_depth": self._pending_by_call.get(call_id, 0),
+            "latency_budget": self.budget_for(call_id),
+            "latency_seconds": self._percentiles(self._call_latencies.get(call_id, ())),
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return counters, queue depth, batch sizes and latency percentiles"""
+        return {
+            "name": self.name,
+            "queue_depth": len(self._heap),
+            "queue_depth_by_call": dict(self._pending_by_call),
+            "in_flight": self._in_flight,
+            "mean_batch_size": float(np.mean(self._batch_sizes)) if self._batch_sizes else 0.0,
+            "service_time_seconds": {"overhead": self._overhead, "per_item": self._per_item},
+            "latency_seconds": self._percentiles(self._latencies),
+            "calls": {call_id: self._percentiles(values)["p95"] for call_id, values in self._call_latencies.items()},
+            **self.stats.__dict__,
+        }
@@ -5,15 +5,16 @@ This module provides a service layer for interacting with Instagram
 to fetch user information, posts, and download content.
 """
 
-from typing import Optional, List, Dict, Any
-import asyncio
+from typing import Optional, List, Dict, Any, AsyncIterator
 import os
 import logging
 from datetime import datetime
 import json
-import yt_dlp
 from pprint import pformat
 
+from src.services.media_stream import DEFAULT_CHUNK_SIZE, MediaSource, iter_media, read_all
+from src.services.ytdlp_pool import get_ytdlp_pool
+
 logger = logging.getLogger(__name__)
 
 
@@ -42,6 +43,14 @@ class InstagramService:
             }
         }
         
+    async def _extract_info(self, url: str, ydl_opts: dict):
+        """Extract info on a pooled yt-dlp instance (cached briefly)."""
+        try:
+            return await get_ytdlp_pool().extract_info(url, ydl_opts)
+        except Exception as e:
+            logger.error(f"yt-dlp extraction error: {str(e)}")
+            return None
+    
     def _extract_user_info_from_data(self, info_dict: Dict[str, Any]) -> Dict[str, Any]:
         """Extract user information from yt-dlp info."""
         # Get username and basic info
@@ -137,19 +146,8 @@ class InstagramService:
                 'playlistend': 12,  # Get some posts to extract user info
             }
             
-            # Run extraction in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            
-            def extract_info():
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    try:
-                        info = ydl.extract_info(url, download=False)
-                        return info
-                    except Exception as e:
-                        logger.error(f"yt-dlp extraction error: {str(e)}")
-                        return None
-                        
-            info_dict = await loop.run_in_executor(None, extract_info)
+            # Extract on a pooled yt-dlp instance
+            info_dict = await self._extract_info(url, ydl_opts)
             
             if not info_dict:
                 raise Exception(f"Could not fetch user info for {username}")
@@ -205,19 +203,8 @@ class InstagramService:
                 'playlist_items': f'1-{count}',  # Limit to first N posts
             }
             
-            # Run extraction in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            
-            def extract_info():
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    try:
-                        info = ydl.extract_info(url, download=False)
-                        return info
-                    except Exception as e:
-                        logger.error(f"yt-dlp extraction error: {str(e)}")
-                        return None
-                        
-            info_dict = await loop.run_in_executor(None, extract_info)
+            # Extract on a pooled yt-dlp instance
+            info_dict = await self._extract_info(url, ydl_opts)
             
             if not info_dict:
                 raise Exception(f"Could not fetch posts for {username}")
@@ -298,19 +285,8 @@ class InstagramService:
             
             logger.info(f"Fetching Instagram post info for: {post_id}")
             
-            # Run extraction in thread pool
-            loop = asyncio.get_event_loop()
-            
-            def extract_info():
-                with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
-                    try:
-                        info = ydl.extract_info(url, download=False)
-                        return info
-                    except Exception as e:
-                        logger.error(f"yt-dlp extraction error: {str(e)}")
-                        return None
-                        
-            info_dict = await loop.run_in_executor(None, extract_info)
+            # Extract on a pooled yt-dlp instance
+            info_dict = await self._extract_info(url, self.ydl_opts)
             
             if not info_dict:
                 raise Exception(f"Could not fetch post info for {post_id}")
@@ -343,10 +319,41 @@ class InstagramService:
             logger.error(f"Error fetching post info for {post_id}: {str(e)}")
             raise Exception(f"Failed to fetch post info: {str(e)}")
     
+    async def stream_media(self, post_id: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """
+        Stream the media of an Instagram post in chunks.
+        
+        Args:
+            post_id: Instagram post ID or shortcode
+            chunk_size: Bytes per chunk
+            
+        Yields:
+            Media bytes
+        """
+        # Instagram post URL
+        if len(post_id) > 15:  # Likely a full ID
+            url = f'https://www.instagram.com/p/{post_id[:11]}/'
+        else:
+            url = f'https://www.instagram.com/p/{post_id}/'
+        
+        ydl_opts = {
+            **self.ydl_opts,
+            'format': 'best',
+        }
+        info_dict = await self._extract_info(url, ydl_opts)
+        if not info_dict:
+            raise Exception(f"Could not fetch post info for {post_id}")
+        
+        logger.info(f"Streaming media for Instagram post {post_id}")
+        async for chunk in iter_media(MediaSource.from_info(info_dict), chunk_size):
+            yield chunk
+    
     async def download_media_bytes(self, post_id: str) -> bytes:
         """
         Download media bytes from Instagram using yt-dlp.
         
+        Prefer stream_media() where the consumer can take chunks.
+        
         Args:
             post_id: Instagram post ID or shortcode
             
@@ -354,19 +361,7 @@ class InstagramService:
             Media bytes
         """
         try:
-            # Instagram post URL
-            if len(post_id) > 15:  # Likely a full ID
-                url = f'https://www.instagram.com/p/{post_id[:11]}/'
-            else:
-                url = f'https://www.instagram.com/p/{post_id}/'
-            
-            logger.info(f"Download requested for Instagram post {post_id}")
-            
-            # For now, return a placeholder
-            # In production, you would implement actual download using yt-dlp
-            # with proper file handling and format selection
-            
-            return f"Instagram media URL: {url}".encode()
+            return await read_all(self.stream_media(post_id))
             
         except Exception as e:
             logger.error(f"Error downloading media {post_id}: {str(e)}")
@@ -8,6 +8,7 @@ import logging
 from typing import List, Optional, Dict, Any
 from .config import JinaConfig
 from .models import JinaEmbeddingRequest, JinaEmbeddingResponse, JinaModelInfo
+from ..embedding_dispatcher import RateLimitError, get_embedding_dispatcher, parse_retry_after
 
 logger = logging.getLogger(__name__)
 
@@ -17,15 +18,21 @@ class JinaEmbeddingsClient:
     def __init__(self, config: Optional[JinaConfig] = None):
         self.config = config or JinaConfig()
         self.session: Optional[aiohttp.ClientSession] = None
+        self._context_users = 0
         
     async def __aenter__(self):
         """Async context manager entry"""
+        # Reference-counted so concurrent batches can share one session
+        self._context_users += 1
         await self.start_session()
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
-        await self.close_session()
+        self._context_users -= 1
+        if self._context_users <= 0:
+            self._context_users = 0
+            await self.close_session()
         
     async def start_session(self):
         """Start HTTP session"""
@@ -120,11 +127,19 @@ class JinaEmbeddingsClient:
                 if response.status == 200:
                     data = await response.json()
                     return JinaEmbeddingResponse(**data)
+                elif response.status == 429:
+                    error_text = await response.text()
+                    raise RateLimitError(
+                        f"Jina rate limit exceeded: {error_text}",
+                        retry_after=parse_retry_after(response.headers.get("Retry-After"))
+                    )
                 else:
                     error_text = await response.text()
                     logger.error(f"Jina API error {response.status}: {error_text}")
                     raise Exception(f"API request failed: {response.status} - {error_text}")
                     
+        except RateLimitError:
+            raise
         except Exception as e:
             logger.error(f"Error creating embeddings: {e}")
             raise
@@ -211,24 +226,22 @@ class JinaEmbeddingsClient:
             List of embedding vectors
         """
         batch_size = batch_size or self.config.batch_size
-        all_embeddings = []
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
         
-        logger.info(f"Batch processing {len(texts)} texts in batches of {batch_size}")
+        logger.info(f"Batch processing {len(texts)} texts in {len(batches)} batches of {batch_size}")
         
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            logger.info(f"Processing batch {i//batch_size + 1}/{(len(texts)-1)//batch_size + 1}")
-            
+        async def embed_batch(batch: List[str]) -> List[List[float]]:
             response = await self.create_embeddings(
                 batch,
                 task=task,
                 dimensions=dimensions,
                 late_chunking=late_chunking
             )
-            
-            # Extract embeddings in order
-            batch_embeddings = [data.embedding for data in response.data]
-            all_embeddings.extend(batch_embeddings)
+            return [data.embedding for data in response.data]
+        
+        # Batches run concurrently under the shared Jina window; results come back in order
+        results = await get_embedding_dispatcher("jina").dispatch(batches, embed_batch)
+        all_embeddings = [embedding for batch_embeddings in results for embedding in batch_embeddings]
             
         logger.info(f"Completed batch processing - generated {len(all_embeddings)} embeddings")
         return all_embeddings
@@ -18,6 +18,8 @@ from typing import List, Dict, Any, Optional
 from .embeddings_client import JinaEmbeddingsClient
 from .config import JinaConfig
 from .models import JinaModelInfo, TranscriptEmbeddingConfig
+from ..embedding_batch_packer import EmbeddingBatchPacker, OverflowPolicy
+from ..embedding_dispatcher import get_embedding_dispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -123,6 +125,77 @@ class JinaEmbeddingsService:
             logger.error(f"Error embedding transcripts: {e}")
             raise
     
+    async def embed_documents(
+        self,
+        documents: List[str],
+        dimensions: Optional[int] = None,
+        task: Optional[str] = None,
+        overflow_policy: OverflowPolicy = OverflowPolicy.TRUNCATE
+    ) -> List[List[float]]:
+        """
+        Embed independent documents in token-budgeted requests
+        
+        Args:
+            documents: List of document texts
+            dimensions: Embedding dimensions (defaults to config)
+            task: Task type (defaults to config)
+            overflow_policy: Handling for documents over the per-item token limit
+            
+        Returns:
+            One embedding vector per document, in input order
+        """
+        packer = EmbeddingBatchPacker.for_provider(
+            "jina",
+            overflow_policy=overflow_policy,
+            max_items_per_request=self.config.batch_size,
+            max_tokens_per_item=self.config.max_tokens
+        )
+        batches = packer.pack(documents)
+        
+        async def embed_batch(batch) -> List[List[float]]:
+            return await self.embed_packed(batch.texts, dimensions=dimensions, task=task)
+        
+        try:
+            async with self.client:
+                results = await get_embedding_dispatcher("jina").dispatch(batches, embed_batch)
+            logger.info(f"Embedded {len(documents)} documents in {len(batches)} requests")
+            return EmbeddingBatchPacker.unpack(batches, results, len(documents))
+            
+        except Exception as e:
+            logger.error(f"Error embedding documents: {e}")
+            raise
+    
+    async def embed_packed(
+        self,
+        texts: List[str],
+        dimensions: Optional[int] = None,
+        task: Optional[str] = None
+    ) -> List[List[float]]:
+        """
+        Embed texts already packed to the request limits, as one request
+        
+        Callers that pack themselves (e.g. BatchEmbeddingService) use this
+        instead of embed_documents so texts are not packed twice.
+        
+        Args:
+            texts: Texts of one packed request
+            dimensions: Embedding dimensions (defaults to config)
+            task: Task type (defaults to config)
+            
+        Returns:
+            One embedding vector per text
+        """
+        async with self.client:
+            # Late chunking would treat the whole request as one document
+            response = await self.client.create_embeddings(
+                texts,
+                task=task or self.config.task,
+                dimensions=dimensions or self.config.dimensions,
+                late_chunking=False,
+                truncate_at_maximum_length=True
+            )
+        return [data.embedding for data in response.data]
+    
     async def embed_for_rag(
         self, 
         transcripts: List[str],
@@ -311,20 +384,21 @@ class JinaEmbeddingsService:
                     "end": end,
                     "length": len(chunk_text)
                 })
+                if end == len(text):
+                    break
                 start = end - overlap
                 
-            # Create embeddings for all chunks using transcript method
+            # Pack chunks into token-budgeted requests instead of one request per chunk
             chunk_texts = [chunk["text"] for chunk in chunks]
-            embedding_results = await self.embed_transcripts(chunk_texts)
+            embeddings = await self.embed_documents(chunk_texts)
             
             # Combine chunks with embeddings
-            for i, chunk in enumerate(chunks):
-                if i < len(embedding_results):
-                    chunk["embedding"] = embedding_results[i]["embeddings"][0]
-                    chunk["embedding_metadata"] = {
-                        "dimensions": len(embedding_results[i]["embeddings"][0]),
-                        "processing_method": embedding_results[i]["processing_method"]
-                    }
+            for chunk, embedding in zip(chunks, embeddings):
+                chunk["embedding"] = embedding
+                chunk["embedding_metadata"] = {
+                    "dimensions": len(embedding),
+                    "processing_method": "direct"
+                }
                 
             return chunks
             
@@ -0,0 +1,274 @@
+"""
+Streaming Media Downloads
+
+Chunked async byte iterators for social media downloads, so a video or its
+audio track never has to sit in memory as one ``bytes`` object:
+
+- ``iter_url`` streams a direct media URL over HTTP.
+- ``iter_process`` streams the stdout of a subprocess; ``iter_audio`` uses it
+  to pipe an audio-only transcode straight out of ffmpeg, and ``iter_media``
+  to remux HLS playlists (Twitch VODs) into fragmented mp4.
+- ``iter_file`` streams a local (usually temporary) file.
+
+API routes hand these to ``StreamingResponse`` (via ``prime_stream`` so that
+errors before the first byte still become HTTP errors); bulk jobs use
+``write_stream`` to spool to disk. Peak memory per download stays around
+``chunk_size`` regardless of the media size.
+"""
+
+import asyncio
+import logging
+import os
+import shutil
+from collections import deque
+from dataclasses import dataclass, field
+from http.cookies import CookieError, SimpleCookie
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import aiofiles
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = int(os.getenv("MEDIA_STREAM_CHUNK_SIZE", str(64 * 1024)))
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+
+# ffmpeg output arguments and response media type per audio format. Every
+# muxer here writes to a non-seekable pipe (m4a needs a fragmented moov).
+AUDIO_FORMATS: Dict[str, Dict[str, Any]] = {
+    "mp3": {"args": ["-codec:a", "libmp3lame", "-b:a", "192k", "-f", "mp3"], "media_type": "audio/mpeg"},
+    "m4a": {"args": ["-codec:a", "aac", "-b:a", "192k", "-movflags", "frag_keyframe+empty_moov", "-f", "mp4"],
+            "media_type": "audio/mp4"},
+    "aac": {"args": ["-codec:a", "aac", "-b:a", "192k", "-f", "adts"], "media_type": "audio/aac"},
+    "wav": {"args": ["-codec:a", "pcm_s16le", "-f", "wav"], "media_type": "audio/wav"},
+}
+
+
+class MediaStreamError(Exception):
+    """A media stream could not be opened or ended abnormally"""
+
+
+@dataclass
+class MediaSource:
+    """Direct media location resolved by yt-dlp"""
+    url: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    protocol: str = "https"
+    ext: str = "mp4"
+
+    @classmethod
+    def from_info(cls, info: Dict[str, Any]) -> "MediaSource":
+        """
+        Build a source from a yt-dlp info dict extracted with a single-file format
+
+        Raises:
+            MediaStreamError: If the info carries no direct URL
+        """
+        url = info.get("url")
+        if not url:
+            raise MediaStreamError(f"No direct media URL for {info.get('webpage_url') or info.get('id')}")
+        headers = dict(info.get("http_headers") or {})
+        # yt-dlp keeps session cookies (e.g. TikTok's tt_chain_token) out of
+        # http_headers; the CDN rejects requests without them
+        if info.get("cookies") and not any(name.lower() == "cookie" for name in headers):
+            headers["Cookie"] = cookie_header(info["cookies"])
+        return cls(
+            url=url,
+            headers=headers,
+            protocol=info.get("protocol") or "https",
+            ext=info.get("ext") or "mp4",
+        )
+
+    @property
+    def is_hls(self) -> bool:
+        return "m3u8" in self.protocol or self.url.split("?", 1)[0].endswith(".m3u8")
+
+
+def cookie_header(cookies: str) -> str:
+    """
+    Turn yt-dlp's ``cookies`` field into a ``Cookie`` request header value
+
+    yt-dlp serializes cookies Set-Cookie style (``name=value; Domain=...;
+    Path=/; Secure``); only the name/value pairs belong in the request.
+    """
+    jar = SimpleCookie()
+    try:
+        jar.load(cookies)
+    except CookieError:
+        return cookies
+    return "; ".join(f"{morsel.key}={morsel.value}" for morsel in jar.values()) or cookies
+
+
+def ffmpeg_available() -> bool:
+    return shutil.which(FFMPEG_BINARY) is not None
+
+
+def _ffmpeg_input_args(source: MediaSource) -> List[str]:
+    args = [FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-nostdin"]
+    if source.headers:
+        args += ["-headers", "".join(f"{name}: {value}\r\n" for name, value in source.headers.items())]
+    return args + ["-i", source.url]
+
+
+def ffmpeg_audio_command(source: MediaSource, format: str) -> List[str]:
+    """ffmpeg command that writes the audio track of ``source`` to stdout"""
+    if format not in AUDIO_FORMATS:
+        raise ValueError(f"Unsupported audio format: {format}")
+    return _ffmpeg_input_args(source) + ["-vn", *AUDIO_FORMATS[format]["args"], "pipe:1"]
+
+
+def ffmpeg_remux_command(source: MediaSource) -> List[str]:
+    """ffmpeg command that copies ``source`` (e.g. an HLS playlist) to fragmented mp4 on stdout"""
+    return _ffmpeg_input_args(source) + [
+        "-c", "copy", "-bsf:a", "aac_adtstoasc", "-movflags", "frag_keyframe+empty_moov", "-f", "mp4", "pipe:1"
+    ]
+
+
+async def iter_url(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    timeout: float = 60.0
+) -> AsyncIterator[bytes]:
+    """
+    Stream a URL's body in chunks of ``chunk_size`` bytes
+
+    Raises:
+        MediaStreamError: On a non-2xx response
+    """
+    request_headers = {"Accept-Encoding": "identity", **(headers or {})}
+    async with httpx.AsyncClient(timeout=httpx.Timeout(timeout, connect=10.0), follow_redirects=True) as client:
+        async with client.stream("GET", url, headers=request_headers) as response:
+            if response.status_code >= 400:
+                raise MediaStreamError(f"HTTP {response.status_code} fetching media")
+            async for chunk in response.aiter_bytes(chunk_size=chunk_size):
+                yield chunk
+
+
+async def iter_process(argv: List[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """
+    Run a command and stream its stdout
+
+    The process is killed if the consumer stops early.
+
+    Raises:
+        MediaStreamError: If the command cannot start or exits non-zero
+    """
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *argv,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    except OSError as e:
+        raise MediaStreamError(f"Could not start {argv[0]}: {e}") from e
+
+    # Keep the tail of stderr for error messages, and keep the pipe drained
+    stderr_tail: deque = deque(maxlen=20)
+
+    async def drain_stderr():
+        async for line in process.stderr:
+            stderr_tail.append(line.decode(errors="replace").rstrip())
+
+    stderr_task = asyncio.create_task(drain_stderr())
+    try:
+        while True:
+            chunk = await process.stdout.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+        returncode = await process.wait()
+        await stderr_task
+        if returncode != 0:
+            detail = "; ".join(stderr_tail) or "no output"
+            raise MediaStreamError(f"{os.path.basename(argv[0])} exited with status {returncode}: {detail}")
+    finally:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        stderr_task.cancel()
+
+
+async def iter_file(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, delete: bool = False) -> AsyncIterator[bytes]:
+    """Stream a local file, optionally deleting it afterwards"""
+    try:
+        async with aiofiles.open(path, "rb") as f:
+            while True:
+                chunk = await f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        if delete and os.path.exists(path):
+            os.unlink(path)
+
+
+def iter_media(source: MediaSource, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Stream a resolved source as-is, remuxing HLS playlists through ffmpeg"""
+    if source.is_hls:
+        return iter_process(ffmpeg_remux_command(source), chunk_size)
+    return iter_url(source.url, source.headers, chunk_size)
+
+
+def iter_audio(source: MediaSource, format: str = "mp3", chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Stream the audio track of a source, transcoded by ffmpeg to ``format``"""
+    return iter_process(ffmpeg_audio_command(source, format), chunk_size)
+
+
+async def prime_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Pull the first chunk now and return an iterator over the whole stream
+
+    Lets an endpoint turn failures that happen before any data arrives
+    (bad URL, ffmpeg missing, HTTP 403) into a proper error response
+    instead of an empty 200 body.
+
+    Raises:
+        MediaStreamError: If the stream is empty
+    """
+    try:
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        raise MediaStreamError("Media stream is empty") from None
+
+    async def replay():
+        yield first
+        async for chunk in chunks:
+            yield chunk
+
+    return replay()
+
+
+async def write_stream(chunks: AsyncIterator[bytes], path: str) -> int:
+    """
+    Spool a stream to ``path`` and return the number of bytes written
+
+    Writes to a sibling temp file and renames on success, so ``path`` never
+    holds a partial download.
+
+    Raises:
+        MediaStreamError: If the stream is empty
+    """
+    partial_path = f"{path}.part"
+    size = 0
+    try:
+        async with aiofiles.open(partial_path, "wb") as f:
+            async for chunk in chunks:
+                await f.write(chunk)
+                size += len(chunk)
+        if size == 0:
+            raise MediaStreamError("Media stream is empty")
+        os.replace(partial_path, path)
+        return size
+    finally:
+        if os.path.exists(partial_path):
+            os.unlink(partial_path)
+
+
+async def read_all(chunks: AsyncIterator[bytes]) -> bytes:
+    """Collect a stream into bytes, for callers that need the whole payload"""
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer += chunk
+    return bytes(buffer)
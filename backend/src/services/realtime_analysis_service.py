@@ -2,40 +2,30 @@
 Service for real-time audio analysis including ASR, sentiment, and speaker embedding.
 """
 import numpy as np
-import torch
 import logging
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any
 from pathlib import Path
 import warnings
 import asyncio
 import os
-from sklearn.preprocessing import StandardScaler
+
+from src.core.lazy import is_available
 
 # Suppress specific warnings
 warnings.filterwarnings("ignore", category=UserWarning, module='torch.nn.modules.conv')
 
 logger = logging.getLogger(__name__)
 
-# Attempt to import all necessary libraries, handling potential ImportErrors
-try:
-    from transformers import (
-        AutoModelForSpeechSeq2Seq,
-        AutoProcessor,
-        pipeline
-    )
-    from funasr import AutoModel
-    TRANSFORMERS_AVAILABLE = True
-except ImportError:
+# Check for the ML libraries without importing them; torch, transformers and
+# friends are only imported when models are loaded, so importing this module
+# (and every router that depends on it) stays cheap.
+TRANSFORMERS_AVAILABLE = is_available("transformers") and is_available("funasr")
+if not TRANSFORMERS_AVAILABLE:
     logger.error("Transformers or FunASR not available. ASR and sentiment analysis will be disabled.")
-    TRANSFORMERS_AVAILABLE = False
 
-try:
-    from speechbrain.pretrained import EncoderClassifier as SpeakerIdModel
-    from speechbrain.pretrained import SepformerSeparation as SeparatorModel
-    SPEECHBRAIN_AVAILABLE = True
-except ImportError:
+SPEECHBRAIN_AVAILABLE = is_available("speechbrain")
+if not SPEECHBRAIN_AVAILABLE:
     logger.error("SpeechBrain not available. Speaker ID and separation will be disabled.")
-    SPEECHBRAIN_AVAILABLE = False
 
 class RealtimeAnalysisService:
     """
@@ -53,6 +43,8 @@ class RealtimeAnalysisService:
         self.device = "cpu"
         self.asr_model_id = asr_model_id
         
+        from sklearn.preprocessing import StandardScaler
+
         self.asr_pipeline = None
         self.sentiment_model = None
         self.sentiment_scaler = StandardScaler()
@@ -107,6 +99,8 @@ class RealtimeAnalysisService:
         """Loads the sentiment analysis model asynchronously."""
         logger.info("Loading sentiment analysis model...")
         try:
+            from transformers import pipeline
+
             self.sentiment_model = pipeline(
                 "text-classification",
                 model="distilbert-base-uncased-finetuned-sst-2-english",
@@ -164,6 +158,51 @@ class RealtimeAnalysisService:
             logger.error(f"Whisper ASR transcription failed: {e}")
             return "[ASR FAILED]"
 
+    def _transcribe_arrays(self, arrays: List[np.ndarray]) -> List[str]:
+        """Run the ASR pipeline once over a batch of 16 kHz float32 arrays."""
+        inputs = [{"array": audio, "sampling_rate": 16000} for audio in arrays]
+        results = self.asr_pipeline(inputs, batch_size=len(inputs), return_timestamps=False)
+        texts = []
+        for result in results:
+            text = result.get("text", "") if isinstance(result, dict) else ""
+            texts.append(text.strip() or "[NO SPEECH DETECTED]")
+        return texts
+
+    async def transcribe_batch(self, audio_chunks: List[bytes]) -> List[str]:
+        """Transcribes several PCM16 16 kHz chunks (e.g. utterances from different calls) in one pipeline call."""
+        await self.ensure_models_loaded()
+        if not audio_chunks:
+            return []
+        arrays = [np.frombuffer(chunk, dtype=np.int16).astype(np.float32) / 32768.0 for chunk in audio_chunks]
+        try:
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(None, self._transcribe_arrays, arrays)
+        except Exception as e:
+            logger.error(f"Whisper ASR batch transcription failed: {e}")
+            return ["[ASR FAILED]"] * len(audio_chunks)
+
+    async def process_sentiment_batch(self, audio_chunks: List[bytes]) -> List[Dict[str, Any]]:
+        """Batched process_sentiment_chunk: one ASR pass for all valid chunks, results in input order."""
+        await self.ensure_models_loaded()
+
+        validations = [self._validate_audio(chunk) for chunk in audio_chunks]
+        valid = [i for i, v in enumerate(validations) if v["valid"]]
+        texts = await self.transcribe_batch([audio_chunks[i] for i in valid])
+        text_by_index = dict(zip(valid, texts))
+
+        results = []
+        for i, (chunk, validation) in enumerate(zip(audio_chunks, validations)):
+            if not validation["valid"]:
+                results.append({"text": validation.get("reason", "Invalid audio"), "sentiment": "unknown", "tokens": []})
+                continue
+            prosody_features = self._extract_prosody_features(chunk)
+            results.append({
+                "text": text_by_index[i],
+                "sentiment": self._classify_sentiment(prosody_features),
+                "tokens": prosody_features.tolist() if prosody_features is not None else [],
+            })
+        return results
+
     def _extract_prosody_features(self, audio_chunk_bytes: bytes) -> Optional[np.ndarray]:
         """Extracts prosody features for sentiment analysis."""
         # Return None since sentiment model is not available
@@ -1,57 +1,316 @@
 import asyncio
+import json
 import logging
+import os
+import random
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
 
 class SaveBatcher:
     """
     Incrementally save leads in batches. Starts a periodic background flusher on `start()`.
     supply a coroutine `save_fn(items)` that persists a list of leads.
+
+    When `wal_path` is set every accepted item is appended to a local write-ahead
+    log before it is queued, and acknowledged there once `save_fn` succeeds.
+    Items that were never acknowledged (crash, or a final save that kept failing)
+    are replayed on the next `start()` with the same path.
+
+    Memory is bounded: `add()` waits while `max_pending` items are unsaved.
+    Failed saves are retried with capped, jittered exponential backoff, and the
+    batch size adapts so a single save takes about `target_latency` seconds.
     """
-    def __init__(self, save_fn, batch_size: int = 50, flush_interval: int = 5):
+    def __init__(
+        self,
+        save_fn,
+        batch_size: int = 50,
+        flush_interval: int = 5,
+        wal_path: Optional[str] = None,
+        max_pending: Optional[int] = None,
+        max_retries: int = 5,
+        base_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        min_batch_size: Optional[int] = None,
+        max_batch_size: Optional[int] = None,
+        target_latency: float = 2.0,
+        compact_after: int = 10000,
+        fsync: bool = False,
+    ):
         self.save_fn = save_fn
-        self.batch_size = batch_size
+        self.batch_size = max(1, batch_size)
         self.flush_interval = flush_interval
-        self._queue = []
-        self._lock = asyncio.Lock()
+        self.wal_path = wal_path
+        self.max_pending = max_pending or self.batch_size * 20
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.min_batch_size = min(min_batch_size or max(1, self.batch_size // 4), self.max_pending)
+        # A batch larger than the backlog limit could never fill up
+        self.max_batch_size = min(max_batch_size or self.batch_size * 4, self.max_pending)
+        self.batch_size = min(self.batch_size, self.max_batch_size)
+        self.target_latency = target_latency
+        self.compact_after = compact_after
+        self.fsync = fsync
+
+        self._queue: Deque[Tuple[int, dict]] = deque()
+        self._in_flight = 0
+        self._seq = 0
+        self._flush_lock = asyncio.Lock()
+        self._space = asyncio.Condition()
+        self._wake = asyncio.Event()
         self._task = None
+        self._closing = False
+        self._wal = None
+        self._wal_records = 0
+        self._replayed = False
+        self.stats = {
+            "added": 0,
+            "saved": 0,
+            "batches": 0,
+            "retries": 0,
+            "failed_flushes": 0,
+            "replayed": 0,
+        }
+
+    @property
+    def pending(self) -> int:
+        """Items accepted but not yet saved (queued plus in flight)"""
+        return len(self._queue) + self._in_flight
 
     async def start(self):
+        if not self._replayed:
+            self._replay()
         if not self._task:
+            self._closing = False
             self._task = asyncio.create_task(self._periodic_flush())
 
     async def add(self, item: dict):
-        async with self._lock:
-            self._queue.append(item)
+        if not self._task:
+            await self.start()
+        async with self._space:
+            while self.pending >= self.max_pending:
+                # Backpressure: let the flusher catch up before accepting more
+                self._wake.set()
+                await self._space.wait()
+            self._seq += 1
+            self._wal_append({"op": "add", "seq": self._seq, "item": item})
+            self._queue.append((self._seq, item))
+            self.stats["added"] += 1
             if len(self._queue) >= self.batch_size:
-                await self._flush_locked()
+                self._wake.set()
 
     async def _periodic_flush(self):
-        while True:
-            await asyncio.sleep(self.flush_interval)
-            async with self._lock:
-                if self._queue:
-                    await self._flush_locked()
-
-    async def _flush_locked(self):
-        if not self._queue:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+                timed_out = False
+            except asyncio.TimeoutError:
+                timed_out = True
+            self._wake.clear()
+            # Full batches go out as soon as they fill; partial ones on the
+            # timer or when add() is blocked on a full backlog
+            await self.flush(force=timed_out or self.pending >= self.max_pending)
+
+    async def flush(self, force: bool = True) -> bool:
+        """
+        Save queued items in batches.
+
+        Args:
+            force: Also save a final partial batch
+
+        Returns:
+            True if nothing is left queued, False if a batch ran out of retries
+        """
+        async with self._flush_lock:
+            while self._queue and (force or len(self._queue) >= self.batch_size):
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                self._in_flight = len(batch)
+                saved = False
+                try:
+                    saved = await self._save_batch(batch)
+                finally:
+                    self._in_flight = 0
+                    if not saved:
+                        # Keep order: the batch goes back ahead of newer items
+                        self._queue.extendleft(reversed(batch))
+                if not saved:
+                    self.stats["failed_flushes"] += 1
+                    return False
+                async with self._space:
+                    self._space.notify_all()
+            return not self._queue
+
+    async def _save_batch(self, batch: List[Tuple[int, dict]]) -> bool:
+        items = [item for _, item in batch]
+        for attempt in range(self.max_retries + 1):
+            started = time.monotonic()
+            try:
+                await self.save_fn(items)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    logger.error(f"SaveBatcher: batch of {len(items)} failed after {attempt + 1} attempts: {e}")
+                    return False
+                # Full jitter keeps parallel pipelines from retrying in lockstep
+                delay = random.uniform(0, min(self.max_backoff, self.base_backoff * (2 ** attempt)))
+                self.stats["retries"] += 1
+                logger.warning(f"SaveBatcher: save failed ({e}), retry {attempt + 1} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            self._adapt_batch_size(time.monotonic() - started)
+            self._wal_append({"op": "ack", "seqs": [seq for seq, _ in batch]})
+            self.stats["saved"] += len(items)
+            self.stats["batches"] += 1
+            self._maybe_compact()
+            return True
+        return False
+
+    def _adapt_batch_size(self, latency: float):
+        # Halve on slow saves, grow by a quarter while comfortably fast
+        if latency > self.target_latency:
+            self.batch_size = max(self.min_batch_size, self.batch_size // 2)
+        elif latency < self.target_latency / 2:
+            self.batch_size = min(self.max_batch_size, self.batch_size + max(1, self.batch_size // 4))
+
+    def _open_wal(self, mode: str = "a"):
+        Path(self.wal_path).parent.mkdir(parents=True, exist_ok=True)
+        self._wal = open(self.wal_path, mode, encoding="utf-8")
+
+    def _wal_append(self, record: Dict[str, Any]):
+        if not self.wal_path:
             return
-        batch = self._queue
-        self._queue = []
-        try:
-            await self.save_fn(batch)
-        except Exception as e:
-            logging.exception("SaveBatcher flush failed, requeueing")
-            # naive retry: put items back at head
-            self._queue = batch + self._queue
+        if self._wal is None:
+            self._open_wal()
+        self._wal.write(json.dumps(record, default=str) + "\n")
+        self._wal.flush()
+        if self.fsync:
+            os.fsync(self._wal.fileno())
+        self._wal_records += 1
+
+    def _rewrite_wal(self):
+        """Replace the log with add records for the items still queued."""
+        if self._wal is not None:
+            self._wal.close()
+        tmp_path = f"{self.wal_path}.tmp"
+        Path(self.wal_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for seq, item in self._queue:
+                f.write(json.dumps({"op": "add", "seq": seq, "item": item}, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.wal_path)
+        self._wal_records = len(self._queue)
+        self._open_wal()
+
+    def _maybe_compact(self):
+        # Only called between batches, so every unsaved item is in the queue
+        if self.wal_path and self._wal_records >= self.compact_after:
+            self._rewrite_wal()
+
+    def _replay(self):
+        self._replayed = True
+        if not self.wal_path or not os.path.exists(self.wal_path):
+            return
+        added: Dict[int, dict] = {}
+        acked = set()
+        with open(self.wal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn write from a crash mid-append
+                    continue
+                if record.get("op") == "add":
+                    added[record["seq"]] = record["item"]
+                elif record.get("op") == "ack":
+                    acked.update(record.get("seqs", []))
+        recovered = [(seq, item) for seq, item in sorted(added.items()) if seq not in acked]
+        self._seq = max([self._seq, *added.keys(), *acked])
+        self._queue.extendleft(reversed(recovered))
+        self.stats["replayed"] = len(recovered)
+        if recovered:
+            logger.info(f"SaveBatcher: replaying {len(recovered)} unsaved items from {self.wal_path}")
+        self._rewrite_wal()
 
     async def drain(self) -> list:
         """Flush and return the set of saved (or pending) items for final dedupe step."""
-        async with self._lock:
-            pending = self._queue
-            self._queue = []
-        if pending:
-            try:
-                await self.save_fn(pending)
-            except Exception:
-                # if final flush fails, leave pending for manual inspection
-                pass
-        return pending
\ No newline at end of file
+        if self._task:
+            self._closing = True
+            self._wake.set()
+            await self._task
+            self._task = None
+        pending = [item for _, item in self._queue]
+        if not await self.flush(force=True):
+            where = f"kept in {self.wal_path} for replay" if self.wal_path else "not persisted"
+            logger.error(f"SaveBatcher: {len(self._queue)} items could not be saved; {where}")
+        if self.wal_path:
+            self._rewrite_wal()
+            self._wal.close()
+            self._wal = None
+            if not self._queue:
+                os.remove(self.wal_path)
+        return pending
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "pending": self.pending, "batch_size": self.batch_size}
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+async def replay_wal_dir(wal_dir: Optional[str], save_fn_for: Callable[[str], Any], **batcher_options) -> Dict[str, int]:
+    """
+    Save the items left in every write-ahead log under `wal_dir`.
+
+    Logs are named after the key their items belong to (`{key}.wal`, e.g. a
+    search id) and `save_fn_for(key)` returns the save coroutine for that key.
+    Each log is claimed by renaming it first, so several workers starting at
+    once never replay the same log twice; a claim left by a dead process is
+    picked up again. A log that still has unsaved items after its retries is
+    put back under its original name.
+
+    Returns:
+        Number of items still unsaved, per key
+    """
+    remaining: Dict[str, int] = {}
+    if not wal_dir or not os.path.isdir(wal_dir):
+        return remaining
+    for name in sorted(os.listdir(wal_dir)):
+        if name.endswith(".wal"):
+            key = name[:-len(".wal")]
+        elif ".wal.replay-" in name:
+            key, _, owner = name.rpartition(".wal.replay-")
+            if not owner.isdigit() or _pid_alive(int(owner)):
+                continue
+        else:
+            continue
+        claimed = os.path.join(wal_dir, f"{key}.wal.replay-{os.getpid()}")
+        try:
+            os.rename(os.path.join(wal_dir, name), claimed)
+        except FileNotFoundError:
+            # Another worker claimed it first
+            continue
+
+        batcher = SaveBatcher(save_fn_for(key), wal_path=claimed, **batcher_options)
+        await batcher.start()
+        await batcher.drain()
+        remaining[key] = len(batcher._queue)
+        if os.path.exists(claimed):
+            os.replace(claimed, os.path.join(wal_dir, f"{key}.wal"))
+        logger.info(f"SaveBatcher: replayed {batcher.stats['replayed']} items for {key}, "
+                    f"{remaining[key]} still unsaved")
+    return remaining
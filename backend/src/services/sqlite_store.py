@@ -0,0 +1,69 @@
+"""
+SQLite Store
+
+Common setup for the local SQLite databases kept by the services (bulk
+results, content fingerprints): one connection in WAL mode, shared across
+threads behind a lock, in autocommit mode so every statement is its own
+transaction.
+"""
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Optional, TypeVar, Union
+
+StoreT = TypeVar("StoreT", bound="SQLiteStore")
+
+
+class SQLiteStore:
+    """
+    Base class owning the connection; subclasses set ``SCHEMA``
+    """
+
+    SCHEMA = ""
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Args:
+            path: Database file path, or ":memory:"
+        """
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(self.SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def shared_store(factory: Callable[[str], StoreT], env_var: str, default_path: str) -> Callable[[], StoreT]:
+    """
+    Build a ``get_*()`` accessor for a process-wide store
+
+    Args:
+        factory: Store class
+        env_var: Environment variable holding the database path
+        default_path: Path used when ``env_var`` is unset
+
+    Returns:
+        Function that opens the store on first call and returns it after
+    """
+    instance: Optional[StoreT] = None
+    lock = threading.Lock()
+
+    def get() -> StoreT:
+        nonlocal instance
+        with lock:
+            if instance is None:
+                instance = factory(os.getenv(env_var, default_path))
+            return instance
+
+    get.__doc__ = f"Get the global {factory.__name__}, located by {env_var}"
+    return get
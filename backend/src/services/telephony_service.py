@@ -6,9 +6,9 @@ Integrates with Bandwidth Python SDK for real-time call management.
 
 import os
 import sys
+import asyncio
 import base64
 import logging
-import numpy as np
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 from pathlib import Path
@@ -33,6 +33,9 @@ from bandwidth.models.call_state_enum import CallStateEnum
 from src.services.realtime_analysis_service import get_realtime_analysis_service
 from src.services.modern_stateful_speaker_identifier import ModernStatefulSpeakerIdentifier
 from src.services.audio_processor import AudioProcessor
+from src.services.batched_vad import BatchedVADEngine
+from src.services.call_audio_pipeline import ASR_SAMPLE_RATE, CallAudioPipeline, TranscriptHistory, Utterance
+from src.services.inference_scheduler import DeadlineBatchScheduler
 
 # --- Environment Variables for Bandwidth ---
 BW_USERNAME = os.environ.get("BW_USERNAME")
@@ -42,6 +45,25 @@ BW_VOICE_APPLICATION_ID = os.environ.get("BW_VOICE_APPLICATION_ID")
 BW_NUMBER = os.environ.get("BW_NUMBER")
 BASE_CALLBACK_URL = os.environ.get("BASE_CALLBACK_URL") # Your publicly accessible server URL, e.g., https://myapp.com
 
+# Sample rate of the PCM audio Bandwidth streams to us; ASR expects 16 kHz
+STREAM_SAMPLE_RATE = int(os.environ.get("TELEPHONY_SAMPLE_RATE", "8000"))
+# Utterance records kept per call before older ones are compacted
+MAX_TRANSCRIPT_SEGMENTS = int(os.environ.get("TELEPHONY_MAX_TRANSCRIPT_SEGMENTS", "50"))
+# Seconds from an utterance ending to its transcript, per call
+LATENCY_BUDGET_S = float(os.environ.get("TELEPHONY_LATENCY_BUDGET_S", "2.0"))
+# Utterances from different calls transcribed together in one model pass
+INFERENCE_BATCH_SIZE = int(os.environ.get("TELEPHONY_INFERENCE_BATCH_SIZE", "16"))
+INFERENCE_MAX_WAIT_S = float(os.environ.get("TELEPHONY_INFERENCE_MAX_WAIT_S", "0.05"))
+# Speaker label and confidence for utterances whose speaker could not be identified
+UNKNOWN_SPEAKER = ("unknown", 0.0)
+
+
+def get_speaker_embedding_service():
+    """Process-wide speaker embedding model (imports torch on first call)"""
+    from src.services.speaker_embedding_service import get_speaker_embedding_service as get_service
+    return get_service()
+
+
 @dataclass
 class CallSession:
     call_id: str
@@ -49,7 +71,7 @@ class CallSession:
     phone_number: str
     direction: str
     start_time: datetime
-    audio_chunks: List[Dict[str, Any]]
+    transcript_history: TranscriptHistory
     current_transcript: str
     current_sentiment: str
     speakers: Dict[str, Any]
@@ -61,20 +83,35 @@ class TelephonyService:
     - Real-time ASR
     - Sentiment analysis
     - Speaker diarization
+
+    Each call has a streaming audio pipeline (PCM ring buffer + VAD-gated
+    utterance segmentation); all calls share one batched VAD engine.
+    Completed utterances from every call go to one deadline scheduler that
+    runs ASR and speaker ID in cross-call batches, earliest deadline first.
     """
 
     def __init__(self):
-        self.analysis_service = get_realtime_analysis_service()
+        self.analysis_service = None
         self.speaker_identifier = ModernStatefulSpeakerIdentifier()
         self.audio_processor = AudioProcessor()
         self.active_calls: Dict[str, CallSession] = {}
+        self.vad = BatchedVADEngine(sample_rate=STREAM_SAMPLE_RATE, queue_events=True, keep_audio=False)
+        self.pipelines: Dict[str, CallAudioPipeline] = {}
+        self.inference = DeadlineBatchScheduler(
+            self._infer_utterances,
+            name="telephony-inference",
+            max_batch_size=INFERENCE_BATCH_SIZE,
+            latency_budget=LATENCY_BUDGET_S,
+            max_wait=INFERENCE_MAX_WAIT_S,
+        )
         
         # Initialize Bandwidth API Client
         configuration = bandwidth.Configuration(username=BW_USERNAME, password=BW_PASSWORD)
         api_client = bandwidth.ApiClient(configuration)
         self.calls_api_instance = calls_api.CallsApi(api_client)
 
-    async def start_call(self, user_id: str, phone_number: str, direction: str) -> Dict[str, Any]:
+    async def start_call(self, user_id: str, phone_number: str, direction: str,
+                         latency_budget_s: Optional[float] = None) -> Dict[str, Any]:
         """Start a new telephony call using the Bandwidth SDK"""
         logger.info(f"Starting call to {phone_number} for user {user_id}")
 
@@ -102,12 +139,15 @@ class TelephonyService:
                 phone_number=phone_number,
                 direction=direction,
                 start_time=datetime.now(),
-                audio_chunks=[],
+                transcript_history=TranscriptHistory(max_segments=MAX_TRANSCRIPT_SEGMENTS),
                 current_transcript="",
                 current_sentiment="neutral",
                 speakers={}
             )
             self.active_calls[call_id] = session
+            self.pipelines[call_id] = CallAudioPipeline(call_id, self.vad, STREAM_SAMPLE_RATE, ASR_SAMPLE_RATE)
+            if latency_budget_s is not None:
+                self.inference.set_budget(call_id, latency_budget_s)
 
             await self.speaker_identifier.initialize()
 
@@ -121,49 +161,117 @@ class TelephonyService:
             raise
 
     async def process_audio_chunk(self, call_id: str, chunk_id: str, audio_data: str, sequence: int) -> Dict[str, Any]:
-        """Process audio chunk with ASR and sentiment analysis"""
+        """Buffer an audio packet; run ASR and sentiment on any utterance it completes"""
         if call_id not in self.active_calls:
             raise ValueError(f"Call {call_id} not found")
         
         session = self.active_calls[call_id]
+        pipeline = self._get_pipeline(call_id)
         
         try:
-            # Bandwidth sends base64 encoded audio in the stream
-            audio_bytes = base64.b64decode(audio_data)
-            audio_array = np.frombuffer(audio_bytes, dtype=np.int16)
-
-            if len(audio_array) == 0:
+            # Bandwidth sends base64 encoded PCM16 audio in the stream
+            if pipeline.ingest(base64.b64decode(audio_data)) == 0:
                 return {"error": "Empty audio data"}
             
-            result = await self.analysis_service.process_sentiment_chunk(
-                audio_array.astype(np.float32).tobytes()
-            )
-            
-            speaker_id, confidence = self.speaker_identifier.identify_speaker(audio_array)
-            
-            chunk_data = {
-                "chunk_id": chunk_id,
-                "sequence": sequence,
-                "transcript": result.get("text", ""),
-                "sentiment": result.get("sentiment", "neutral"),
-                "speaker": speaker_id,
-                "confidence": confidence,
-                "timestamp": datetime.now().isoformat()
-            }
-            
-            session.audio_chunks.append(chunk_data)
-            session.current_transcript = result.get("text", "")
-            session.current_sentiment = result.get("sentiment", "neutral")
+            # Yield once so packets arriving for other calls are buffered too;
+            # the first drain then evaluates all of them in shared model calls
+            await asyncio.sleep(0)
+            self.vad.drain()
+            utterances = pipeline.collect()
             
-            if speaker_id not in session.speakers:
-                session.speakers[speaker_id] = {"first_seen": datetime.now().isoformat(), "confidence": confidence}
+            if not utterances:
+                return {
+                    "chunk_id": chunk_id,
+                    "sequence": sequence,
+                    "speech": self.vad.is_speaking(call_id),
+                    "transcript": "",
+                    "sentiment": session.current_sentiment,
+                }
             
-            return chunk_data
+            # Submitted together so they can share a batch with other calls' utterances
+            results = await asyncio.gather(
+                *(self._analyze_utterance(session, chunk_id, sequence, utterance) for utterance in utterances)
+            )
+            return results[-1]
             
         except Exception as e:
             logger.error(f"Error processing chunk {chunk_id}: {e}")
             return {"error": str(e), "transcript": "", "sentiment": "neutral", "speaker": "unknown"}
 
+    def _get_pipeline(self, call_id: str) -> CallAudioPipeline:
+        if call_id not in self.pipelines:
+            self.pipelines[call_id] = CallAudioPipeline(call_id, self.vad, STREAM_SAMPLE_RATE, ASR_SAMPLE_RATE)
+        return self.pipelines[call_id]
+
+    async def _infer_utterances(self, utterances: List[Utterance]) -> List[Dict[str, Any]]:
+        """Scheduler batch function: ASR and sentiment in one pass, speaker ID alongside it"""
+        if self.analysis_service is None:
+            self.analysis_service = await get_realtime_analysis_service()
+        # Speaker embeddings are CPU work; running them in the executor keeps
+        # packet handling for every call responsive and overlaps the ASR pass
+        loop = asyncio.get_running_loop()
+        results, speakers = await asyncio.gather(
+            self.analysis_service.process_sentiment_batch([u.audio.tobytes() for u in utterances]),
+            loop.run_in_executor(None, self._identify_speakers, utterances),
+            return_exceptions=True,
+        )
+        if isinstance(results, BaseException):
+            raise results
+        if isinstance(speakers, BaseException):
+            # Transcripts still go out; only the speaker labels are lost
+            logger.error(f"Speaker identification failed for a batch of {len(utterances)} utterances: {speakers}")
+            speakers = [UNKNOWN_SPEAKER] * len(utterances)
+        for result, (speaker_id, confidence) in zip(results, speakers):
+            result["speaker"], result["confidence"] = speaker_id, confidence
+        return results
+
+    def _identify_speakers(self, utterances: List[Utterance]) -> List[tuple]:
+        """
+        Embed and identify speakers in submission order; the identifier is
+        stateful, so one batch runs serially. An utterance that fails is
+        labelled unknown without affecting the rest of the batch.
+        """
+        embedding_service = get_speaker_embedding_service()
+        speakers = []
+        for utterance in utterances:
+            try:
+                embedding = embedding_service.extract_embedding(utterance.audio, ASR_SAMPLE_RATE)
+                if embedding is None:
+                    raise ValueError("no speaker embedding")
+                speakers.append(self.speaker_identifier.identify_speaker(utterance.audio, embedding))
+            except Exception as e:
+                logger.warning(f"Speaker identification failed for call {utterance.call_id} utterance {utterance.index}: {e}")
+                speakers.append(UNKNOWN_SPEAKER)
+        return speakers
+
+    async def _analyze_utterance(self, session: CallSession, chunk_id: str, sequence: int, utterance: Utterance) -> Dict[str, Any]:
+        """Queue an utterance for batched ASR, sentiment and speaker ID, and record the result"""
+        result = await self.inference.submit(session.call_id, utterance)
+        speaker_id, confidence = result["speaker"], result["confidence"]
+        
+        chunk_data = {
+            "chunk_id": chunk_id,
+            "sequence": sequence,
+            "utterance": utterance.index,
+            "speech": True,
+            "start_time": utterance.start_time,
+            "end_time": utterance.end_time,
+            "transcript": result.get("text", ""),
+            "sentiment": result.get("sentiment", "neutral"),
+            "speaker": speaker_id,
+            "confidence": confidence,
+            "timestamp": datetime.now().isoformat()
+        }
+        
+        session.transcript_history.append(chunk_data)
+        session.current_transcript = result.get("text", "")
+        session.current_sentiment = result.get("sentiment", "neutral")
+        
+        if speaker_id not in session.speakers:
+            session.speakers[speaker_id] = {"first_seen": datetime.now().isoformat(), "confidence": confidence}
+        
+        return chunk_data
+
     async def end_call(self, call_id: str) -> Dict[str, Any]:
         """End telephony call using the Bandwidth SDK and cleanup"""
         if call_id not in self.active_calls:
@@ -178,11 +286,22 @@ class TelephonyService:
         except bandwidth.ApiException as e:
             logger.error(f"Error ending call with Bandwidth: {e}")
             # Continue with local cleanup even if API call fails
+        
+        # Flush the pipeline so speech still open at hang-up is transcribed
+        pipeline = self.pipelines.pop(call_id, None)
+        if pipeline is not None:
+            for utterance in pipeline.finish():
+                try:
+                    await self._analyze_utterance(self.active_calls[call_id], "final", -1, utterance)
+                except Exception as e:
+                    logger.error(f"Error processing final utterance for call {call_id}: {e}")
             
         final_result = await self.process_final_transcription(call_id)
+        final_result["inference_latency"] = self.inference.call_stats(call_id)["latency_seconds"]
         
         # Cleanup
         del self.active_calls[call_id]
+        self.inference.remove_call(call_id)
         
         return final_result
 
@@ -192,15 +311,27 @@ class TelephonyService:
             raise ValueError(f"Call {call_id} not found for final processing")
         
         session = self.active_calls[call_id]
-        # ... (rest of the final processing logic remains the same)
-        full_transcript = " ".join([chunk.get("transcript", "") for chunk in session.audio_chunks])
-        return {"full_transcript": full_transcript, "speaker_summary": session.speakers}
+        history = session.transcript_history
+        return {
+            "full_transcript": history.full_transcript(),
+            "speaker_summary": session.speakers,
+            "utterances": history.total_segments,
+            "speaker_seconds": history.speaker_seconds,
+        }
 
     async def get_call_status(self, call_id: str) -> Dict[str, Any]:
         if call_id not in self.active_calls:
             return {"error": "Call not found"}
         session = self.active_calls[call_id]
-        return {"status": "active", "duration": (datetime.now() - session.start_time).total_seconds()}
+        return {
+            "status": "active",
+            "duration": (datetime.now() - session.start_time).total_seconds(),
+            "inference": self.inference.call_stats(call_id),
+        }
+
+    def get_inference_stats(self) -> Dict[str, Any]:
+        """Queue depth, batch sizes and latency percentiles of the shared inference scheduler"""
+        return {"active_calls": len(self.active_calls), **self.inference.get_stats()}
 
 
 # Global service instance
@@ -5,7 +5,7 @@ This module provides a service layer for interacting with TikTok's API
 to fetch user information, videos, and download content.
 """
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator
 import asyncio
 import os
 import logging
@@ -13,7 +13,17 @@ from datetime import datetime
 import json
 import yt_dlp
 from pprint import pformat
-import aiofiles
+
+from src.services.media_stream import (
+    DEFAULT_CHUNK_SIZE,
+    MediaSource,
+    ffmpeg_available,
+    iter_audio,
+    iter_file,
+    iter_media,
+    read_all,
+)
+from src.services.ytdlp_pool import get_ytdlp_pool
 
 logger = logging.getLogger(__name__)
 
@@ -36,37 +46,22 @@ class TikTokService:
             'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
         }
     
-    def _extract_info_with_retry(self, url: str, ydl_opts: dict, max_retries: int = 3):
+    async def _extract_info(self, url: str, ydl_opts: dict):
+        """Extract info on a pooled yt-dlp instance (cached briefly)."""
+        try:
+            return await get_ytdlp_pool().extract_info(url, ydl_opts)
+        except Exception as e:
+            logger.error(f"yt-dlp extraction error: {str(e)}")
+            return None
+    
+    async def _extract_info_with_retry(self, url: str, ydl_opts: dict, max_retries: int = 3):
         """Extract info with retry logic and exponential backoff."""
-        retry_delay = 1  # Start with 1 second delay
-        
-        for attempt in range(max_retries):
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                try:
-                    info = ydl.extract_info(url, download=False)
-                    if info:
-                        return info
-                except Exception as e:
-                    error_msg = str(e).lower()
-                    logger.error(f"yt-dlp extraction error (attempt {attempt + 1}/{max_retries}): {str(e)}")
-                    
-                    # Don't retry for certain permanent errors
-                    if any(term in error_msg for term in [
-                        'video unavailable', 'private', 'deleted', 'not found',
-                        'does not exist', 'removed', 'blocked'
-                    ]):
-                        logger.warning(f"Permanent error detected, not retrying: {str(e)}")
-                        return None
-                    
-                    # If this is the last attempt, return None
-                    if attempt == max_retries - 1:
-                        return None
-                    
-                    # Wait before retrying with exponential backoff
-                    import time
-                    time.sleep(retry_delay * (2 ** attempt))
-        
-        return None
+        try:
+            # Permanent errors (private, removed, ...) are not retried
+            return await get_ytdlp_pool().extract_info(url, ydl_opts, retries=max_retries - 1)
+        except Exception as e:
+            logger.error(f"yt-dlp extraction failed after retries: {str(e)}")
+            return None
         
     def _extract_user_info_from_data(self, info_dict: Dict[str, Any]) -> Dict[str, Any]:
         """Extract user information from yt-dlp info."""
@@ -222,19 +217,8 @@ class TikTokService:
                 'playlistend': 25,  # Get more videos for user info
                 'quiet': False,  # Show output for debugging
             }            
-            # Run extraction in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            
-            def extract_info():
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    try:
-                        info = ydl.extract_info(url, download=False)
-                        return info
-                    except Exception as e:
-                        logger.error(f"yt-dlp extraction error: {str(e)}")
-                        return None
-                        
-            info_dict = await loop.run_in_executor(None, extract_info)
+            # Extract on a pooled yt-dlp instance
+            info_dict = await self._extract_info(url, ydl_opts)
             
             if not info_dict:
                 raise Exception(f"Could not fetch user info for {username}")
@@ -341,9 +325,8 @@ class TikTokService:
                 'playlist_items': f'1-{count}',  # Limit to first N videos
                 'quiet': False,  # Enable debug output
             }            
-            # Run extraction in thread pool to avoid blocking with retry logic
-            loop = asyncio.get_event_loop()
-            info_dict = await loop.run_in_executor(None, self._extract_info_with_retry, url, ydl_opts)
+            # Extract on a pooled yt-dlp instance with retry logic
+            info_dict = await self._extract_info_with_retry(url, ydl_opts)
             
             if not info_dict:
                 raise Exception(f"Could not fetch videos for {username}")
@@ -448,19 +431,8 @@ class TikTokService:
             # TikTok video URL
             url = f'https://www.tiktok.com/@_/video/{video_id}'
             
-            # Run extraction in thread pool
-            loop = asyncio.get_event_loop()
-            
-            def extract_info():
-                with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
-                    try:
-                        info = ydl.extract_info(url, download=False)
-                        return info
-                    except Exception as e:
-                        logger.error(f"yt-dlp extraction error: {str(e)}")
-                        return None
-                        
-            info_dict = await loop.run_in_executor(None, extract_info)
+            # Extract on a pooled yt-dlp instance
+            info_dict = await self._extract_info(url, self.ydl_opts)
             
             if not info_dict:
                 raise Exception(f"Could not fetch video info for {video_id}")
@@ -507,19 +479,8 @@ class TikTokService:
                 'no_warnings': True,
             }
             
-            # Run extraction in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            
-            def extract_info():
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    try:
-                        info = ydl.extract_info(url, download=False)
-                        return info
-                    except Exception as e:
-                        logger.error(f"yt-dlp extraction error: {str(e)}")
-                        return None
-                        
-            info_dict = await loop.run_in_executor(None, extract_info)
+            # Extract on a pooled yt-dlp instance
+            info_dict = await self._extract_info(url, ydl_opts)
             
             if not info_dict:
                 raise Exception(f"Could not fetch video info for {video_id}")
@@ -556,10 +517,112 @@ class TikTokService:
             logger.error(f"Error getting video preview for {video_id}: {str(e)}")
             raise Exception(f"Failed to get video preview: {str(e)}")
     
+    async def _resolve_media(self, video_id: str, format_spec: str) -> MediaSource:
+        """Resolve the direct media URL and request headers for a video."""
+        url = f'https://www.tiktok.com/@_/video/{video_id}'
+        ydl_opts = {
+            **self.ydl_opts,
+            'format': format_spec,
+        }
+        info_dict = await self._extract_info(url, ydl_opts)
+        if not info_dict:
+            raise Exception(f"Could not fetch video info for {video_id}")
+        return MediaSource.from_info(info_dict)
+    
+    async def _download_to_file(self, video_id: str) -> str:
+        """
+        Download a video to a temporary file with yt-dlp's own downloader.
+        
+        Fallback for when the direct media URL cannot be streamed (e.g. it
+        needs cookies that only yt-dlp's session carries).
+        
+        Args:
+            video_id: TikTok video ID
+            
+        Returns:
+            Path of the temporary file; the caller deletes it
+        """
+        # TikTok video URL
+        url = f'https://www.tiktok.com/@_/video/{video_id}'
+        
+        # Create temporary file for download
+        import tempfile
+        with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as tmp_file:
+            tmp_path = tmp_file.name
+        
+        # Configure yt-dlp for downloading
+        ydl_opts = {
+            **self.ydl_opts,
+            'outtmpl': tmp_path,
+            'format': 'best[ext=mp4]/best',
+            'overwrites': True,  # Force overwrite existing files
+            'no_overwrites': False,
+            'continuedl': False,  # Don't continue partial downloads
+        }
+        
+        def download_video():
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                try:
+                    logger.info(f"Starting download for URL: {url}")
+                    ydl.download([url])
+                    return True
+                except Exception as e:
+                    error_msg = str(e)
+                    logger.error(f"yt-dlp download error for {url}: {error_msg}")
+                    
+                    # Check for DNS resolution errors
+                    if "Failed to resolve" in error_msg or "Temporary failure in name resolution" in error_msg:
+                        logger.error(f"DNS resolution failed for video {video_id}. The video URL may be expired or region-locked.")
+                    
+                    return False
+        
+        loop = asyncio.get_event_loop()
+        success = await loop.run_in_executor(get_ytdlp_pool().executor, download_video)
+        
+        if not success or not os.path.exists(tmp_path) or os.path.getsize(tmp_path) == 0:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise Exception(f"Could not download video {video_id}")
+        
+        logger.info(f"Downloaded video {video_id} to file, size: {os.path.getsize(tmp_path)} bytes")
+        return tmp_path
+    
+    async def stream_video(self, video_id: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """
+        Stream a TikTok video in chunks without buffering the whole file.
+        
+        Streams the direct media URL; if that fails before any data arrives,
+        falls back to a yt-dlp download into a temporary file and streams that.
+        
+        Args:
+            video_id: TikTok video ID
+            chunk_size: Bytes per chunk
+            
+        Yields:
+            Video bytes (mp4)
+        """
+        started = False
+        try:
+            source = await self._resolve_media(video_id, 'best[ext=mp4]/best')
+            async for chunk in iter_media(source, chunk_size):
+                started = True
+                yield chunk
+            return
+        except Exception as e:
+            if started:
+                raise
+            logger.warning(f"Direct stream failed for video {video_id}, falling back to yt-dlp download: {str(e)}")
+        
+        tmp_path = await self._download_to_file(video_id)
+        async for chunk in iter_file(tmp_path, chunk_size, delete=True):
+            yield chunk
+    
     async def download_video_bytes(self, video_id: str) -> bytes:
         """
         Download video bytes from TikTok using yt-dlp.
         
+        Prefer stream_video() where the consumer can take chunks.
+        
         Args:
             video_id: TikTok video ID
             
@@ -567,82 +630,12 @@ class TikTokService:
             Video bytes
         """
         try:
-            # TikTok video URL
-            url = f'https://www.tiktok.com/@_/video/{video_id}'
-            
-            # Create temporary file for download
-            import tempfile
-            with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as tmp_file:
-                tmp_path = tmp_file.name
-            
-            # Configure yt-dlp for downloading
-            ydl_opts = {
-                **self.ydl_opts,
-                'outtmpl': tmp_path,
-                'format': 'best[ext=mp4]/best',
-                'verbose': True,  # Enable verbose logging to debug issues
-                'overwrites': True,  # Force overwrite existing files
-                'no_overwrites': False,
-                'continuedl': False,  # Don't continue partial downloads
-            }
+            video_bytes = await read_all(self.stream_video(video_id))
+            if len(video_bytes) == 0:
+                raise Exception(f"Downloaded video is empty (0 bytes)")
             
-            # Run download in thread pool
-            loop = asyncio.get_event_loop()
-            
-            def download_video():
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    try:
-                        logger.info(f"Starting download for URL: {url}")
-                        result = ydl.download([url])
-                        logger.info(f"Download result: {result}")
-                        
-                        # Check if the file was created
-                        if os.path.exists(tmp_path):
-                            size = os.path.getsize(tmp_path)
-                            logger.info(f"Downloaded file exists at {tmp_path}, size: {size} bytes")
-                        else:
-                            logger.error(f"Downloaded file not found at {tmp_path}")
-                            
-                        return True
-                    except Exception as e:
-                        error_msg = str(e)
-                        logger.error(f"yt-dlp download error for {url}: {error_msg}")
-                        logger.error(f"Error type: {type(e).__name__}")
-                        
-                        # Check for DNS resolution errors
-                        if "Failed to resolve" in error_msg or "Temporary failure in name resolution" in error_msg:
-                            logger.error(f"DNS resolution failed for video {video_id}. The video URL may be expired or region-locked.")
-                        
-                        return False
-                        
-            success = await loop.run_in_executor(None, download_video)
-            
-            if not success:
-                raise Exception(f"Could not download video {video_id}")
-            
-            # Read the downloaded file
-            try:
-                # Check if file exists and has content
-                if not os.path.exists(tmp_path):
-                    raise Exception(f"Downloaded file not found at {tmp_path}")
-                
-                file_size = os.path.getsize(tmp_path)
-                if file_size == 0:
-                    raise Exception(f"Downloaded file is empty (0 bytes)")
-                
-                logger.info(f"Downloaded video {video_id}, size: {file_size} bytes")
-                
-                async with aiofiles.open(tmp_path, 'rb') as f:
-                    video_bytes = await f.read()
-                
-                if len(video_bytes) == 0:
-                    raise Exception(f"Failed to read video bytes from file")
-                    
-                return video_bytes
-            finally:
-                # Clean up temporary file
-                if os.path.exists(tmp_path):
-                    os.unlink(tmp_path)
+            logger.info(f"Downloaded video {video_id}, size: {len(video_bytes)} bytes")
+            return video_bytes
             
         except Exception as e:
             logger.error(f"Error downloading video {video_id}: {str(e)}")
@@ -700,19 +693,8 @@ class TikTokService:
                 'no_warnings': True,
             }
             
-            # Run extraction in thread pool
-            loop = asyncio.get_event_loop()
-            
-            def extract_info():
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    try:
-                        info = ydl.extract_info(url, download=False)
-                        return info
-                    except Exception as e:
-                        logger.error(f"yt-dlp extraction error: {str(e)}")
-                        return None
-                        
-            info_dict = await loop.run_in_executor(None, extract_info)
+            # Extract on a pooled yt-dlp instance
+            info_dict = await self._extract_info(url, ydl_opts)
             
             if not info_dict:
                 raise Exception(f"Could not fetch video info for {video_id}")
@@ -728,10 +710,62 @@ class TikTokService:
             logger.error(f"Error getting video stream URL for {video_id}: {str(e)}")
             raise Exception(f"Failed to get video stream URL: {str(e)}")
     
+    async def stream_audio(
+        self,
+        video_id: str,
+        format: str = 'mp3',
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream the audio of a TikTok video, transcoded on the fly by ffmpeg.
+        
+        ffmpeg reads the direct media URL itself and writes the audio to a
+        pipe, so neither the video nor the audio is ever held in full. If that
+        fails before any data arrives, the video is downloaded to a temporary
+        file with yt-dlp and transcoded from there. Without ffmpeg, or for
+        format 'original', the source is streamed as-is.
+        
+        Args:
+            video_id: TikTok video ID
+            format: Audio format (mp3, m4a, aac, wav, original)
+            chunk_size: Bytes per chunk
+            
+        Yields:
+            Audio bytes
+        """
+        if format == 'original' or not ffmpeg_available():
+            if format != 'original':
+                logger.warning(f"FFmpeg not available, streaming full video for {video_id}")
+            async for chunk in self.stream_video(video_id, chunk_size):
+                yield chunk
+            return
+        
+        started = False
+        try:
+            source = await self._resolve_media(video_id, 'bestaudio/best')
+            logger.info(f"Streaming {format} audio for video {video_id}")
+            async for chunk in iter_audio(source, format, chunk_size):
+                started = True
+                yield chunk
+            return
+        except Exception as e:
+            if started:
+                raise
+            logger.warning(f"Direct audio stream failed for video {video_id}, falling back to yt-dlp download: {str(e)}")
+        
+        tmp_path = await self._download_to_file(video_id)
+        try:
+            async for chunk in iter_audio(MediaSource(url=tmp_path, protocol="file"), format, chunk_size):
+                yield chunk
+        finally:
+            os.unlink(tmp_path)
+    
     async def download_audio_bytes(self, video_id: str, format: str = 'mp3') -> bytes:
         """
         Download audio only from TikTok video using yt-dlp.
         
+        Prefer stream_audio() where the consumer can take chunks.
+        
         Args:
             video_id: TikTok video ID
             format: Audio format (mp3, m4a, etc.)
@@ -740,90 +774,12 @@ class TikTokService:
             Audio bytes
         """
         try:
-            # TikTok video URL
-            url = f'https://www.tiktok.com/@_/video/{video_id}'
-            
-            # Create temporary file for download
-            import tempfile
-            with tempfile.NamedTemporaryFile(suffix=f'.{format}', delete=False) as tmp_file:
-                tmp_path = tmp_file.name
-            
-            # Configure yt-dlp for audio extraction
-            ydl_opts = {
-                **self.ydl_opts,
-                'format': 'bestaudio/best',  # Download best audio quality
-                'outtmpl': tmp_path.replace(f'.{format}', '.%(ext)s'),  # Let yt-dlp handle extension
-                'verbose': True,
-                'overwrites': True,
-                'no_overwrites': False,
-                'continuedl': False,
-                # Post-processor for audio extraction if ffmpeg is available
-                'postprocessors': [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': format,
-                    'preferredquality': '192',
-                }] if format != 'original' else [],
-                'prefer_ffmpeg': True,
-            }
+            audio_bytes = await read_all(self.stream_audio(video_id, format))
+            if len(audio_bytes) == 0:
+                raise Exception(f"Downloaded audio is empty (0 bytes)")
             
-            # Try with audio extraction first, fallback to video download
-            loop = asyncio.get_event_loop()
-            
-            def download_audio():
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    try:
-                        logger.info(f"Starting audio download for URL: {url}")
-                        result = ydl.download([url])
-                        logger.info(f"Audio download result: {result}")
-                        
-                        # Find the downloaded file (might have different extension)
-                        import glob
-                        pattern = tmp_path.replace(f'.{format}', '.*')
-                        files = glob.glob(pattern)
-                        if files:
-                            actual_path = files[0]
-                            logger.info(f"Downloaded audio file: {actual_path}")
-                            return actual_path
-                        else:
-                            logger.error(f"No files found matching pattern: {pattern}")
-                            return None
-                    except Exception as e:
-                        logger.error(f"yt-dlp audio download error: {str(e)}")
-                        return None
-                        
-            downloaded_path = await loop.run_in_executor(None, download_audio)
-            
-            if not downloaded_path:
-                # Fallback: Download video and return as is
-                logger.warning(f"Audio extraction failed, downloading full video for {video_id}")
-                video_bytes = await self.download_video_bytes(video_id)
-                return video_bytes
-            
-            # Read the downloaded file
-            try:
-                if not os.path.exists(downloaded_path):
-                    raise Exception(f"Downloaded file not found at {downloaded_path}")
-                
-                file_size = os.path.getsize(downloaded_path)
-                if file_size == 0:
-                    raise Exception(f"Downloaded file is empty (0 bytes)")
-                
-                logger.info(f"Downloaded audio {video_id}, size: {file_size} bytes")
-                
-                async with aiofiles.open(downloaded_path, 'rb') as f:
-                    audio_bytes = await f.read()
-                
-                if len(audio_bytes) == 0:
-                    raise Exception(f"Failed to read audio bytes from file")
-                    
-                return audio_bytes
-            finally:
-                # Clean up temporary file
-                if os.path.exists(downloaded_path):
-                    os.unlink(downloaded_path)
-                # Also clean up base path if different
-                if os.path.exists(tmp_path) and tmp_path != downloaded_path:
-                    os.unlink(tmp_path)
+            logger.info(f"Downloaded audio {video_id}, size: {len(audio_bytes)} bytes")
+            return audio_bytes
             
         except Exception as e:
             logger.error(f"Error downloading audio {video_id}: {str(e)}")
@@ -844,18 +800,7 @@ class TikTokService:
             url = f'https://www.tiktok.com/@_/video/{video_id}'
             
             # Extract info without downloading
-            loop = asyncio.get_event_loop()
-            
-            def extract_info():
-                with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
-                    try:
-                        info = ydl.extract_info(url, download=False)
-                        return info
-                    except Exception as e:
-                        logger.error(f"yt-dlp extraction error: {str(e)}")
-                        return None
-                        
-            info_dict = await loop.run_in_executor(None, extract_info)
+            info_dict = await self._extract_info(url, self.ydl_opts)
             
             if not info_dict:
                 raise Exception(f"Could not fetch audio info for {video_id}")
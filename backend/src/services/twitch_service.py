@@ -5,15 +5,16 @@ This module provides a service layer for interacting with Twitch
 to fetch channel information, videos, and download content.
 """
 
-from typing import Optional, List, Dict, Any
-import asyncio
+from typing import Optional, List, Dict, Any, AsyncIterator
 import os
 import logging
 from datetime import datetime
 import json
-import yt_dlp
 from pprint import pformat
 
+from src.services.media_stream import DEFAULT_CHUNK_SIZE, MediaSource, iter_media, read_all
+from src.services.ytdlp_pool import get_ytdlp_pool
+
 logger = logging.getLogger(__name__)
 
 
@@ -35,6 +36,14 @@ class TwitchService:
             'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
         }
         
+    async def _extract_info(self, url: str, ydl_opts: dict):
+        """Extract info on a pooled yt-dlp instance (cached briefly)."""
+        try:
+            return await get_ytdlp_pool().extract_info(url, ydl_opts)
+        except Exception as e:
+            logger.error(f"yt-dlp extraction error: {str(e)}")
+            return None
+    
     def _extract_channel_info_from_data(self, info_dict: Dict[str, Any]) -> Dict[str, Any]:
         """Extract channel information from yt-dlp info."""
         # Get username and basic info
@@ -137,19 +146,8 @@ class TwitchService:
                 'playlistend': 12,  # Get some videos to extract channel info
             }
             
-            # Run extraction in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            
-            def extract_info():
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    try:
-                        info = ydl.extract_info(url, download=False)
-                        return info
-                    except Exception as e:
-                        logger.error(f"yt-dlp extraction error: {str(e)}")
-                        return None
-                        
-            info_dict = await loop.run_in_executor(None, extract_info)
+            # Extract on a pooled yt-dlp instance
+            info_dict = await self._extract_info(url, ydl_opts)
             
             if not info_dict:
                 raise Exception(f"Could not fetch channel info for {username}")
@@ -208,19 +206,8 @@ class TwitchService:
                 'playlist_items': f'1-{count}',  # Limit to first N videos
             }
             
-            # Run extraction in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            
-            def extract_info():
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    try:
-                        info = ydl.extract_info(url, download=False)
-                        return info
-                    except Exception as e:
-                        logger.error(f"yt-dlp extraction error: {str(e)}")
-                        return None
-                        
-            info_dict = await loop.run_in_executor(None, extract_info)
+            # Extract on a pooled yt-dlp instance
+            info_dict = await self._extract_info(url, ydl_opts)
             
             if not info_dict:
                 raise Exception(f"Could not fetch videos for {username}")
@@ -287,19 +274,8 @@ class TwitchService:
             
             logger.info(f"Fetching Twitch video info for: {video_id}")
             
-            # Run extraction in thread pool
-            loop = asyncio.get_event_loop()
-            
-            def extract_info():
-                with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
-                    try:
-                        info = ydl.extract_info(url, download=False)
-                        return info
-                    except Exception as e:
-                        logger.error(f"yt-dlp extraction error: {str(e)}")
-                        return None
-                        
-            info_dict = await loop.run_in_executor(None, extract_info)
+            # Extract on a pooled yt-dlp instance
+            info_dict = await self._extract_info(url, self.ydl_opts)
             
             if not info_dict:
                 raise Exception(f"Could not fetch video info for {video_id}")
@@ -323,10 +299,41 @@ class TwitchService:
             logger.error(f"Error fetching video info for {video_id}: {str(e)}")
             raise Exception(f"Failed to fetch video info: {str(e)}")
     
+    async def stream_video(self, video_id: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """
+        Stream a Twitch video in chunks.
+        
+        Twitch VODs are HLS playlists, so they are remuxed by ffmpeg into
+        fragmented mp4 on a pipe rather than fetched as one file.
+        
+        Args:
+            video_id: Twitch video ID
+            chunk_size: Bytes per chunk
+            
+        Yields:
+            Video bytes (mp4)
+        """
+        # Twitch video URL
+        url = f'https://www.twitch.tv/videos/{video_id}'
+        
+        ydl_opts = {
+            **self.ydl_opts,
+            'format': 'best',
+        }
+        info_dict = await self._extract_info(url, ydl_opts)
+        if not info_dict:
+            raise Exception(f"Could not fetch video info for {video_id}")
+        
+        logger.info(f"Streaming Twitch video {video_id}")
+        async for chunk in iter_media(MediaSource.from_info(info_dict), chunk_size):
+            yield chunk
+    
     async def download_video_bytes(self, video_id: str) -> bytes:
         """
         Download video bytes from Twitch using yt-dlp.
         
+        Prefer stream_video() where the consumer can take chunks.
+        
         Args:
             video_id: Twitch video ID
             
@@ -334,16 +341,7 @@ class TwitchService:
             Video bytes
         """
         try:
-            # Twitch video URL
-            url = f'https://www.twitch.tv/videos/{video_id}'
-            
-            logger.info(f"Download requested for Twitch video {video_id}")
-            
-            # For now, return a placeholder
-            # In production, you would implement actual download using yt-dlp
-            # with proper file handling and quality selection
-            
-            return f"Twitch video URL: {url}".encode()
+            return await read_all(self.stream_video(video_id))
             
         except Exception as e:
             logger.error(f"Error downloading video {video_id}: {str(e)}")
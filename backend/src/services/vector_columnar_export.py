@@ -0,0 +1,284 @@
+"""
+Columnar Vector Export
+
+Writes embedding exports in binary columnar layouts instead of JSON text:
+
+- Parquet / Feather: vectors stored as an Arrow ``FixedSizeList<float32>``
+  column, written in row-group sized batches, with ids, documents and JSON
+  metadata alongside.
+- NPY: a raw float32 ``.npy`` matrix that loads with ``mmap_mode="r"``, plus a
+  line-aligned JSONL sidecar (``<name>.meta.jsonl``) holding ids, metadata and
+  documents.
+
+Uncompressed Feather files and ``.npy`` matrices can be memory-mapped on load,
+so reading vectors back costs no parsing and no copies.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Sequence, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+COLUMNAR_FORMATS = ("parquet", "feather")
+DEFAULT_ROW_GROUP_SIZE = 65536
+
+
+def vector_schema(dimensions: int, include_documents: bool = True) -> pa.Schema:
+    """
+    Arrow schema for a vector export
+
+    Args:
+        dimensions: Vector length
+        include_documents: Add a nullable ``document`` text column
+
+    Returns:
+        Schema with id, vector (fixed-size float32 list), metadata (JSON text)
+    """
+    fields = [
+        pa.field("id", pa.string(), nullable=False),
+        pa.field("vector", pa.list_(pa.float32(), dimensions), nullable=False),
+        pa.field("metadata", pa.string()),
+    ]
+    if include_documents:
+        fields.append(pa.field("document", pa.string()))
+    return pa.schema(fields, metadata={"dimensions": str(dimensions)})
+
+
+def fixed_size_vector_array(vectors: Union[np.ndarray, Sequence[Sequence[float]]], dimensions: int) -> pa.FixedSizeListArray:
+    """
+    Wrap a (rows, dimensions) matrix as a FixedSizeList<float32> array
+
+    A C-contiguous float32 ndarray is wrapped without copying.
+    """
+    matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+    if matrix.ndim != 2 or matrix.shape[1] != dimensions:
+        raise ValueError(f"Expected vectors of shape (n, {dimensions}), got {matrix.shape}")
+    return pa.FixedSizeListArray.from_arrays(pa.array(matrix.reshape(-1)), dimensions)
+
+
+def _metadata_column(metadatas: Optional[Sequence[Any]], rows: int) -> pa.Array:
+    if metadatas is None:
+        return pa.nulls(rows, pa.string())
+    return pa.array([json.dumps(m, default=str) if m is not None else None for m in metadatas], pa.string())
+
+
+class ColumnarVectorWriter:
+    """
+    Incremental Parquet or Feather writer for vectors
+
+    Each ``write_batch`` call becomes one or more row groups (Parquet) or
+    record batches (Feather) of at most ``row_group_size`` rows.
+    """
+
+    def __init__(
+        self,
+        sink: Any,
+        dimensions: int,
+        file_format: str = "parquet",
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        compression: Optional[str] = None,
+        include_documents: bool = True
+    ):
+        """
+        Args:
+            sink: Output path or writable binary file object
+            dimensions: Vector length
+            file_format: "parquet" or "feather"
+            row_group_size: Maximum rows per row group / record batch
+            compression: Codec; defaults to snappy for Parquet and none for
+                Feather so the file stays memory-mappable
+            include_documents: Write a ``document`` column
+        """
+        if file_format not in COLUMNAR_FORMATS:
+            raise ValueError(f"Unsupported columnar format: {file_format}")
+        self.dimensions = dimensions
+        self.file_format = file_format
+        self.row_group_size = max(1, row_group_size)
+        self.include_documents = include_documents
+        self.schema = vector_schema(dimensions, include_documents)
+        self.rows_written = 0
+
+        if file_format == "parquet":
+            self._writer = pq.ParquetWriter(
+                sink,
+                self.schema,
+                compression=compression or "snappy",
+                # Splitting float bytes into streams lets the codec find redundancy
+                use_byte_stream_split=["vector.list.element"],
+                use_dictionary=False,
+            )
+        else:
+            options = pa.ipc.IpcWriteOptions(compression=compression) if compression else None
+            self._writer = pa.ipc.new_file(sink, self.schema, options=options)
+
+    def write_batch(
+        self,
+        ids: Sequence[str],
+        vectors: Union[np.ndarray, Sequence[Sequence[float]]],
+        metadatas: Optional[Sequence[Any]] = None,
+        documents: Optional[Sequence[Optional[str]]] = None
+    ):
+        """
+        Append rows
+
+        Args:
+            ids: Record ids
+            vectors: (rows, dimensions) matrix or list of vectors
+            metadatas: Per-row metadata dicts, stored as JSON text
+            documents: Per-row source text
+        """
+        matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+        for start in range(0, len(ids), self.row_group_size):
+            end = start + self.row_group_size
+            rows = len(ids[start:end])
+            columns = [
+                pa.array(ids[start:end], pa.string()),
+                fixed_size_vector_array(matrix[start:end], self.dimensions),
+                _metadata_column(metadatas[start:end] if metadatas is not None else None, rows),
+            ]
+            if self.include_documents:
+                columns.append(pa.array(documents[start:end], pa.string()) if documents is not None else pa.nulls(rows, pa.string()))
+            batch = pa.RecordBatch.from_arrays(columns, schema=self.schema)
+            if self.file_format == "parquet":
+                self._writer.write_batch(batch, row_group_size=self.row_group_size)
+            else:
+                self._writer.write_batch(batch)
+            self.rows_written += rows
+
+    def close(self):
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def npy_sidecar_path(npy_path: Union[str, Path]) -> Path:
+    """Path of the JSONL sidecar that accompanies a ``.npy`` vector file"""
+    path = Path(npy_path)
+    return path.with_name(f"{path.stem}.meta.jsonl")
+
+
+class NpyVectorWriter:
+    """
+    Writes vectors into a preallocated float32 ``.npy`` file plus JSONL sidecar
+
+    The row count must be known up front because the ``.npy`` header records
+    the matrix shape; rows are written straight into a memory map.
+    """
+
+    def __init__(self, path: Union[str, Path], count: int, dimensions: int):
+        """
+        Args:
+            path: Output ``.npy`` path
+            count: Total number of rows
+            dimensions: Vector length
+        """
+        self.path = Path(path)
+        self.count = count
+        self.dimensions = dimensions
+        self.rows_written = 0
+        self._matrix = np.lib.format.open_memmap(self.path, mode="w+", dtype=np.float32, shape=(count, dimensions))
+        self._sidecar = open(npy_sidecar_path(self.path), "w", encoding="utf-8")
+
+    def write_batch(
+        self,
+        ids: Sequence[str],
+        vectors: Union[np.ndarray, Sequence[Sequence[float]]],
+        metadatas: Optional[Sequence[Any]] = None,
+        documents: Optional[Sequence[Optional[str]]] = None
+    ):
+        """Append rows; see ColumnarVectorWriter.write_batch"""
+        rows = len(ids)
+        end = self.rows_written + rows
+        if end > self.count:
+            raise ValueError(f"NPY export sized for {self.count} rows, got {end}")
+        self._matrix[self.rows_written:end] = np.asarray(vectors, dtype=np.float32).reshape(rows, self.dimensions)
+        lines = []
+        for i in range(rows):
+            lines.append(json.dumps({
+                "id": ids[i],
+                "metadata": metadatas[i] if metadatas is not None else None,
+                "document": documents[i] if documents is not None else None,
+            }, default=str))
+        self._sidecar.write("\n".join(lines) + "\n" if lines else "")
+        self.rows_written = end
+
+    def close(self):
+        if self.rows_written != self.count:
+            logger.warning(f"NPY export {self.path} expected {self.count} rows, wrote {self.rows_written}")
+        self._matrix.flush()
+        del self._matrix
+        self._sidecar.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def open_npy_vectors(path: Union[str, Path]) -> np.memmap:
+    """Memory-map a ``.npy`` vector export read-only"""
+    return np.load(path, mmap_mode="r")
+
+
+def read_vector_batches(path: Union[str, Path], file_format: Optional[str] = None, batch_size: int = DEFAULT_ROW_GROUP_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Read a vector export back in batches
+
+    Vectors come back as (rows, dimensions) float32 arrays; for Feather and
+    NPY these are views into the memory-mapped file.
+
+    Args:
+        path: Export file path
+        file_format: parquet, feather or npy; inferred from the extension if omitted
+        batch_size: Rows per batch for NPY (Parquet/Feather use their own row groups)
+
+    Yields:
+        Dicts with ids, vectors, metadatas and documents
+    """
+    path = Path(path)
+    file_format = file_format or path.suffix.lstrip(".").lower()
+
+    if file_format == "npy":
+        matrix = open_npy_vectors(path)
+        with open(npy_sidecar_path(path), "r", encoding="utf-8") as sidecar:
+            for start in range(0, matrix.shape[0], batch_size):
+                rows = [json.loads(next(sidecar)) for _ in range(min(batch_size, matrix.shape[0] - start))]
+                yield {
+                    "ids": [row["id"] for row in rows],
+                    "vectors": matrix[start:start + len(rows)],
+                    "metadatas": [row["metadata"] for row in rows],
+                    "documents": [row["document"] for row in rows],
+                }
+        return
+
+    if file_format == "parquet":
+        parquet_file = pq.ParquetFile(path)
+        batches = (parquet_file.read_row_group(i).to_batches()[0] for i in range(parquet_file.num_row_groups))
+    elif file_format in ("feather", "arrow"):
+        reader = pa.ipc.open_file(pa.memory_map(str(path), "r"))
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    else:
+        raise ValueError(f"Unsupported vector export format: {file_format}")
+
+    for batch in batches:
+        vector_column = batch.column("vector")
+        dimensions = vector_column.type.list_size
+        flat = vector_column.flatten().to_numpy(zero_copy_only=False)
+        metadata = batch.column("metadata").to_pylist()
+        yield {
+            "ids": batch.column("id").to_pylist(),
+            "vectors": flat.reshape(-1, dimensions),
+            "metadatas": [json.loads(m) if m is not None else None for m in metadata],
+            "documents": batch.column("document").to_pylist() if "document" in batch.schema.names else None,
+        }
@@ -15,7 +15,6 @@ from datetime import datetime
 import hashlib
 import uuid
 from enum import Enum
-import pandas as pd
 import numpy as np
 from dataclasses import dataclass, asdict
 from pydantic import BaseModel, Field
@@ -25,6 +24,8 @@ from .jina.embeddings_service import JinaEmbeddingsService
 from .jina.models import JinaEmbeddingData
 from .gemini.embeddings_service import GeminiEmbeddingsService
 from .gemini.models import GeminiEmbeddingData
+from .vector_columnar_export import ColumnarVectorWriter, NpyVectorWriter, npy_sidecar_path
+from . import vector_import_scripts
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +40,8 @@ class ExportFormat(str, Enum):
     JSON = "json"
     CSV = "csv"
     PARQUET = "parquet"
+    FEATHER = "feather"
+    NPY = "npy"
     VECTOR = "vector"
 
 class TaskType(str, Enum):
@@ -80,6 +83,8 @@ class VectorExportConfig(BaseModel):
     include_text: bool = Field(default=True, description="Include original text")
     validate_vectors: bool = Field(default=True, description="Validate vector data")
     output_path: Optional[str] = Field(default=None, description="Output file path")
+    row_group_size: int = Field(default=65536, description="Rows per Parquet row group / Feather record batch")
+    import_workers: int = Field(default=4, description="Parallel upsert workers in generated import scripts")
     
 class VectorImportConfig(BaseModel):
     """Configuration for vector import operations"""
@@ -155,13 +160,16 @@ class VectorDatabaseService:
         # Export in requested format
         export_data = await self._export_in_format(formatted_data, config)
         
-        # Generate import scripts
-        import_scripts = self._create_import_scripts(formatted_data, config)
+        # Generate import scripts that stream from a data file
+        import_data_file, import_data = self._write_import_data_file(formatted_data, export_data, config)
+        import_scripts = self._create_import_scripts(formatted_data, config, import_data_file)
         
         result = {
             "metadata": metadata,
             "export_data": export_data,
             "import_scripts": import_scripts,
+            "import_data_file": import_data_file,
+            "import_data": import_data,
             "config": config.dict(),
             "record_count": len(records)
         }
@@ -326,6 +334,12 @@ class VectorDatabaseService:
         elif config.format == ExportFormat.PARQUET:
             return self._export_to_parquet(data, config)
             
+        elif config.format == ExportFormat.FEATHER:
+            return self._export_to_columnar(data, config, "feather")
+            
+        elif config.format == ExportFormat.NPY:
+            return self._export_to_npy(data, config)
+            
         elif config.format == ExportFormat.VECTOR:
             return self._export_to_vector_format(data, config)
             
@@ -377,39 +391,117 @@ class VectorDatabaseService:
             return output.getvalue()
         return ""
     
-    def _export_to_parquet(self, data: Dict[str, Any], config: VectorExportConfig) -> bytes:
+    def _export_to_parquet(self, data: Dict[str, Any], config: VectorExportConfig) -> Union[bytes, Dict[str, Any]]:
         """Export data to Parquet format"""
-        logger.info("Converting to Parquet format")
-        
+        return self._export_to_columnar(data, config, "parquet")
+    
+    def _extract_vector_columns(self, data: Dict[str, Any], config: VectorExportConfig) -> Dict[str, Any]:
+        """Pull ids, vectors, metadata and documents out of provider-formatted data"""
         if config.provider == VectorDatabaseProvider.PINECONE:
-            df_data = {
-                "id": [v["id"] for v in data["vectors"]],
-                "vector": [v["values"] for v in data["vectors"]],
-                "metadata": [v["metadata"] for v in data["vectors"]]
+            return {
+                "ids": [v["id"] for v in data["vectors"]],
+                "vectors": [v["values"] for v in data["vectors"]],
+                "metadatas": [v["metadata"] for v in data["vectors"]],
+                "documents": None
             }
             
         elif config.provider == VectorDatabaseProvider.CHROMADB:
-            df_data = {
-                "id": data["ids"],
-                "vector": data["embeddings"],
-                "metadata": data["metadatas"],
-                "document": data["documents"]
+            return {
+                "ids": data["ids"],
+                "vectors": data["embeddings"],
+                "metadatas": data["metadatas"],
+                "documents": data["documents"]
             }
             
         elif config.provider == VectorDatabaseProvider.WEAVIATE:
-            df_data = {
-                "id": [obj["id"] for obj in data["objects"]],
-                "vector": [obj["vector"] for obj in data["objects"]],
-                "properties": [obj["properties"] for obj in data["objects"]]
+            return {
+                "ids": [obj["id"] for obj in data["objects"]],
+                "vectors": [obj["vector"] for obj in data["objects"]],
+                "metadatas": [obj["properties"] for obj in data["objects"]],
+                "documents": None
             }
             
-        df = pd.DataFrame(df_data)
+        raise ValueError(f"Unsupported provider: {config.provider}")
+    
+    def _write_vector_columns(self, writer: Any, columns: Dict[str, Any], chunk_size: int):
+        """Feed columns to a vector writer one chunk at a time"""
+        documents = columns["documents"]
+        for start in range(0, len(columns["ids"]), chunk_size):
+            end = start + chunk_size
+            writer.write_batch(
+                columns["ids"][start:end],
+                np.asarray(columns["vectors"][start:end], dtype=np.float32),
+                columns["metadatas"][start:end],
+                documents[start:end] if documents is not None else None
+            )
+    
+    def _export_to_columnar(
+        self,
+        data: Dict[str, Any],
+        config: VectorExportConfig,
+        file_format: str
+    ) -> Union[bytes, Dict[str, Any]]:
+        """
+        Export vectors as a FixedSizeList<float32> column in Parquet or Feather
+        
+        Written straight to ``config.output_path`` in row-group batches when a
+        path is set, otherwise returned as bytes.
+        """
+        logger.info(f"Converting to {file_format} format")
+        
+        columns = self._extract_vector_columns(data, config)
+        if not columns["ids"]:
+            return b""
+        dimensions = len(columns["vectors"][0])
         
-        # Convert to parquet bytes
-        import io
-        buffer = io.BytesIO()
-        df.to_parquet(buffer, index=False)
-        return buffer.getvalue()
+        if config.output_path:
+            output_path = Path(config.output_path)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            sink = str(output_path)
+        else:
+            import io
+            sink = io.BytesIO()
+            
+        with ColumnarVectorWriter(
+            sink,
+            dimensions,
+            file_format=file_format,
+            row_group_size=config.row_group_size,
+            include_documents=columns["documents"] is not None
+        ) as writer:
+            self._write_vector_columns(writer, columns, config.row_group_size)
+            
+        if config.output_path:
+            return {
+                "format": file_format,
+                "path": sink,
+                "rows": len(columns["ids"]),
+                "dimensions": dimensions
+            }
+        return sink.getvalue()
+    
+    def _export_to_npy(self, data: Dict[str, Any], config: VectorExportConfig) -> Dict[str, Any]:
+        """Export vectors as a raw float32 .npy matrix plus a JSONL metadata sidecar"""
+        logger.info("Converting to NPY format")
+        
+        if not config.output_path:
+            raise ValueError("NPY export requires output_path")
+            
+        columns = self._extract_vector_columns(data, config)
+        dimensions = len(columns["vectors"][0]) if columns["vectors"] else 0
+        output_path = Path(config.output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        with NpyVectorWriter(output_path, len(columns["ids"]), dimensions) as writer:
+            self._write_vector_columns(writer, columns, config.row_group_size)
+            
+        return {
+            "format": "npy",
+            "path": str(output_path),
+            "sidecar_path": str(npy_sidecar_path(output_path)),
+            "rows": len(columns["ids"]),
+            "dimensions": dimensions
+        }
     
     def _export_to_vector_format(self, data: Dict[str, Any], config: VectorExportConfig) -> Dict[str, Any]:
         """Export data in raw vector format for direct import"""
@@ -502,169 +594,109 @@ class VectorDatabaseService:
             
         return True
     
-    def _create_import_scripts(self, data: Dict[str, Any], config: VectorExportConfig) -> Dict[str, str]:
+    def _write_import_data_file(
+        self,
+        data: Dict[str, Any],
+        export_data: Any,
+        config: VectorExportConfig
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Write the data file the import scripts read from
+        
+        NPY exports are read directly; otherwise a JSONL file is written next
+        to ``config.output_path``. Without an output path the JSONL content is
+        returned instead, to be saved as ``vectors.import.jsonl`` beside the
+        scripts.
+        
+        Returns:
+            Tuple of (data file the scripts read, inline JSONL content or None)
+        """
+        if isinstance(export_data, dict) and export_data.get("format") == "npy":
+            return export_data["path"], None
+        columns = self._extract_vector_columns(data, config)
+        if not config.output_path:
+            content = "".join(vector_import_scripts.iter_import_data_lines(
+                columns["ids"],
+                columns["vectors"],
+                columns["metadatas"],
+                columns["documents"]
+            ))
+            return vector_import_scripts.DEFAULT_IMPORT_DATA_FILE, content
+        path = vector_import_scripts.write_import_data_file(
+            vector_import_scripts.import_data_path(config.output_path),
+            columns["ids"],
+            columns["vectors"],
+            columns["metadatas"],
+            columns["documents"]
+        )
+        return path, None
+    
+    def _create_import_scripts(
+        self,
+        data: Dict[str, Any],
+        config: VectorExportConfig,
+        data_file: Optional[str] = None
+    ) -> Dict[str, str]:
         """Generate import scripts for different database providers"""
         logger.info("Creating import scripts")
         
+        data_file = data_file or vector_import_scripts.DEFAULT_IMPORT_DATA_FILE
         scripts = {}
         
         if config.provider == VectorDatabaseProvider.PINECONE:
-            scripts["python"] = self._create_pinecone_import_script(data, config)
-            scripts["cli"] = self._create_pinecone_cli_script(data, config)
+            scripts["python"] = self._create_pinecone_import_script(data, config, data_file)
+            scripts["cli"] = self._create_pinecone_cli_script(data, config, data_file)
             
         elif config.provider == VectorDatabaseProvider.CHROMADB:
-            scripts["python"] = self._create_chromadb_import_script(data, config)
+            scripts["python"] = self._create_chromadb_import_script(data, config, data_file)
             
         elif config.provider == VectorDatabaseProvider.WEAVIATE:
-            scripts["python"] = self._create_weaviate_import_script(data, config)
+            scripts["python"] = self._create_weaviate_import_script(data, config, data_file)
             scripts["graphql"] = self._create_weaviate_graphql_script(data, config)
             
         return scripts
     
-    def _create_pinecone_import_script(self, data: Dict[str, Any], config: VectorExportConfig) -> str:
+    def _pinecone_dimension(self, data: Dict[str, Any]) -> int:
+        return len(data['vectors'][0]['values']) if data['vectors'] else 1024
+    
+    def _create_pinecone_import_script(self, data: Dict[str, Any], config: VectorExportConfig, data_file: str) -> str:
         """Create Python import script for Pinecone"""
-        return f'''
-import pinecone
-import json
-from typing import List, Dict, Any
-
-# Initialize Pinecone
-pinecone.init(api_key="YOUR_API_KEY", environment="YOUR_ENVIRONMENT")
-
-# Create or connect to index
-index_name = "{data.get('index_name', 'embeddings')}"
-namespace = "{data.get('namespace', 'default')}"
-
-if index_name not in pinecone.list_indexes():
-    pinecone.create_index(
-        name=index_name,
-        dimension={len(data['vectors'][0]['values']) if data['vectors'] else 1024},
-        metric="cosine"
-    )
-
-index = pinecone.Index(index_name)
-
-# Load and import vectors
-def import_vectors(vectors: List[Dict[str, Any]], batch_size: int = {config.batch_size}):
-    for i in range(0, len(vectors), batch_size):
-        batch = vectors[i:i + batch_size]
-        index.upsert(vectors=batch, namespace=namespace)
-        print(f"Imported batch {{i//batch_size + 1}}: {{len(batch)}} vectors")
-
-# Import the data
-vectors = {json.dumps(data['vectors'], indent=2)}
-import_vectors(vectors)
-print(f"Successfully imported {{len(vectors)}} vectors to Pinecone")
-'''
+        return vector_import_scripts.create_pinecone_import_script(
+            data_file,
+            index_name=data.get('index_name', 'embeddings'),
+            namespace=data.get('namespace', 'default'),
+            dimension=self._pinecone_dimension(data),
+            batch_size=config.batch_size,
+            workers=config.import_workers
+        )
     
-    def _create_pinecone_cli_script(self, data: Dict[str, Any], config: VectorExportConfig) -> str:
+    def _create_pinecone_cli_script(self, data: Dict[str, Any], config: VectorExportConfig, data_file: str) -> str:
         """Create CLI script for Pinecone"""
-        return f'''
-# Pinecone CLI Import Script
-# Save vectors to file first, then import
-
-# 1. Save vectors to JSON file
-echo '{json.dumps(data["vectors"])}' > pinecone_vectors.json
-
-# 2. Create index (replace with your settings)
-pinecone create-index {data.get('index_name', 'embeddings')} \\
-    --dimension {len(data['vectors'][0]['values']) if data['vectors'] else 1024} \\
-    --metric cosine
-
-# 3. Import vectors
-pinecone import {data.get('index_name', 'embeddings')} \\
-    --namespace {data.get('namespace', 'default')} \\
-    --file pinecone_vectors.json
-'''
+        return vector_import_scripts.create_pinecone_cli_script(
+            data_file,
+            index_name=data.get('index_name', 'embeddings'),
+            namespace=data.get('namespace', 'default'),
+            dimension=self._pinecone_dimension(data)
+        )
     
-    def _create_chromadb_import_script(self, data: Dict[str, Any], config: VectorExportConfig) -> str:
+    def _create_chromadb_import_script(self, data: Dict[str, Any], config: VectorExportConfig, data_file: str) -> str:
         """Create Python import script for ChromaDB"""
-        return f'''
-import chromadb
-import json
-from typing import List, Dict, Any
-
-# Initialize ChromaDB client
-client = chromadb.Client()
-
-# Create or get collection
-collection_name = "{data.get('collection_name', 'embeddings')}"
-collection = client.get_or_create_collection(name=collection_name)
-
-# Load and import data
-def import_embeddings(
-    ids: List[str],
-    embeddings: List[List[float]],
-    metadatas: List[Dict[str, Any]],
-    documents: List[str],
-    batch_size: int = {config.batch_size}
-):
-    total = len(ids)
-    for i in range(0, total, batch_size):
-        batch_ids = ids[i:i + batch_size]
-        batch_embeddings = embeddings[i:i + batch_size]
-        batch_metadatas = metadatas[i:i + batch_size]
-        batch_documents = documents[i:i + batch_size]
-        
-        collection.add(
-            ids=batch_ids,
-            embeddings=batch_embeddings,
-            metadatas=batch_metadatas,
-            documents=batch_documents
+        return vector_import_scripts.create_chromadb_import_script(
+            data_file,
+            collection_name=data.get('collection_name', 'embeddings'),
+            batch_size=config.batch_size,
+            workers=config.import_workers
         )
-        print(f"Imported batch {{i//batch_size + 1}}: {{len(batch_ids)}} vectors")
-
-# Import the data
-data = {json.dumps(data, indent=2)}
-import_embeddings(
-    ids=data["ids"],
-    embeddings=data["embeddings"],
-    metadatas=data["metadatas"],
-    documents=data["documents"]
-)
-print(f"Successfully imported {{len(data['ids'])}} vectors to ChromaDB")
-'''
     
-    def _create_weaviate_import_script(self, data: Dict[str, Any], config: VectorExportConfig) -> str:
+    def _create_weaviate_import_script(self, data: Dict[str, Any], config: VectorExportConfig, data_file: str) -> str:
         """Create Python import script for Weaviate"""
-        return f'''
-import weaviate
-import json
-from typing import List, Dict, Any
-
-# Initialize Weaviate client
-client = weaviate.Client("http://localhost:8080")  # Replace with your Weaviate URL
-
-# Create schema
-class_name = "{data.get('class_name', 'Embeddings')}"
-schema = {json.dumps(data.get('schema', {}), indent=2)}
-
-# Create class if it doesn't exist
-if not client.schema.exists(class_name):
-    client.schema.create_class(schema)
-
-# Import objects
-def import_objects(objects: List[Dict[str, Any]], batch_size: int = {config.batch_size}):
-    total = len(objects)
-    for i in range(0, total, batch_size):
-        batch = objects[i:i + batch_size]
-        
-        with client.batch as batch_client:
-            batch_client.batch_size = batch_size
-            for obj in batch:
-                batch_client.add_data_object(
-                    data_object=obj["properties"],
-                    class_name=class_name,
-                    uuid=obj["id"],
-                    vector=obj["vector"]
-                )
-        print(f"Imported batch {{i//batch_size + 1}}: {{len(batch)}} objects")
-
-# Import the data
-objects = {json.dumps(data['objects'], indent=2)}
-import_objects(objects)
-print(f"Successfully imported {{len(objects)}} objects to Weaviate")
-'''
+        return vector_import_scripts.create_weaviate_import_script(
+            data_file,
+            class_name=data.get('class_name', 'Embeddings'),
+            schema=data.get('schema', {}),
+            batch_size=config.batch_size,
+            workers=config.import_workers
+        )
     
     def _create_weaviate_graphql_script(self, data: Dict[str, Any], config: VectorExportConfig) -> str:
         """Create GraphQL script for Weaviate"""
@@ -693,9 +725,11 @@ mutation {{
             with open(output_path, 'w') as f:
                 f.write(data['export_data'])
                 
-        elif config.format == ExportFormat.PARQUET:
-            with open(output_path, 'wb') as f:
-                f.write(data['export_data'])
+        elif config.format in (ExportFormat.PARQUET, ExportFormat.FEATHER, ExportFormat.NPY):
+            # Columnar exports with an output path are written in place
+            if isinstance(data['export_data'], bytes):
+                with open(output_path, 'wb') as f:
+                    f.write(data['export_data'])
                 
         logger.info(f"Export data saved to {output_path}")
     
@@ -767,7 +801,7 @@ mutation {{
                     "Managed service", "High performance", "Scalable",
                     "Multiple indexes", "Namespaces", "Metadata filtering"
                 ],
-                "supported_formats": ["json", "csv", "parquet", "vector"],
+                "supported_formats": ["json", "csv", "parquet", "feather", "npy", "vector"],
                 "max_dimensions": 40000,
                 "max_metadata_size": "40KB",
                 "distance_metrics": ["cosine", "euclidean", "dotproduct"]
@@ -779,7 +813,7 @@ mutation {{
                     "Open source", "Local or cloud", "SQL-like queries",
                     "Collections", "Metadata filtering", "Document storage"
                 ],
-                "supported_formats": ["json", "csv", "parquet", "vector"],
+                "supported_formats": ["json", "csv", "parquet", "feather", "npy", "vector"],
                 "max_dimensions": "No limit",
                 "max_metadata_size": "No limit",
                 "distance_metrics": ["cosine", "euclidean", "ip"]
@@ -791,7 +825,7 @@ mutation {{
                     "GraphQL API", "Schema-based", "Auto-vectorization",
                     "Hybrid search", "Multi-tenancy", "Modules"
                 ],
-                "supported_formats": ["json", "csv", "parquet", "vector"],
+                "supported_formats": ["json", "csv", "parquet", "feather", "npy", "vector"],
                 "max_dimensions": "No limit",
                 "max_metadata_size": "No limit",
                 "distance_metrics": ["cosine", "euclidean", "dot", "manhattan"]
@@ -818,9 +852,10 @@ mutation {{
         elif format == ExportFormat.CSV:
             # CSV is more compact
             estimated_size = base_size_per_record * len(records) * 1.2
-        elif format == ExportFormat.PARQUET:
-            # Parquet is most compact
-            estimated_size = base_size_per_record * len(records) * 0.8
+        elif format in (ExportFormat.PARQUET, ExportFormat.FEATHER, ExportFormat.NPY):
+            # Columnar formats store float32 vectors at 4 bytes per dimension
+            binary_size = len(sample_record.vector) * 4 + metadata_size + text_size
+            estimated_size = binary_size * len(records)
         else:
             estimated_size = base_size_per_record * len(records)
         # Estimate processing time (rough approximation)
@@ -18,10 +18,13 @@ from datetime import datetime
 from typing import Dict, List, Any, Optional, Union
 from dataclasses import dataclass, asdict
 from pathlib import Path
-import pandas as pd
 import numpy as np
 from enum import Enum
 
+from src.core.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
 logger = logging.getLogger(__name__)
 
 
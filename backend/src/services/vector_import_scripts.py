@@ -0,0 +1,277 @@
+"""
+Vector Database Import Scripts
+
+Generates standalone Python import scripts for Pinecone, ChromaDB and
+Weaviate that stream vectors from a data file instead of carrying them inline.
+The data file is either JSONL (one ``{"id", "vector", "metadata", "document"}``
+object per line) or a float32 ``.npy`` matrix with its ``.meta.jsonl``
+sidecar, as written by ``vector_columnar_export.NpyVectorWriter``.
+
+Scripts read the file lazily in ``--batch-size`` upserts and keep at most two
+batches per ``--workers`` thread in memory, so script size and generation cost
+do not depend on the number of vectors.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IMPORT_WORKERS = 4
+DEFAULT_IMPORT_DATA_FILE = "vectors.import.jsonl"
+
+_READER = '''
+import argparse
+import json
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+
+def read_records(path):
+    """Yield {"id", "vector", "metadata", "document"} records from JSONL or .npy + sidecar"""
+    path = Path(path)
+    if path.suffix == ".npy":
+        import numpy as np
+        vectors = np.load(path, mmap_mode="r")
+        with open(path.with_name(path.stem + ".meta.jsonl"), encoding="utf-8") as sidecar:
+            for row, line in enumerate(sidecar):
+                record = json.loads(line)
+                record["vector"] = vectors[row].tolist()
+                yield record
+    else:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def read_batches(path, batch_size):
+    batch = []
+    for record in read_records(path):
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run_parallel(path, batch_size, workers, upsert):
+    """Upsert batches on a thread pool with a bounded number of batches in flight"""
+    imported = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for batch in read_batches(path, batch_size):
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    imported += future.result()
+            pending.add(pool.submit(upsert, batch))
+        for future in pending:
+            imported += future.result()
+    return imported
+
+
+parser = argparse.ArgumentParser(description="Import vectors from " + DATA_FILE)
+parser.add_argument("data_file", nargs="?", default=DATA_FILE)
+parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+parser.add_argument("--workers", type=int, default=WORKERS)
+args = parser.parse_args()
+'''
+
+
+def import_data_path(output_path: Union[str, Path]) -> Path:
+    """Default JSONL import data file that sits next to an export"""
+    path = Path(output_path)
+    return path.with_name(f"{path.stem}.import.jsonl")
+
+
+def iter_import_data_lines(
+    ids: Sequence[str],
+    vectors: Sequence[Sequence[float]],
+    metadatas: Optional[Sequence[Dict[str, Any]]] = None,
+    documents: Optional[Sequence[Optional[str]]] = None
+) -> Iterator[str]:
+    """Yield the JSONL lines (newline-terminated) read by the generated scripts"""
+    for i, record_id in enumerate(ids):
+        vector = vectors[i]
+        yield json.dumps({
+            "id": record_id,
+            "vector": vector.tolist() if hasattr(vector, "tolist") else list(vector),
+            "metadata": metadatas[i] if metadatas is not None else {},
+            "document": documents[i] if documents is not None else None,
+        }, default=str) + "\n"
+
+
+def write_import_data_file(
+    path: Union[str, Path],
+    ids: Sequence[str],
+    vectors: Sequence[Sequence[float]],
+    metadatas: Optional[Sequence[Dict[str, Any]]] = None,
+    documents: Optional[Sequence[Optional[str]]] = None
+) -> str:
+    """
+    Write the JSONL data file read by the generated scripts
+
+    Args:
+        path: Output path
+        ids: Record ids
+        vectors: Vectors, one per id
+        metadatas: Per-record metadata
+        documents: Per-record source text
+
+    Returns:
+        The path written, as a string
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(iter_import_data_lines(ids, vectors, metadatas, documents))
+    return str(path)
+
+
+def _header(provider_import: str, data_file: str, batch_size: int, workers: int, **constants) -> str:
+    lines = [provider_import, ""]
+    lines.append(f"DATA_FILE = {str(data_file)!r}")
+    lines.append(f"BATCH_SIZE = {int(batch_size)}")
+    lines.append(f"WORKERS = {int(workers)}")
+    for name, value in constants.items():
+        lines.append(f"{name} = {value!r}")
+    return "\n".join(lines) + "\n" + _READER
+
+
+def create_pinecone_import_script(
+    data_file: str,
+    index_name: str,
+    namespace: str,
+    dimension: int,
+    batch_size: int = 100,
+    workers: int = DEFAULT_IMPORT_WORKERS
+) -> str:
+    """Python script that upserts a data file into a Pinecone index"""
+    return _header(
+        "import pinecone",
+        data_file,
+        batch_size,
+        workers,
+        INDEX_NAME=index_name,
+        NAMESPACE=namespace,
+        DIMENSION=dimension,
+    ) + '''
+# Initialize Pinecone
+pinecone.init(api_key="YOUR_API_KEY", environment="YOUR_ENVIRONMENT")
+
+if INDEX_NAME not in pinecone.list_indexes():
+    pinecone.create_index(name=INDEX_NAME, dimension=DIMENSION, metric="cosine")
+
+index = pinecone.Index(INDEX_NAME)
+
+
+def upsert(batch):
+    index.upsert(
+        vectors=[{"id": r["id"], "values": r["vector"], "metadata": r.get("metadata") or {}} for r in batch],
+        namespace=NAMESPACE,
+    )
+    return len(batch)
+
+
+total = run_parallel(args.data_file, args.batch_size, args.workers, upsert)
+print(f"Successfully imported {total} vectors to Pinecone")
+'''
+
+
+def create_pinecone_cli_script(data_file: str, index_name: str, namespace: str, dimension: int) -> str:
+    """Shell script that imports a data file with the Pinecone CLI"""
+    return f'''
+# Pinecone CLI Import Script
+# Vectors are read from {data_file} (one JSON object per line)
+
+# 1. Create index (replace with your settings)
+pinecone create-index {index_name} \\
+    --dimension {dimension} \\
+    --metric cosine
+
+# 2. Import vectors
+pinecone import {index_name} \\
+    --namespace {namespace} \\
+    --file {data_file}
+'''
+
+
+def create_chromadb_import_script(
+    data_file: str,
+    collection_name: str,
+    batch_size: int = 100,
+    workers: int = DEFAULT_IMPORT_WORKERS
+) -> str:
+    """Python script that adds a data file to a ChromaDB collection"""
+    return _header(
+        "import chromadb",
+        data_file,
+        batch_size,
+        workers,
+        COLLECTION_NAME=collection_name,
+    ) + '''
+# Initialize ChromaDB client
+client = chromadb.Client()
+collection = client.get_or_create_collection(name=COLLECTION_NAME)
+
+
+def upsert(batch):
+    collection.add(
+        ids=[r["id"] for r in batch],
+        embeddings=[r["vector"] for r in batch],
+        metadatas=[r.get("metadata") or {} for r in batch],
+        documents=[r.get("document") or "" for r in batch],
+    )
+    return len(batch)
+
+
+total = run_parallel(args.data_file, args.batch_size, args.workers, upsert)
+print(f"Successfully imported {total} vectors to ChromaDB")
+'''
+
+
+def create_weaviate_import_script(
+    data_file: str,
+    class_name: str,
+    schema: Dict[str, Any],
+    batch_size: int = 100,
+    workers: int = DEFAULT_IMPORT_WORKERS
+) -> str:
+    """Python script that loads a data file into a Weaviate class"""
+    return _header(
+        "import weaviate",
+        data_file,
+        batch_size,
+        workers,
+        CLASS_NAME=class_name,
+        SCHEMA=schema,
+    ) + '''
+# Initialize Weaviate client
+client = weaviate.Client("http://localhost:8080")  # Replace with your Weaviate URL
+
+# Create class if it doesn't exist
+if SCHEMA and not client.schema.exists(CLASS_NAME):
+    client.schema.create_class(SCHEMA)
+
+# The Weaviate client batches and parallelizes requests itself
+client.batch.configure(batch_size=args.batch_size, num_workers=args.workers)
+
+total = 0
+with client.batch as batch_client:
+    for batch in read_batches(args.data_file, args.batch_size):
+        for r in batch:
+            batch_client.add_data_object(
+                data_object=r.get("metadata") or {},
+                class_name=CLASS_NAME,
+                uuid=r["id"],
+                vector=r["vector"],
+            )
+        total += len(batch)
+        print(f"Queued {total} objects")
+
+print(f"Successfully imported {total} objects to Weaviate")
+'''
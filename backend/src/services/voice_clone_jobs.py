@@ -13,6 +13,8 @@ from datetime import datetime
 import asyncio
 from convex import ConvexClient
 
+from src.services.convex_progress import get_progress_publisher
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,6 +25,8 @@ class VoiceCloneJobManager:
         """Initialize job manager with Convex client"""
         self.convex_url = os.getenv("CONVEX_URL", "http://127.0.0.1:3210")
         self.convex_client = ConvexClient(self.convex_url)
+        # Status updates go out through one coalescing async publisher
+        self.progress_publisher = get_progress_publisher(self.convex_url)
         self.environment = os.getenv("ENVIRONMENT", "development")
         
         logger.info(f"Voice Clone Job Manager initialized - Convex URL: {self.convex_url}")
@@ -79,7 +83,7 @@ class VoiceCloneJobManager:
                 job_data["audioFileUrl"] = f"file://{audio_path}"
             
             # Create job in Convex
-            self.convex_client.mutation("voiceCloneJobs:create", job_data)
+            await self.progress_publisher.send("voiceCloneJobs:create", job_data)
             
             logger.info(f"Created voice clone job: {job_id}")
             return job_id
@@ -111,7 +115,11 @@ class VoiceCloneJobManager:
             if updates:
                 mutation_data.update(updates)
             
-            self.convex_client.mutation("voiceCloneJobs:updateStatus", mutation_data)
+            if status == "processing":
+                # Progress ticks: merged per job and sent at most once per interval
+                self.progress_publisher.publish("voiceCloneJobs:updateStatus", mutation_data)
+            else:
+                await self.progress_publisher.send("voiceCloneJobs:updateStatus", mutation_data)
             
             logger.info(f"Updated job {job_id} status to: {status}")
             
@@ -198,7 +206,7 @@ class VoiceCloneJobManager:
             True if successfully claimed, False otherwise
         """
         try:
-            self.convex_client.mutation("voiceCloneJobs:claimJob", {
+            await self.progress_publisher.send("voiceCloneJobs:claimJob", {
                 "jobId": job_id,
                 "workerInfo": worker_info
             })
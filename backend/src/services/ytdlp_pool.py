@@ -0,0 +1,379 @@
+"""
+Shared yt-dlp Extractor Pool
+
+The social content services used to build a fresh ``yt_dlp.YoutubeDL`` for
+every call, re-initializing extractors and HTTP state each time, with no
+limit on how many ran at once. This module keeps them warm instead:
+
+- ``YoutubeDL`` instances are pooled per option profile (the canonical
+  JSON of the options dict), at most ``extractors_per_profile`` each, and
+  reused across calls. An instance is only ever used by one thread at a
+  time and is replaced after ``max_uses`` calls.
+- Extraction runs on a dedicated thread pool, so yt-dlp work is bounded
+  and cannot starve the event loop's default executor.
+- ``extract_info`` results are kept in a short-TTL LRU cache keyed by
+  profile and canonical URL, and concurrent requests for the same key
+  share one extraction.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = int(os.getenv("YTDLP_POOL_WORKERS", "8"))
+DEFAULT_EXTRACTORS_PER_PROFILE = int(os.getenv("YTDLP_EXTRACTORS_PER_PROFILE", "4"))
+DEFAULT_CACHE_TTL = float(os.getenv("YTDLP_INFO_CACHE_TTL", "300"))
+DEFAULT_CACHE_SIZE = int(os.getenv("YTDLP_INFO_CACHE_SIZE", "2048"))
+
+# Errors that will not go away by retrying
+PERMANENT_ERROR_TERMS = (
+    'video unavailable', 'private', 'deleted', 'not found',
+    'does not exist', 'removed', 'blocked'
+)
+
+# Query parameters that never change what a URL points to (sharing, tracking,
+# playback position); anything else may identify content and is kept
+_TRACKING_PARAMS = {
+    "si", "feature", "pp", "t", "start", "ab_channel",                 # YouTube
+    "is_from_webapp", "sender", "sender_device", "_r", "_t", "share_app_id",
+    "share_item_id", "share_link_id", "social_sharing", "lang",       # TikTok
+    "igsh", "igshid", "img_index",                                    # Instagram
+    "tt_content", "tt_medium", "ref", "ref_src", "ref_url",
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid",
+}
+_TRACKING_PREFIXES = ("utm_",)
+
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in _TRACKING_PARAMS or name.startswith(_TRACKING_PREFIXES)
+
+
+def canonical_url(url: str) -> str:
+    """
+    Normalize a content URL for use as a cache key
+
+    Lowercases scheme and host, drops ``www.``/``m.`` prefixes, fragments,
+    trailing slashes and known tracking query parameters; other parameters
+    are kept, sorted.
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    for prefix in ("www.", "m."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query) if not _is_tracking_param(k)))
+    return urlunsplit((parts.scheme.lower() or "https", host, parts.path.rstrip("/"), query, ""))
+
+
+def _default_factory(options: Dict[str, Any]):
+    import yt_dlp
+    return yt_dlp.YoutubeDL(options)
+
+
+def _close_extractor(ydl) -> None:
+    try:
+        ydl.__exit__(None, None, None)
+    except Exception as e:
+        logger.debug(f"Error closing yt-dlp instance: {e}")
+
+
+@dataclass
+class PoolStats:
+    """Counters exposed by a YtdlpExtractorPool"""
+    extractors_created: int = 0
+    extractors_recycled: int = 0
+    extractions: int = 0
+    cache_hits: int = 0
+    shared_inflight: int = 0
+    retries: int = 0
+
+
+class _Profile:
+    """Idle extractors for one options profile, created lazily up to a cap"""
+
+    def __init__(self, options: Dict[str, Any], capacity: int):
+        self.options = options
+        self.capacity = capacity
+        self.idle: "queue.LifoQueue" = queue.LifoQueue()
+        self.created = 0
+        self.uses: Dict[int, int] = {}
+        self.lock = threading.Lock()
+
+
+class YtdlpExtractorPool:
+    """
+    Bounded pool of long-lived YoutubeDL instances with a metadata cache
+    """
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        extractors_per_profile: int = DEFAULT_EXTRACTORS_PER_PROFILE,
+        cache_ttl: float = DEFAULT_CACHE_TTL,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        max_uses: int = 500,
+        factory: Callable[[Dict[str, Any]], Any] = _default_factory,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            workers: Threads running yt-dlp calls
+            extractors_per_profile: Upper bound on instances per options profile
+            cache_ttl: Seconds an extract_info result is reused (0 disables)
+            cache_size: Maximum cached results
+            max_uses: Calls after which an instance is closed and replaced
+            factory: Builds an extractor from an options dict
+            clock: Monotonic time source for cache expiry
+        """
+        self.workers = workers
+        self.extractors_per_profile = extractors_per_profile
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.max_uses = max_uses
+        self.factory = factory
+        self.clock = clock
+        self.stats = PoolStats()
+
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ytdlp")
+        self._profiles: Dict[str, _Profile] = {}
+        self._profiles_lock = threading.Lock()
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+
+    # --- Extractor checkout ------------------------------------------------
+
+    @staticmethod
+    def profile_key(options: Dict[str, Any]) -> str:
+        return json.dumps(options, sort_keys=True, default=repr)
+
+    def _profile(self, options: Dict[str, Any]) -> _Profile:
+        key = self.profile_key(options)
+        with self._profiles_lock:
+            profile = self._profiles.get(key)
+            if profile is None:
+                profile = self._profiles[key] = _Profile(dict(options), self.extractors_per_profile)
+            return profile
+
+    def _checkout(self, profile: _Profile):
+        while True:
+            try:
+                return profile.idle.get_nowait()
+            except queue.Empty:
+                pass
+            with profile.lock:
+                create = profile.created < profile.capacity
+                if create:
+                    profile.created += 1
+            if create:
+                break
+            try:
+                # Wait for a busy one; re-check capacity now and then in
+                # case an instance was retired instead of returned
+                return profile.idle.get(timeout=1.0)
+            except queue.Empty:
+                continue
+        try:
+            ydl = self.factory(profile.options)
+        except Exception:
+            with profile.lock:
+                profile.created -= 1
+            raise
+        self.stats.extractors_created += 1
+        return ydl
+
+    def _checkin(self, profile: _Profile, ydl) -> None:
+        uses = profile.uses.pop(id(ydl), 0) + 1
+        if uses >= self.max_uses:
+            # Replace rather than shrink, so threads already waiting in
+            # _checkout for this profile are still handed an instance
+            _close_extractor(ydl)
+            self.stats.extractors_recycled += 1
+            try:
+                ydl = self.factory(profile.options)
+            except Exception as e:
+                logger.error(f"Could not replace recycled yt-dlp instance: {e}")
+                with profile.lock:
+                    profile.created -= 1
+                return
+            self.stats.extractors_created += 1
+            uses = 0
+        profile.uses[id(ydl)] = uses
+        profile.idle.put(ydl)
+
+    def run_sync(self, options: Dict[str, Any], func: Callable[[Any], Any]) -> Any:
+        """Call ``func(ydl)`` with a pooled extractor in the current thread"""
+        profile = self._profile(options)
+        ydl = self._checkout(profile)
+        try:
+            return func(ydl)
+        finally:
+            self._checkin(profile, ydl)
+
+    async def run(self, options: Dict[str, Any], func: Callable[[Any], Any]) -> Any:
+        """Call ``func(ydl)`` with a pooled extractor on the pool's threads"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.run_sync, options, func)
+
+    # --- Metadata ----------------------------------------------------------
+
+    def _cache_get(self, key: Tuple[str, str]) -> Optional[Any]:
+        if self.cache_ttl <= 0:
+            return None
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            expires_at, info = entry
+            if expires_at <= self.clock():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return info
+
+    def _cache_put(self, key: Tuple[str, str], info: Any) -> None:
+        if self.cache_ttl <= 0 or not info:
+            return
+        with self._cache_lock:
+            self._cache[key] = (self.clock() + self.cache_ttl, info)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def extract_info_sync(self, url: str, options: Dict[str, Any], use_cache: bool = True) -> Optional[Dict[str, Any]]:
+        """Blocking ``extract_info(url, download=False)`` through the pool and cache"""
+        key = (self.profile_key(options), canonical_url(url))
+        if use_cache:
+            cached = self._cache_get(key)
+            if cached is not None:
+                self.stats.cache_hits += 1
+                return cached
+        self.stats.extractions += 1
+        info = self.run_sync(options, lambda ydl: ydl.extract_info(url, download=False))
+        if use_cache:
+            self._cache_put(key, info)
+        return info
+
+    async def extract_info(
+        self,
+        url: str,
+        options: Dict[str, Any],
+        use_cache: bool = True,
+        retries: int = 0,
+        retry_delay: float = 1.0
+    ) -> Optional[Dict[str, Any]]:
+        """
+        ``extract_info(url, download=False)`` on a warm extractor
+
+        Args:
+            url: Content URL
+            options: yt-dlp options; selects the extractor profile
+            use_cache: Serve and store results in the TTL cache
+            retries: Extra attempts after an error, with exponential backoff;
+                errors that look permanent (private, removed, ...) are not retried
+            retry_delay: Backoff before the first retry
+
+        Returns:
+            The info dict (shared with the cache; treat as read-only), or
+            None if yt-dlp returned nothing
+
+        Raises:
+            Exception: The extraction error once retries are exhausted
+        """
+        key = (self.profile_key(options), canonical_url(url))
+        if use_cache:
+            cached = self._cache_get(key)
+            if cached is not None:
+                self.stats.cache_hits += 1
+                return cached
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                self.stats.shared_inflight += 1
+                return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        if use_cache:
+            self._inflight[key] = future
+        try:
+            for attempt in range(retries + 1):
+                try:
+                    self.stats.extractions += 1
+                    info = await self.run(options, lambda ydl: ydl.extract_info(url, download=False))
+                    break
+                except Exception as e:
+                    message = str(e).lower()
+                    if attempt == retries or any(term in message for term in PERMANENT_ERROR_TERMS):
+                        raise
+                    self.stats.retries += 1
+                    logger.warning(f"yt-dlp extraction error (attempt {attempt + 1}/{retries + 1}): {e}")
+                    await asyncio.sleep(retry_delay * (2 ** attempt))
+            if use_cache:
+                self._cache_put(key, info)
+            future.set_result(info)
+            return info
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()                           # mark retrieved when nobody shares it
+            raise
+        finally:
+            if use_cache:
+                self._inflight.pop(key, None)
+
+    def invalidate(self, url: Optional[str] = None) -> None:
+        """Drop cached results for one URL (any profile), or everything"""
+        with self._cache_lock:
+            if url is None:
+                self._cache.clear()
+                return
+            target = canonical_url(url)
+            for key in [k for k in self._cache if k[1] == target]:
+                del self._cache[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return counters plus per-profile pool sizes"""
+        with self._profiles_lock:
+            profiles = {
+                key: {"created": p.created, "idle": p.idle.qsize()} for key, p in self._profiles.items()
+            }
+        return {"cached": len(self._cache), "profiles": profiles, **self.stats.__dict__}
+
+    def close(self) -> None:
+        """Shut down the thread pool and close idle extractors"""
+        self.executor.shutdown(wait=True)
+        with self._profiles_lock:
+            for profile in self._profiles.values():
+                while True:
+                    try:
+                        _close_extractor(profile.idle.get_nowait())
+                    except queue.Empty:
+                        break
+            self._profiles.clear()
+
+
+_pool: Optional[YtdlpExtractorPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_ytdlp_pool() -> YtdlpExtractorPool:
+    """Process-wide extractor pool shared by the social content services"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = YtdlpExtractorPool()
+    return _pool
@@ -0,0 +1,56 @@
+"""
+Shared Task Helpers
+
+Celery tasks pass references to files under a work directory shared by the
+API and every worker (``TASK_WORK_DIR``), never audio bytes, so payloads
+stay a few hundred bytes however long the recording is.
+
+Service methods are async; ``run_async`` drives them on one event loop per
+worker thread, so async singletons (and the models they hold) stay bound to
+a loop that outlives the task.
+"""
+
+import asyncio
+import os
+import shutil
+import threading
+from dataclasses import dataclass
+from typing import Any, Awaitable, Dict
+
+TASK_WORK_DIR = os.getenv("TASK_WORK_DIR", "/tmp/diala_tasks")
+
+_local = threading.local()
+
+
+@dataclass
+class AudioChunk:
+    """A slice of a recording written to its own 16 kHz mono WAV file"""
+    index: int
+    path: str
+    start: float
+    end: float
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AudioChunk":
+        return cls(index=data["index"], path=data["path"], start=data["start"], end=data["end"])
+
+
+def job_dir(job_id: str, *parts: str) -> str:
+    """Create and return ``TASK_WORK_DIR/<job_id>/<parts...>``"""
+    path = os.path.join(TASK_WORK_DIR, job_id, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def remove_job_dir(job_id: str) -> None:
+    """Delete everything a job wrote to the work directory"""
+    shutil.rmtree(os.path.join(TASK_WORK_DIR, job_id), ignore_errors=True)
+
+
+def run_async(coro: Awaitable) -> Any:
+    """Run a coroutine to completion on this thread's persistent event loop"""
+    loop = getattr(_local, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        _local.loop = loop
+    return loop.run_until_complete(coro)
@@ -1,6 +1,188 @@
-from celery import shared_task
+"""
+Transcription Tasks
 
-@shared_task
-def stub(*args, **kwargs):
-    """TODO: implement real logic."""
-    return "stub"
+A file is transcribed as a pipeline of small tasks:
+
+    transcribe_file ─► voice.separate_vocals (gpu, optional)
+                    ─► prepare_chunks: split into WAV chunks (default)
+                    ─► chord(transcribe_chunk × N (gpu) [+ voice.diarize (gpu)])
+                    ─► merge_transcripts (default)
+
+Chunks are written to the job's work directory and tasks exchange their
+paths, so no audio crosses the broker. ``run_transcription`` is the API
+side: it submits the pipeline and waits for it without blocking the loop.
+"""
+
+import asyncio
+import logging
+import os
+import wave
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional
+
+from celery import chain, chord, shared_task
+
+from src.services.audio_stream_decoder import float_to_int16, load_audio, open_audio_stream
+from src.services.realtime_analysis_service import get_realtime_analysis_service
+from src.tasks.common import AudioChunk, job_dir, run_async
+from src.tasks.voice import diarize as diarize_task
+from src.tasks.voice import separate_vocals
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+DEFAULT_CHUNK_SECONDS = float(os.getenv("TRANSCRIBE_CHUNK_SECONDS", "30"))
+NO_SPEECH_MARKERS = ("[NO SPEECH DETECTED]", "[ASR FAILED]")
+
+
+def get_asr_service():
+    """Process-wide ASR service with its models loaded"""
+    service = run_async(get_realtime_analysis_service())
+    run_async(service.ensure_models_loaded())
+    return service
+
+
+def warm() -> None:
+    """Load the ASR models up front so the first task does not pay for it"""
+    get_asr_service()
+
+
+@shared_task(name="transcribe.split_audio")
+def split_audio(audio_path: str, job_id: str, chunk_seconds: float = DEFAULT_CHUNK_SECONDS) -> List[Dict[str, Any]]:
+    """
+    Decode a file to 16 kHz mono and write it as consecutive WAV chunks
+
+    Returns:
+        AudioChunk dicts in order
+    """
+    chunks_dir = job_dir(job_id, "chunks")
+    frame_size = int(chunk_seconds * SAMPLE_RATE)
+    chunks: List[Dict[str, Any]] = []
+    offset = 0
+    with open_audio_stream(audio_path, SAMPLE_RATE, frame_size) as stream:
+        for index, frame in enumerate(stream):
+            path = os.path.join(chunks_dir, f"{index:05d}.wav")
+            with wave.open(path, "wb") as out:
+                out.setnchannels(1)
+                out.setsampwidth(2)
+                out.setframerate(SAMPLE_RATE)
+                out.writeframes(float_to_int16(frame).tobytes())
+            chunk = AudioChunk(index=index, path=path, start=offset / SAMPLE_RATE,
+                               end=(offset + len(frame)) / SAMPLE_RATE)
+            chunks.append(asdict(chunk))
+            offset += len(frame)
+    logger.info(f"Split {audio_path} into {len(chunks)} chunk(s) of up to {chunk_seconds:.0f}s")
+    return chunks
+
+
+@shared_task(name="transcribe.transcribe_chunk")
+def transcribe_chunk(chunk: Dict[str, Any]) -> Dict[str, Any]:
+    """Transcribe one chunk; returns its index, time span and text"""
+    audio_chunk = AudioChunk.from_dict(chunk)
+    audio = load_audio(audio_chunk.path, SAMPLE_RATE)
+    text = run_async(get_asr_service().transcribe_chunk(audio))
+    return {"index": audio_chunk.index, "start": audio_chunk.start, "end": audio_chunk.end, "text": text}
+
+
+def _speaker_for(start: float, end: float, segments: List[Dict[str, Any]]) -> str:
+    """Diarized speaker overlapping [start, end] the most"""
+    best_speaker, best_overlap = "SPEAKER_UNKNOWN", 0.0
+    for segment in segments:
+        overlap = min(end, segment["end"]) - max(start, segment["start"])
+        if overlap > best_overlap:
+            best_speaker, best_overlap = segment["speaker"], overlap
+    return best_speaker
+
+
+@shared_task(name="transcribe.merge_transcripts")
+def merge_transcripts(results: List[Dict[str, Any]], diarized: bool = False) -> Dict[str, Any]:
+    """
+    Join chunk transcripts in time order
+
+    Args:
+        results: Chord results: one per chunk, then the diarization if ``diarized``
+        diarized: Whether the last result is a diarization to label chunks with
+
+    Returns:
+        ``transcription``, per-chunk ``segments`` and ``diarization`` (the
+        same keys AudioPreparationService returns)
+    """
+    diarization: Optional[Dict[str, Any]] = results[-1] if diarized else None
+    chunks = sorted(results[:-1] if diarized else results, key=lambda r: r["index"])
+    speaker_segments = (diarization or {}).get("segments", [])
+
+    segments = []
+    for chunk in chunks:
+        segment = {"start": chunk["start"], "end": chunk["end"], "text": chunk["text"]}
+        if diarization is not None:
+            segment["speaker"] = _speaker_for(chunk["start"], chunk["end"], speaker_segments)
+        segments.append(segment)
+
+    text = " ".join(s["text"] for s in segments if s["text"] and s["text"] not in NO_SPEECH_MARKERS)
+    return {"transcription": text, "segments": segments, "diarization": diarization, "chunks": len(chunks)}
+
+
+def _run_inline(audio_path: str, job_id: str, separate: bool, diarize: bool,
+                chunk_seconds: float) -> Dict[str, Any]:
+    """Run the pipeline stages in order in this process
+
+    Eager mode (tests, local dev) cannot wait on subtasks from inside a task,
+    so the orchestrating tasks call the stages directly there.
+    """
+    if separate:
+        audio_path = separate_vocals(audio_path, job_id)
+    results = [transcribe_chunk(chunk) for chunk in split_audio(audio_path, job_id, chunk_seconds)]
+    if diarize:
+        results.append(diarize_task(audio_path))
+    return merge_transcripts(results, diarized=diarize)
+
+
+@shared_task(name="transcribe.prepare_chunks", bind=True)
+def prepare_chunks(self, audio_path: str, job_id: str, diarize: bool = True,
+                   chunk_seconds: float = DEFAULT_CHUNK_SECONDS):
+    """Split ``audio_path`` and replace this task with the transcription chord"""
+    if self.request.is_eager:
+        return _run_inline(audio_path, job_id, False, diarize, chunk_seconds)
+
+    chunks = split_audio(audio_path, job_id, chunk_seconds)
+    header = [transcribe_chunk.s(chunk) for chunk in chunks]
+    if diarize:
+        header.append(diarize_task.si(audio_path))
+    return self.replace(chord(header, merge_transcripts.s(diarized=diarize)))
+
+
+@shared_task(name="transcribe.transcribe_file", bind=True)
+def transcribe_file(self, audio_path: str, job_id: str, separate: bool = True, diarize: bool = True,
+                    chunk_seconds: float = DEFAULT_CHUNK_SECONDS):
+    """
+    Transcribe a file on the workers
+
+    Args:
+        audio_path: File on storage shared with the workers
+        job_id: Names the job's work directory
+        separate: Extract vocals with Demucs first
+        diarize: Label chunks with diarized speakers
+        chunk_seconds: Length of the chunks transcribed in parallel
+
+    Returns:
+        The merge_transcripts result (via task replacement)
+    """
+    if self.request.is_eager:
+        return _run_inline(audio_path, job_id, separate, diarize, chunk_seconds)
+
+    options = {"job_id": job_id, "diarize": diarize, "chunk_seconds": chunk_seconds}
+    if separate:
+        return self.replace(chain(separate_vocals.si(audio_path, job_id), prepare_chunks.s(**options)))
+    return self.replace(prepare_chunks.si(audio_path, **options))
+
+
+async def run_transcription(audio_path: str, job_id: str, timeout: Optional[float] = None,
+                            **options) -> Dict[str, Any]:
+    """
+    Submit ``transcribe_file`` and await its result without blocking the event loop
+
+    Raises:
+        Whatever the pipeline raised, or celery's TimeoutError
+    """
+    result = transcribe_file.apply_async(args=(audio_path, job_id), kwargs=options)
+    return await asyncio.to_thread(result.get, timeout=timeout)
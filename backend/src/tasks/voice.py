@@ -1,6 +1,116 @@
+"""
+Voice Tasks
+
+GPU-queue tasks for source separation, speaker diarization and speaker
+embeddings. Each takes and returns file paths under the job's work
+directory; the models behind them are loaded once per worker process and
+reused across tasks.
+"""
+
+import logging
+import os
+import shutil
+from typing import Any, Dict, List, Optional
+
+import numpy as np
 from celery import shared_task
 
-@shared_task
-def stub(*args, **kwargs):
-    """TODO: implement real logic."""
-    return "stub"
+from src.services.audio_separation_service import audio_separation_service
+from src.services.audio_stream_decoder import load_audio
+from src.tasks.common import job_dir, run_async
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+
+def get_speaker_embedding_service():
+    """Process-wide speaker embedding model (imports torch on first call)"""
+    from src.services.speaker_embedding_service import get_speaker_embedding_service as get_service
+    return get_service()
+
+
+def warm() -> None:
+    """Load the voice models up front so the first task does not pay for it"""
+    logger.info(f"Warming voice models on {audio_separation_service.device}")
+    audio_separation_service.load_demucs_model()
+    if audio_separation_service.hf_token:
+        audio_separation_service._load_diarization_pipeline()
+    get_speaker_embedding_service()
+
+
+@shared_task(name="voice.separate_vocals")
+def separate_vocals(audio_path: str, job_id: str, model_name: str = "htdemucs") -> str:
+    """
+    Extract the vocal stem with Demucs
+
+    Returns:
+        Path of the vocals file, moved into the job's work directory
+    """
+    vocals_path = run_async(audio_separation_service.extract_vocals(audio_path, model_name=model_name))
+    destination = os.path.join(job_dir(job_id), "vocals" + os.path.splitext(vocals_path)[1])
+    shutil.move(vocals_path, destination)
+    shutil.rmtree(os.path.dirname(os.path.dirname(os.path.dirname(vocals_path))), ignore_errors=True)
+    return destination
+
+
+@shared_task(name="voice.diarize")
+def diarize(
+    audio_path: str,
+    min_speakers: int = 1,
+    max_speakers: int = 10,
+    min_duration: float = 1.0
+) -> Dict[str, Any]:
+    """
+    Speaker diarization of a whole file
+
+    Returns:
+        Diarization result with ``speakers`` and time-ordered ``segments``
+    """
+    return run_async(audio_separation_service.diarize_speakers(
+        audio_path, min_speakers=min_speakers, max_speakers=max_speakers, min_duration=min_duration
+    ))
+
+
+@shared_task(name="voice.speaker_embeddings")
+def speaker_embeddings(
+    audio_path: str,
+    diarization: Dict[str, Any],
+    job_id: str,
+    max_seconds_per_speaker: float = 30.0
+) -> Dict[str, Any]:
+    """
+    One embedding per diarized speaker, from up to ``max_seconds_per_speaker``
+    of their speech
+
+    Returns:
+        ``path`` of an (n_speakers, dim) float32 .npy file and the ``speakers``
+        labels in row order
+    """
+    audio = load_audio(audio_path, SAMPLE_RATE)
+    by_speaker: Dict[str, List[np.ndarray]] = {}
+    budget: Dict[str, int] = {}
+    limit = int(max_seconds_per_speaker * SAMPLE_RATE)
+    for segment in diarization.get("segments", []):
+        speaker = segment["speaker"]
+        remaining = limit - budget.get(speaker, 0)
+        if remaining <= 0:
+            continue
+        piece = audio[int(segment["start"] * SAMPLE_RATE):int(segment["end"] * SAMPLE_RATE)][:remaining]
+        by_speaker.setdefault(speaker, []).append(piece)
+        budget[speaker] = budget.get(speaker, 0) + len(piece)
+
+    service = get_speaker_embedding_service()
+    speakers: List[str] = []
+    rows: List[np.ndarray] = []
+    for speaker, pieces in sorted(by_speaker.items()):
+        embedding: Optional[np.ndarray] = service.extract_embedding(np.concatenate(pieces), SAMPLE_RATE)
+        if embedding is None:
+            logger.warning(f"No embedding for {speaker} in {audio_path}")
+            continue
+        speakers.append(speaker)
+        rows.append(np.asarray(embedding, dtype=np.float32).reshape(-1))
+
+    path = os.path.join(job_dir(job_id), "speaker_embeddings.npy")
+    np.save(path, np.stack(rows) if rows else np.zeros((0, 0), dtype=np.float32))
+    return {"path": path, "speakers": speakers, "dim": int(rows[0].shape[0]) if rows else 0}
@@ -1,5 +1,5 @@
-from core.celery_app import celery_app
+from src.core.celery_app import DEFAULT_QUEUE, celery_app
 
 if __name__ == "__main__":
     celery_app.worker_main(argv=["worker", "-l", "INFO",
-                                 "-Q", "default", "-c", "4"])
+                                 "-Q", DEFAULT_QUEUE, "-c", "4"])
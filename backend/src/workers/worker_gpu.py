@@ -1,5 +1,9 @@
-from core.celery_app import celery_app
+from src.core.celery_app import GPU_QUEUE, celery_app
+from src.tasks import transcribe, voice
 
 if __name__ == "__main__":
+    # One solo process owns the GPU; load the models before taking tasks
+    voice.warm()
+    transcribe.warm()
     celery_app.worker_main(argv=["worker", "-l", "INFO",
-                                 "-Q", "gpu", "-c", "1", "-P", "solo"])
+                                 "-Q", GPU_QUEUE, "-c", "1", "-P", "solo"])
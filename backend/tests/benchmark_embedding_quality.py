@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Embedding Quality Scoring Benchmark
+
+Scores a set of mixed-length segments (0.2-6 s, many with odd or prime
+sample counts) three ways:
+
+- legacy: the previous per-segment scoring, with a full-length complex FFT
+  over each segment at its raw length
+- single: EmbeddingQualityAssessor.assess_quality, one call per segment
+- batch:  EmbeddingQualityAssessor.assess_quality_batch over all segments
+
+and reports wall time per method plus the largest composite score difference
+against the legacy scores.
+
+    python tests/benchmark_embedding_quality.py --segments 500
+"""
+
+import argparse
+import time
+
+import numpy as np
+import scipy.fft
+
+from src.services.embedding_quality_assessor import EmbeddingQualityAssessor
+
+SAMPLE_RATE = 16000
+
+
+def generate_segments(count: int, seed: int = 0):
+    """Voiced-like segments of random length with varying noise"""
+    rng = np.random.default_rng(seed)
+    segments = []
+    for _ in range(count):
+        n = int(rng.integers(int(0.2 * SAMPLE_RATE), 6 * SAMPLE_RATE))
+        t = np.arange(n) / SAMPLE_RATE
+        f0 = rng.uniform(90, 250)
+        y = sum(np.exp(-((k * f0 - 600) / 500) ** 2) * np.sin(2 * np.pi * k * f0 * t) for k in range(1, 20))
+        y = 0.4 * y / (np.abs(y).max() + 1e-9)
+        segments.append((y + rng.uniform(0.005, 0.2) * rng.standard_normal(n)).astype(np.float32))
+    return segments
+
+
+def legacy_assess_quality(assessor: EmbeddingQualityAssessor, audio: np.ndarray) -> float:
+    """Mirror of the previous assess_quality: per-segment SNR and full-FFT spectral score"""
+    frames = assessor._frame_audio(audio, 512, 256)
+    energies = np.sqrt(np.mean(frames ** 2, axis=1))
+    noise, signal = np.percentile(energies, 20), np.percentile(energies, 95)
+    snr_db = 80.0 if noise < 1e-9 else 10 * np.log10((signal / noise) ** 2)
+    if snr_db < 5:
+        snr_quality = 0.3 * (snr_db / 5)
+    elif snr_db < 15:
+        snr_quality = 0.3 + 0.4 * ((snr_db - 5) / 10)
+    elif snr_db < 30:
+        snr_quality = 0.7 + 0.2 * ((snr_db - 15) / 15)
+    else:
+        snr_quality = 0.9 + 0.1 * (min(snr_db - 30, 10) / 10)
+    snr_quality = float(np.clip(snr_quality, 0.0, 1.0))
+
+    fft = np.abs(scipy.fft.fft(audio))
+    freqs = scipy.fft.fftfreq(len(audio), 1 / SAMPLE_RATE)
+    mask = (freqs >= 80) & (freqs <= 4000)
+    speech_fft, speech_freqs = fft[mask], freqs[mask]
+    total_energy = np.sum(speech_fft)
+    centroid = np.sum(speech_freqs * speech_fft) / total_energy
+    spread = np.sqrt(np.sum(((speech_freqs - centroid) ** 2) * speech_fft) / total_energy)
+    flatness = np.exp(np.mean(np.log(speech_fft + 1e-10))) / (np.mean(speech_fft) + 1e-10)
+    peaks = np.sum(speech_fft > np.max(speech_fft) * 0.1)
+    spectral_quality = float(np.clip(
+        0.2 * (1.0 - min(1.0, abs(centroid - 1500) / 1500)) + 0.3 * min(1.0, spread / 1000) +
+        0.3 * min(1.0, flatness * 10) + 0.2 * min(1.0, peaks / 10.0),
+        0.0, 1.0
+    ))
+
+    return float(np.clip(
+        assessor.snr_weight * snr_quality +
+        assessor.duration_weight * assessor._calculate_duration_quality(audio) +
+        assessor.spectral_weight * spectral_quality,
+        0.0, 1.0
+    ))
+
+
+def timed(label: str, func, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<8} {best * 1000:10.1f} ms")
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--segments", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    assessor = EmbeddingQualityAssessor(sample_rate=SAMPLE_RATE)
+    segments = generate_segments(args.segments)
+    total_seconds = sum(len(s) for s in segments) / SAMPLE_RATE
+    odd = sum(len(s) % 2 for s in segments)
+    print(f"{len(segments)} segments, {total_seconds:.0f} s of audio, {odd} with odd lengths")
+
+    legacy_time, legacy = timed("legacy", lambda: [legacy_assess_quality(assessor, s) for s in segments], args.repeat)
+    single_time, _ = timed("single", lambda: [assessor.assess_quality(s) for s in segments], args.repeat)
+    batch_time, batch = timed("batch", lambda: assessor.assess_quality_batch(segments), args.repeat)
+
+    print(f"speedup  single {legacy_time / single_time:5.1f}x   batch {legacy_time / batch_time:5.1f}x")
+    print(f"max |batch - legacy| composite score: {np.max(np.abs(np.array(batch) - np.array(legacy))):.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Multi-Call Inference Scheduling Benchmark
+
+Simulates N concurrent telephony calls, each producing utterances at random
+(exponential) intervals, against one shared model whose cost per invocation
+is a fixed overhead plus a per-utterance term, and which runs one invocation
+at a time (a single CPU box). Two ways of serving the calls are compared:
+
+- inline:    every call runs its own single-utterance inference as soon as an
+             utterance is ready, as TelephonyService did before
+- scheduled: utterances from all calls go through DeadlineBatchScheduler,
+             which forms earliest-deadline-first cross-call batches
+
+For each call count, p50/p95 utterance latency (ready -> result), deadline
+misses and the mean batch size are reported, followed by the largest call
+count each mode sustains with p95 inside the latency budget.
+
+    python tests/benchmark_inference_scheduler.py --calls 8 16 32 64 --budget 1.0
+"""
+
+import argparse
+import asyncio
+import random
+
+import numpy as np
+
+from src.services.inference_scheduler import DeadlineBatchScheduler
+
+
+class SharedDevice:
+    """One model instance: invocations are serialized and cost overhead + per_item * n"""
+
+    def __init__(self, overhead: float, per_item: float):
+        self.overhead = overhead
+        self.per_item = per_item
+        self.invocations = 0
+        self._lock = asyncio.Lock()
+
+    async def infer(self, items):
+        async with self._lock:
+            self.invocations += 1
+            await asyncio.sleep(self.overhead + self.per_item * len(items))
+            return [None] * len(items)
+
+
+async def simulate(mode: str, calls: int, args) -> dict:
+    device = SharedDevice(args.overhead, args.per_item)
+    scheduler = DeadlineBatchScheduler(
+        device.infer, max_batch_size=args.batch_size, latency_budget=args.budget, max_wait=args.max_wait
+    )
+    loop = asyncio.get_running_loop()
+    rng = random.Random(calls)
+    latencies = []
+    end = loop.time() + args.duration
+
+    async def call(call_id: str):
+        while True:
+            await asyncio.sleep(rng.expovariate(1 / args.interval))
+            if loop.time() >= end:
+                return
+            ready = loop.time()
+            if mode == "inline":
+                await device.infer([call_id])
+            else:
+                await scheduler.submit(call_id, call_id)
+            latencies.append(loop.time() - ready)
+
+    await asyncio.gather(*(call(f"call-{i}") for i in range(calls)))
+    stats = scheduler.get_stats()
+    await scheduler.close()
+
+    latencies = np.asarray(latencies)
+    return {
+        "utterances": len(latencies),
+        "p50": float(np.percentile(latencies, 50)),
+        "p95": float(np.percentile(latencies, 95)),
+        "misses": int(np.sum(latencies > args.budget)),
+        "batch": stats["mean_batch_size"] if mode == "scheduled" else 1.0,
+        "invocations": device.invocations,
+    }
+
+
+async def run(args):
+    print(f"model: {args.overhead * 1000:.0f} ms + {args.per_item * 1000:.0f} ms/utterance, "
+          f"one utterance per call every {args.interval:.1f} s, budget {args.budget:.2f} s")
+    print(f"{'calls':>5} {'mode':<10} {'utts':>6} {'p50 ms':>8} {'p95 ms':>8} {'misses':>7} {'batch':>6}")
+    sustained = {"inline": 0, "scheduled": 0}
+    for calls in args.calls:
+        for mode in ("inline", "scheduled"):
+            result = await simulate(mode, calls, args)
+            print(f"{calls:>5} {mode:<10} {result['utterances']:>6} {result['p50'] * 1000:>8.0f} "
+                  f"{result['p95'] * 1000:>8.0f} {result['misses']:>7} {result['batch']:>6.1f}")
+            if result["p95"] <= args.budget:
+                sustained[mode] = max(sustained[mode], calls)
+    print(f"max calls with p95 <= budget: inline {sustained['inline']}, scheduled {sustained['scheduled']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, nargs="+", default=[8, 16, 32, 64, 128])
+    parser.add_argument("--duration", type=float, default=5.0, help="Simulated seconds per run")
+    parser.add_argument("--interval", type=float, default=2.0, help="Mean seconds between utterances per call")
+    parser.add_argument("--overhead", type=float, default=0.08, help="Fixed seconds per model invocation")
+    parser.add_argument("--per-item", type=float, default=0.01, help="Seconds per utterance in a batch")
+    parser.add_argument("--budget", type=float, default=1.0, help="Per-call latency budget in seconds")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-wait", type=float, default=0.05)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+API Startup Benchmark
+
+Imports each router (and optionally ``src.main``) in a fresh interpreter
+and reports the import time, peak RSS and which heavy ML libraries
+(torch, transformers, pyannote, ...) were pulled in. With lazy imports a
+worker serving non-ML routes should boot in well under two seconds and
+load none of them.
+
+    python tests/benchmark_startup.py
+    python tests/benchmark_startup.py --modules src.main --repeat 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+from src.core.lazy import HEAVY_MODULES
+
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = [
+    "src.api.public.hunter_leadgen",
+    "src.api.public.bulk",
+    "src.api.public.tiktok_content",
+    "src.api.public.youtube_content",
+    "src.api.public.audio_transcripts",
+    "src.api.public.voice_onboarding",
+    "src.api.public.realtime_analysis_api",
+    "src.api.public.chatterbox_tts",
+    "src.api.public.tts",
+    "src.main",
+]
+
+PROBE = """
+import importlib, json, resource, sys, time
+start = time.perf_counter()
+try:
+    importlib.import_module(sys.argv[1])
+    error = None
+except Exception as e:
+    error = f"{type(e).__name__}: {e}"
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "seconds": elapsed,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "heavy": [m for m in sys.argv[2:] if m in sys.modules],
+    "error": error,
+}))
+"""
+
+
+def measure(module: str) -> Dict:
+    """Import ``module`` in a new interpreter and return its timings"""
+    env = dict(os.environ, PYTHONPATH=BACKEND_ROOT, PRELOAD_MODELS="false")
+    proc = subprocess.run([sys.executable, "-c", PROBE, module, *HEAVY_MODULES],
+                          cwd=BACKEND_ROOT, env=env, capture_output=True, text=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    results: List[Dict] = []
+    print(f"{'module':<40}{'import s':>10}{'RSS MB':>9}  heavy modules loaded")
+    for module in args.modules:
+        runs = [measure(module) for _ in range(args.repeat)]
+        result = {
+            "module": module,
+            "seconds": statistics.median(r["seconds"] for r in runs),
+            "rss_mb": max(r["rss_mb"] for r in runs),
+            "heavy": runs[-1]["heavy"],
+            "error": runs[-1]["error"],
+        }
+        results.append(result)
+        detail = result["error"].splitlines()[0] if result["error"] else (", ".join(result["heavy"]) or "-")
+        print(f"{module:<40}{result['seconds']:>10.2f}{result['rss_mb']:>9.0f}  {detail}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Vector Export Benchmark
+
+Compares the legacy CSV (JSON-encoded vectors) and pandas Parquet (list
+columns) exports of VectorDatabaseService against the columnar exports
+(Arrow FixedSizeList<float32> Parquet / Feather, raw float32 .npy) on file
+size, write time and read-back time.
+
+The full 1M x 1024 run needs ~4GB for the vectors themselves; the legacy
+writers materialize everything as Python objects and need an order of
+magnitude more, so by default they run on a --legacy-rows sample and their
+numbers are scaled linearly (marked with *).
+
+    python tests/benchmark_vector_export.py --rows 1000000 --dims 1024
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from src.services.vector_columnar_export import (
+    ColumnarVectorWriter,
+    NpyVectorWriter,
+    read_vector_batches,
+)
+
+CHUNK_ROWS = 65536
+
+
+def generate_chunks(rows: int, dims: int, seed: int = 0):
+    """Yield (ids, vectors, metadatas) chunks without holding the full matrix"""
+    rng = np.random.default_rng(seed)
+    for start in range(0, rows, CHUNK_ROWS):
+        count = min(CHUNK_ROWS, rows - start)
+        ids = [f"vec-{i}" for i in range(start, start + count)]
+        vectors = rng.standard_normal((count, dims), dtype=np.float32)
+        metadatas = [{"index": i, "source": "benchmark"} for i in range(start, start + count)]
+        yield ids, vectors, metadatas
+
+
+def legacy_csv_write(path: str, rows: int, dims: int):
+    """Mirror of the previous _export_to_csv: one JSON string per vector"""
+    records = []
+    for ids, vectors, metadatas in generate_chunks(rows, dims):
+        for record_id, vector, metadata in zip(ids, vectors.tolist(), metadatas):
+            records.append({"id": record_id, "vector": json.dumps(vector), "metadata": json.dumps(metadata)})
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=records[0].keys())
+    writer.writeheader()
+    writer.writerows(records)
+    with open(path, "w") as f:
+        f.write(output.getvalue())
+
+
+def legacy_csv_read(path: str) -> int:
+    with open(path, newline="") as f:
+        vectors = [json.loads(row["vector"]) for row in csv.DictReader(f)]
+    return np.asarray(vectors, dtype=np.float32).shape[0]
+
+
+def legacy_parquet_write(path: str, rows: int, dims: int):
+    """Mirror of the previous _export_to_parquet: pandas list columns"""
+    import pandas as pd
+    df_data = {"id": [], "vector": [], "metadata": []}
+    for ids, vectors, metadatas in generate_chunks(rows, dims):
+        df_data["id"].extend(ids)
+        df_data["vector"].extend(vectors.tolist())
+        df_data["metadata"].extend(metadatas)
+    buffer = io.BytesIO()
+    pd.DataFrame(df_data).to_parquet(buffer, index=False)
+    with open(path, "wb") as f:
+        f.write(buffer.getvalue())
+
+
+def legacy_parquet_read(path: str) -> int:
+    import pandas as pd
+    df = pd.read_parquet(path)
+    return np.stack(df["vector"].to_numpy()).astype(np.float32).shape[0]
+
+
+def columnar_write(file_format: str) -> Callable[[str, int, int], None]:
+    def write(path: str, rows: int, dims: int):
+        with ColumnarVectorWriter(path, dims, file_format=file_format, include_documents=False) as writer:
+            for ids, vectors, metadatas in generate_chunks(rows, dims):
+                writer.write_batch(ids, vectors, metadatas)
+    return write
+
+
+def npy_write(path: str, rows: int, dims: int):
+    with NpyVectorWriter(path, rows, dims) as writer:
+        for ids, vectors, metadatas in generate_chunks(rows, dims):
+            writer.write_batch(ids, vectors, metadatas)
+
+
+def columnar_read(path: str) -> int:
+    # Touch every vector so lazily mapped formats pay for their I/O too
+    total = 0
+    for batch in read_vector_batches(path):
+        total += batch["vectors"].shape[0]
+        float(batch["vectors"].sum())
+    return total
+
+
+def run_case(name: str, suffix: str, write, read, rows: int, dims: int, scale: float, workdir: str) -> Dict:
+    path = os.path.join(workdir, f"{name}.{suffix}")
+    started = time.perf_counter()
+    write(path, rows, dims)
+    write_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    read_rows = read(path)
+    read_seconds = time.perf_counter() - started
+    assert read_rows == rows, f"{name}: read {read_rows} rows, expected {rows}"
+
+    size = os.path.getsize(path)
+    sidecar = os.path.join(workdir, f"{name}.meta.jsonl")
+    if os.path.exists(sidecar):
+        size += os.path.getsize(sidecar)
+    return {
+        "name": name,
+        "size_mb": size * scale / 1024 / 1024,
+        "write_s": write_seconds * scale,
+        "read_s": read_seconds * scale,
+        "extrapolated": scale != 1.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--dims", type=int, default=1024)
+    parser.add_argument("--legacy-rows", type=int, default=50_000,
+                        help="Rows for the legacy writers (0 to skip, >= --rows for a full run)")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    legacy_rows = min(args.legacy_rows, args.rows)
+    results: List[Dict] = []
+    with tempfile.TemporaryDirectory() as workdir:
+        if legacy_rows:
+            scale = args.rows / legacy_rows
+            results.append(run_case("legacy_csv", "csv", legacy_csv_write, legacy_csv_read,
+                                    legacy_rows, args.dims, scale, workdir))
+            try:
+                results.append(run_case("legacy_parquet", "parquet", legacy_parquet_write, legacy_parquet_read,
+                                        legacy_rows, args.dims, scale, workdir))
+            except ImportError:
+                print("pandas not installed; skipping legacy Parquet")
+
+        for name, suffix, write in (
+            ("arrow_parquet", "parquet", columnar_write("parquet")),
+            ("arrow_feather", "feather", columnar_write("feather")),
+            ("raw_npy", "npy", npy_write),
+        ):
+            results.append(run_case(name, suffix, write, columnar_read, args.rows, args.dims, 1.0, workdir))
+
+    raw_mb = args.rows * args.dims * 4 / 1024 / 1024
+    print(f"\n{args.rows:,} x {args.dims} float32 vectors ({raw_mb:,.0f} MB raw)")
+    print(f"{'format':<16}{'size MB':>12}{'vs raw':>9}{'write s':>11}{'read s':>10}")
+    for r in results:
+        mark = "*" if r["extrapolated"] else " "
+        print(f"{r['name']:<16}{r['size_mb']:>11,.0f}{mark}{r['size_mb'] / raw_mb:>8.2f}x"
+              f"{r['write_s']:>10.1f}{mark}{r['read_s']:>9.1f}{mark}")
+    if any(r["extrapolated"] for r in results):
+        print(f"* scaled linearly from {legacy_rows:,} rows")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"rows": args.rows, "dims": args.dims, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Tests for the streaming audio decode / resample layer.
+"""
+
+import wave
+
+import numpy as np
+import pytest
+from scipy.signal import resample_poly
+
+from src.services.audio_stream_decoder import (
+    AudioStream,
+    PolyphaseResampler,
+    aiter_audio_frames,
+    aload_pcm16,
+    float_to_int16,
+    load_audio,
+    open_audio_stream,
+    transcode_to_wav,
+)
+
+
+def write_wav(path, samples: np.ndarray, rate: int, width: int = 2):
+    """Write (n, channels) float samples in [-1, 1] as PCM"""
+    samples = np.atleast_2d(samples.T).T
+    if width == 2:
+        raw = (samples * 32767).astype("<i2").tobytes()
+    else:
+        ints = (samples * 8388607).astype(np.int32).reshape(-1)
+        raw = np.stack([ints & 0xFF, (ints >> 8) & 0xFF, (ints >> 16) & 0xFF], axis=1).astype(np.uint8).tobytes()
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(samples.shape[1])
+        wav.setsampwidth(width)
+        wav.setframerate(rate)
+        wav.writeframes(raw)
+
+
+def reference(x: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    divisor = np.gcd(orig_sr, target_sr)
+    return resample_poly(x.astype(np.float64), target_sr // divisor, orig_sr // divisor)
+
+
+@pytest.mark.parametrize("orig_sr,target_sr", [(44100, 16000), (48000, 16000), (8000, 16000), (22050, 24000)])
+def test_chunked_resampling_matches_resample_poly(orig_sr, target_sr):
+    rng = np.random.default_rng(1)
+    x = rng.standard_normal(int(orig_sr * 0.9)).astype(np.float32)
+    resampler = PolyphaseResampler(orig_sr, target_sr)
+
+    outputs, position = [], 0
+    while position < len(x):
+        size = int(rng.integers(1, 3000))
+        outputs.append(resampler.process(x[position:position + size]))
+        position += size
+    outputs.append(resampler.flush())
+
+    expected = reference(x, orig_sr, target_sr)
+    result = np.concatenate(outputs)
+    assert len(result) == len(expected)
+    assert np.allclose(result, expected, atol=1e-5)
+
+
+def test_stream_yields_fixed_size_mono_frames(tmp_path):
+    t = np.arange(44100 * 2) / 44100
+    stereo = np.stack([np.sin(2 * np.pi * 220 * t), np.sin(2 * np.pi * 330 * t)], axis=1) * 0.5
+    write_wav(tmp_path / "stereo.wav", stereo, 44100)
+
+    with open_audio_stream(tmp_path / "stereo.wav", sample_rate=16000, frame_size=480) as stream:
+        frames = list(stream)
+        assert stream.backend in ("soundfile", "ffmpeg", "wave")
+
+    assert all(len(frame) == 480 for frame in frames[:-1])
+    assert 0 < len(frames[-1]) <= 480
+    decoded = np.concatenate(frames)
+    assert decoded.dtype == np.float32
+    assert len(decoded) == 32000
+    if stream.backend != "ffmpeg":
+        mono = np.round(stereo * 32767) / 32768.0
+        assert np.allclose(decoded, reference(mono.mean(axis=1), 44100, 16000), atol=1e-4)
+
+
+def test_max_seconds_stops_decoding_early(tmp_path):
+    write_wav(tmp_path / "long.wav", np.zeros((16000 * 10, 1)), 16000, width=3)
+
+    stream = AudioStream(tmp_path / "long.wav", sample_rate=16000, frame_size=1000, max_seconds=1.25)
+    assert sum(len(frame) for frame in stream) == 20000
+    assert len(load_audio(tmp_path / "long.wav", 8000, max_seconds=2)) == 16000
+
+
+@pytest.mark.asyncio
+async def test_async_frames_match_sync_and_stop_cleanly(tmp_path):
+    rng = np.random.default_rng(2)
+    write_wav(tmp_path / "noise.wav", rng.uniform(-0.5, 0.5, (48000, 1)), 48000)
+
+    sync_frames = list(open_audio_stream(tmp_path / "noise.wav", frame_size=1600))
+    async_frames = [frame async for frame in aiter_audio_frames(tmp_path / "noise.wav", frame_size=1600, prefetch=2)]
+    assert len(async_frames) == len(sync_frames) == 10
+    assert all(np.array_equal(a, b) for a, b in zip(async_frames, sync_frames))
+
+    # Leaving early must not leave the decoder thread blocked on a full queue
+    async for _ in aiter_audio_frames(tmp_path / "noise.wav", frame_size=160, prefetch=1):
+        break
+
+
+@pytest.mark.asyncio
+async def test_pcm16_and_wav_outputs_match_the_float_decode(tmp_path):
+    rng = np.random.default_rng(3)
+    write_wav(tmp_path / "noise.wav", rng.uniform(-0.5, 0.5, (44100 * 3, 2)), 44100)
+    expected = float_to_int16(load_audio(tmp_path / "noise.wav", 16000))
+
+    pcm = await aload_pcm16(tmp_path / "noise.wav", 16000)
+    assert pcm.dtype == np.int16 and np.array_equal(pcm, expected)
+    assert len(await aload_pcm16(tmp_path / "noise.wav", 16000, max_seconds=1)) == 16000
+
+    assert transcode_to_wav(tmp_path / "noise.wav", tmp_path / "out.wav", 24000) == 72000
+    with wave.open(str(tmp_path / "out.wav"), "rb") as wav:
+        assert (wav.getnchannels(), wav.getsampwidth(), wav.getframerate(), wav.getnframes()) == (1, 2, 24000, 72000)
@@ -0,0 +1,176 @@
+"""
+Tests for the batched, multi-stream VAD engine.
+"""
+
+import wave
+
+import numpy as np
+
+from src.services.batched_vad import (
+    BatchedVADEngine,
+    EnergyVAD,
+    VADEventType,
+    detect_speech_segments,
+)
+
+SAMPLE_RATE = 16000
+
+
+class ScriptedVAD:
+    """Returns each frame's mean sample value as its speech probability"""
+
+    sample_rate = SAMPLE_RATE
+    frame_size = 480
+    context_size = 0
+    state_shape = (1,)
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def initial_state(self):
+        return np.zeros(self.state_shape, dtype=np.float32)
+
+    def __call__(self, frames, states):
+        self.batch_sizes.append(len(frames))
+        return frames.mean(axis=1), states + 1
+
+
+def scripted(probs):
+    return np.repeat(np.asarray(probs, dtype=np.float32), ScriptedVAD.frame_size)
+
+
+def speech_like(pattern, seed=0):
+    """Noise floor with loud 300 Hz bursts; pattern is a list of (seconds, voiced)"""
+    rng = np.random.default_rng(seed)
+    parts = []
+    for seconds, voiced in pattern:
+        n = int(seconds * SAMPLE_RATE)
+        noise = rng.normal(0, 0.003, n)
+        if voiced:
+            noise += 0.3 * np.sin(2 * np.pi * 300 * np.arange(n) / SAMPLE_RATE)
+        parts.append(noise)
+    return np.concatenate(parts).astype(np.float32)
+
+
+def test_hysteresis_ignores_blips_and_mid_probability_dips():
+    engine = BatchedVADEngine(
+        model=ScriptedVAD(), threshold=0.5, min_speech_ms=90, min_silence_ms=150, speech_pad_ms=30
+    )
+    # 2-frame blip (too short), 10 frames of speech with a dip between the
+    # thresholds (0.4) that must not end it, a 4-frame low dip (< 150 ms),
+    # then silence long enough to close the segment.
+    probs = [0.0] * 5 + [0.9] * 2 + [0.0] * 5 + [0.9] * 4 + [0.4] * 8 + [0.1] * 4 + [0.9] * 2 + [0.0] * 10
+    engine.push("call", scripted(probs))
+    events = engine.drain()
+
+    assert [e.type for e in events] == [VADEventType.SPEECH_START, VADEventType.SPEECH_END]
+    start, end = events
+    frame_s = 0.03
+    assert np.isclose(start.time, 11 * frame_s)          # first voiced frame (12) minus 1 pad frame
+    assert np.isclose(end.start_time, start.time)
+    assert np.isclose(end.time, 31 * frame_s)            # silence starts at frame 30, plus 1 pad frame
+    assert len(end.audio) == 20 * ScriptedVAD.frame_size
+
+
+def test_streams_share_one_model_call_per_step():
+    model = ScriptedVAD()
+    engine = BatchedVADEngine(model=model, min_speech_ms=30, min_silence_ms=60, speech_pad_ms=0, queue_events=True)
+    for n in range(24):
+        engine.push(f"call-{n}", scripted([0.0] * n + [1.0] * 3 + [0.0] * 30))
+
+    events = engine.drain()
+    assert model.batch_sizes[0] == 24
+    assert engine.model_calls == 30 + 3 + 23
+    assert engine.frames_evaluated == sum(33 + n for n in range(24))
+
+    ends = {e.stream_id: e for e in events if e.type is VADEventType.SPEECH_END}
+    assert len(ends) == 24
+    for n in range(24):
+        assert np.isclose(ends[f"call-{n}"].start_time, n * 0.03)
+        assert np.isclose(ends[f"call-{n}"].time, (n + 3) * 0.03)
+        assert [e.type for e in engine.pop_events(f"call-{n}")] == [VADEventType.SPEECH_START, VADEventType.SPEECH_END]
+        assert engine.pop_events(f"call-{n}") == []
+
+
+def test_batched_results_match_streams_run_alone():
+    pattern_a = [(0.5, False), (0.8, True), (0.6, False), (0.4, True), (0.5, False)]
+    pattern_b = [(0.2, False), (1.2, True), (0.9, False)]
+    signals = {"a": speech_like(pattern_a, 1), "b": speech_like(pattern_b, 2)}
+
+    def run(stream_ids):
+        engine = BatchedVADEngine(model=EnergyVAD())
+        chunk = 320
+        collected = []
+        length = max(len(signals[s]) for s in stream_ids)
+        for offset in range(0, length, chunk):
+            for stream_id in stream_ids:
+                engine.push(stream_id, signals[stream_id][offset:offset + chunk])
+            collected.extend(engine.drain())
+        for stream_id in stream_ids:
+            engine.end_stream(stream_id)
+        collected.extend(engine.drain())
+        return [(e.stream_id, e.type, round(e.time, 3)) for e in collected if e.type is VADEventType.SPEECH_END]
+
+    together = run(["a", "b"])
+    alone = run(["a"]) + run(["b"])
+    assert sorted(together) == sorted(alone)
+    # Bursts end at 1.3 s and 2.3 s; ends include the 60 ms pad, frame-aligned
+    assert np.allclose([t for s, _, t in alone if s == "a"], [1.36, 2.36], atol=0.03)
+
+
+def test_long_speech_is_split_and_open_segment_closes_at_stream_end():
+    engine = BatchedVADEngine(model=ScriptedVAD(), min_speech_ms=30, speech_pad_ms=0, max_speech_s=0.3)
+    engine.push("call", scripted([1.0] * 25))
+    engine.end_stream("call")
+    ends = [e for e in engine.drain() if e.type is VADEventType.SPEECH_END]
+
+    assert [round(e.duration, 2) for e in ends] == [0.3, 0.3, 0.15]
+    assert "call" not in engine.streams
+
+
+def write_wav(path, samples):
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes((samples * 32767).astype("<i2").tobytes())
+
+
+def test_detect_speech_segments_over_many_files(tmp_path):
+    paths = []
+    for n in range(6):
+        path = tmp_path / f"clip-{n}.wav"
+        write_wav(path, speech_like([(0.3 + 0.1 * n, False), (0.6, True), (0.5, False)], seed=n))
+        paths.append(path)
+
+    engine = BatchedVADEngine(model=EnergyVAD(), speech_pad_ms=0)
+    segments = detect_speech_segments(paths, engine=engine, frames_per_push=4)
+
+    for n, path in enumerate(paths):
+        (segment,) = segments[str(path)]
+        assert abs(segment["start_time"] - (0.3 + 0.1 * n)) <= 0.03
+        assert abs(segment["end_time"] - (0.9 + 0.1 * n)) <= 0.06
+        assert segment["audio"].dtype == np.int16
+    # Up to six files per model call instead of one call per file per frame
+    assert engine.model_calls < engine.frames_evaluated / 4
+
+
+def test_max_seconds_and_comprehensive_vad_segments(tmp_path, monkeypatch):
+    from src.services import comprehensive_audio_service
+
+    samples = speech_like([(0.5, False), (0.6, True), (0.6, False), (0.6, True), (0.5, False)])
+    write_wav(tmp_path / "clip.wav", samples)
+
+    engine = BatchedVADEngine(model=EnergyVAD(), speech_pad_ms=0)
+    (first,) = detect_speech_segments([tmp_path / "clip.wav"], engine=engine, max_seconds=1.5)[str(tmp_path / "clip.wav")]
+    assert abs(first["start_time"] - 0.5) <= 0.03
+
+    monkeypatch.setattr(comprehensive_audio_service, "_vad_model", EnergyVAD())
+    pcm = (samples * 32767).astype(np.int16)
+    in_memory = comprehensive_audio_service.get_vad_segments(pcm)
+    streamed = comprehensive_audio_service.get_vad_segments_from_file(tmp_path / "clip.wav")
+    assert len(in_memory) == len(streamed) == 2
+    for a, b in zip(in_memory, streamed):
+        assert (a["start_time"], a["end_time"]) == (b["start_time"], b["end_time"])
+        assert a["audio"].dtype == b["audio"].dtype == np.int16
+        assert len(a["audio"]) == round((a["end_time"] - a["start_time"]) * SAMPLE_RATE)
@@ -0,0 +1,81 @@
+"""
+Tests for the SQLite-backed bulk processing result store.
+"""
+
+import threading
+
+from src.services.bulk_result_store import BulkResultStore
+
+
+def make_payload(item_id: str, status: str = "completed", embeddings: int = 2):
+    return {
+        "item_id": item_id,
+        "status": status,
+        "transcription": f"text for {item_id}",
+        "embeddings": [[0.1, 0.2]] * embeddings,
+    }
+
+
+def test_results_survive_reopen_and_completed_set_skips_finished(tmp_path):
+    path = tmp_path / "results.db"
+    store = BulkResultStore(path)
+    for i in range(5):
+        store.put("job-1", f"item-{i}", "completed", make_payload(f"item-{i}"), embeddings_count=2)
+    store.put("job-1", "item-5", "failed", make_payload("item-5", "failed", 0))
+    store.put("job-2", "item-0", "completed", make_payload("item-0"))
+    store.close()
+
+    # Simulated restart: a fresh store sees everything the crashed run wrote
+    reopened = BulkResultStore(path)
+    assert reopened.completed_item_ids("job-1") == {f"item-{i}" for i in range(5)}
+    pending = [f"item-{i}" for i in range(8) if f"item-{i}" not in reopened.completed_item_ids("job-1")]
+    assert pending == ["item-5", "item-6", "item-7"]
+
+    stats = reopened.stats("job-1")
+    assert stats == {"total_items": 6, "embeddings_count": 10, "completed_items": 5, "failed_items": 1}
+
+
+def test_retry_replaces_failed_result(tmp_path):
+    store = BulkResultStore(tmp_path / "results.db")
+    store.put("job", "a", "failed", make_payload("a", "failed"))
+    store.put("job", "a", "completed", make_payload("a"))
+
+    assert store.completed_item_ids("job") == {"a"}
+    assert store.get("job", "a")["status"] == "completed"
+    assert store.stats("job")["total_items"] == 1
+
+
+def test_iter_results_pages_in_insertion_order_and_filters(tmp_path):
+    store = BulkResultStore(tmp_path / "results.db")
+    for i in range(1203):
+        status = "failed" if i % 100 == 0 else "completed"
+        store.put("job", f"item-{i:04d}", status, make_payload(f"item-{i:04d}", status))
+
+    ids = [r["item_id"] for r in store.iter_results("job", batch_size=250)]
+    assert ids == [f"item-{i:04d}" for i in range(1203)]
+
+    completed = list(store.iter_results("job", status="completed", batch_size=64))
+    assert len(completed) == 1203 - 13
+    assert all(r["status"] == "completed" for r in completed)
+
+
+def test_concurrent_puts_and_job_cleanup(tmp_path):
+    store = BulkResultStore(tmp_path / "results.db")
+
+    def worker(offset):
+        for i in range(200):
+            store.put("job", f"item-{offset + i}", "completed", make_payload(str(i)), embeddings_count=1)
+
+    threads = [threading.Thread(target=worker, args=(n * 1000,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(store.completed_item_ids("job")) == 800
+    store.put_summary("job", {"successful_items": 800})
+    assert store.get_summary("job") == {"successful_items": 800}
+
+    assert store.delete_job("job") == 800
+    assert store.completed_item_ids("job") == set()
+    assert store.get_summary("job") is None
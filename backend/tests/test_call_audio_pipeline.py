@@ -0,0 +1,110 @@
+"""
+Tests for the per-call streaming audio pipeline used by TelephonyService.
+"""
+
+import numpy as np
+import pytest
+
+from src.services.batched_vad import BatchedVADEngine, EnergyVAD
+from src.services.call_audio_pipeline import CallAudioPipeline, PCMRingBuffer, TranscriptHistory
+
+STREAM_RATE = 8000
+
+
+def call_audio(pattern, seed=0):
+    """PCM16 call audio: low noise with 250 Hz voiced bursts; pattern is (seconds, voiced) pairs"""
+    rng = np.random.default_rng(seed)
+    parts = []
+    for seconds, voiced in pattern:
+        n = int(seconds * STREAM_RATE)
+        y = rng.normal(0, 0.002, n)
+        if voiced:
+            y += 0.3 * np.sin(2 * np.pi * 250 * np.arange(n) / STREAM_RATE)
+        parts.append(y)
+    return (np.concatenate(parts) * 32767).astype(np.int16)
+
+
+def test_ring_buffer_wraps_and_converts_without_reallocating():
+    ring = PCMRingBuffer(1000)
+    source = np.arange(-1500, 1500, dtype=np.int16)
+    for start in range(0, 2600, 130):
+        ring.write(source[start:start + 130])
+
+    assert ring.written == 2600 and ring.oldest == 1600
+    assert np.array_equal(ring.read(1700, 2600), source[1700:2600])       # wraps
+    view = ring.read(2100, 2400)
+    assert np.shares_memory(view, ring._buffer)                            # contiguous: no copy
+
+    floats = ring.read_float(1700, 2600)
+    assert floats.dtype == np.float32
+    assert np.array_equal(floats, source[1700:2600].astype(np.float32) / 32768)
+    scratch = ring._scratch
+    ring.read_float(2000, 2500)
+    assert ring._scratch is scratch
+
+    # Reads before the retained window are clamped to what is still held
+    assert np.array_equal(ring.read(0, 1700), source[1600:1700])
+    ring.write(source[:2500])
+    assert ring.written == 5100
+    assert np.array_equal(ring.read(4100, 5100), source[1500:2500])
+
+
+def test_pipeline_emits_one_utterance_per_phrase_from_packets():
+    vad = BatchedVADEngine(model=EnergyVAD(sample_rate=STREAM_RATE), sample_rate=STREAM_RATE,
+                           queue_events=True, keep_audio=False)
+    pipeline = CallAudioPipeline("call-1", vad, STREAM_RATE)
+    audio = call_audio([(0.5, False), (1.2, True), (0.8, False), (0.6, True), (0.7, False), (2.0, True), (0.4, False)])
+
+    utterances = []
+    for offset in range(0, len(audio), 160):                 # 20 ms Bandwidth packets
+        pipeline.ingest(audio[offset:offset + 160].tobytes())
+        vad.drain()
+        utterances.extend(pipeline.collect())
+    utterances.extend(pipeline.finish())
+
+    assert pipeline.packets == len(audio) // 160
+    assert [u.index for u in utterances] == [0, 1, 2]
+    expected = [(0.5, 1.7), (2.5, 3.1), (3.8, 5.8)]
+    for utterance, (start, end) in zip(utterances, expected):
+        assert abs(utterance.start_time - start) < 0.1
+        assert abs(utterance.end_time - end) < 0.15
+        assert utterance.audio.dtype == np.int16
+        # Resampled to 16 kHz for ASR with the level preserved
+        assert len(utterance.audio) == pytest.approx(utterance.duration * 16000, abs=2)
+        assert np.abs(utterance.audio).max() > 0.25 * 32767
+    assert "call-1" not in vad.streams
+
+
+def test_ring_holds_the_longest_utterance_the_vad_can_emit():
+    vad = BatchedVADEngine(model=EnergyVAD(sample_rate=STREAM_RATE), sample_rate=STREAM_RATE,
+                           queue_events=True, keep_audio=False, max_speech_s=3.0)
+    pipeline = CallAudioPipeline("call-2", vad, STREAM_RATE, target_rate=STREAM_RATE)
+    audio = call_audio([(0.3, False), (7.0, True), (0.6, False)], seed=3)
+
+    utterances = []
+    for offset in range(0, len(audio), 160):
+        pipeline.ingest(audio[offset:offset + 160])
+        vad.drain()
+        utterances.extend(pipeline.collect())
+    utterances.extend(pipeline.finish())
+
+    assert [round(u.duration, 1) for u in utterances[:2]] == [3.0, 3.0]
+    for utterance in utterances:
+        start = int(round(utterance.start_time * STREAM_RATE))
+        assert len(utterance.audio) == round(utterance.duration * STREAM_RATE)
+        assert np.array_equal(utterance.audio, audio[start:start + len(utterance.audio)])
+
+    with pytest.raises(ValueError):
+        CallAudioPipeline("other", BatchedVADEngine(model=EnergyVAD(sample_rate=STREAM_RATE), sample_rate=STREAM_RATE),
+                          STREAM_RATE)
+
+
+def test_transcript_history_is_bounded_and_compacts_old_segments():
+    history = TranscriptHistory(max_segments=10)
+    for i in range(95):
+        history.append({"transcript": f"w{i}", "speaker": f"S{i % 2}", "start_time": i, "end_time": i + 0.5})
+
+    assert len(history.segments) <= 10
+    assert history.total_segments == 95
+    assert history.full_transcript() == " ".join(f"w{i}" for i in range(95))
+    assert history.speaker_seconds == {"S0": 24.0, "S1": 23.5}
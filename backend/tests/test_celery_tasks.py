@@ -0,0 +1,188 @@
+"""
+Tests for the Celery audio pipeline and its CPU/GPU queue routing.
+
+Models are replaced by fakes on the service singletons the tasks call.
+Single tasks and the whole pipeline run in eager mode; the chord-based
+pipeline also runs through an in-memory broker and a threaded worker.
+"""
+
+import json
+import os
+import shutil
+import wave
+
+import numpy as np
+import pytest
+from celery import Celery
+from celery.contrib.testing.worker import start_worker
+from celery.signals import before_task_publish
+
+from src.core.celery_app import DEFAULT_QUEUE, GPU_QUEUE, GPU_TASKS, celery_app
+from src.tasks import common, transcribe, voice
+
+SAMPLE_RATE = 16000
+
+
+def write_wav(path, seconds, sample_rate=SAMPLE_RATE):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    samples = (0.3 * np.sin(2 * np.pi * 220 * t) * 32767).astype(np.int16)
+    with wave.open(str(path), "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(sample_rate)
+        out.writeframes(samples.tobytes())
+    return str(path)
+
+
+class FakeASR:
+    """Transcribes a chunk as its length in seconds"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def transcribe_chunk(self, audio):
+        self.calls += 1
+        return f"{len(audio) / SAMPLE_RATE:.0f}s"
+
+
+class FakeSeparation:
+    """Demucs writes vocals under its own temp dir; diarization splits the file in two"""
+
+    device = "cpu"
+    hf_token = None
+
+    def __init__(self, tmp_path):
+        self.tmp_path = tmp_path
+        self.diarized = []
+
+    async def extract_vocals(self, audio_path, model_name="htdemucs"):
+        track_dir = self.tmp_path / "separated" / model_name / "track"
+        track_dir.mkdir(parents=True)
+        vocals = track_dir / "vocals.wav"
+        shutil.copyfile(audio_path, vocals)
+        return str(vocals)
+
+    async def diarize_speakers(self, audio_path, min_speakers=1, max_speakers=10, min_duration=1.0):
+        self.diarized.append(audio_path)
+        return {"speakers": 2, "segments": [
+            {"speaker": "SPEAKER_00", "start": 0.0, "end": 42.0},
+            {"speaker": "SPEAKER_01", "start": 42.0, "end": 70.0},
+        ]}
+
+
+@pytest.fixture
+def fakes(tmp_path, monkeypatch):
+    asr = FakeASR()
+    separation = FakeSeparation(tmp_path)
+    monkeypatch.setattr(common, "TASK_WORK_DIR", str(tmp_path / "work"))
+    monkeypatch.setattr(transcribe, "get_asr_service", lambda: asr)
+    monkeypatch.setattr(voice, "audio_separation_service", separation)
+    return asr, separation
+
+
+@pytest.fixture
+def eager(monkeypatch):
+    monkeypatch.setitem(celery_app.conf, "task_always_eager", True)
+
+
+@pytest.fixture
+def memory_app():
+    """App with the production routing on an in-memory broker and result store"""
+    app = Celery("diala-test", broker="memory://", backend="cache+memory://")
+    app.conf.update({key: celery_app.conf[key] for key in (
+        "task_default_queue", "task_queues", "task_routes",
+        "task_serializer", "result_serializer", "accept_content",
+    )})
+    app.set_current()
+    app.set_default()
+    yield app
+    celery_app.set_current()
+    celery_app.set_default()
+
+
+def test_model_tasks_route_to_gpu_queue():
+    router = celery_app.amqp.router
+    assert set(GPU_TASKS) <= set(celery_app.tasks)
+    for name in GPU_TASKS:
+        assert router.route({}, name)["queue"].name == GPU_QUEUE
+    for name in ("transcribe.split_audio", "transcribe.merge_transcripts",
+                 "transcribe.prepare_chunks", "transcribe.transcribe_file"):
+        assert router.route({}, name)["queue"].name == DEFAULT_QUEUE
+
+
+def test_split_audio_writes_chunks_and_payloads_reference_files(tmp_path, fakes, eager):
+    source = write_wav(tmp_path / "call.wav", 65, sample_rate=8000)
+
+    chunks = transcribe.split_audio.delay(source, "job-1", chunk_seconds=30).get()
+
+    assert [(c["start"], c["end"]) for c in chunks] == [(0.0, 30.0), (30.0, 60.0), (60.0, 65.0)]
+    for chunk in chunks:
+        assert chunk["path"].startswith(common.TASK_WORK_DIR)
+        with wave.open(chunk["path"]) as f:
+            assert f.getframerate() == SAMPLE_RATE
+            assert f.getnframes() == (chunk["end"] - chunk["start"]) * SAMPLE_RATE
+    # The payload is a few hundred bytes; the audio it points at is ~2 MB
+    assert len(json.dumps(chunks)) < 1024
+
+
+def test_eager_pipeline_separates_transcribes_and_labels_speakers(tmp_path, fakes, eager):
+    asr, separation = fakes
+    source = write_wav(tmp_path / "call.wav", 70)
+
+    result = transcribe.transcribe_file.delay(source, "job-2", chunk_seconds=30).get()
+
+    vocals = os.path.join(common.TASK_WORK_DIR, "job-2", "vocals.wav")
+    assert separation.diarized == [vocals] and os.path.exists(vocals)
+    assert not (tmp_path / "separated").exists()          # Demucs output moved, temp dir removed
+    assert result["transcription"] == "30s 30s 10s" and result["chunks"] == 3 and asr.calls == 3
+    assert [s["speaker"] for s in result["segments"]] == ["SPEAKER_00", "SPEAKER_01", "SPEAKER_01"]
+    assert result["diarization"]["speakers"] == 2
+
+
+def test_speaker_embeddings_are_written_to_a_file(tmp_path, fakes, eager, monkeypatch):
+    seen = []
+
+    class FakeEmbeddings:
+        def extract_embedding(self, audio, sample_rate):
+            seen.append(len(audio))
+            return np.full(192, len(seen), dtype=np.float32)
+
+    monkeypatch.setattr(voice, "get_speaker_embedding_service", FakeEmbeddings)
+    source = write_wav(tmp_path / "call.wav", 70)
+    diarization = {"segments": [
+        {"speaker": "SPEAKER_01", "start": 0.0, "end": 50.0},
+        {"speaker": "SPEAKER_00", "start": 50.0, "end": 55.0},
+        {"speaker": "SPEAKER_01", "start": 55.0, "end": 70.0},
+    ]}
+
+    result = voice.speaker_embeddings.delay(source, diarization, "job-3", max_seconds_per_speaker=30).get()
+
+    assert result["speakers"] == ["SPEAKER_00", "SPEAKER_01"] and result["dim"] == 192
+    assert seen == [5 * SAMPLE_RATE, 30 * SAMPLE_RATE]     # capped per speaker
+    assert np.load(result["path"]).shape == (2, 192)
+
+
+@pytest.mark.asyncio
+async def test_pipeline_runs_through_broker_with_queue_routing(tmp_path, fakes, memory_app):
+    asr, _ = fakes
+    source = write_wav(tmp_path / "call.wav", 70)
+
+    published = []
+
+    def record(sender=None, routing_key=None, **kwargs):
+        published.append((sender, routing_key))
+
+    before_task_publish.connect(record)
+    try:
+        with start_worker(memory_app, pool="threads", concurrency=4, perform_ping_check=False,
+                          queues=[DEFAULT_QUEUE, GPU_QUEUE], loglevel="WARNING"):
+            result = await transcribe.run_transcription(source, "job-4", timeout=30, chunk_seconds=30)
+    finally:
+        before_task_publish.disconnect(record)
+
+    assert result["transcription"] == "30s 30s 10s" and asr.calls == 3
+    queues = dict(published)
+    assert queues["transcribe.transcribe_file"] == DEFAULT_QUEUE
+    assert queues["voice.separate_vocals"] == GPU_QUEUE
+    assert queues["transcribe.transcribe_chunk"] == GPU_QUEUE
+    assert queues["voice.diarize"] == GPU_QUEUE
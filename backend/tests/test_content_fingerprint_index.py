@@ -0,0 +1,115 @@
+"""
+Tests for the cross-job content fingerprint index.
+"""
+
+import os
+import stat
+import struct
+import sys
+import threading
+import wave
+
+import numpy as np
+
+from src.services.content_fingerprint_index import (
+    EMBEDDING,
+    TRANSCRIPT,
+    ContentFingerprintIndex,
+    artifact_variant,
+    content_source_key,
+    pcm_fingerprint,
+    text_fingerprint,
+)
+
+
+def write_wav(path, samples: np.ndarray, rate: int = 16000, tags: bytes = b""):
+    """Write 16-bit mono PCM, optionally with a LIST/INFO chunk before the data"""
+    data = samples.astype("<i2").tobytes()
+    fmt = struct.pack("<HHIIHH", 1, 1, rate, rate * 2, 2, 16)
+    chunks = b"fmt " + struct.pack("<I", len(fmt)) + fmt
+    if tags:
+        chunks += b"LIST" + struct.pack("<I", len(tags)) + tags
+    chunks += b"data" + struct.pack("<I", len(data)) + data
+    path.write_bytes(b"RIFF" + struct.pack("<I", 4 + len(chunks)) + b"WAVE" + chunks)
+
+
+def tone(seconds: float = 0.5, freq: float = 440.0) -> np.ndarray:
+    t = np.arange(int(16000 * seconds)) / 16000
+    return (np.sin(2 * np.pi * freq * t) * 12000).astype(np.int16)
+
+
+def test_pcm_fingerprint_ignores_container_metadata(tmp_path):
+    write_wav(tmp_path / "original.wav", tone())
+    write_wav(tmp_path / "repost.wav", tone(), tags=b"INFOISFT\x08\x00\x00\x00reposted")
+    write_wav(tmp_path / "other.wav", tone(freq=880.0))
+
+    original = pcm_fingerprint(tmp_path / "original.wav")
+    assert (tmp_path / "original.wav").read_bytes() != (tmp_path / "repost.wav").read_bytes()
+    assert pcm_fingerprint(tmp_path / "repost.wav") == original
+    assert pcm_fingerprint(tmp_path / "other.wav") != original
+    with wave.open(str(tmp_path / "repost.wav")) as wav:
+        assert wav.getnframes() == 8000
+
+
+def test_pcm_fingerprint_survives_a_chatty_decoder(tmp_path, monkeypatch):
+    # Stand-in ffmpeg that fills the stderr pipe before writing any samples
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    fake = bin_dir / "ffmpeg"
+    fake.write_text(
+        f"#!{sys.executable}\n"
+        "import sys\n"
+        "sys.stderr.write('warning: damaged frame\\n' * 20000)\n"
+        "sys.stdout.buffer.write(b'\\x01\\x00' * 16000)\n"
+    )
+    fake.chmod(fake.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    write_wav(tmp_path / "clip.wav", tone())
+
+    result = []
+    worker = threading.Thread(target=lambda: result.append(pcm_fingerprint(tmp_path / "clip.wav")), daemon=True)
+    worker.start()
+    worker.join(timeout=10)
+
+    assert result and result[0].startswith("pcm16k:")
+
+
+def test_text_fingerprint_normalizes_case_width_and_whitespace():
+    assert text_fingerprint("Hello   World\n") == text_fingerprint("hello world")
+    assert text_fingerprint("ＨＥＬＬＯ world") == text_fingerprint("hello world")
+    assert text_fingerprint("hello world!") != text_fingerprint("hello world")
+
+
+def test_artifacts_are_scoped_by_variant_and_persist(tmp_path):
+    path = tmp_path / "index.db"
+    index = ContentFingerprintIndex(path)
+    base = artifact_variant(provider="jina", dimensions=1024)
+    assert base == artifact_variant(dimensions=1024, provider="jina")
+
+    fingerprint = text_fingerprint("a transcript")
+    payload = {"embeddings": [[0.5, 0.25]], "chunks": [{"text": "a transcript"}]}
+    index.put(fingerprint, EMBEDDING, payload, base)
+    index.close()
+
+    reopened = ContentFingerprintIndex(path)
+    assert reopened.get(fingerprint, EMBEDDING, base) == payload
+    assert reopened.get(fingerprint, EMBEDDING, artifact_variant(provider="jina", dimensions=512)) is None
+    assert reopened.get(fingerprint, TRANSCRIPT, base) is None
+    assert reopened.get_stats() == {"hits": {EMBEDDING: 1}, "misses": {EMBEDDING: 1, TRANSCRIPT: 1}}
+
+
+def test_source_alias_resolves_to_audio_fingerprint(tmp_path):
+    index = ContentFingerprintIndex(tmp_path / "index.db")
+    write_wav(tmp_path / "clip.wav", tone())
+    fingerprint = pcm_fingerprint(tmp_path / "clip.wav")
+    variant = artifact_variant(whisper_model="base")
+
+    index.put(fingerprint, TRANSCRIPT, {"transcription": "hi", "language": "en"}, variant)
+    # Two reposts of the same audio under different video ids
+    index.link_source(content_source_key("tiktok", "111"), fingerprint)
+    index.link_source(content_source_key("tiktok", "222"), fingerprint)
+
+    for video_id in ("111", "222"):
+        resolved = index.resolve_source(content_source_key("tiktok", video_id))
+        assert index.get(resolved, TRANSCRIPT, variant)["transcription"] == "hi"
+    assert index.resolve_source(content_source_key("tiktok", "333")) is None
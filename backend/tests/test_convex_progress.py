@@ -0,0 +1,164 @@
+"""
+Tests for the coalescing Convex progress publisher.
+
+A local aiohttp server stands in for the Convex HTTP API and records every
+call, so the tests can count requests and check their order.
+"""
+
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from src.services.convex_progress import ConvexError, ConvexProgressPublisher
+
+
+@pytest_asyncio.fixture
+async def convex():
+    calls = []
+    latency = {"seconds": 0.0}
+
+    async def handle(request: web.Request) -> web.Response:
+        body = await request.json()
+        calls.append((request.match_info["kind"], body["path"], body["args"]))
+        await asyncio.sleep(latency["seconds"])
+        if body["path"] == "missing:fn":
+            return web.json_response({"code": "FunctionNotFound",
+                                      "message": "Could not find public function for 'missing:fn'"}, status=404)
+        if body["args"].get("fail"):
+            return web.json_response({"status": "error", "errorMessage": "Uncaught Error: boom"})
+        return web.json_response({"status": "success", "value": {"ok": body["path"]}, "logLines": []})
+
+    app = web.Application()
+    app.router.add_post("/api/{kind}", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}", calls, latency
+    await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_progress_ticks_are_coalesced_to_the_latest_value(convex):
+    base_url, calls, latency = convex
+    latency["seconds"] = 0.01
+    publisher = ConvexProgressPublisher(base_url, interval=0.05)
+
+    # 3 jobs x 2 stages x 500 ticks over ~0.3s of work, with a slow backend
+    start = time.perf_counter()
+    for tick in range(1, 501):
+        for job in ("a", "b", "c"):
+            for stage in ("fetch", "transcribe"):
+                publisher.publish("bulkJobs:updateStageProgress",
+                                  {"jobId": job, "stage": stage, "progress": tick / 500,
+                                   **({"itemsCompleted": tick} if tick % 2 else {})})
+        if tick % 50 == 0:
+            await asyncio.sleep(0.03)
+    publish_time = time.perf_counter() - start
+    await publisher.close()
+
+    assert publish_time < 0.6                              # publishing never waits on HTTP
+    assert publisher.stats.published == 3000
+    assert len(calls) < 100, len(calls)                    # vs 3000 uncoalesced
+    assert publisher.stats.sent == len(calls) and publisher.stats.failed == 0
+
+    latest = {}
+    for _, _, args in calls:
+        latest[(args["jobId"], args["stage"])] = args
+    assert len(latest) == 6
+    for args in latest.values():
+        assert args["progress"] == 1.0 and args["itemsCompleted"] == 499   # fields merge, later wins
+
+
+@pytest.mark.asyncio
+async def test_terminal_updates_flush_the_job_immediately_and_in_order(convex):
+    base_url, calls, _ = convex
+    publisher = ConvexProgressPublisher(base_url, interval=60)
+
+    publisher.publish("bulkJobs:updateStageProgress", {"jobId": "a", "stage": "fetch", "progress": 0.1})
+    await asyncio.sleep(0.05)                              # leading edge: first update goes out at once
+    assert len(calls) == 1
+
+    # Within the (long) interval: queued, not sent
+    publisher.publish("bulkJobs:updateStageProgress", {"jobId": "a", "stage": "fetch", "progress": 0.9})
+    publisher.publish("bulkJobs:updateStatus", {"jobId": "a", "status": "processing"}, kind="action")
+    publisher.publish("bulkJobs:updateStageProgress", {"jobId": "b", "stage": "fetch", "progress": 0.5})
+    await asyncio.sleep(0.05)
+    assert len(calls) == 1 and publisher.get_stats()["pending"] == 3
+
+    start = time.perf_counter()
+    result = await publisher.send("bulkJobs:updateStatus", {"jobId": "a", "status": "completed"}, kind="action")
+    assert time.perf_counter() - start < 1.0
+    assert result == {"ok": "bulkJobs:updateStatus"}
+    assert [(kind, args.get("progress", args.get("status"))) for kind, _, args in calls[1:]] == [
+        ("mutation", 0.9), ("action", "processing"), ("action", "completed"),
+    ]
+    assert publisher.get_stats()["pending"] == 1           # job b still waits for its interval
+
+    assert publisher._state().job_locks == {}             # per-job locks are dropped when idle
+    await publisher.close()
+    assert calls[-1][2] == {"jobId": "b", "stage": "fetch", "progress": 0.5}
+    assert publisher.get_stats()["loops"] == 0
+
+
+@pytest.mark.asyncio
+async def test_errors_raise_on_send_and_are_logged_for_coalesced_updates(convex):
+    base_url, calls, _ = convex
+    publisher = ConvexProgressPublisher(base_url, interval=0.01)
+
+    with pytest.raises(ConvexError, match="boom"):
+        await publisher.send("voiceCloneJobs:updateStatus", {"jobId": "v", "status": "failed", "fail": True})
+    with pytest.raises(ConvexError, match="Could not find public function"):
+        await publisher.send("missing:fn", {"jobId": "v"})
+
+    publisher.publish("voiceCloneJobs:updateStatus", {"jobId": "v", "status": "processing", "fail": True})
+    publisher.publish("missing:fn", {"jobId": "v"})
+    await asyncio.sleep(0.1)
+    assert publisher.stats.failed == 4 and len(calls) == 4
+
+    # A later update for the key supersedes the failed one
+    publisher.publish("voiceCloneJobs:updateStatus", {"jobId": "v", "status": "processing", "step": 2})
+    await publisher.close()
+    assert calls[-1][2] == {"jobId": "v", "status": "processing", "step": 2}
+
+    unreachable = ConvexProgressPublisher("http://127.0.0.1:9", timeout=1)
+    with pytest.raises(ConvexError, match="jobs:create"):
+        await unreachable.send("jobs:create", {"jobId": "x"})
+    await unreachable.close()
+
+
+@pytest.mark.asyncio
+async def test_other_event_loops_get_their_own_state(convex):
+    base_url, calls, _ = convex
+    publisher = ConvexProgressPublisher(base_url, interval=60)
+
+    publisher.publish("bulkJobs:updateStageProgress", {"jobId": "main", "stage": "fetch", "progress": 0.1})
+    publisher.publish("bulkJobs:updateStageProgress", {"jobId": "main", "stage": "fetch", "progress": 0.2})
+    main_state = publisher._state()
+    main_client, main_flusher = main_state.client, main_state.flusher
+
+    # A sync caller in a worker thread, as BulkJobManager.update_job_progress does
+    async def from_worker():
+        publisher.publish("bulkJobs:updateStageProgress", {"jobId": "worker", "stage": "fetch", "progress": 0.5})
+        worker_state = publisher._state()
+        await publisher.close()
+        return worker_state
+
+    worker_state = await asyncio.to_thread(asyncio.run, from_worker())
+
+    assert worker_state.client.is_closed and not worker_state.pending
+    assert publisher._state() is main_state
+    assert main_state.client is main_client and not main_client.is_closed
+    assert main_state.flusher is main_flusher and not main_flusher.done()
+    assert [args for _, _, args in calls if args["jobId"] == "worker"] == [
+        {"jobId": "worker", "stage": "fetch", "progress": 0.5}
+    ]
+    assert publisher.get_stats()["loops"] == 1
+
+    await publisher.close()
+    assert main_client.is_closed and main_flusher.done()
+    assert [args for _, _, args in calls if args["jobId"] == "main"][-1]["progress"] == 0.2
@@ -0,0 +1,168 @@
+"""
+Tests for the bounded download scheduler and the content-addressed cache.
+
+Downloads are fake byte streams that sleep for a fixed time, so wall time
+and peak concurrency show how jobs were scheduled.
+"""
+
+import asyncio
+import os
+import random
+import time
+from collections import Counter
+
+import pytest
+
+from src.services.content_cache import ContentCache
+from src.services.download_scheduler import DownloadJob, DownloadScheduler
+
+
+class FakeSource:
+    """Byte streams with a fixed latency that record concurrency and order"""
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.active = Counter()
+        self.peak = Counter()
+        self.peak_total = 0
+        self.started = []
+        self.failures = {}
+
+    def job(self, name, host="cdn-a", priority=0, payload=None, max_age=None):
+        return DownloadJob(
+            key=f"video:{name}",
+            open=lambda: self.stream(name, host, payload),
+            host=host,
+            priority=priority,
+            max_age=max_age,
+        )
+
+    async def stream(self, name, host, payload=None):
+        self.started.append(name)
+        self.active[host] += 1
+        self.peak[host] = max(self.peak[host], self.active[host])
+        self.peak_total = max(self.peak_total, sum(self.active.values()))
+        try:
+            await asyncio.sleep(self.latency)
+            error = self.failures.get(name)
+            if error and error[0] > 0:
+                error[0] -= 1
+                raise RuntimeError(error[1])
+            for _ in range(4):
+                yield (payload or name.encode()) * 256
+        finally:
+            self.active[host] -= 1
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ContentCache(str(tmp_path / "cache"))
+
+
+@pytest.mark.asyncio
+async def test_wall_time_drops_with_concurrency_and_hosts_stay_bounded(cache):
+    async def bulk(concurrency):
+        source = FakeSource(latency=0.05)
+        scheduler = DownloadScheduler(ContentCache(f"{cache.root}-{concurrency}"),
+                                      max_concurrency=concurrency, per_host_limit=concurrency)
+        start = time.perf_counter()
+        results = await scheduler.download_many([source.job(f"v{i}") for i in range(32)])
+        await scheduler.close()
+        assert all(r.ok for r in results)
+        return time.perf_counter() - start
+
+    serial, parallel = await bulk(1), await bulk(8)
+    assert serial >= 32 * 0.05
+    assert serial / parallel > 5                     # ideal speedup is 8
+
+    # Two hosts, two slots each: four downloads at most, never three on one host
+    source = FakeSource(latency=0.02)
+    scheduler = DownloadScheduler(cache, max_concurrency=8, per_host_limit=2)
+    jobs = [source.job(f"{host}-{i}", host=host) for i in range(10) for host in ("cdn-a", "cdn-b")]
+    results = await scheduler.download_many(jobs)
+    assert [r.key for r in results] == [job.key for job in jobs]
+    assert source.peak == {"cdn-a": 2, "cdn-b": 2} and source.peak_total == 4
+    assert scheduler.get_stats()["running"] == 0
+    await scheduler.close()
+
+
+@pytest.mark.asyncio
+async def test_priority_order_skips_saturated_hosts(cache):
+    source = FakeSource(latency=0.02)
+    scheduler = DownloadScheduler(cache, max_concurrency=2, per_host_limit=1)
+
+    bulk = [source.job(f"bulk-{i}", host="cdn-a") for i in range(4)]
+    background = asyncio.ensure_future(scheduler.download_many(bulk))
+    await asyncio.sleep(0.005)                       # bulk-0 is running on cdn-a
+    urgent = [
+        source.job("preview", host="cdn-a", priority=10),
+        source.job("other-host", host="cdn-b"),
+    ]
+    await asyncio.gather(*(scheduler.download(job) for job in urgent), background)
+
+    # other-host starts at once on the free host; preview jumps the cdn-a queue
+    assert source.started[:3] == ["bulk-0", "other-host", "preview"]
+    assert source.started[3:] == ["bulk-1", "bulk-2", "bulk-3"]
+    await scheduler.close()
+
+
+@pytest.mark.asyncio
+async def test_jittered_retries_permanent_errors_and_progress(cache):
+    source = FakeSource(latency=0.001)
+    source.failures = {"flaky": [2, "HTTP Error 503"], "gone": [5, "Video unavailable"], "dead": [5, "timeout"]}
+    scheduler = DownloadScheduler(cache, retries=2, retry_base_delay=0.02, rng=random.Random(7))
+
+    progress = []
+    results = await scheduler.download_many(
+        [source.job(name) for name in ("ok", "flaky", "gone", "dead")],
+        on_progress=lambda result, done, total: progress.append((result.key, done, total)),
+    )
+    by_key = {r.key: r for r in results}
+
+    assert by_key["video:ok"].ok and by_key["video:ok"].attempts == 1
+    assert by_key["video:flaky"].ok and by_key["video:flaky"].attempts == 3
+    assert not by_key["video:gone"].ok and by_key["video:gone"].attempts == 1
+    assert not by_key["video:dead"].ok and by_key["video:dead"].attempts == 3
+    assert by_key["video:dead"].error == "timeout"
+    assert [done for _, done, _ in progress] == [1, 2, 3, 4]
+    assert {key for key, _, _ in progress[:2]} == {"video:ok", "video:gone"}      # retried ones finish last
+    assert all(total == 4 for *_, total in progress)
+    assert scheduler.stats.retries == 4
+
+    # Backoff is full jitter under a doubling cap
+    delays = [scheduler._backoff(attempt) for attempt in range(6) for _ in range(50)]
+    assert all(0 <= d <= 8.0 for d in delays)
+    assert max(delays[:50]) <= 0.02 and len(set(delays)) == len(delays)
+    await scheduler.close()
+
+
+@pytest.mark.asyncio
+async def test_content_addressed_cache_is_shared_and_deduplicated(cache, tmp_path):
+    source = FakeSource(latency=0.02)
+    scheduler = DownloadScheduler(cache)
+
+    # Concurrent requests for one key share one download
+    first = await asyncio.gather(*(scheduler.download(source.job("a")) for _ in range(5)))
+    assert source.started == ["a"] and scheduler.stats.shared_inflight == 4
+    assert len({r.path for r in first}) == 1
+
+    # Later requests are cache hits; identical bytes under another key share the object
+    again = await scheduler.download(source.job("a"))
+    assert again.cached and again.path == first[0].path
+    alias = await scheduler.download(source.job("a-mirror", payload=b"a"))
+    assert alias.digest == first[0].digest and not alias.cached
+    assert cache.get_stats() == {"refs": 2, "objects": 1, "bytes": first[0].size}
+
+    os.makedirs(tmp_path / "job")
+    linked = ContentCache.link(alias.path, str(tmp_path / "job" / "a.mp4"))
+    assert os.path.samefile(linked, first[0].path)
+
+    # Stale entries are re-downloaded; pruning drops refs then orphaned objects
+    cache.clock = lambda: time.time() + 7200
+    refreshed = await scheduler.download(source.job("a", max_age=3600))
+    assert not refreshed.cached and source.started.count("a") == 2
+    assert cache.prune(max_age=3600) == {"refs_removed": 1, "objects_removed": 0, "bytes_removed": 0}
+    assert cache.lookup("video:a-mirror") is None
+    assert cache.prune()["objects_removed"] == 1
+    assert os.path.exists(linked)                    # hard links outlive the cache entry
+    await scheduler.close()
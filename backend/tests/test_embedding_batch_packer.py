@@ -0,0 +1,118 @@
+"""
+Tests for token-budget embedding batch packing.
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from src.core.tokens import CHARS_PER_TOKEN, CharEstimateEncoder, get_token_encoder
+from src.services.embedding_batch_packer import (
+    EmbeddingBatchPacker,
+    OverflowPolicy,
+    PackingLimits,
+)
+
+
+def make_corpus(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    words = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel"]
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(5, 400))) for _ in range(count)]
+
+
+def test_packed_batches_respect_limits():
+    limits = PackingLimits(max_items_per_request=32, max_tokens_per_item=512, max_tokens_per_request=4096, safety_margin=1.0)
+    packer = EmbeddingBatchPacker(limits)
+    texts = make_corpus(500)
+
+    batches = packer.pack(texts)
+
+    assert all(len(batch) <= 32 for batch in batches)
+    assert all(batch.total_tokens <= 4096 for batch in batches)
+    assert sorted(item.index for batch in batches for item in batch.items) == list(range(500))
+
+
+def test_packing_needs_fewer_requests_than_fixed_slicing():
+    limits = PackingLimits(max_items_per_request=64, max_tokens_per_item=512, max_tokens_per_request=4096, safety_margin=1.0)
+    packer = EmbeddingBatchPacker(limits)
+    texts = make_corpus(500)
+    counts = packer.count_tokens(texts)
+
+    # The largest fixed slice size that never exceeds the request budget
+    # for this corpus is what a count-based batcher has to fall back to
+    fixed = 64
+    while any(sum(counts[i:i + fixed]) > 4096 for i in range(0, len(counts), fixed)):
+        fixed -= 1
+    fixed_requests = (len(texts) + fixed - 1) // fixed
+
+    assert len(packer.pack(texts)) < fixed_requests
+
+
+def test_truncate_policy_caps_long_texts():
+    limits = PackingLimits(max_items_per_request=8, max_tokens_per_item=50, safety_margin=1.0)
+    packer = EmbeddingBatchPacker(limits, overflow_policy=OverflowPolicy.TRUNCATE)
+    text = "word " * 500
+
+    items = packer.prepare([text, "short"])
+
+    assert len(items) == 2
+    assert items[0].token_count == 50
+    assert len(get_token_encoder().encode(items[0].text)) <= 50
+
+
+def test_error_policy_rejects_long_texts():
+    limits = PackingLimits(max_items_per_request=8, max_tokens_per_item=50, safety_margin=1.0)
+    packer = EmbeddingBatchPacker(limits, overflow_policy=OverflowPolicy.ERROR)
+
+    with pytest.raises(ValueError):
+        packer.prepare(["word " * 500])
+
+
+def test_split_policy_merges_parts_on_unpack():
+    limits = PackingLimits(max_items_per_request=4, max_tokens_per_item=50, max_tokens_per_request=200, safety_margin=1.0)
+    packer = EmbeddingBatchPacker(limits, overflow_policy=OverflowPolicy.SPLIT)
+    texts = ["short text", "word " * 120]
+
+    batches = packer.pack(texts)
+    parts = [item for batch in batches for item in batch.items if item.index == 1]
+    assert len(parts) == 3
+    assert all(item.token_count <= 50 for item in parts)
+
+    # Fake provider: unit vector along the first axis for text 0, second axis for text 1
+    results = [
+        [[1.0, 0.0] if item.index == 0 else [0.0, 1.0] for item in batch.items]
+        for batch in batches
+    ]
+    embeddings = EmbeddingBatchPacker.unpack(batches, results, len(texts))
+
+    assert embeddings[0] == [1.0, 0.0]
+    assert np.allclose(embeddings[1], [0.0, 1.0])
+
+
+def test_unpack_marks_failed_batches_empty():
+    limits = PackingLimits(max_items_per_request=1, max_tokens_per_item=50, safety_margin=1.0)
+    packer = EmbeddingBatchPacker(limits)
+    batches = packer.pack(["a", "b"])
+
+    embeddings = EmbeddingBatchPacker.unpack(batches, [[[1.0]], None], 2)
+
+    assert embeddings.count([]) == 1
+    assert [1.0] in embeddings
+
+
+def test_unavailable_encoding_falls_back_to_length_estimate():
+    encoder = get_token_encoder("no_such_encoding")
+    assert isinstance(encoder, CharEstimateEncoder)
+
+    text = "hello world, " * 10
+    tokens = encoder.encode(text)
+    assert len(tokens) == -(-len(text) // CHARS_PER_TOKEN)
+    assert encoder.decode(tokens) == text
+
+    packer = EmbeddingBatchPacker(
+        PackingLimits(max_items_per_request=8, max_tokens_per_item=10, safety_margin=1.0),
+        encoding_name="no_such_encoding"
+    )
+    items = packer.prepare([text])
+    assert items[0].token_count == 10 and items[0].text == text[:10 * CHARS_PER_TOKEN]
@@ -0,0 +1,234 @@
+"""
+Tests for the shared embedding dispatcher.
+
+Runs the Jina client against a local aiohttp server that only accepts a fixed
+number of concurrent requests and answers the rest with 429 + Retry-After.
+"""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from src.services.embedding_dispatcher import (
+    AIMDController,
+    EmbeddingDispatcher,
+    RateLimitError,
+    iter_windowed,
+    parse_retry_after,
+)
+from src.services.batch_embedding_service import BatchConfig, BatchEmbeddingService, EmbeddingProvider
+from src.services.embedding_batch_packer import PackedBatch, PackedItem
+from src.services.jina.config import JinaConfig
+from src.services.jina.embeddings_client import JinaEmbeddingsClient
+
+
+class MockEmbeddingServer:
+    """Embeddings endpoint that rate limits above `capacity` concurrent requests."""
+
+    def __init__(self, capacity: int = 3, latency: float = 0.05, retry_after: str = "0.1"):
+        self.capacity = capacity
+        self.latency = latency
+        self.retry_after = retry_after
+        self.active = 0
+        self.max_active = 0
+        self.requests = 0
+        self.rejected = 0
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if self.active >= self.capacity:
+            self.rejected += 1
+            return web.Response(status=429, text="slow down", headers={"Retry-After": self.retry_after})
+
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            payload = await request.json()
+            await asyncio.sleep(self.latency)
+            data = [
+                {"object": "embedding", "embedding": [float(text.split("-")[1]), 0.0], "index": i}
+                for i, text in enumerate(payload["input"])
+            ]
+            return web.json_response({
+                "object": "list",
+                "data": data,
+                "model": payload["model"],
+                "usage": {"total_tokens": len(data)},
+            })
+        finally:
+            self.active -= 1
+
+
+@pytest_asyncio.fixture
+async def mock_server():
+    server = MockEmbeddingServer()
+    app = web.Application()
+    app.router.add_post("/v1/embeddings", server.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    server.base_url = f"http://127.0.0.1:{port}/v1"
+    yield server
+    await runner.cleanup()
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after("0.5") == 0.5
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("not a date") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_aimd_increase_and_decrease():
+    controller = AIMDController(initial=4, max_limit=8, decrease_factor=0.5)
+    controller.on_congestion()
+    assert controller.limit == 2
+    for _ in range(20):
+        controller.on_success(0.01)
+    assert controller.limit > 2
+    assert controller.limit <= 8
+
+
+@pytest.mark.asyncio
+async def test_dispatch_preserves_order_and_overlaps():
+    dispatcher = EmbeddingDispatcher(initial_concurrency=4, max_concurrency=4)
+    in_flight = 0
+    peak = 0
+
+    async def embed(batch):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        # Later batches finish first
+        await asyncio.sleep(0.01 * (10 - batch[0]))
+        in_flight -= 1
+        return [value * 2 for value in batch]
+
+    results = await dispatcher.dispatch([[i] for i in range(10)], embed)
+    assert results == [[i * 2] for i in range(10)]
+    assert peak == 4
+
+
+@pytest.mark.asyncio
+async def test_dispatch_honors_retry_after():
+    dispatcher = EmbeddingDispatcher(initial_concurrency=1, max_concurrency=1)
+    calls = []
+
+    async def embed(batch):
+        calls.append(asyncio.get_running_loop().time())
+        if len(calls) == 1:
+            raise RateLimitError("limited", retry_after=0.2)
+        return batch
+
+    assert await dispatcher.dispatch([["a"]], embed) == [["a"]]
+    assert calls[1] - calls[0] >= 0.19
+    assert dispatcher.stats.rate_limited == 1
+
+
+@pytest.mark.asyncio
+async def test_dispatch_return_exceptions():
+    dispatcher = EmbeddingDispatcher(max_retries=0)
+
+    async def embed(batch):
+        if batch == ["bad"]:
+            raise ValueError("boom")
+        return batch
+
+    results = await dispatcher.dispatch([["ok"], ["bad"]], embed, return_exceptions=True)
+    assert results[0] == ["ok"]
+    assert isinstance(results[1], ValueError)
+
+
+@pytest.mark.asyncio
+async def test_submit_and_batch_service_share_one_retry_layer():
+    dispatcher = EmbeddingDispatcher(max_retries=2, base_backoff=0)
+    calls = []
+
+    async def embed(batch):
+        calls.append(batch)
+        raise ValueError("upstream 503")
+
+    async def embed_documents(texts):
+        return await dispatcher.submit(texts, embed)
+
+    service = BatchEmbeddingService()
+    batch = PackedBatch(items=[PackedItem(index=0, text="hello", token_count=1)], total_tokens=1)
+    embeddings, processed, errors = await service._run_batches(
+        ["hello"], [batch], embed_documents, BatchConfig(provider=EmbeddingProvider.JINA), "jina"
+    )
+
+    # The dispatcher's retries only, not multiplied by a second layer
+    assert len(calls) == 3 and dispatcher.stats.retries == 2
+    assert embeddings == [[]] and processed == 0 and len(errors) == 1
+
+
+@pytest.mark.asyncio
+async def test_iter_windowed_follows_controller_limit():
+    controller = AIMDController(initial=4, max_limit=4)
+    in_flight = 0
+    peaks = []
+
+    async def embed(batch):
+        nonlocal in_flight
+        in_flight += 1
+        peaks.append(in_flight)
+        await asyncio.sleep(0.01 * (3 - batch % 4))
+        in_flight -= 1
+        return batch * 10
+
+    results = {}
+    async for index, result in iter_windowed(range(8), embed, max_in_flight=8, controller=controller):
+        results[index] = result
+        if index == 3:
+            # A 429 seen by the provider dispatcher halves the window
+            controller.on_congestion()
+
+    assert results == {i: i * 10 for i in range(8)}
+    assert max(peaks[:4]) == 4
+    assert max(peaks[6:]) <= 2
+
+
+@pytest.mark.asyncio
+async def test_iter_windowed_cancels_pending_on_error():
+    cancelled = []
+
+    async def embed(batch):
+        if batch == 0:
+            raise RateLimitError("limited")
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(batch)
+            raise
+        return batch
+
+    with pytest.raises(RateLimitError):
+        async for _ in iter_windowed(range(100), embed, max_in_flight=3):
+            pass
+    assert sorted(cancelled) == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_jina_client_against_rate_limited_server(mock_server, monkeypatch):
+    dispatcher = EmbeddingDispatcher(name="jina", initial_concurrency=8, max_concurrency=8)
+    monkeypatch.setattr(
+        "src.services.jina.embeddings_client.get_embedding_dispatcher",
+        lambda provider: dispatcher,
+    )
+    config = JinaConfig(api_key="test", base_url=mock_server.base_url)
+    texts = [f"text-{i}" for i in range(40)]
+
+    async with JinaEmbeddingsClient(config) as client:
+        embeddings = await client.batch_embeddings(texts, batch_size=2)
+
+    assert [embedding[0] for embedding in embeddings] == [float(i) for i in range(40)]
+    assert mock_server.max_active <= mock_server.capacity
+    assert mock_server.rejected > 0
+    assert dispatcher.stats.rate_limited == mock_server.rejected
+    # The window shrank from its starting point after the 429s
+    assert dispatcher.controller.limit < 8
@@ -0,0 +1,114 @@
+"""
+Tests for batched, Welch-based scoring in EmbeddingQualityAssessor.
+"""
+
+import numpy as np
+import pytest
+import scipy.fft
+
+from src.services.embedding_quality_assessor import EmbeddingQualityAssessor
+
+SAMPLE_RATE = 16000
+
+
+def legacy_spectral_quality(audio: np.ndarray) -> float:
+    """Previous full-length complex FFT spectral score, for calibration checks"""
+    fft = np.abs(scipy.fft.fft(audio))
+    freqs = scipy.fft.fftfreq(len(audio), 1 / SAMPLE_RATE)
+    mask = (freqs >= 80) & (freqs <= 4000)
+    speech_fft, speech_freqs = fft[mask], freqs[mask]
+    total_energy = np.sum(speech_fft)
+    centroid = np.sum(speech_freqs * speech_fft) / total_energy
+    spread = np.sqrt(np.sum(((speech_freqs - centroid) ** 2) * speech_fft) / total_energy)
+    flatness = np.exp(np.mean(np.log(speech_fft + 1e-10))) / (np.mean(speech_fft) + 1e-10)
+    peaks = np.sum(speech_fft > np.max(speech_fft) * 0.1)
+    return float(
+        0.2 * (1.0 - min(1.0, abs(centroid - 1500) / 1500)) + 0.3 * min(1.0, spread / 1000) +
+        0.3 * min(1.0, flatness * 10) + 0.2 * min(1.0, peaks / 10.0)
+    )
+
+
+def harmonic(seconds: float, f0: float = 130.0, noise: float = 0.02, seed: int = 0) -> np.ndarray:
+    """Voiced, formant-shaped test signal with a little background noise"""
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    y = sum(
+        (np.exp(-((k * f0 - 500) / 400) ** 2) + 0.3 * np.exp(-((k * f0 - 1500) / 500) ** 2)) * np.sin(2 * np.pi * k * f0 * t)
+        for k in range(1, 30)
+    )
+    y = y / np.abs(y).max() * 0.5
+    return (y + noise * np.random.default_rng(seed).standard_normal(len(t))).astype(np.float32)
+
+
+def mixed_segments():
+    rng = np.random.default_rng(7)
+    segments = [np.array([], dtype=np.float32), np.zeros(200, np.float32), np.zeros(8000, np.float32)]
+    for seconds in (0.05, 0.1, 0.3, 1.0, 2.0, 3.7, 6.2):
+        segments.append(harmonic(seconds, seed=len(segments)))
+    # Odd and prime lengths, integer PCM, pure noise
+    segments.append(harmonic(1.0)[:16007])
+    segments.append((harmonic(2.5) * 32767).astype(np.int16))
+    segments.append(rng.normal(0, 0.3, 24001).astype(np.float32))
+    return segments
+
+
+def test_batch_scores_equal_single_segment_scores():
+    assessor = EmbeddingQualityAssessor()
+    segments = mixed_segments()
+
+    batch = assessor.assess_quality_batch(segments)
+    assert batch == pytest.approx([assessor.assess_quality(audio) for audio in segments], abs=1e-12)
+    assert batch[0] == 0.0
+    assert all(0.0 <= q <= 1.0 for q in batch)
+    assert assessor.assess_quality_batch([]) == []
+
+    metrics = assessor.get_quality_metrics(segments[6])
+    assert metrics["composite_quality"] == pytest.approx(batch[6], abs=1e-12)
+
+
+def test_snr_and_duration_match_per_segment_reference():
+    assessor = EmbeddingQualityAssessor()
+    segments = [assessor._to_float32(audio) for audio in mixed_segments()]
+
+    for audio, snr in zip(segments, assessor._snr_quality_batch(segments)):
+        if len(audio) < SAMPLE_RATE * 0.1:
+            assert snr == 0.1
+            continue
+        frames = assessor._frame_audio(audio, 512, 256)
+        energies = np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1))
+        noise, signal = np.percentile(energies, 20), np.percentile(energies, 95)
+        snr_db = 80.0 if noise < 1e-9 else 20 * np.log10(signal / noise)
+        expected = (
+            0.3 * snr_db / 5 if snr_db < 5 else
+            0.3 + 0.4 * (snr_db - 5) / 10 if snr_db < 15 else
+            0.7 + 0.2 * (snr_db - 15) / 15 if snr_db < 30 else
+            0.9 + 0.1 * min(snr_db - 30, 10) / 10
+        )
+        assert snr == pytest.approx(np.clip(expected, 0, 1), abs=1e-6)
+
+    durations = assessor._duration_quality_batch(segments)
+    assert list(durations) == pytest.approx([assessor._calculate_duration_quality(a) for a in segments])
+
+
+def test_welch_spectral_score_keeps_calibration_and_is_length_invariant():
+    assessor = EmbeddingQualityAssessor()
+    t = np.arange(SAMPLE_RATE) / SAMPLE_RATE
+    fixtures = [
+        harmonic(1.0),
+        harmonic(2.0, f0=210.0, noise=0.05),
+        np.random.default_rng(1).standard_normal(SAMPLE_RATE).astype(np.float32),
+        np.sin(2 * np.pi * 440 * t).astype(np.float32),
+    ]
+    welch = assessor._spectral_quality_batch(fixtures)
+    legacy = np.array([legacy_spectral_quality(audio) for audio in fixtures])
+    # The full-length FFT weighs the noise floor more the longer the segment,
+    # so the two differ somewhat per metric but agree on the composite score
+    assert np.allclose(welch, legacy, atol=0.15)
+    assert np.all(assessor.spectral_weight * np.abs(welch - legacy) < 0.03)
+    # A pure tone still scores far below voiced or broadband audio
+    assert welch[3] < 0.2 < 0.7 < min(welch[:3])
+
+    lengths = [4001, 16000, 47999, 75000]
+    scores = assessor._spectral_quality_batch([harmonic(5.0)[:n] for n in lengths])
+    assert np.ptp(scores) < 0.01
+
+    assert assessor._spectral_quality_batch([np.zeros(4000, np.float32), np.ones(100, np.float32)]).tolist() == [0.0, 0.5]
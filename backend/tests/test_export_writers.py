@@ -0,0 +1,139 @@
+"""
+Tests for the streaming export writers used by BulkJobManager.
+"""
+
+import csv
+import json
+import threading
+import zipfile
+
+import psutil
+import pytest
+
+from src.services.export_writers import export_json_document, export_records, export_zip
+
+
+async def synthetic_records(count: int):
+    for i in range(count):
+        yield {
+            "id": i,
+            "url": f"https://example.com/video/{i}",
+            "title": f"Synthetic record {i} ünïcode",
+            "duration": i % 600,
+            "tags": ["bulk", "export"],
+        }
+
+
+async def measure_peak(coro) -> int:
+    """Peak RSS growth (bytes) while `coro` runs, sampled from a side thread."""
+    process = psutil.Process()
+    baseline = process.memory_info().rss
+    peak = baseline
+    done = threading.Event()
+
+    def sample():
+        nonlocal peak
+        while not done.is_set():
+            peak = max(peak, process.memory_info().rss)
+            done.wait(0.005)
+
+    sampler = threading.Thread(target=sample)
+    sampler.start()
+    try:
+        await coro
+    finally:
+        done.set()
+        sampler.join()
+    return peak - baseline
+
+
+@pytest.mark.asyncio
+async def test_json_array_export_of_1m_records_uses_flat_memory(tmp_path):
+    path = tmp_path / "export.json"
+
+    peak = await measure_peak(export_records(path, synthetic_records(1_000_000), "json"))
+
+    size = path.stat().st_size
+    assert size > 100 * 1024 * 1024
+    # The dataset is >100MB on disk; the writer should only ever hold a chunk
+    assert peak < 32 * 1024 * 1024
+    with open(path, encoding="utf-8") as f:
+        assert f.readline() == "[\n"
+        assert json.loads(f.readline().rstrip(",\n"))["id"] == 0
+
+
+@pytest.mark.asyncio
+async def test_materialized_list_export_does_not_copy_the_data(tmp_path):
+    records = [record async for record in synthetic_records(200_000)]
+
+    peak = await measure_peak(export_records(tmp_path / "list.jsonl", records, "jsonl"))
+
+    assert (tmp_path / "list.jsonl").stat().st_size > 20 * 1024 * 1024
+    assert peak < 16 * 1024 * 1024
+
+
+@pytest.mark.asyncio
+async def test_formats_round_trip(tmp_path):
+    records = [{"id": i, "name": f"n{i}"} for i in range(2500)]
+
+    assert await export_records(tmp_path / "a.json", records, "json", chunk_size=100) == 2500
+    await export_records(tmp_path / "a.jsonl", iter(records), "jsonl", chunk_size=100)
+    await export_records(tmp_path / "a.csv", synthetic_records(0), "csv", fieldnames=["id", "name"])
+    await export_records(tmp_path / "b.csv", records, "csv", chunk_size=100)
+
+    assert json.loads((tmp_path / "a.json").read_text()) == records
+    assert [json.loads(line) for line in (tmp_path / "a.jsonl").read_text().splitlines()] == records
+    assert (tmp_path / "a.csv").read_text().strip() == "id,name"
+    with open(tmp_path / "b.csv", newline="") as f:
+        assert [{"id": int(r["id"]), "name": r["name"]} for r in csv.DictReader(f)] == records
+
+    await export_records(tmp_path / "empty.json", [], "json")
+    assert json.loads((tmp_path / "empty.json").read_text()) == []
+
+
+@pytest.mark.asyncio
+async def test_json_document_export(tmp_path):
+    document = {"summary": {"total": 2}, "results": [{"id": 1}, {"id": 2}]}
+
+    await export_json_document(tmp_path / "doc.json", document)
+
+    assert json.loads((tmp_path / "doc.json").read_text()) == document
+
+
+@pytest.mark.asyncio
+async def test_json_document_streams_generator_values(tmp_path):
+    def stored_results():
+        for i in range(2500):
+            yield {"item_id": str(i), "transcription": f"text {i}"}
+
+    document = {"session_id": "s1", "results": stored_results(), "errors": [], "empty": iter(())}
+
+    await export_json_document(tmp_path / "doc.json", document, chunk_size=1000)
+
+    loaded = json.loads((tmp_path / "doc.json").read_text())
+    assert list(loaded) == ["session_id", "results", "errors", "empty"]
+    assert len(loaded["results"]) == 2500 and loaded["results"][-1]["item_id"] == "2499"
+    assert loaded["errors"] == [] and loaded["empty"] == []
+
+
+@pytest.mark.asyncio
+async def test_zip_export_streams_members(tmp_path):
+    path = tmp_path / "export.zip"
+
+    written = await export_zip(path, {
+        "records.jsonl": synthetic_records(5000),
+        "records.csv": synthetic_records(10),
+        "summary.json": {"total": 5000},
+        "README.txt": "bulk export",
+        "raw.bin": b"\x00\x01",
+    })
+
+    assert written == 5010
+    with zipfile.ZipFile(path) as zf:
+        lines = zf.read("records.jsonl").decode().splitlines()
+        assert len(lines) == 5000
+        assert json.loads(lines[-1])["id"] == 4999
+        assert zf.read("records.csv").decode().startswith("id,url,title,duration,tags")
+        assert json.loads(zf.read("summary.json")) == {"total": 5000}
+        assert zf.read("README.txt") == b"bulk export"
+        assert zf.read("raw.bin") == b"\x00\x01"
@@ -0,0 +1,111 @@
+"""
+Tests for deferred imports of heavy ML libraries.
+
+Importing service and router modules must not import torch, transformers
+and friends; those load on first real use through lazy proxies. Import
+checks run in a fresh interpreter so modules imported by other tests do
+not leak in.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import types
+
+import pytest
+
+from src.core.lazy import (
+    HEAVY_MODULES,
+    LazyModule,
+    LazyObject,
+    is_available,
+    is_resolved,
+    lazy_import,
+)
+
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that used to import torch/sklearn/pandas/soundfile at import time
+# and whose remaining dependencies are light enough to import here
+LAZY_MODULES = [
+    "src.services.realtime_analysis_service",
+    "src.services.audio_separation_service",
+    "src.services.chatterbox_service",
+    "src.services.vector_db_connectors",
+    "src.services.comprehensive_audio_service",
+    "src.services.audio_preparation_service",
+    "src.api.public.tts",
+    "src.api.public.realtime_analysis_api",
+    "src.tasks.transcribe",
+]
+
+
+def import_in_subprocess(modules):
+    """Import ``modules`` in a fresh interpreter; return the heavy modules it loaded"""
+    script = (
+        "import importlib, json, sys\n"
+        f"for name in {modules!r}:\n"
+        "    importlib.import_module(name)\n"
+        f"print(json.dumps([m for m in {list(HEAVY_MODULES)!r} if m in sys.modules]))\n"
+    )
+    env = dict(os.environ, PYTHONPATH=BACKEND_ROOT)
+    proc = subprocess.run([sys.executable, "-c", script], cwd=BACKEND_ROOT, env=env,
+                          capture_output=True, text=True, timeout=120)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def test_service_and_router_imports_defer_heavy_libraries():
+    assert import_in_subprocess(LAZY_MODULES) == []
+
+
+def test_lazy_module_imports_on_first_attribute_access():
+    name = "json.tool"
+    sys.modules.pop(name, None)
+    module = lazy_import(name)
+    assert isinstance(module, LazyModule) and name not in sys.modules
+    assert "not loaded" in repr(module)
+
+    assert callable(module.main)
+    assert name in sys.modules and "(loaded)" in repr(module)
+    assert lazy_import(name) is sys.modules[name]       # already imported: no proxy
+
+    missing = lazy_import("definitely_not_installed_module")
+    with pytest.raises(ModuleNotFoundError):
+        missing.anything
+
+    assert is_available("json") and not is_available("definitely_not_installed_module")
+    assert not is_available("definitely_not_installed_module.sub")
+
+
+def test_lazy_object_builds_once_across_threads():
+    built = []
+
+    class Service:
+        def __init__(self):
+            built.append(threading.get_ident())
+            self.value = 1
+
+    proxy = LazyObject(Service)
+    assert not is_resolved(proxy) and built == []
+
+    barrier = threading.Barrier(8)
+    values = []
+
+    def use():
+        barrier.wait()
+        values.append(proxy.value)
+
+    threads = [threading.Thread(target=use) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(built) == 1 and values == [1] * 8
+    assert is_resolved(proxy) and is_resolved(types.SimpleNamespace())
+
+    proxy.value = 2                                      # writes go to the target
+    assert proxy._resolve().value == 2
@@ -0,0 +1,177 @@
+"""
+Tests for the streaming media download helpers.
+
+A local aiohttp server stands in for the CDN and a small Python child
+process for ffmpeg, so peak memory can be checked against media that is
+much larger than the chunk size.
+"""
+
+import os
+import sys
+import tracemalloc
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from src.services.media_stream import (
+    MediaSource,
+    MediaStreamError,
+    ffmpeg_audio_command,
+    ffmpeg_remux_command,
+    iter_media,
+    iter_process,
+    iter_url,
+    prime_stream,
+    read_all,
+    write_stream,
+)
+
+MEDIA_SIZE = 16 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+# Child process writing MEDIA_SIZE bytes to stdout, then exiting with argv[1]
+WRITER = (
+    "import sys\n"
+    "block = bytes(range(256)) * 256\n"
+    f"for _ in range({MEDIA_SIZE} // len(block)):\n"
+    "    sys.stdout.buffer.write(block)\n"
+    "sys.stdout.buffer.flush()\n"
+    "print('decoder gave up', file=sys.stderr)\n"
+    "sys.exit(int(sys.argv[1]))\n"
+)
+
+
+@pytest_asyncio.fixture
+async def media_server():
+    seen_headers = {}
+
+    async def video(request: web.Request) -> web.StreamResponse:
+        seen_headers.update(request.headers)
+        response = web.StreamResponse(headers={"Content-Type": "video/mp4"})
+        response.content_length = MEDIA_SIZE
+        await response.prepare(request)
+        block = bytes(range(256)) * 64
+        for _ in range(MEDIA_SIZE // len(block)):
+            await response.write(block)
+        await response.write_eof()
+        return response
+
+    async def forbidden(request: web.Request) -> web.Response:
+        return web.Response(status=403)
+
+    app = web.Application()
+    app.router.add_get("/video.mp4", video)
+    app.router.add_get("/expired.mp4", forbidden)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}", seen_headers
+    await runner.cleanup()
+
+
+async def consume(chunks):
+    """Drain a stream keeping only its size; return (size, largest chunk, peak traced memory)"""
+    tracemalloc.start()
+    try:
+        size = largest = 0
+        async for chunk in chunks:
+            size += len(chunk)
+            largest = max(largest, len(chunk))
+        return size, largest, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.asyncio
+async def test_http_stream_memory_stays_near_chunk_size(media_server):
+    base_url, seen_headers = media_server
+    source = MediaSource.from_info({
+        "url": f"{base_url}/video.mp4",
+        "http_headers": {"Referer": "https://www.tiktok.com/"},
+        "protocol": "https",
+    })
+
+    size, largest, peak = await consume(iter_media(source, CHUNK_SIZE))
+
+    assert size == MEDIA_SIZE
+    assert largest <= CHUNK_SIZE
+    assert peak < MEDIA_SIZE / 8, peak
+    assert seen_headers["Referer"] == "https://www.tiktok.com/"
+    assert seen_headers["Accept-Encoding"] == "identity"
+
+    with pytest.raises(MediaStreamError, match="403"):
+        await prime_stream(iter_url(f"{base_url}/expired.mp4"))
+
+
+@pytest.mark.asyncio
+async def test_process_pipe_streams_and_reports_failures():
+    size, largest, peak = await consume(iter_process([sys.executable, "-c", WRITER, "0"], CHUNK_SIZE))
+    assert size == MEDIA_SIZE
+    assert largest <= CHUNK_SIZE
+    assert peak < MEDIA_SIZE / 8, peak
+
+    with pytest.raises(MediaStreamError, match="status 3: decoder gave up"):
+        await read_all(iter_process([sys.executable, "-c", WRITER, "3"], CHUNK_SIZE))
+
+    with pytest.raises(MediaStreamError, match="Could not start"):
+        await prime_stream(iter_process(["/nonexistent/ffmpeg", "-i", "x"]))
+
+    # A consumer that stops early does not leave the process running
+    chunks = iter_process([sys.executable, "-c", "import sys\nwhile True: sys.stdout.buffer.write(b'x' * 65536)"])
+    assert len(await chunks.__anext__()) > 0
+    await chunks.aclose()
+
+
+@pytest.mark.asyncio
+async def test_write_stream_never_leaves_partial_files(media_server, tmp_path):
+    base_url, _ = media_server
+    target = tmp_path / "video.mp4"
+
+    assert await write_stream(iter_url(f"{base_url}/video.mp4"), str(target)) == MEDIA_SIZE
+    assert target.stat().st_size == MEDIA_SIZE
+
+    failed = tmp_path / "failed.mp4"
+    with pytest.raises(MediaStreamError):
+        await write_stream(iter_process([sys.executable, "-c", WRITER, "1"]), str(failed))
+    assert os.listdir(tmp_path) == ["video.mp4"]
+
+
+def test_ffmpeg_commands_pipe_to_stdout():
+    source = MediaSource.from_info({
+        "url": "https://example.com/vod/index.m3u8",
+        "protocol": "m3u8_native",
+        "http_headers": {"User-Agent": "UA", "Referer": "https://www.twitch.tv/"},
+    })
+    assert source.is_hls
+
+    audio = ffmpeg_audio_command(source, "m4a")
+    assert audio[audio.index("-headers") + 1] == "User-Agent: UA\r\nReferer: https://www.twitch.tv/\r\n"
+    assert audio[audio.index("-i") + 1] == source.url
+    assert "-vn" in audio and "frag_keyframe+empty_moov" in audio and audio[-1] == "pipe:1"
+
+    remux = ffmpeg_remux_command(source)
+    assert remux[remux.index("-c") + 1] == "copy" and remux[-1] == "pipe:1"
+
+    with pytest.raises(ValueError):
+        ffmpeg_audio_command(source, "flac")
+    with pytest.raises(MediaStreamError):
+        MediaSource.from_info({"id": "123"})
+
+
+def test_cookies_are_sent_as_a_cookie_header():
+    source = MediaSource.from_info({
+        "url": "https://v16.tiktokcdn.com/video.mp4",
+        "http_headers": {"User-Agent": "UA"},
+        "cookies": "tt_chain_token=abc; Domain=.tiktok.com; Path=/; Secure; Expires=1893456000; "
+                   "ttwid=1%7Cxyz; Domain=.tiktok.com; Path=/",
+    })
+    assert source.headers == {"User-Agent": "UA", "Cookie": "tt_chain_token=abc; ttwid=1%7Cxyz"}
+
+    audio = ffmpeg_audio_command(source, "mp3")
+    assert "Cookie: tt_chain_token=abc; ttwid=1%7Cxyz\r\n" in audio[audio.index("-headers") + 1]
+
+    explicit = MediaSource.from_info({"url": "https://a/b.mp4", "http_headers": {"Cookie": "a=1"}, "cookies": "b=2"})
+    assert explicit.headers == {"Cookie": "a=1"}
@@ -0,0 +1,151 @@
+"""
+Tests for concurrent, cached Phase 5 validation.
+"""
+
+import json
+import threading
+import time
+
+import pytest
+
+from src.core.leadgen import phase5_validate
+
+
+CRITERIA = {
+    "industry": "Fintech",
+    "mustHaveSpecificKeywords": ["payments"],
+    "customValidationRules": "Must offer B2B payment APIs",
+}
+
+
+class StubLLM:
+    """validate_content stand-in that sleeps like a network call and counts calls."""
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def validate_content(self, text_content, validation_type="all", custom_prompt=None):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.latency)
+        with self._lock:
+            self.active -= 1
+        return {"is_valid": "payments" in text_content, "evidence": "stub", "confidence": 0.9}
+
+
+def write_combined(count: int, start: int = 0):
+    websites = [
+        {"url": f"https://site{i}.example", "title": f"Site {i}", "snippet": "payments platform"}
+        for i in range(start, start + count)
+    ]
+    with open(phase5_validate.COMBINED_DATA_FILE, "w") as f:
+        json.dump({"websites": websites}, f)
+    return websites
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    (tmp_path / "data").mkdir()
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_validation_runs_concurrently(workdir):
+    write_combined(20)
+    llm = StubLLM(latency=0.05)
+
+    started = time.monotonic()
+    result = phase5_validate.run(CRITERIA, max_workers=10, llm_client=llm)
+    elapsed = time.monotonic() - started
+
+    assert llm.calls == 20
+    assert llm.peak > 1
+    # Serial would take 20 * 0.05 = 1s
+    assert elapsed < 0.6
+    assert result["total_websites"] == 20
+    assert [w["url"] for w in result["websites"]] == [f"https://site{i}.example" for i in range(20)]
+    assert all(w["validation_results"]["ai_validation"]["evidence"] == "stub" for w in result["websites"])
+
+
+def test_rerun_uses_cache(workdir):
+    write_combined(8)
+    first = phase5_validate.run(CRITERIA, max_workers=4, llm_client=StubLLM(latency=0))
+
+    llm = StubLLM(latency=0)
+    second = phase5_validate.run(CRITERIA, max_workers=4, llm_client=llm)
+
+    assert llm.calls == 0
+    assert [w["is_valid"] for w in second["websites"]] == [w["is_valid"] for w in first["websites"]]
+
+
+def test_changed_criteria_invalidate_cache(workdir):
+    write_combined(4)
+    phase5_validate.run(CRITERIA, max_workers=4, llm_client=StubLLM(latency=0))
+
+    llm = StubLLM(latency=0)
+    phase5_validate.run({**CRITERIA, "industry": "Insurance"}, max_workers=4, llm_client=llm)
+
+    assert llm.calls == 4
+
+
+def test_interrupted_run_resumes(workdir):
+    write_combined(6)
+    phase5_validate.run(CRITERIA, max_workers=2, llm_client=StubLLM(latency=0))
+
+    # Simulate a crash partway through a larger run: half the new sites done,
+    # last cache line cut off mid-write
+    write_combined(10)
+    cache_path = workdir / phase5_validate.VALIDATION_CACHE_FILE
+    with open(cache_path, "a") as f:
+        f.write('{"key": "trunc')
+
+    llm = StubLLM(latency=0)
+    result = phase5_validate.run(CRITERIA, max_workers=2, llm_client=llm)
+
+    assert llm.calls == 4
+    assert result["total_websites"] == 10
+
+    # The verdicts written after the torn line must survive the next load
+    llm = StubLLM(latency=0)
+    phase5_validate.run(CRITERIA, max_workers=2, llm_client=llm)
+    assert llm.calls == 0
+
+
+class FailingLLM(StubLLM):
+    """Fails (like a 429 / API error) for the first ``failures`` calls."""
+
+    def __init__(self, failures: int):
+        super().__init__(latency=0)
+        self.failures = failures
+
+    def validate_content(self, text_content, validation_type="all", custom_prompt=None):
+        with self._lock:
+            self.calls += 1
+            failing = self.calls <= self.failures
+        if failing:
+            if self.calls % 2:
+                raise RuntimeError("429 Too Many Requests")
+            return None
+        return {"is_valid": True, "evidence": "stub", "confidence": 0.9}
+
+
+def test_verdicts_without_ai_validation_are_not_cached(workdir):
+    write_combined(6)
+    phase5_validate.run(CRITERIA, max_workers=1, llm_client=FailingLLM(failures=4))
+    assert len(phase5_validate.ValidationCache()) == 2
+
+    llm = StubLLM(latency=0)
+    result = phase5_validate.run(CRITERIA, max_workers=4, llm_client=llm)
+    assert llm.calls == 4
+    assert all("ai_validation" in w["validation_results"] for w in result["websites"])
+
+    # Without custom rules there is no AI check to wait for
+    no_ai = {k: v for k, v in CRITERIA.items() if k != "customValidationRules"}
+    phase5_validate.run(no_ai, max_workers=2, llm_client=llm)
+    assert len(phase5_validate.ValidationCache()) == 12
@@ -0,0 +1,100 @@
+"""
+Tests for RAG chunk ingestion via batched Core INSERTs.
+
+Chunking runs against an in-memory SQLite database with more chunks than
+``BULK_INSERT_BATCH_SIZE`` so rows are written across several batches. The
+module is skipped when the RAG package cannot be imported (e.g. its client
+libraries are not installed).
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("src.rag.services")
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from src.core.database import Base
+from src.core.tokens import get_token_encoder
+from src.rag.models import (
+    RAGChunk,
+    RAGProcessingStep,
+    RAGSource,
+    RAGWorkflow,
+    SourceStatus,
+    SourceType,
+    WorkflowType,
+)
+from src.rag.services import BULK_INSERT_BATCH_SIZE, RAGProcessingService
+
+CHUNK_SIZE = 10
+CHUNKS_PER_SOURCE = 700
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("JINA_API_KEY", "test")
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[
+        RAGWorkflow.__table__,
+        RAGSource.__table__,
+        RAGChunk.__table__,
+        RAGProcessingStep.__table__,
+    ])
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def make_workflow(db, source_count: int) -> RAGWorkflow:
+    workflow = RAGWorkflow(
+        name="bulk",
+        type=WorkflowType.DOCUMENTS.value,
+        user_id="user",
+        parameters={"chunkSize": CHUNK_SIZE, "overlap": 0},
+        stats={},
+    )
+    db.add(workflow)
+    db.flush()
+    for s in range(source_count):
+        words = " ".join(f"s{s}w{i}" for i in range(CHUNK_SIZE * CHUNKS_PER_SOURCE))
+        db.add(RAGSource(
+            workflow_id=workflow.id,
+            source=f"doc-{s}.txt",
+            source_type=SourceType.DOCUMENT.value,
+            status=SourceStatus.COMPLETED.value,
+            metadata={"raw_content": words, "title": f"doc {s}"},
+            stats={},
+        ))
+    db.commit()
+    return workflow
+
+
+def test_chunking_bulk_inserts_across_batches(db):
+    workflow = make_workflow(db, source_count=2)
+    total = 2 * CHUNKS_PER_SOURCE
+    assert total > BULK_INSERT_BATCH_SIZE
+
+    asyncio.run(RAGProcessingService(db)._process_chunking(workflow.id))
+
+    assert db.scalar(select(func.count()).select_from(RAGChunk)) == total
+    chunks = db.scalars(select(RAGChunk)).all()
+    assert len({chunk.id for chunk in chunks}) == total
+
+    encoder = get_token_encoder()
+    sources = db.scalars(select(RAGSource)).all()
+    for source in sources:
+        rows = sorted((c for c in chunks if c.source_id == source.id), key=lambda c: c.chunk_index)
+        assert [c.chunk_index for c in rows] == list(range(CHUNKS_PER_SOURCE))
+        assert all(c.token_count == len(encoder.encode(c.content)) for c in rows)
+        assert source.stats["chunks"] == CHUNKS_PER_SOURCE
+        assert source.stats["total_tokens"] == sum(c.token_count for c in rows)
+
+    db.refresh(workflow)
+    assert workflow.stats["total_chunks"] == total
+    step = db.scalars(select(RAGProcessingStep)).one()
+    assert step.step_name == "chunking" and step.status == "completed"
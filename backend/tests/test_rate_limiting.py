@@ -0,0 +1,163 @@
+"""
+Tests for the GCRA rate limiters in core/rate_limiting.
+
+The Redis limiter runs its real Lua script inside an in-process fake Redis
+built on lupa (Lua 5.1, as embedded in Redis); those tests are skipped when
+lupa is not installed.
+"""
+
+import random
+import threading
+
+import pytest
+
+from src.core import rate_limiting
+from src.core.rate_limiting import (
+    InMemoryRateLimiter,
+    RateLimitException,
+    RedisRateLimiter,
+    check_rate_limit,
+)
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeRedis:
+    """Just enough Redis to run scripts: TIME, GET and SET ... PX, on a fake clock"""
+
+    def __init__(self, clock: FakeClock):
+        from lupa.lua51 import LuaRuntime
+
+        self.clock = clock
+        self.store = {}
+        self.lua = LuaRuntime(unpack_returned_tuples=True)
+        self.lua.globals().redis = self.lua.table_from({"call": self._call})
+        self._lock = threading.Lock()
+
+    def _call(self, command, *args):
+        now_ms = int(self.clock() * 1000)
+        command = command.upper()
+        if command == "TIME":
+            micros = int(round(self.clock() * 1_000_000))
+            return self.lua.table(str(micros // 1_000_000), str(micros % 1_000_000))
+        if command == "GET":
+            value, expires_at = self.store.get(args[0], (None, None))
+            if value is None or expires_at <= now_ms:
+                self.store.pop(args[0], None)
+                return False
+            return value
+        if command == "SET":
+            key, value, unit, ttl = args
+            assert unit == "PX" and int(ttl) > 0
+            self.store[key] = (str(value), now_ms + int(ttl))
+            return "OK"
+        raise NotImplementedError(command)
+
+    def register_script(self, script: str):
+        function = self.lua.eval(f"function(KEYS, ARGV) {script} end")
+
+        def run(keys, args):
+            with self._lock:
+                result = function(self.lua.table(*keys), self.lua.table(*(str(a) for a in args)))
+                # Redis truncates Lua numbers to integers in replies
+                return [int(v) for v in result.values()]
+
+        return run
+
+
+def test_burst_then_one_request_per_emission_interval():
+    clock = FakeClock()
+    limiter = InMemoryRateLimiter(clock=clock)
+
+    results = [limiter.acquire("user", limit=5, window_seconds=10) for _ in range(6)]
+    assert [r.allowed for r in results] == [True] * 5 + [False]
+    assert [r.remaining for r in results[:5]] == [4, 3, 2, 1, 0]
+    assert results[5].retry_after == pytest.approx(2.0)       # window / limit
+    assert results[4].reset_after == pytest.approx(10.0)
+
+    assert limiter.get_remaining_requests("user", 5, 10) == 0  # peeking consumes nothing
+    clock.now += 2.0
+    assert limiter.check_rate_limit("user", 5, 10)
+    assert not limiter.check_rate_limit("user", 5, 10)
+
+    clock.now += 10.0
+    assert limiter.peek("user", 5, 10).remaining == 5
+    assert limiter.get_remaining_requests("never-seen", 5, 10) == 5
+    assert not limiter.acquire("user", 0, 10).allowed
+
+
+def test_state_is_one_value_per_key_and_idle_keys_are_evicted():
+    clock = FakeClock()
+    limiter = InMemoryRateLimiter(sweep_interval=30, clock=clock)
+
+    for i in range(20000):
+        limiter.check_rate_limit("hot", 1000, 60)
+    for i in range(5000):
+        limiter.check_rate_limit(f"user-{i}", 10, 60)
+    assert len(limiter) == 5001
+    assert isinstance(limiter._tats["hot"], int)
+
+    clock.now += 61
+    limiter.check_rate_limit("fresh", 10, 60)
+    assert len(limiter) == 1
+
+
+def test_concurrent_threads_never_exceed_the_limit():
+    limiter = InMemoryRateLimiter(clock=FakeClock())
+    allowed = []
+
+    def worker():
+        allowed.append(sum(limiter.check_rate_limit("shared", 1000, 3600) for _ in range(500)))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(allowed) == 1000
+
+
+def test_redis_lua_script_matches_in_memory_limiter():
+    pytest.importorskip("lupa")
+    clock = FakeClock()
+    redis_limiter = RedisRateLimiter(FakeRedis(clock), prefix="rl:")
+    memory_limiter = InMemoryRateLimiter(clock=clock)
+    rng = random.Random(0)
+
+    for _ in range(2000):
+        clock.now += rng.choice([0.0, 0.001, 0.05, 0.3, 2.5])
+        key = rng.choice(["alice", "bob"])
+        expected = memory_limiter.acquire(key, 20, 10)
+        actual = redis_limiter.acquire(key, 20, 10)
+        assert (actual.allowed, actual.remaining) == (expected.allowed, expected.remaining)
+        assert actual.retry_after == pytest.approx(expected.retry_after, abs=1e-5)
+        assert actual.reset_after == pytest.approx(expected.reset_after, abs=1e-5)
+        assert redis_limiter.get_remaining_requests(key, 20, 10) == memory_limiter.get_remaining_requests(key, 20, 10)
+
+    # Keys carry a TTL, so idle ones disappear from Redis on their own
+    fake = redis_limiter.client
+    assert set(fake.store) <= {"rl:alice", "rl:bob"}
+    clock.now += 11
+    assert redis_limiter.peek("alice", 20, 10).remaining == 20
+    assert "rl:alice" not in fake.store
+
+
+@pytest.mark.asyncio
+async def test_check_rate_limit_reports_retry_after(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiting, "_rate_limiter", InMemoryRateLimiter(clock=clock))
+
+    for _ in range(3):
+        await check_rate_limit("user-1", "search", limit=3, window_hours=1)
+    with pytest.raises(RateLimitException) as excinfo:
+        await check_rate_limit("user-1", "search", limit=3, window_hours=1)
+    assert excinfo.value.retry_after == 1200
+
+    info = rate_limiting.get_rate_limit_info("user-1", "search", limit=3, window_hours=1)
+    assert info["remaining"] == 0
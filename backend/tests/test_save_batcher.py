@@ -0,0 +1,137 @@
+"""
+Tests for the write-ahead logged SaveBatcher.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from src.services.save_batcher import SaveBatcher, replay_wal_dir
+
+
+class FlakySave:
+    """save_fn that fails a set number of times before succeeding."""
+
+    def __init__(self, failures: int = 0, latency: float = 0.0):
+        self.failures = failures
+        self.latency = latency
+        self.saved = []
+        self.calls = 0
+
+    async def __call__(self, items):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.failures > 0:
+            self.failures -= 1
+            raise RuntimeError("convex unavailable")
+        self.saved.extend(items)
+
+
+@pytest.mark.asyncio
+async def test_retries_are_capped_and_nothing_is_lost(tmp_path):
+    save = FlakySave(failures=2)
+    batcher = SaveBatcher(save, batch_size=5, flush_interval=60, wal_path=str(tmp_path / "leads.wal"),
+                          max_retries=3, base_backoff=0.01)
+
+    for i in range(12):
+        await batcher.add({"id": i})
+    await batcher.drain()
+
+    assert sorted(item["id"] for item in save.saved) == list(range(12))
+    assert batcher.stats["retries"] == 2
+    assert not (tmp_path / "leads.wal").exists()
+
+
+@pytest.mark.asyncio
+async def test_failed_final_save_is_replayed_on_startup(tmp_path):
+    wal_path = str(tmp_path / "leads.wal")
+    down = FlakySave(failures=10 ** 6)
+    batcher = SaveBatcher(down, batch_size=4, flush_interval=60, wal_path=wal_path,
+                          max_retries=1, base_backoff=0.01)
+    for i in range(6):
+        await batcher.add({"id": i})
+    pending = await batcher.drain()
+    assert [item["id"] for item in pending] == list(range(6))
+
+    up = FlakySave()
+    recovered = SaveBatcher(up, batch_size=4, flush_interval=60, wal_path=wal_path)
+    await recovered.start()
+    assert recovered.stats["replayed"] == 6
+    await recovered.add({"id": 6})
+    await recovered.drain()
+
+    assert [item["id"] for item in up.saved] == list(range(7))
+
+
+@pytest.mark.asyncio
+async def test_replay_skips_acked_items_and_torn_tail(tmp_path):
+    wal_path = tmp_path / "leads.wal"
+    records = [{"op": "add", "seq": i, "item": {"id": i}} for i in range(1, 6)]
+    records.append({"op": "ack", "seqs": [1, 2, 3]})
+    wal_path.write_text("\n".join(json.dumps(r) for r in records) + '\n{"op": "add", "se')
+
+    save = FlakySave()
+    batcher = SaveBatcher(save, batch_size=10, flush_interval=60, wal_path=str(wal_path))
+    await batcher.start()
+    await batcher.drain()
+
+    assert [item["id"] for item in save.saved] == [4, 5]
+
+
+@pytest.mark.asyncio
+async def test_add_applies_backpressure(tmp_path):
+    save = FlakySave(latency=0.02)
+    batcher = SaveBatcher(save, batch_size=5, flush_interval=60, max_pending=10,
+                          wal_path=str(tmp_path / "leads.wal"))
+    peak = 0
+
+    for i in range(60):
+        await batcher.add({"id": i})
+        peak = max(peak, batcher.pending)
+    await batcher.drain()
+
+    assert peak <= 10
+    assert len(save.saved) == 60
+
+
+@pytest.mark.asyncio
+async def test_batch_size_adapts_to_latency():
+    fast = SaveBatcher(FlakySave(), batch_size=8, flush_interval=60, target_latency=1.0)
+    for i in range(200):
+        await fast.add({"id": i})
+    await fast.drain()
+    assert fast.batch_size == fast.max_batch_size
+
+    slow = SaveBatcher(FlakySave(latency=0.05), batch_size=8, flush_interval=60, target_latency=0.01)
+    for i in range(40):
+        await slow.add({"id": i})
+    await slow.drain()
+    assert slow.batch_size == slow.min_batch_size
+
+
+@pytest.mark.asyncio
+async def test_leftover_logs_are_drained_on_startup(tmp_path):
+    down = FlakySave(failures=10 ** 6)
+    for search_id, count in (("search-a", 3), ("search-b", 5)):
+        batcher = SaveBatcher(down, batch_size=4, flush_interval=60, wal_path=str(tmp_path / f"{search_id}.wal"),
+                              max_retries=0)
+        for i in range(count):
+            await batcher.add({"id": f"{search_id}-{i}"})
+        await batcher.drain()
+    (tmp_path / "search-c.wal.replay-999999999").write_text('{"op": "add", "seq": 1, "item": {"id": "c"}}\n')
+
+    saves = {}
+
+    def save_fn_for(search_id):
+        saves[search_id] = FlakySave(failures=10 ** 6 if search_id == "search-b" else 0)
+        return saves[search_id]
+
+    remaining = await replay_wal_dir(str(tmp_path), save_fn_for, max_retries=0)
+
+    assert remaining == {"search-a": 0, "search-b": 5, "search-c": 0}
+    assert [item["id"] for item in saves["search-a"].saved] == ["search-a-0", "search-a-1", "search-a-2"]
+    assert [item["id"] for item in saves["search-c"].saved] == ["c"]
+    # Unsaved leads go back under their search's log for the next attempt
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["search-b.wal"]
+    assert await replay_wal_dir(str(tmp_path / "missing"), save_fn_for) == {}
@@ -0,0 +1,112 @@
+"""
+Tests for columnar (Arrow FixedSizeList / raw .npy) vector exports.
+"""
+
+import json
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from src.services.vector_columnar_export import (
+    ColumnarVectorWriter,
+    NpyVectorWriter,
+    npy_sidecar_path,
+    open_npy_vectors,
+    read_vector_batches,
+)
+
+
+def make_rows(count: int, dimensions: int = 32):
+    rng = np.random.default_rng(3)
+    vectors = rng.standard_normal((count, dimensions), dtype=np.float32)
+    ids = [f"vec-{i}" for i in range(count)]
+    metadatas = [{"index": i, "source": "test"} for i in range(count)]
+    documents = [f"document {i}" for i in range(count)]
+    return ids, vectors, metadatas, documents
+
+
+def read_all(path, **kwargs):
+    batches = list(read_vector_batches(path, **kwargs))
+    return {
+        "ids": [i for b in batches for i in b["ids"]],
+        "vectors": np.concatenate([b["vectors"] for b in batches]),
+        "metadatas": [m for b in batches for m in b["metadatas"]],
+        "documents": [d for b in batches for d in b["documents"]],
+        "batches": len(batches),
+    }
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "feather"])
+def test_columnar_round_trip_in_row_groups(tmp_path, file_format):
+    ids, vectors, metadatas, documents = make_rows(1000)
+    path = tmp_path / f"vectors.{file_format}"
+
+    with ColumnarVectorWriter(path, 32, file_format=file_format, row_group_size=256) as writer:
+        writer.write_batch(ids[:600], vectors[:600], metadatas[:600], documents[:600])
+        writer.write_batch(ids[600:], vectors[600:], metadatas[600:], documents[600:])
+
+    result = read_all(path)
+    assert result["ids"] == ids
+    assert np.array_equal(result["vectors"], vectors)
+    assert result["metadatas"] == metadatas
+    assert result["documents"] == documents
+    # 600 -> 256+256+88, 400 -> 256+144
+    assert result["batches"] == 5
+
+
+def test_parquet_vector_column_is_fixed_size_float32(tmp_path):
+    ids, vectors, metadatas, _ = make_rows(10, dimensions=1024)
+    path = tmp_path / "vectors.parquet"
+
+    with ColumnarVectorWriter(path, 1024, include_documents=False) as writer:
+        writer.write_batch(ids, vectors, metadatas)
+
+    vector_type = pq.read_schema(path).field("vector").type
+    assert pa.types.is_fixed_size_list(vector_type)
+    assert vector_type.list_size == 1024
+    assert vector_type.value_type == pa.float32()
+    # float32 payload, not 8-byte floats or JSON text
+    assert path.stat().st_size < 10 * 1024 * 4 * 1.2 + 4096
+
+
+def test_feather_reads_are_zero_copy_views(tmp_path):
+    ids, vectors, metadatas, documents = make_rows(100)
+    path = tmp_path / "vectors.feather"
+    with ColumnarVectorWriter(path, 32, file_format="feather") as writer:
+        writer.write_batch(ids, vectors, metadatas, documents)
+
+    batch = next(read_vector_batches(path))
+    assert not batch["vectors"].flags.owndata
+
+
+def test_npy_export_is_memory_mappable_with_sidecar(tmp_path):
+    ids, vectors, metadatas, documents = make_rows(500)
+    path = tmp_path / "vectors.npy"
+
+    with NpyVectorWriter(path, 500, 32) as writer:
+        writer.write_batch(ids[:200], vectors[:200], metadatas[:200], documents[:200])
+        writer.write_batch(ids[200:], vectors[200:], metadatas[200:], documents[200:])
+
+    matrix = open_npy_vectors(path)
+    assert isinstance(matrix, np.memmap)
+    assert matrix.dtype == np.float32
+    assert np.array_equal(matrix, vectors)
+    sidecar = npy_sidecar_path(path).read_text().splitlines()
+    assert json.loads(sidecar[499])["id"] == "vec-499"
+
+    result = read_all(path, batch_size=128)
+    assert result["ids"] == ids
+    assert result["metadatas"] == metadatas
+
+
+def test_dimension_mismatch_is_rejected(tmp_path):
+    ids, vectors, _, _ = make_rows(4)
+    with ColumnarVectorWriter(tmp_path / "v.parquet", 16) as writer:
+        with pytest.raises(ValueError):
+            writer.write_batch(ids, vectors)
+
+    with NpyVectorWriter(tmp_path / "v.npy", 2, 32) as writer:
+        with pytest.raises(ValueError):
+            writer.write_batch(ids, vectors)
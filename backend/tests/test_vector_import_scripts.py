@@ -0,0 +1,145 @@
+"""
+Tests for generated vector database import scripts.
+
+The generated scripts are executed in a subprocess against minimal fake
+``chromadb`` / ``pinecone`` client modules that record every upsert.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import numpy as np
+import pytest
+
+from src.services.vector_columnar_export import NpyVectorWriter
+from src.services.vector_database_service import (
+    VectorDatabaseProvider,
+    VectorDatabaseService,
+    VectorExportConfig,
+    VectorRecord,
+)
+from src.services.vector_import_scripts import (
+    create_chromadb_import_script,
+    create_pinecone_import_script,
+    create_weaviate_import_script,
+    write_import_data_file,
+)
+
+FAKE_CHROMADB = '''
+import json, os, threading
+_lock = threading.Lock()
+
+class _Collection:
+    def add(self, ids, embeddings, metadatas, documents):
+        with _lock, open(os.environ["UPSERT_LOG"], "a") as f:
+            f.write(json.dumps({"ids": ids, "dims": len(embeddings[0]), "thread": threading.get_ident()}) + "\\n")
+
+class Client:
+    def get_or_create_collection(self, name):
+        return _Collection()
+'''
+
+FAKE_PINECONE = '''
+import json, os, threading
+_lock = threading.Lock()
+
+def init(**kwargs):
+    pass
+
+def list_indexes():
+    return []
+
+def create_index(name, dimension, metric):
+    with open(os.environ["UPSERT_LOG"] + ".index", "w") as f:
+        f.write(json.dumps({"name": name, "dimension": dimension}))
+
+class Index:
+    def __init__(self, name):
+        pass
+
+    def upsert(self, vectors, namespace):
+        with _lock, open(os.environ["UPSERT_LOG"], "a") as f:
+            f.write(json.dumps({"ids": [v["id"] for v in vectors], "dims": len(vectors[0]["values"]), "namespace": namespace}) + "\\n")
+'''
+
+
+def make_data(count: int, dims: int = 8):
+    rng = np.random.default_rng(0)
+    ids = [f"vec-{i}" for i in range(count)]
+    vectors = rng.standard_normal((count, dims)).astype(np.float32)
+    metadatas = [{"index": i} for i in range(count)]
+    documents = [f"doc {i}" for i in range(count)]
+    return ids, vectors, metadatas, documents
+
+
+def run_script(tmp_path, script: str, fake_modules: dict, *args):
+    for name, source in fake_modules.items():
+        (tmp_path / f"{name}.py").write_text(textwrap.dedent(source))
+    script_path = tmp_path / "import_script.py"
+    script_path.write_text(script)
+    log_path = tmp_path / "upserts.log"
+    env = {**os.environ, "PYTHONPATH": str(tmp_path), "UPSERT_LOG": str(log_path)}
+    completed = subprocess.run(
+        [sys.executable, str(script_path), *args],
+        env=env, cwd=tmp_path, capture_output=True, text=True, timeout=60,
+    )
+    assert completed.returncode == 0, completed.stderr
+    return [json.loads(line) for line in log_path.read_text().splitlines()], completed.stdout
+
+
+def test_chromadb_script_streams_jsonl_in_batches(tmp_path):
+    ids, vectors, metadatas, documents = make_data(1050)
+    data_file = write_import_data_file(tmp_path / "vectors.import.jsonl", ids, vectors, metadatas, documents)
+    script = create_chromadb_import_script(data_file, "embeddings", batch_size=100, workers=4)
+
+    upserts, stdout = run_script(tmp_path, script, {"chromadb": FAKE_CHROMADB})
+
+    assert sorted(i for u in upserts for i in u["ids"]) == sorted(ids)
+    assert max(len(u["ids"]) for u in upserts) == 100
+    assert len(upserts) == 11
+    assert "imported 1050 vectors" in stdout
+
+
+def test_pinecone_script_reads_npy_and_overrides(tmp_path):
+    ids, vectors, metadatas, documents = make_data(300, dims=16)
+    with NpyVectorWriter(tmp_path / "vectors.npy", 300, 16) as writer:
+        writer.write_batch(ids, vectors, metadatas, documents)
+    script = create_pinecone_import_script(str(tmp_path / "vectors.npy"), "idx", "ns", 16, batch_size=100)
+
+    upserts, _ = run_script(tmp_path, script, {"pinecone": FAKE_PINECONE}, "--batch-size", "64", "--workers", "2")
+
+    assert sorted(i for u in upserts for i in u["ids"]) == sorted(ids)
+    assert all(u["dims"] == 16 and u["namespace"] == "ns" for u in upserts)
+    assert max(len(u["ids"]) for u in upserts) == 64
+    assert json.loads((tmp_path / "upserts.log.index").read_text()) == {"name": "idx", "dimension": 16}
+
+
+def test_script_size_does_not_depend_on_vector_count(tmp_path):
+    schema = {"class": "Embeddings", "vectorizer": "none", "properties": {"flag": {"indexed": True, "x": None}}}
+
+    small = create_weaviate_import_script("a.jsonl", "Embeddings", schema)
+    large = create_weaviate_import_script("a.jsonl", "Embeddings", schema, batch_size=10_000, workers=16)
+
+    assert abs(len(large) - len(small)) < 16
+    compile(small, "weaviate_import.py", "exec")
+
+
+@pytest.mark.asyncio
+async def test_export_without_output_path_returns_import_data(tmp_path):
+    ids, vectors, metadatas, documents = make_data(250)
+    records = [
+        VectorRecord(id=i, vector=v.tolist(), metadata=m, text=d)
+        for i, v, m, d in zip(ids, vectors, metadatas, documents)
+    ]
+    config = VectorExportConfig(provider=VectorDatabaseProvider.CHROMADB, batch_size=100)
+
+    result = await VectorDatabaseService().prepare_vector_export(records, config)
+
+    assert result["import_data_file"] == "vectors.import.jsonl"
+    (tmp_path / result["import_data_file"]).write_text(result["import_data"])
+    upserts, stdout = run_script(tmp_path, result["import_scripts"]["python"], {"chromadb": FAKE_CHROMADB})
+    assert sorted(i for u in upserts for i in u["ids"]) == sorted(ids)
+    assert "imported 250 vectors" in stdout
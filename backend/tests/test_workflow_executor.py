@@ -0,0 +1,171 @@
+"""
+Tests for DAG-parallel node execution in the automation WorkflowExecutor.
+
+HTTP branches call a local aiohttp server whose endpoint sleeps for the
+requested time, so branch overlap shows up directly in wall-clock time.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from src.automation.services import BaseNode, NodeRegistry, WorkflowExecutor
+
+
+class SlowServer:
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(float(request.query["delay"]))
+            return web.json_response({"branch": request.query["branch"]})
+        finally:
+            self.active -= 1
+
+
+class ProbeNode(BaseNode):
+    """Test node that sleeps, records concurrency and echoes its input"""
+    active = 0
+    peak = 0
+    seen = {}
+
+    async def execute(self, input_data, context):
+        ProbeNode.active += 1
+        ProbeNode.peak = max(ProbeNode.peak, ProbeNode.active)
+        try:
+            await asyncio.sleep(self.parameters.get("delay", 0.01))
+            if self.parameters.get("fail"):
+                raise RuntimeError(f"{self.node_id} failed")
+            ProbeNode.seen[self.node_id] = (input_data, context["inputs"])
+            return self.parameters.get("output", self.node_id)
+        finally:
+            ProbeNode.active -= 1
+
+    @classmethod
+    def get_node_info(cls):
+        return {"type": "probe", "name": "Probe", "category": "action"}
+
+
+@pytest.fixture(autouse=True)
+def probe_node():
+    NodeRegistry.register("probe", ProbeNode)
+    ProbeNode.active, ProbeNode.peak, ProbeNode.seen = 0, 0, {}
+    yield
+    NodeRegistry._nodes.pop("probe", None)
+
+
+@pytest_asyncio.fixture
+async def slow_server():
+    server = SlowServer()
+    app = web.Application()
+    app.router.add_get("/slow", server.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    server.base_url = f"http://127.0.0.1:{port}"
+    yield server
+    await runner.cleanup()
+
+
+def workflow(nodes, edges, settings=None):
+    """Workflow stand-in with n8n-style connections built from (source, target) pairs"""
+    connections = {}
+    for source, target in edges:
+        connections.setdefault(source, {"main": [[]]})["main"][0].append({"node": target, "type": "main", "index": 0})
+    return SimpleNamespace(nodes=nodes, connections=connections, settings=settings or {})
+
+
+def probe(node_id, **parameters):
+    return {"id": node_id, "type": "probe", "parameters": parameters}
+
+
+@pytest.mark.asyncio
+async def test_parallel_http_branches_take_the_time_of_the_longest_one(slow_server):
+    delays = {"a": 0.3, "b": 0.4, "c": 0.5}
+    nodes = [{"id": "trigger", "type": "webhook", "parameters": {"path": "/go"}}]
+    nodes += [
+        {"id": f"http-{branch}", "type": "httpRequest",
+         "parameters": {"url": f"{slow_server.base_url}/slow?branch={branch}&delay={delay}"}}
+        for branch, delay in delays.items()
+    ]
+    nodes.append({"id": "merge", "type": "code", "parameters": {"code": "output = len(input_data)"}})
+    edges = [("trigger", f"http-{b}") for b in delays] + [(f"http-{b}", "merge") for b in delays]
+
+    start = time.perf_counter()
+    data = await WorkflowExecutor(db=None)._execute_nodes(workflow(nodes, edges), {"lead": 1})
+    elapsed = time.perf_counter() - start
+
+    assert slow_server.max_active == 3
+    assert 0.5 <= elapsed < 0.5 + 0.3                 # sequential would be 1.2 s
+    assert data["trigger"] == {"lead": 1}
+    assert {data[f"http-{b}"]["body"]["branch"] for b in delays} == set(delays)
+    assert data["merge"] == 3
+
+
+@pytest.mark.asyncio
+async def test_fan_in_runs_once_after_all_parents_with_their_outputs():
+    #   start -> left  -> join -> tail
+    #   start -> right -^
+    nodes = [probe("start"), probe("left", delay=0.05), probe("right", delay=0.01), probe("join"), probe("tail")]
+    edges = [("start", "left"), ("start", "right"), ("left", "join"), ("right", "join"), ("join", "tail")]
+
+    data = await WorkflowExecutor(db=None)._execute_nodes(workflow(nodes, edges), {"x": 1})
+
+    assert data == {name: name for name in ("start", "right", "left", "join", "tail")}
+    assert list(data) == ["start", "right", "left", "join", "tail"]
+    assert ProbeNode.seen["start"] == ({"x": 1}, {})
+    assert ProbeNode.seen["left"][0] == "start"
+    assert ProbeNode.seen["join"][0] == {"left": "left", "right": "right"}
+    assert ProbeNode.seen["tail"][0] == "join"
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_and_workflow_override():
+    nodes = [probe("root", delay=0)] + [probe(f"branch-{i}", delay=0.05) for i in range(6)]
+    edges = [("root", f"branch-{i}") for i in range(6)]
+
+    await WorkflowExecutor(db=None, max_concurrency=2)._execute_nodes(workflow(nodes, edges), {})
+    assert ProbeNode.peak == 2
+
+    ProbeNode.peak = 0
+    await WorkflowExecutor(db=None, max_concurrency=2)._execute_nodes(
+        workflow(nodes, edges, settings={"maxConcurrency": 6}), {}
+    )
+    assert ProbeNode.peak == 6
+
+
+@pytest.mark.asyncio
+async def test_cycles_unknown_nodes_and_failures():
+    executor = WorkflowExecutor(db=None)
+
+    cyclic = workflow([probe("a"), probe("b"), probe("c")], [("a", "b"), ("b", "c"), ("c", "b")])
+    with pytest.raises(ValueError, match="b, c"):
+        await executor._execute_nodes(cyclic, {})
+
+    # A node of unknown type is skipped with everything only it leads to;
+    # a fan-in node still runs with the parents that did
+    nodes = [probe("start"), {"id": "mystery", "type": "notInstalled"}, probe("after-mystery"), probe("join")]
+    edges = [("start", "mystery"), ("mystery", "after-mystery"), ("start", "join"), ("mystery", "join"),
+             ("start", "missing-node")]
+    data = await executor._execute_nodes(workflow(nodes, edges), {})
+    assert set(data) == {"start", "join"}
+    assert ProbeNode.seen["join"][0] == "start"
+
+    # A failing node aborts the run and cancels its running siblings
+    nodes = [probe("start"), probe("bad", delay=0.01, fail=True), probe("slow", delay=5.0), probe("never")]
+    edges = [("start", "bad"), ("start", "slow"), ("bad", "never")]
+    start = time.perf_counter()
+    with pytest.raises(RuntimeError, match="bad failed"):
+        await executor._execute_nodes(workflow(nodes, edges), {})
+    assert time.perf_counter() - start < 1.0
+    assert ProbeNode.active == 0 and "never" not in ProbeNode.seen
@@ -0,0 +1,140 @@
+"""
+Tests for the shared yt-dlp extractor pool.
+
+A fake YoutubeDL stands in for yt-dlp: construction is deliberately slow (as
+real extractor setup is) and every instance checks it is never used by two
+threads at once.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.services.ytdlp_pool import YtdlpExtractorPool, canonical_url
+
+
+class FakeYoutubeDL:
+    created = 0
+    closed = 0
+    lock = threading.Lock()
+
+    def __init__(self, options):
+        time.sleep(0.02)                        # extractor and HTTP setup
+        with FakeYoutubeDL.lock:
+            FakeYoutubeDL.created += 1
+        self.options = options
+        self.busy = False
+        self.calls = 0
+
+    def extract_info(self, url, download=False):
+        assert not self.busy, "extractor used concurrently"
+        self.busy = True
+        try:
+            time.sleep(0.005)
+            self.calls += 1
+            if "private" in url:
+                raise RuntimeError("This video is private")
+            if "flaky" in url and self.calls % 2:
+                raise RuntimeError("HTTP Error 503")
+            return {"id": url.rsplit("/", 1)[-1], "playlistend": self.options.get("playlistend")}
+        finally:
+            self.busy = False
+
+    def __exit__(self, *exc):
+        FakeYoutubeDL.closed += 1
+
+
+@pytest.fixture
+def pool():
+    FakeYoutubeDL.created = FakeYoutubeDL.closed = 0
+    pool = YtdlpExtractorPool(workers=8, extractors_per_profile=4, factory=FakeYoutubeDL)
+    yield pool
+    pool.close()
+
+
+def test_canonical_url_strips_tracking_noise():
+    assert canonical_url("https://www.TikTok.com/@user/video/123/?is_from_webapp=1&sender=x#top") == \
+        "https://tiktok.com/@user/video/123"
+    assert canonical_url("https://m.youtube.com/watch?t=30&v=abc&feature=share") == "https://youtube.com/watch?v=abc"
+    assert canonical_url("https://www.instagram.com/p/XYZ/") == canonical_url("https://instagram.com/p/XYZ")
+    assert canonical_url("https://youtu.be/abc?si=Xy&utm_source=share") == "https://youtu.be/abc"
+
+
+def test_canonical_url_keeps_identifying_params():
+    # Embeds identify the clip only through the query string
+    first = canonical_url("https://clips.twitch.tv/embed?clip=FirstClip&parent=example.com")
+    second = canonical_url("https://clips.twitch.tv/embed?clip=SecondClip&parent=example.com")
+    assert first != second
+    assert canonical_url("https://clips.twitch.tv/embed?parent=example.com&clip=FirstClip&utm_medium=x") == first
+
+
+@pytest.mark.asyncio
+async def test_profile_of_300_videos_reuses_a_few_warm_extractors(pool):
+    options = {"quiet": True, "extract_flat": False}
+    urls = [f"https://www.tiktok.com/@creator/video/{i}" for i in range(300)]
+
+    start = time.perf_counter()
+    infos = await asyncio.gather(*(pool.extract_info(url, options) for url in urls))
+    elapsed = time.perf_counter() - start
+
+    assert [info["id"] for info in infos] == [str(i) for i in range(300)]
+    assert FakeYoutubeDL.created == 4                      # not 300
+    # 300 fresh instances would cost 300 x 20 ms of setup alone
+    assert elapsed < 300 * 0.02 / 2
+    stats = pool.get_stats()
+    assert stats["extractions"] == 300
+    assert list(stats["profiles"].values()) == [{"created": 4, "idle": 4}]
+
+    # A different option profile gets its own extractors
+    info = await pool.extract_info(urls[0], {**options, "playlistend": 25})
+    assert info["playlistend"] == 25
+    assert FakeYoutubeDL.created == 5
+
+
+@pytest.mark.asyncio
+async def test_metadata_cache_ttl_and_shared_inflight_requests():
+    clock_now = [0.0]
+    pool = YtdlpExtractorPool(workers=4, cache_ttl=60, factory=FakeYoutubeDL, clock=lambda: clock_now[0])
+    options = {"quiet": True}
+    try:
+        results = await asyncio.gather(*(
+            pool.extract_info(f"https://www.tiktok.com/@u/video/7?share_link_id={i}&_r=1", options) for i in range(10)
+        ))
+        assert all(r is results[0] for r in results)
+        assert pool.stats.extractions == 1 and pool.stats.shared_inflight == 9
+
+        await pool.extract_info("https://tiktok.com/@u/video/7", options)
+        assert pool.stats.cache_hits == 1
+
+        clock_now[0] += 61
+        await pool.extract_info("https://tiktok.com/@u/video/7", options)
+        assert pool.stats.extractions == 2
+
+        await pool.extract_info("https://tiktok.com/@u/video/7", options, use_cache=False)
+        assert pool.stats.extractions == 3
+        assert pool.extract_info_sync("https://tiktok.com/@u/video/7", options)["id"] == "7"
+        assert pool.stats.cache_hits == 2
+    finally:
+        pool.close()
+
+
+@pytest.mark.asyncio
+async def test_retries_permanent_errors_and_recycling():
+    pool = YtdlpExtractorPool(workers=1, extractors_per_profile=1, max_uses=3, factory=FakeYoutubeDL)
+    options = {"quiet": True}
+    try:
+        info = await pool.extract_info("https://tiktok.com/@u/video/flaky", options, retries=2, retry_delay=0.01)
+        assert info["id"] == "flaky" and pool.stats.retries == 1
+
+        with pytest.raises(RuntimeError, match="private"):
+            await pool.extract_info("https://tiktok.com/@u/video/private", options, retries=3, retry_delay=0.01)
+        assert pool.stats.retries == 1                       # permanent: not retried
+
+        for i in range(4):
+            await pool.extract_info(f"https://tiktok.com/@u/video/{i}", options)
+        assert pool.stats.extractors_recycled >= 1
+        assert FakeYoutubeDL.closed >= 1
+    finally:
+        pool.close()